@@ -1,8 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.db.connection import init_db
+from backend.db.connection import SessionLocal, init_db
 from backend.routers import auth, history, movies, recommendation, tags
+from backend.services.collaborative import start_cooccurrence_index
+from backend.services.interaction_stats import ensure_interaction_stats
+from backend.services.recommender_service import start_model_watch
+from backend.services.similarity_index import start_similarity_index
+from backend.services.trending import start_trending_refresh
+from backend.services.warmup import start_warmup
+from backend.utils.helpers import start_memory_profiling
 
 app = FastAPI(
     title="Film Öneri API",
@@ -22,8 +29,23 @@ app.add_middleware(
 
 @app.on_event("startup")
 def on_startup():
+    # PROFILE_HOT_PATHS: tracemalloc süreç başına bir kez (measure() ölçümleri süreç genelidir)
+    start_memory_profiling()
     # Veritabanı tablolarını oluştur (varsa dokunmaz)
     init_db()
+    # Film etkileşim sayaçları boşsa user_history'den bir kez doldur
+    ensure_interaction_stats(SessionLocal)
+    # "Benzer filmler" k-NN indeksini kur ve artımlı yenilemeyi başlat
+    start_similarity_index(SessionLocal)
+    # user_history co-occurrence matrisini diskten yükle (tutarsızsa yeniden kur)
+    start_cooccurrence_index(SessionLocal)
+    # Trend / duygu liderlik listelerini hesapla ve periyodik yenilemeyi başlat
+    start_trending_refresh(SessionLocal)
+    # Yeni model versiyonu yayınlandığında (CURRENT) modeli kesintisiz yeniden yükle
+    start_model_watch()
+    # Model tahminleri, bağlantı havuzu ve sıcak sorgular: ilk istek tembel başlatma ödemesin
+    # (arka planda; /recommendation/health bitene kadar "warming_up" + 503)
+    start_warmup(SessionLocal)
 
 
 # Router'ları ekle
@@ -3,10 +3,14 @@ Merkezi konfigürasyon dosyası.
 Tüm ortam değişkenleri ve ayarlar burada tanımlanır.
 """
 
+import logging
 import os
 from pathlib import Path
 from typing import List, Optional
 
+# Import sırasında stdout'a yazılmaz; uyarılar logging üzerinden gider
+logger = logging.getLogger(__name__)
+
 # Load environment variables from project root .env (if present)
 try:
     from dotenv import load_dotenv
@@ -17,12 +21,12 @@ try:
     if dotenv_path.exists():
         # .env dosyasındaki değişkenleri environment'a yükle
         load_dotenv(dotenv_path)
-        print(f"✅ .env dosyası yüklendi: {dotenv_path}")
+        logger.debug(f"✅ .env dosyası yüklendi: {dotenv_path}")
     else:
-        print(f"⚠️  .env dosyası bulunamadı: {dotenv_path}")
+        logger.debug(f"⚠️  .env dosyası bulunamadı: {dotenv_path}")
 except Exception as e:
     # python-dotenv kurulu değilse veya yükleme başarısız olursa sessizce devam et
-    print(f"ℹ️  .env yüklenemedi: {e}")
+    logger.debug(f"ℹ️  .env yüklenemedi: {e}")
 
 
 class Settings:
@@ -74,6 +78,85 @@ class Settings:
     # AutoGluon model dosyaları (YENİ)
     MULTI_LABEL_BINARIZER_PATH: str = str(MODEL_PATH / "multi_label_binarizer.pkl")
     
+    # Overview LSA vektör indeksi (ml/build_text_index.py ile üretilir)
+    TEXT_INDEX_DIR: str = os.getenv(
+        "TEXT_INDEX_DIR", str(Path(__file__).resolve().parent / "ml" / "model" / "text_index")
+    )
+    # LSH yaklaşık en yakın komşu ayarları (tablo sayısı, tablo başına bit, komşu kova yoklama)
+    LSH_TABLES: int = int(os.getenv("LSH_TABLES", "8"))
+    LSH_BITS: int = int(os.getenv("LSH_BITS", "12"))
+    LSH_MULTIPROBE: int = int(os.getenv("LSH_MULTIPROBE", "2"))
+    # user_history item-item co-occurrence matrisi (services/collaborative.py)
+    CF_INDEX_PATH: str = os.getenv(
+        "CF_INDEX_PATH", str(Path(__file__).resolve().parent / "ml" / "model" / "cf" / "cooccurrence.npz")
+    )
+    # Implicit ALS faktör modeli (ml/als_train.py ile üretilir)
+    ALS_MODEL_DIR: str = os.getenv(
+        "ALS_MODEL_DIR", str(Path(__file__).resolve().parent / "ml" / "model" / "als")
+    )
+    ALS_FACTORS: int = int(os.getenv("ALS_FACTORS", "32"))
+    ALS_REGULARIZATION: float = float(os.getenv("ALS_REGULARIZATION", "0.1"))
+    ALS_ALPHA: float = float(os.getenv("ALS_ALPHA", "10"))
+    ALS_ITERATIONS: int = int(os.getenv("ALS_ITERATIONS", "10"))
+    # Etkileşim tiplerinin güven ağırlıkları (liked > viewed > clicked)
+    ALS_INTERACTION_WEIGHTS: dict = {"liked": 3.0, "viewed": 2.0, "clicked": 1.0}
+    # Modelde olmayan kullanıcıların fold-in faktörü worker başına bu süre (sn) önbellekte tutulur
+    ALS_FOLD_IN_CACHE_SECONDS: float = float(os.getenv("ALS_FOLD_IN_CACHE_SECONDS", "60"))
+    ALS_FOLD_IN_CACHE_USERS: int = int(os.getenv("ALS_FOLD_IN_CACHE_USERS", "10000"))
+    
+    # AutoGluon eğitim orkestrasyonu (ml/automl_train.py): toplam CPU/bellek bütçesi
+    # (0: tüm çekirdekler / fiziksel belleğin %80'i), etiket başına CPU, tahmini bellek ve süre
+    TRAIN_CPU_BUDGET: int = int(os.getenv("TRAIN_CPU_BUDGET", "0"))
+    TRAIN_CPUS_PER_LABEL: int = int(os.getenv("TRAIN_CPUS_PER_LABEL", "2"))
+    TRAIN_MEMORY_BUDGET_GB: float = float(os.getenv("TRAIN_MEMORY_BUDGET_GB", "0"))
+    TRAIN_MEMORY_PER_LABEL_GB: float = float(os.getenv("TRAIN_MEMORY_PER_LABEL_GB", "4"))
+    TRAIN_TIME_LIMIT: int = int(os.getenv("TRAIN_TIME_LIMIT", "3600"))
+    # Artımlı eğitim: etiket başına değişen film oranı bu eşiği aşarsa etiket yeniden eğitilir
+    RETRAIN_DRIFT_THRESHOLD: float = float(os.getenv("RETRAIN_DRIFT_THRESHOLD", "0.05"))
+    # Satır başına tahmin süresi bütçesi (ms, AutoGluon infer_limit; 0: sınırsız)
+    TRAIN_INFER_LIMIT_MS: float = float(os.getenv("TRAIN_INFER_LIMIT_MS", "0"))
+    # Servisin yüklediği duygu modeli klasörü (örn. automl_train.py --export çıktısı)
+    EMOTION_MODEL_DIR: str = os.getenv(
+        "EMOTION_MODEL_DIR", str(Path(__file__).resolve().parent / "ml" / "model")
+    )
+
+    # Yüklenen predictor'ların en iyi modelini belleğe sabitle (TabularPredictor.persist)
+    PERSIST_MODELS: bool = os.getenv("PERSIST_MODELS", "true").lower() == "true"
+    # Duygu modeli düzeni: auto (multi_output_model.joblib varsa onu kullanır),
+    # per_label (duygu başına TabularPredictor), multi_output (tek artifact) veya
+    # fake (model gerektirmeyen deterministik motor; yük testi / profilleme için)
+    MODEL_LAYOUT: str = os.getenv("MODEL_LAYOUT", "auto")
+    # fake motorun çağrı başına ve satır başına yapay gecikmesi (ms)
+    FAKE_MODEL_LATENCY_MS: float = float(os.getenv("FAKE_MODEL_LATENCY_MS", "0"))
+    FAKE_MODEL_ROW_LATENCY_MS: float = float(os.getenv("FAKE_MODEL_ROW_LATENCY_MS", "0"))
+    # Ayarlıysa modeller bu süreçte yüklenmez, yerel çıkarım sunucusuna (Unix soket) gidilir
+    # (python -m backend.services.inference_server); havuz boyutu ve istek zaman aşımı
+    INFERENCE_SERVER_SOCKET: str = os.getenv("INFERENCE_SERVER_SOCKET", "")
+    INFERENCE_POOL_SIZE: int = int(os.getenv("INFERENCE_POOL_SIZE", "4"))
+    INFERENCE_TIMEOUT_SECONDS: float = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "30"))
+    # İstemcinin sunucu bilgisini (hazır olma, versiyon, etiketler) yeniden çekme aralığı (saniye)
+    INFERENCE_INFO_TTL_SECONDS: float = float(os.getenv("INFERENCE_INFO_TTL_SECONDS", "5"))
+    # Sunucu tarafı toplama: ilk istekten sonra en fazla bu kadar bekle / bu kadar satır birleştir
+    INFERENCE_MAX_WAIT_MS: float = float(os.getenv("INFERENCE_MAX_WAIT_MS", "2"))
+    INFERENCE_MAX_BATCH_ROWS: int = int(os.getenv("INFERENCE_MAX_BATCH_ROWS", "512"))
+    # Açılışta sentetik tahminler + veritabanı havuzu / sıcak sorgularla ısınma
+    # (arka planda çalışır; /recommendation/health ısınma bitene kadar "warming_up" ve 503 döner)
+    WARMUP_ON_STARTUP: bool = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+    WARMUP_BATCH_SIZE: int = int(os.getenv("WARMUP_BATCH_SIZE", "32"))
+    # Önceden açılacak veritabanı bağlantısı sayısı (0: havuz boyutu kadar)
+    WARMUP_DB_CONNECTIONS: int = int(os.getenv("WARMUP_DB_CONNECTIONS", "0"))
+    # Modeller gunicorn master'ında fork öncesi yüklenir (backend/gunicorn.conf.py ayarlar);
+    # worker'lar sayfaları copy-on-write paylaşır, CURRENT izleme (hot reload) kapalıdır
+    MODEL_PRELOAD: bool = os.getenv("MODEL_PRELOAD", "false").lower() == "true"
+    # Worker açılışında model belleğinin en az bu oranı master ile paylaşılmıyorsa uyar
+    PRELOAD_MIN_SHARED_RATIO: float = float(os.getenv("PRELOAD_MIN_SHARED_RATIO", "0.8"))
+    # model_bundle.pkl yüklenirken sha256'sını manifest ile doğrula
+    BUNDLE_VERIFY_CHECKSUM: bool = os.getenv("BUNDLE_VERIFY_CHECKSUM", "true").lower() == "true"
+    # EMOTION_MODEL_DIR/CURRENT dosyasını izleme aralığı (sn); değişince model yeniden yüklenir (0: kapalı)
+    MODEL_WATCH_SECONDS: int = int(os.getenv("MODEL_WATCH_SECONDS", "30"))
+    # /recommendation/admin/* endpoint'leri için X-Admin-Token değeri (boşsa endpoint'ler kapalı)
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+
     # AutoGluon model kullanım modu
     USE_AUTOGLUON: bool = os.getenv("USE_AUTOGLUON", "true").lower() == "true"
     
@@ -97,11 +180,57 @@ class Settings:
 
     # ===== LOGGING =====
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
-    
+    # Sıcak okuma yollarında tracemalloc ile bellek tahsisini de ölç (maliyetli, sadece profil için);
+    # tracemalloc açılışta bir kez başlar, değerler süreç genelidir (eşzamanlı istekler dahil)
+    PROFILE_HOT_PATHS: bool = os.getenv("PROFILE_HOT_PATHS", "false").lower() == "true"
+
     # ===== RECOMMENDATION SETTINGS =====
     DEFAULT_MAX_RECOMMENDATIONS: int = int(os.getenv("DEFAULT_MAX_RECOMMENDATIONS", "10"))
     MIN_SIMILARITY_THRESHOLD: float = float(os.getenv("MIN_SIMILARITY_THRESHOLD", "0.3"))
     PREDICTION_BATCH_SIZE: int = int(os.getenv("PREDICTION_BATCH_SIZE", "50"))
+    # MMR çeşitlendirme: 1.0 sadece alaka, 0.0 sadece çeşitlilik
+    MMR_LAMBDA: float = float(os.getenv("MMR_LAMBDA", "0.7"))
+    # MMR benzerliğinde tür (genre) bloğunun duygu bloğuna göre ağırlığı
+    MMR_GENRE_WEIGHT: float = float(os.getenv("MMR_GENRE_WEIGHT", "0.5"))
+    # "Benzer filmler" indeksinin artımlı yenilenme aralığı (saniye, 0: kapalı)
+    SIMILARITY_REFRESH_SECONDS: int = int(os.getenv("SIMILARITY_REFRESH_SECONDS", "300"))
+    # İşbirlikçi filtreleme (item-item): skorun final skora katkısı, film başına komşu,
+    # kullanıcı profilindeki en fazla film ve delta'nın CSR'a katlanma eşiği
+    CF_WEIGHT: float = float(os.getenv("CF_WEIGHT", "0.2"))
+    CF_NEIGHBORS: int = int(os.getenv("CF_NEIGHBORS", "50"))
+    CF_MAX_PROFILE_ITEMS: int = int(os.getenv("CF_MAX_PROFILE_ITEMS", "50"))
+    CF_COMPACT_THRESHOLD: int = int(os.getenv("CF_COMPACT_THRESHOLD", "10000"))
+    # Co-occurrence matrisinin user_history_events günlüğünü okuyup diske yazma aralığı
+    # (saniye, 0: kapalı); diğer worker'lara gelen POST /history kayıtları en geç bu aralıkla
+    # (bu worker'a bir POST /history gelirse hemen) görünür. Günlüğün son CF_EVENT_LOOKBACK
+    # olayı her okumada yeniden uygulanır (geç commit edilen olaylar); daha eski ve
+    # CF_EVENT_RETENTION_SECONDS'tan eski olaylar silinir.
+    CF_SYNC_SECONDS: int = int(os.getenv("CF_SYNC_SECONDS", "30"))
+    CF_EVENT_LOOKBACK: int = int(os.getenv("CF_EVENT_LOOKBACK", "100"))
+    CF_EVENT_RETENTION_SECONDS: int = int(os.getenv("CF_EVENT_RETENTION_SECONDS", "86400"))
+    # Trend listeleri: kayan pencereler (gün), liste başına film ve yenileme aralığı
+    # (saniye; 0: sadece açılışta, -1: worker'larda hiç, python -m backend.services.trending ile cron)
+    TRENDING_WINDOWS: List[int] = [int(d) for d in os.getenv("TRENDING_WINDOWS", "1,7,30").split(",")]
+    TRENDING_TOP_N: int = int(os.getenv("TRENDING_TOP_N", "100"))
+    TRENDING_REFRESH_SECONDS: int = int(os.getenv("TRENDING_REFRESH_SECONDS", "600"))
+    # "Daha önce görüldü" filtresinin bellekte tutacağı en fazla kullanıcı (LRU) ve girdinin
+    # veritabanından yeniden yükleneceği süre (saniye; diğer worker'ların POST /history'leri için)
+    SEEN_CACHE_USERS: int = int(os.getenv("SEEN_CACHE_USERS", "10000"))
+    SEEN_CACHE_TTL_SECONDS: int = int(os.getenv("SEEN_CACHE_TTL_SECONDS", "60"))
+    # Kullanıcı başına öneri önbelleği (login'de mood için ön-hesaplama dahil)
+    RECOMMENDATION_CACHE_TTL_SECONDS: int = int(os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", "300"))
+    RECOMMENDATION_CACHE_MAX_USERS: int = int(os.getenv("RECOMMENDATION_CACHE_MAX_USERS", "10000"))
+    # /emotion-distribution: model ile tahmin edilecek satır sayısı bunu aşarsa arka plan işi olarak
+    # çalışır; biten sonuç bu süre boyunca emotion_distribution_jobs tablosundan dönülür; çalışan iş
+    # STALE_SECONDS boyunca heartbeat göndermezse (worker öldü) yeniden başlatılır; tahmin batch boyutu
+    EMOTION_DISTRIBUTION_SYNC_ROWS: int = int(os.getenv("EMOTION_DISTRIBUTION_SYNC_ROWS", "1000"))
+    EMOTION_DISTRIBUTION_CACHE_SECONDS: int = int(os.getenv("EMOTION_DISTRIBUTION_CACHE_SECONDS", "600"))
+    EMOTION_DISTRIBUTION_STALE_SECONDS: int = int(os.getenv("EMOTION_DISTRIBUTION_STALE_SECONDS", "300"))
+    EMOTION_DISTRIBUTION_BATCH_SIZE: int = int(os.getenv("EMOTION_DISTRIBUTION_BATCH_SIZE", "256"))
+    # ALS (matris ayrıştırma) skorunun final skora katkısı
+    MF_WEIGHT: float = float(os.getenv("MF_WEIGHT", "0.2"))
+    # movie_interaction_stats sayaçlarından gelen popülerlik skorunun final skora katkısı (0: kapalı)
+    POPULARITY_WEIGHT: float = float(os.getenv("POPULARITY_WEIGHT", "0.05"))
 
     def __init__(self):
         """Ayarları başlatır ve gerekli kontrolleri yapar."""
@@ -120,20 +249,18 @@ class Settings:
                 missing.append(setting)
         
         if missing:
-            print(f"⚠️  UYARI: Aşağıdaki ayarlar eksik veya boş: {missing}")
-            print("   Lütfen .env dosyasını kontrol edin.")
+            logger.warning(f"⚠️  UYARI: Aşağıdaki ayarlar eksik veya boş: {missing}. Lütfen .env dosyasını kontrol edin.")
         
         # AutoGluon model yolu kontrolü
         if self.USE_AUTOGLUON:
             model_dir = Path(self.ML_MODEL_PATH)
             if not model_dir.exists():
-                print(f"⚠️  UYARI: Model klasörü bulunamadı: {model_dir}")
-                print("   Lütfen önce modeli eğitin: python -m ml.automl_train")
+                logger.info(f"⚠️  Model klasörü bulunamadı: {model_dir}. Lütfen önce modeli eğitin: python -m ml.automl_train")
             else:
                 # MultiLabelBinarizer dosyasını kontrol et
                 binarizer_path = model_dir / "multi_label_binarizer.pkl"
                 if not binarizer_path.exists():
-                    print(f"⚠️  UYARI: MultiLabelBinarizer dosyası bulunamadı: {binarizer_path}")
+                    logger.info(f"⚠️  MultiLabelBinarizer dosyası bulunamadı: {binarizer_path}")
 
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,63 @@
+# backend/conftest.py
+#
+# pytest ortak ayarları. backend.db.connection import sırasında DATABASE_URL'den
+# motor kurduğu için testler gerçek veritabanı yerine SQLite'a yönlendirilir;
+# her test kendi bellek içi veritabanını `db` fixture'ı ile alır.
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.db.models import Base, Movie, User, UserHistory
+
+# Eğitilmiş modeller ve AutoGluon isteyen elle çalıştırılan script (pytest testi değil)
+collect_ignore = ["test_recommender.py"]
+
+
+@pytest.fixture
+def engine():
+    """Tabloları oluşturulmuş, tek bağlantılı bellek içi SQLite motoru."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def add_movies(db):
+    """1..count id'li (isteğe bağlı türlerle) filmler ekler."""
+    def _add(count: int, genres=None) -> None:
+        db.add_all(Movie(movie_id=i, title=f"Film {i}", overview="...",
+                         genre=genres[i - 1] if genres else None)
+                   for i in range(1, count + 1))
+        db.commit()
+    return _add
+
+
+@pytest.fixture
+def add_history(db):
+    """Kullanıcıyı (yoksa) oluşturur ve (movie_id, interaction) kayıtlarını ekler."""
+    def _add(user_id: int, interactions) -> None:
+        if db.get(User, user_id) is None:
+            db.add(User(user_id=user_id, username=f"user{user_id}", email=f"u{user_id}@x", password_hash="x"))
+        db.add_all(UserHistory(user_id=user_id, movie_id=movie_id, interaction=interaction)
+                   for movie_id, interaction in interactions)
+        db.commit()
+    return _add
@@ -1,12 +1,13 @@
 from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
+from backend.config import settings
 from backend.db.connection import get_db
 from backend.db.models import User
 
@@ -16,6 +17,8 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
+# Token opsiyonel olan endpoint'ler için (eksikse 401 yerine None)
+optional_security = HTTPBearer(auto_error=False)
 
 
 def get_password_hash(password: str) -> str:
@@ -64,3 +67,29 @@ async def get_current_user(
     return user
 
 
+def get_optional_user_id(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+) -> Optional[int]:
+    """
+    Bearer token varsa ve geçerliyse kullanıcı id'sini döndürür, aksi halde None.
+    Veritabanına gitmez (anonim erişime de açık endpoint'ler için).
+    """
+    if credentials is None:
+        return None
+    try:
+        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        user_id = payload.get("sub")
+        return int(user_id) if user_id is not None else None
+    except (JWTError, ValueError):
+        return None
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """
+    Yönetim endpoint'leri için X-Admin-Token başlığını ADMIN_TOKEN ile karşılaştırır.
+    ADMIN_TOKEN tanımlı değilse endpoint'ler kapalıdır.
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Yönetim endpoint'leri kapalı (ADMIN_TOKEN)")
+    if x_admin_token != settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Geçersiz admin token")
@@ -24,7 +24,8 @@ logger = logging.getLogger(__name__)
 # Config'den DATABASE_URL'i al
 DATABASE_URL = settings.DATABASE_URL
 
-logger.info(f"Veritabanı bağlantısı kuruluyor: {DATABASE_URL.replace(settings.DB_PASSWORD, '***')}")
+_masked_url = DATABASE_URL.replace(settings.DB_PASSWORD, '***') if settings.DB_PASSWORD else DATABASE_URL
+logger.info(f"Veritabanı bağlantısı kuruluyor: {_masked_url}")
 
 try:
     # SQLAlchemy Motorunu (Engine) oluştur
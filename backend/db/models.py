@@ -1,6 +1,6 @@
 from datetime import datetime, date
 
-from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime, Date
+from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime, Date, Index
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -30,6 +30,11 @@ class Movie(Base):
     tags = relationship("MovieTag", back_populates="movie", cascade="all, delete-orphan")
     histories = relationship("UserHistory", back_populates="movie", cascade="all, delete-orphan")
 
+    # İçe aktarmada tekrar kontrolü (INSERT ... ON CONFLICT DO NOTHING)
+    __table_args__ = (
+        Index("uq_movies_title_release_date", "title", "release_date", unique=True),
+    )
+
 
 class Emotion(Base):
     __tablename__ = "emotions"
@@ -80,3 +85,75 @@ class MovieTag(Base):
     movie = relationship("Movie", back_populates="tags")
 
 
+class UserHistoryEvent(Base):
+    """
+    user_history değişiklik günlüğü (co-occurrence matrisi için). Her ekleme ve
+    silme aynı transaction'da, (kullanıcı, film) çiftinin değişiklik sonrası
+    kayıt sayısıyla yazılır; worker'lar kendi su seviyelerinden (event_id)
+    sonraki olayları okuyup matrislerine uygular.
+    """
+    __tablename__ = "user_history_events"
+
+    event_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)
+    movie_id = Column(Integer, nullable=False)
+    history_count = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class MovieInteractionStats(Base):
+    """
+    Film başına etkileşim sayaçları. user_history'deki kayıtlarla birlikte
+    (aynı transaction'da) atomik olarak artırılır/azaltılır; popülerlik
+    sinyalleri için COUNT(*) ... GROUP BY gerekmez.
+    """
+    __tablename__ = "movie_interaction_stats"
+
+    movie_id = Column(Integer, ForeignKey("movies.movie_id", ondelete="CASCADE"), primary_key=True)
+    likes = Column(Integer, nullable=False, default=0)
+    views = Column(Integer, nullable=False, default=0)
+    clicks = Column(Integer, nullable=False, default=0)
+    last_interaction = Column(DateTime, default=datetime.utcnow)
+
+
+class TrendingMovie(Base):
+    """
+    user_history'den periyodik olarak yeniden hesaplanan trend listeleri
+    (materialized aggregate). list_key "all" genel listeyi, bir duygu etiketi
+    o duygunun liderlik tablosunu ifade eder.
+    """
+    __tablename__ = "trending_movies"
+
+    trending_id = Column(Integer, primary_key=True, index=True)
+    list_key = Column(String(50), nullable=False)
+    window_days = Column(Integer, nullable=False)
+    rank = Column(Integer, nullable=False)
+    movie_id = Column(Integer, ForeignKey("movies.movie_id", ondelete="CASCADE"))
+    likes = Column(Integer, default=0)
+    views = Column(Integer, default=0)
+    clicks = Column(Integer, default=0)
+    score = Column(Float, default=0.0)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_trending_movies_list_window_rank", "list_key", "window_days", "rank"),
+    )
+
+
+class EmotionDistributionJob(Base):
+    """
+    /recommendation/emotion-distribution model hesaplarının iş durumu ve
+    sonucu. Tüm worker'lar aynı tabloyu okur: 202 sonrası gelen istek hangi
+    worker'a düşerse düşsün aynı işi görür; çalışan iş updated_at'i
+    periyodik olarak yeniler (heartbeat).
+    """
+    __tablename__ = "emotion_distribution_jobs"
+
+    job_key = Column(String(255), primary_key=True)
+    state = Column(String(20), nullable=False)
+    rows = Column(Integer, default=0)
+    result = Column(Text, nullable=True)  # JSON
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,41 @@
+# backend/gunicorn.conf.py
+#
+# Çok worker'lı üretim sunucusu: modeller master süreçte bir kez yüklenir,
+# worker'lar fork ile sayfaları copy-on-write paylaşır (bkz. services/model_preload.py).
+#
+#   gunicorn -c backend/gunicorn.conf.py backend.app:app
+#
+# Ayrı bir çıkarım süreci için alternatif: services/inference_server.py
+
+import gc
+import logging
+import multiprocessing
+import os
+
+# backend.config import edilmeden önce ayarlanmalı (preload_app uygulamayı bu dosyadan sonra yükler)
+os.environ.setdefault("MODEL_PRELOAD", "true")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(multiprocessing.cpu_count(), 8))))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+# Servis logları (preload ve paylaşım kontrolü) gunicorn çıktısına düşsün
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(process)d] %(levelname)s %(message)s")
+
+
+def when_ready(server):
+    # Master: worker'lar fork edilmeden önce modelleri yükle ve dondur
+    from backend.services.model_preload import preload_models
+    preload_models()
+
+
+def pre_fork(server, worker):
+    # Master'da sonradan oluşan nesneler de kalıcı nesile geçsin
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    from backend.services.model_preload import check_worker_sharing
+    check_worker_sharing()
@@ -0,0 +1,236 @@
+"""
+user_history etkileşimlerinden örtük geri bildirimli ALS (Alternating Least
+Squares) modelini eğiten script. Sadece NumPy/SciPy kullanır.
+
+Güven: c_ui = 1 + α · Σ ağırlık(etkileşim)   (liked > viewed > clicked)
+Faktörler float32 memmap olarak ALS_MODEL_DIR altına yazılır; API tarafında
+backend/services/matrix_factorization.py tarafından okunur.
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Proje kök dizinini Python path'ine ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+project_root = os.path.dirname(backend_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.config import settings
+from backend.db.connection import get_db_session
+from backend.db.models import UserHistory
+from backend.services.matrix_factorization import (
+    ITEM_FACTORS_FILE, META_FILE, MOVIE_IDS_FILE, USER_FACTORS_FILE, USER_IDS_FILE,
+    interaction_weight, solve_factor,
+)
+
+
+def load_interactions(chunk_size: int = 10000) -> List[Tuple[int, int, str]]:
+    """user_history'den (user_id, movie_id, interaction) üçlülerini okur."""
+    session = get_db_session()
+    try:
+        rows = (
+            session.query(UserHistory.user_id, UserHistory.movie_id, UserHistory.interaction)
+            .yield_per(chunk_size)
+        )
+        return [(user_id, movie_id, interaction) for user_id, movie_id, interaction in rows]
+    finally:
+        session.close()
+
+
+def build_confidence(interactions, alpha: float):
+    """
+    Üçlülerden kullanıcı×film güven matrisini (CSR) kurar.
+
+    Returns:
+        Tuple: (C, user_ids, movie_ids) — C.data = 1 + α·ağırlık toplamı
+    """
+    user_ids, user_idx = np.unique(np.fromiter((u for u, _, _ in interactions), dtype=np.int64), return_inverse=True)
+    movie_ids, movie_idx = np.unique(np.fromiter((m for _, m, _ in interactions), dtype=np.int64), return_inverse=True)
+    weights = np.fromiter((interaction_weight(i) for _, _, i in interactions), dtype=np.float32)
+    # Aynı (kullanıcı, film) için tekrar eden kayıtlar toplanır
+    matrix = sparse.csr_matrix((weights, (user_idx, movie_idx)), shape=(len(user_ids), len(movie_ids)))
+    matrix.sum_duplicates()
+    matrix.eliminate_zeros()
+    matrix.data = 1.0 + alpha * matrix.data
+    return matrix, user_ids, movie_ids
+
+
+def _als_half_step(confidence: sparse.csr_matrix, fixed: np.ndarray, regularization: float) -> np.ndarray:
+    """Karşı taraf sabitken tüm satırların faktörlerini çözer."""
+    gram = fixed.astype(np.float64).T @ fixed.astype(np.float64)
+    solved = np.zeros((confidence.shape[0], fixed.shape[1]), dtype=np.float32)
+    indptr, indices, data = confidence.indptr, confidence.indices, confidence.data
+    for row in range(confidence.shape[0]):
+        start, end = indptr[row], indptr[row + 1]
+        solved[row] = solve_factor(fixed, gram, indices[start:end], data[start:end].astype(np.float64),
+                                   regularization)
+    return solved
+
+
+def train_als(confidence: sparse.csr_matrix, factors: int, regularization: float, iterations: int,
+              seed: int = 42, verbose: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Implicit ALS eğitimi (Hu, Koren & Volinsky, 2008).
+
+    Returns:
+        Tuple: (kullanıcı faktörleri, film faktörleri)
+    """
+    rng = np.random.default_rng(seed)
+    n_users, n_items = confidence.shape
+    user_factors = (rng.standard_normal((n_users, factors)) * 0.01).astype(np.float32)
+    item_factors = (rng.standard_normal((n_items, factors)) * 0.01).astype(np.float32)
+    confidence_t = confidence.T.tocsr()
+
+    for iteration in range(iterations):
+        start = time.perf_counter()
+        user_factors = _als_half_step(confidence, item_factors, regularization)
+        item_factors = _als_half_step(confidence_t, user_factors, regularization)
+        if verbose:
+            print(f"   iterasyon {iteration + 1}/{iterations}: {time.perf_counter() - start:.2f} sn")
+    return user_factors, item_factors
+
+
+def save_model(output_dir: str, user_factors: np.ndarray, item_factors: np.ndarray,
+               user_ids: np.ndarray, movie_ids: np.ndarray, meta: dict) -> None:
+    """
+    Faktörleri memmap (float32), id'leri .npy ve meta bilgisini json olarak yazar.
+
+    Her dosya önce geçici adla yazılıp rename edilir (meta.json en son): çalışan
+    API eski dosyaları memmap ile açık tutar ve meta.json değişince yeni modeli yükler.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    def _replace(name: str, write) -> None:
+        path = os.path.join(output_dir, name)
+        tmp_path = f"{path}.tmp"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+    def _write_memmap(matrix: np.ndarray):
+        def write(path: str) -> None:
+            mapped = np.memmap(path, dtype=np.float32, mode="w+", shape=matrix.shape)
+            mapped[:] = matrix
+            mapped.flush()
+            del mapped
+        return write
+
+    def _write_npy(array: np.ndarray):
+        def write(path: str) -> None:
+            with open(path, "wb") as f:
+                np.save(f, array)
+        return write
+
+    def _write_meta(path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    _replace(USER_FACTORS_FILE, _write_memmap(user_factors))
+    _replace(ITEM_FACTORS_FILE, _write_memmap(item_factors))
+    _replace(USER_IDS_FILE, _write_npy(user_ids))
+    _replace(MOVIE_IDS_FILE, _write_npy(movie_ids))
+    _replace(META_FILE, _write_meta)
+
+
+def _synthetic_interactions(n_users: int, n_items: int, per_user: int, seed: int):
+    """Zaman ölçümü için Zipf benzeri popülerlikle sentetik etkileşimler üretir."""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, n_items + 1)
+    weights /= weights.sum()
+    kinds = np.array(["liked", "viewed", "clicked"])
+    interactions = []
+    for user_id in range(n_users):
+        movies = rng.choice(n_items, size=min(per_user, n_items), replace=False, p=weights)
+        for movie_id, kind in zip(movies, rng.choice(kinds, size=len(movies), p=[0.2, 0.5, 0.3])):
+            interactions.append((user_id, int(movie_id), str(kind)))
+    return interactions
+
+
+def report_scaling(interactions, factors: int, regularization: float, alpha: float, iterations: int,
+                   fractions=(0.25, 0.5, 1.0), seed: int = 42) -> None:
+    """Etkileşim sayısına göre eğitim süresini (duvar saati) raporlar."""
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(interactions))
+    print(f"⏱️ Ölçekleme: {factors} faktör, {iterations} iterasyon")
+    for fraction in fractions:
+        subset = [interactions[i] for i in order[:int(len(interactions) * fraction)]]
+        if not subset:
+            continue
+        confidence, _, _ = build_confidence(subset, alpha)
+        start = time.perf_counter()
+        train_als(confidence, factors, regularization, iterations, seed=seed, verbose=False)
+        elapsed = time.perf_counter() - start
+        print(f"   {confidence.nnz:>10} etkileşim ({confidence.shape[0]} kullanıcı × {confidence.shape[1]} film): "
+              f"{elapsed:7.2f} sn  ({elapsed / max(1, confidence.nnz) * 1e6:.2f} µs/etkileşim)")
+
+
+def main(output_dir: str, factors: int, regularization: float, alpha: float, iterations: int,
+         synthetic: Optional[Tuple[int, int, int]] = None, scaling: bool = False) -> None:
+    if synthetic:
+        print(f"🧪 Sentetik veri: {synthetic[0]} kullanıcı, {synthetic[1]} film, kullanıcı başına {synthetic[2]}")
+        interactions = _synthetic_interactions(*synthetic, seed=42)
+    else:
+        print("📥 user_history okunuyor...")
+        interactions = load_interactions()
+    if not interactions:
+        print("❌ Eğitim için etkileşim bulunamadı.")
+        return
+
+    if scaling:
+        report_scaling(interactions, factors, regularization, alpha, iterations)
+        return
+
+    confidence, user_ids, movie_ids = build_confidence(interactions, alpha)
+    print(f"✅ {len(interactions)} kayıt → {confidence.nnz} etkileşim "
+          f"({len(user_ids)} kullanıcı × {len(movie_ids)} film)")
+
+    print(f"🧮 ALS eğitiliyor: {factors} faktör, λ={regularization}, α={alpha}, {iterations} iterasyon")
+    start = time.perf_counter()
+    user_factors, item_factors = train_als(confidence, factors, regularization, iterations)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Eğitim tamamlandı: {elapsed:.2f} sn ({confidence.nnz} etkileşim, "
+          f"{elapsed / max(1, confidence.nnz) * 1e6:.2f} µs/etkileşim)")
+
+    if synthetic:
+        print("ℹ️ Sentetik veriyle eğitilen model kaydedilmedi.")
+        return
+
+    save_model(output_dir, user_factors, item_factors, user_ids, movie_ids, {
+        "n_users": int(len(user_ids)),
+        "n_items": int(len(movie_ids)),
+        "factors": factors,
+        "regularization": regularization,
+        "alpha": alpha,
+        "iterations": iterations,
+        "interaction_weights": settings.ALS_INTERACTION_WEIGHTS,
+        "n_interactions": int(confidence.nnz),
+        "train_seconds": round(elapsed, 3),
+        "trained_at": datetime.utcnow().isoformat(),
+    })
+    print(f"💾 Model kaydedildi: {output_dir}")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="user_history üzerinden implicit ALS modeli eğit")
+    parser.add_argument('--output', default=settings.ALS_MODEL_DIR, help='Model klasörü')
+    parser.add_argument('--factors', type=int, default=settings.ALS_FACTORS, help='Faktör sayısı')
+    parser.add_argument('--regularization', type=float, default=settings.ALS_REGULARIZATION, help='λ')
+    parser.add_argument('--alpha', type=float, default=settings.ALS_ALPHA, help='Güven katsayısı α')
+    parser.add_argument('--iterations', type=int, default=settings.ALS_ITERATIONS, help='İterasyon sayısı')
+    parser.add_argument('--synthetic', type=int, nargs=3, metavar=('USERS', 'ITEMS', 'PER_USER'),
+                        help='Veritabanı yerine sentetik etkileşimlerle çalış (kaydetmez)')
+    parser.add_argument('--scaling', action='store_true',
+                        help='Verinin %%25/%%50/%%100 alt kümelerinde eğitim süresini raporla (kaydetmez)')
+    args = parser.parse_args()
+
+    main(args.output, args.factors, args.regularization, args.alpha, args.iterations,
+         synthetic=tuple(args.synthetic) if args.synthetic else None, scaling=args.scaling)
@@ -5,79 +5,251 @@ AutoGluon ile Çoklu Etiket Sınıflandırma modelini eğiten script.
 
 import sys
 import os
+import hashlib
+import json
+import pickle
+import platform
+import shutil
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import numpy as np
 import pandas as pd
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 import joblib
 from sklearn.model_selection import train_test_split
 
-# AutoGluon import'ları (aynı kalır)
+from sklearn.base import clone
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MultiLabelBinarizer
+from sklearn.metrics import accuracy_score, f1_score
+
+# Parquet snapshot'ları için (AutoGluon ile birlikte gelir)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# AutoGluon import'ları (çoklu çıkışlı mod sadece scikit-learn ister)
 try:
     from autogluon.tabular import TabularPredictor
-    from sklearn.preprocessing import MultiLabelBinarizer
-    from sklearn.metrics import accuracy_score, f1_score
     ML_LIBRARIES_AVAILABLE = True
 except ImportError:
     ML_LIBRARIES_AVAILABLE = False
-    print("⚠️ Gerekli kütüphaneler eksik. Lütfen kurun: pip install autogluon scikit-learn")
+    print("⚠️ AutoGluon kurulu değil; sadece --mode multi-output kullanılabilir (pip install autogluon)")
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import func
+
 from backend.db.connection import get_db_session
 from backend.db.models import Movie, Emotion
 from backend.config import settings
 
+from backend.services.recommender_service import (
+    BUNDLE_FILE, BUNDLE_FORMAT_VERSION, BUNDLE_MANIFEST_FILE, LAYOUT_MULTI_OUTPUT,
+    MULTI_OUTPUT_MODEL_FILE, ModelBundle, publish_model_version,
+)
+
 # --- GLOBAL AYARLAR VE KLASÖR KONTROLÜ (Aynı Kalır) ---
-if ML_LIBRARIES_AVAILABLE:
-    MODEL_DIR = os.path.dirname(settings.BEST_MODEL_PATH)
-    if not os.path.exists(MODEL_DIR):
-        os.makedirs(MODEL_DIR, exist_ok=True)
-        print(f"📁 Model klasörü oluşturuldu: {MODEL_DIR}")
+MODEL_DIR = os.path.dirname(settings.BEST_MODEL_PATH)
+if not os.path.exists(MODEL_DIR):
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    print(f"📁 Model klasörü oluşturuldu: {MODEL_DIR}")
 # ------------------------------------------------------
 
 
-def prepare_data_for_autogluon() -> Optional[pd.DataFrame]:
-    """Veritabanından etiketli veriyi çeker ve binarize eder."""
-    # (Bu fonksiyonun içeriği değişmedi)
-    # ... (önceki kod)
-    
-    # Kodu önceki cevabınızdan kopyalayın
-    print("1. Veritabanından etiketli veriler çekiliyor...")
+SNAPSHOT_DIR_NAME = "snapshots"
+SNAPSHOT_MANIFEST_FILE = "manifest.json"
+SNAPSHOT_LABEL_SEPARATOR = "\x1f"
+
+
+def _snapshot_dir() -> str:
+    return os.path.join(MODEL_DIR, SNAPSHOT_DIR_NAME)
+
+
+def load_snapshot_manifest() -> Dict:
+    """Snapshot geçmişi: {"snapshots": [{"path", "rows", "fingerprint", ...}, ...]} (en yenisi sonda)."""
+    path = os.path.join(_snapshot_dir(), SNAPSHOT_MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"snapshots": []}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def labels_fingerprint(session) -> Dict:
+    """
+    emotions tablosunun ucuz bir parmak izi (tek aggregate sorgu). Değişmediyse
+    son snapshot yeniden kullanılır.
+    """
+    count, max_id, last_created = session.query(
+        func.count(Emotion.emotion_id), func.max(Emotion.emotion_id), func.max(Emotion.created_at)
+    ).one()
+    return {
+        "emotion_rows": int(count or 0),
+        "max_emotion_id": int(max_id or 0),
+        "last_created_at": last_created.isoformat() if last_created else None,
+    }
+
+
+def _labeled_movies_query(session):
+    """
+    Film başına etiketleri veritabanında toplayan tek sorgu
+    (PostgreSQL: array_agg, diğerleri: ayraçlı group_concat).
+    """
+    if session.bind.dialect.name == "postgresql":
+        labels = func.array_agg(Emotion.emotion_label)
+    else:
+        labels = func.group_concat(Emotion.emotion_label, SNAPSHOT_LABEL_SEPARATOR)
+    return (
+        session.query(Movie.movie_id, Movie.overview, labels)
+        .join(Emotion, Movie.movie_id == Emotion.movie_id)
+        .filter(func.trim(Movie.overview) != '')
+        .group_by(Movie.movie_id, Movie.overview)
+        .order_by(Movie.movie_id)
+    )
+
+
+def _rows_to_batch(rows, label_classes: List[str]) -> "pa.RecordBatch":
+    """(movie_id, overview, etiketler) satırlarını multi-hot Arrow batch'ine çevirir."""
+    column_of = {label: i for i, label in enumerate(label_classes)}
+    multi_hot = np.zeros((len(rows), len(label_classes)), dtype=np.uint8)
+    for i, (_, _, labels) in enumerate(rows):
+        if isinstance(labels, str):
+            labels = labels.split(SNAPSHOT_LABEL_SEPARATOR)
+        for label in labels or ():
+            column = column_of.get(label)
+            if column is not None:
+                multi_hot[i, column] = 1
+    arrays = [
+        pa.array([row[0] for row in rows], type=pa.int64()),
+        pa.array([row[1] for row in rows], type=pa.string()),
+    ] + [pa.array(multi_hot[:, j]) for j in range(len(label_classes))]
+    return pa.RecordBatch.from_arrays(arrays, names=['movie_id', 'overview'] + list(label_classes))
+
+
+def write_training_snapshot(session, label_classes: List[str], chunk_size: int = 10000) -> Optional[Dict]:
+    """
+    Etiketli filmleri yield_per ile akış halinde okuyup Arrow batch'leri olarak
+    versiyonlu bir Parquet dosyasına yazar ve manifest'e ekler.
+    """
+    os.makedirs(_snapshot_dir(), exist_ok=True)
+    fingerprint = labels_fingerprint(session)
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    path = os.path.join(_snapshot_dir(), f"training_{version}.parquet")
+    schema = _rows_to_batch([], label_classes).schema
+
+    start = time.perf_counter()
+    rows_written = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        chunk = []
+        for row in _labeled_movies_query(session).yield_per(chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                writer.write_batch(_rows_to_batch(chunk, label_classes))
+                rows_written += len(chunk)
+                chunk = []
+        if chunk:
+            writer.write_batch(_rows_to_batch(chunk, label_classes))
+            rows_written += len(chunk)
+
+    if rows_written == 0:
+        os.remove(path)
+        return None
+
+    entry = {
+        "version": version,
+        "path": os.path.basename(path),
+        "rows": rows_written,
+        "labels": list(label_classes),
+        "fingerprint": fingerprint,
+        "created_at": datetime.utcnow().isoformat(),
+        "extract_seconds": round(time.perf_counter() - start, 3),
+    }
+    manifest = load_snapshot_manifest()
+    manifest["snapshots"].append(entry)
+    _write_json(os.path.join(_snapshot_dir(), SNAPSHOT_MANIFEST_FILE), manifest)
+    print(f"💾 Eğitim snapshot'ı yazıldı: {path} ({rows_written} film, {entry['extract_seconds']} sn)")
+    return entry
+
+
+def load_training_snapshot(entry: Dict) -> pd.DataFrame:
+    return pd.read_parquet(os.path.join(_snapshot_dir(), entry["path"]))
+
+
+def _rows_to_frame_columns(rows, label_classes: List[str]):
+    """pyarrow olmadan: sorgu satırlarını DataFrame satırlarına çevirir."""
+    column_of = {label: i for i, label in enumerate(label_classes)}
+    for movie_id, overview, labels in rows:
+        if isinstance(labels, str):
+            labels = labels.split(SNAPSHOT_LABEL_SEPARATOR)
+        flags = [0] * len(label_classes)
+        for label in labels or ():
+            if label in column_of:
+                flags[column_of[label]] = 1
+        yield [movie_id, overview] + flags
+
+
+def prepare_data_for_autogluon(refresh_snapshot: bool = False, snapshot_version: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Etiketli eğitim verisini (movie_id, overview, duygu başına 0/1) döndürür.
+
+    Veri, versiyonlu bir Parquet snapshot'ından okunur. emotions tablosu son
+    snapshot'tan beri değişmediyse (parmak izi aynı) veritabanı yeniden
+    sorgulanmaz; değiştiyse veya refresh_snapshot=True ise etiketler SQL
+    tarafında film başına toplanıp yeni snapshot akış halinde yazılır.
+    pyarrow yoksa aynı sorgu doğrudan DataFrame'e okunur.
+    """
+    mlb = MultiLabelBinarizer()
+    mlb.fit([settings.EMOTION_CATEGORIES]) 
+    label_classes = list(mlb.classes_)
+
     session = get_db_session()
-    
     try:
-        results = session.query(Movie, Emotion).join(
-            Emotion, Movie.movie_id == Emotion.movie_id
-        ).all()
-        
-        if not results:
+        manifest = load_snapshot_manifest()
+        if snapshot_version:
+            entry = next((e for e in manifest["snapshots"] if e["version"] == snapshot_version), None)
+            if entry is None:
+                print(f"❌ Snapshot bulunamadı: {snapshot_version}")
+                return None
+            print(f"1. 📦 Sabitlenen snapshot kullanılıyor: {entry['path']}")
+        elif not PARQUET_AVAILABLE:
+            print("1. Veritabanından etiketli veriler çekiliyor (pyarrow yok, snapshot yazılmıyor)...")
+            rows = _labeled_movies_query(session).yield_per(10000).all()
+            entry = None
+            df_train = pd.DataFrame(
+                _rows_to_frame_columns(rows, label_classes), columns=['movie_id', 'overview'] + label_classes
+            )
+        else:
+            latest = manifest["snapshots"][-1] if manifest["snapshots"] else None
+            if (not refresh_snapshot and latest and latest.get("labels") == label_classes
+                    and latest["fingerprint"] == labels_fingerprint(session)
+                    and os.path.exists(os.path.join(_snapshot_dir(), latest["path"]))):
+                entry = latest
+                print(f"1. 📦 Etiketler değişmemiş; snapshot yeniden kullanılıyor: {entry['path']}")
+            else:
+                print("1. Veritabanından etiketli veriler çekiliyor (snapshot yazılıyor)...")
+                entry = write_training_snapshot(session, label_classes)
+                if entry is None:
+                    print("❌ Eğitim için etiketli veri bulunamadı.")
+                    return None
+        if entry is not None:
+            df_train = load_training_snapshot(entry)
+            df_train.attrs["snapshot_version"] = entry["version"]
+
+        if df_train.empty:
             print("❌ Eğitim için etiketli veri bulunamadı.")
             return None
-        
-        data = []
-        for movie, emotion in results:
-            data.append({
-                'movie_id': movie.movie_id,
-                'overview': movie.overview,
-                'emotion_label': emotion.emotion_label
-            })
-        
-        df = pd.DataFrame(data)
-        df_grouped = df.groupby('movie_id').agg({
-            'overview': 'first',
-            'emotion_label': lambda x: list(x)
-        }).reset_index()
-        
-        df_grouped = df_grouped[df_grouped['overview'].str.strip() != '']
-        print(f"✅ Çekilen ve temizlenen film sayısı: {len(df_grouped)}")
-        
-        mlb = MultiLabelBinarizer()
-        mlb.fit([settings.EMOTION_CATEGORIES]) 
-        
-        y_multi_hot = mlb.transform(df_grouped['emotion_label'])
-        df_labels = pd.DataFrame(y_multi_hot, columns=mlb.classes_)
-        df_train = pd.concat([df_grouped.drop(columns=['emotion_label']), df_labels], axis=1)
-        
+        for label in label_classes:
+            df_train[label] = df_train[label].astype(int)
         df_train['overview'] = df_train['overview'].fillna('').astype(str)
+        print(f"✅ Çekilen ve temizlenen film sayısı: {len(df_train)}")
         
         mlb_path = os.path.join(MODEL_DIR, "multi_label_binarizer.pkl")
         joblib.dump(mlb, mlb_path)
@@ -92,88 +264,861 @@ def prepare_data_for_autogluon() -> Optional[pd.DataFrame]:
         session.close()
 
 
-def train_autogluon_model(df_train: pd.DataFrame, target_labels: List[str]):
+TRAINING_STATE_FILE = "training_state.json"
+TRAINING_SUMMARY_FILE = "training_summary.json"
+
+
+def _total_memory_gb() -> float:
+    """Fiziksel bellek (GB); belirlenemezse 0."""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 1024 ** 3
+    except (ValueError, OSError, AttributeError):
+        return 0.0
+
+
+def plan_label_concurrency(
+    n_labels: int,
+    cpu_budget: int,
+    cpus_per_label: int,
+    memory_budget_gb: float,
+    memory_per_label_gb: float,
+) -> Tuple[int, int]:
+    """
+    CPU ve bellek bütçesine göre aynı anda eğitilecek etiket sayısını belirler.
+
+    Returns:
+        Tuple: (eşzamanlı etiket sayısı, etiket başına CPU) — boşta kalan
+        çekirdekler eşzamanlı işlere dağıtılır
+    """
+    if n_labels <= 0:
+        return 0, cpus_per_label
+    by_cpu = max(1, cpu_budget // max(1, cpus_per_label))
+    by_memory = max(1, int(memory_budget_gb // memory_per_label_gb)) if memory_budget_gb > 0 else n_labels
+    concurrency = max(1, min(n_labels, by_cpu, by_memory))
+    return concurrency, max(cpus_per_label, cpu_budget // concurrency)
+
+
+def load_training_state(model_dir: str) -> Dict[str, Dict]:
+    """Tamamlanan etiketlerin checkpoint'ini okur ({etiket: sonuç})."""
+    path = os.path.join(model_dir, TRAINING_STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path: str, data: Dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+
+
+# AutoGluon model sınıfı → fit(hyperparameters=...) anahtarı
+AG_MODEL_KEYS = {
+    'LGBModel': 'GBM', 'CatBoostModel': 'CAT', 'XGBoostModel': 'XGB', 'RFModel': 'RF',
+    'XTModel': 'XT', 'KNNModel': 'KNN', 'LinearModel': 'LR',
+    'NNFastAiTabularModel': 'FASTAI', 'TabularNeuralNetTorchModel': 'NN_TORCH',
+}
+
+
+def best_model_hyperparameters(predictor) -> Optional[Dict[str, List[Dict]]]:
     """
-    Veriyi ayırır, Ray'i devre dışı bırakarak AutoGluon modelini eğitir ve performansını ölçer.
+    En iyi modelin (ensemble ise temel modellerinin) ailelerini ve
+    hiperparametrelerini fit(hyperparameters=...) biçiminde döndürür.
+    Çıkarılamazsa None (artımlı eğitim 'default' ile devam eder).
+    """
+    try:
+        model_info = predictor.info()['model_info']
+        best = predictor.model_best
+        names = model_info[best].get('stacker_info', {}).get('base_model_names') or [best]
+        hyperparameters: Dict[str, List[Dict]] = {}
+        for name in names:
+            info = model_info[name]
+            bagged = info.get('bagged_info') or {}
+            key = AG_MODEL_KEYS.get(bagged.get('child_model_type') or info.get('model_type'))
+            if key is None:
+                continue
+            params = bagged.get('child_hyperparameters') or info.get('hyperparameters') or {}
+            hyperparameters.setdefault(key, []).append(json.loads(json.dumps(params, default=str)))
+        return hyperparameters or None
+    except Exception:
+        return None
+
+
+def fit_label(
+    label: str,
+    df_train_set: pd.DataFrame,
+    df_test_set: pd.DataFrame,
+    target_labels: List[str],
+    model_dir: str,
+    num_cpus: int,
+    time_limit: int,
+    infer_limit_ms: Optional[float] = None,
+    hyperparameters=None,
+) -> Dict:
+    """
+    Tek bir duygu etiketi için TabularPredictor eğitir ve test setinde ölçer.
+    Orkestratör tarafından ayrı bir süreçte çalıştırılır.
+
+    infer_limit_ms verilirse AutoGluon'a satır başına tahmin süresi bütçesi
+    (infer_limit) olarak geçilir; bu bütçeyi aşan modeller/ensemble'lar seçilmez.
+    hyperparameters verilirse (artımlı mod: önceki en iyi modelin aileleri ve
+    hiperparametreleri) 'default' arama uzayı yerine kullanılır.
+    """
+    fit_kwargs = {}
+    if infer_limit_ms:
+        fit_kwargs['infer_limit'] = infer_limit_ms / 1000.0
+        fit_kwargs['infer_limit_batch_size'] = 1  # API tek film özetiyle çağırır
+    start = time.perf_counter()
+    predictor = TabularPredictor(
+        label=label, 
+        path=os.path.join(model_dir, f'predictor_{label}'),
+        eval_metric='f1_macro',
+        verbosity=1,
+    ).fit(
+        train_data=df_train_set[['overview'] + target_labels], 
+        time_limit=time_limit,
+        presets='best_quality', 
+
+        dynamic_stacking=False, # DyStack'i kapatır
+        num_stack_levels=0,      # Sadece temel (L1) modelleri eğitir, Ray'i kullanan Stacking'i minimize eder.
+        # Her etiket orkestratörün ayırdığı CPU payıyla sınırlı (Ray yerine süreç bazlı paralellik)
+        ag_args_fit={'num_cpus': num_cpus},
+        ag_args_ensemble={'num_folds': 4, 'num_cpus': num_cpus}, # Fold sayısını düşürerek hafıza sorununu azaltır
+        # Aşırı öğrenmeyi azaltmak için early stopping sıkılaştırılabilir:
+        hyperparameters=hyperparameters or 'default', # Hyperparametre tuning'i varsayılan hale getirir.
+        **fit_kwargs,
+    )
+    fit_seconds = time.perf_counter() - start
+
+    # Model Değerlendirme (Gerçek Genelleme Yeteneği)
+    y_true = df_test_set[label]
+    y_pred = predictor.predict(df_test_set)
+
+    return {
+        "best_f1_score": float(f1_score(y_true, y_pred)),
+        "accuracy_score": float(accuracy_score(y_true, y_pred)),
+        "best_model": predictor.info()['best_model'],
+        "hyperparameters": best_model_hyperparameters(predictor),
+        "num_cpus": num_cpus,
+        "fit_seconds": round(fit_seconds, 2),
+        "wall_seconds": round(time.perf_counter() - start, 2),
+        "finished_at": datetime.utcnow().isoformat(),
+    }
+
+
+def train_autogluon_model(
+    df_train: pd.DataFrame,
+    target_labels: List[str],
+    cpu_budget: Optional[int] = None,
+    cpus_per_label: Optional[int] = None,
+    memory_budget_gb: Optional[float] = None,
+    memory_per_label_gb: Optional[float] = None,
+    time_limit: Optional[int] = None,
+    force: bool = False,
+    infer_limit_ms: Optional[float] = None,
+    retrain_labels: Optional[List[str]] = None,
+    hyperparameters: Optional[Dict[str, Dict]] = None,
+) -> Optional[Dict]:
+    """
+    Veriyi ayırır ve etiket modellerini CPU/bellek bütçesi içinde paralel süreçlerde eğitir.
+
+    Biten her etiket training_state.json'a yazılır; tekrar çalıştırıldığında
+    aynı snapshot_version ile tamamlanmış etiketler atlanır (force=True hariç). Sonunda etiket başına
+    duvar saati ve F1 içeren training_summary.json yazılır.
+
+    Args:
+        retrain_labels: Tamamlanmış olsa da yeniden eğitilecek etiketler (artımlı mod)
+        hyperparameters: Etiket → fit(hyperparameters=...) (artımlı modda önceki değerler)
     """
     if not ML_LIBRARIES_AVAILABLE:
-        return
+        return None
+
+    cpu_budget = cpu_budget or settings.TRAIN_CPU_BUDGET or os.cpu_count() or 1
+    cpus_per_label = cpus_per_label or settings.TRAIN_CPUS_PER_LABEL
+    memory_budget_gb = memory_budget_gb or settings.TRAIN_MEMORY_BUDGET_GB or _total_memory_gb() * 0.8
+    memory_per_label_gb = memory_per_label_gb or settings.TRAIN_MEMORY_PER_LABEL_GB
+    time_limit = time_limit or settings.TRAIN_TIME_LIMIT
+    infer_limit_ms = infer_limit_ms if infer_limit_ms is not None else settings.TRAIN_INFER_LIMIT_MS
 
     print("\n3. 🔍 Veri, Eğitim ve Test Setlerine Ayrılıyor (Overfitting azaltma)...")
     
     # Aşırı öğrenmeyi kontrol etmek için veriyi eğitim ve test setlerine ayır
-    df_train_set, df_test_set = train_test_split(
-        df_train, 
-        test_size=0.20, 
-        random_state=42,
-        shuffle=True
-    )
+    df_train_set, df_test_set = split_train_test(df_train)
     
     print(f"   Eğitim Seti Boyutu: {len(df_train_set)} film")
     print(f"   Test Seti Boyutu: {len(df_test_set)} film")
 
+    # Aynı snapshot üzerinde tamamlanmış etiketleri atla (checkpoint); başka
+    # snapshot'la eğitilmiş etiketler (veri değişti) yeniden eğitilir
+    state = {} if force else load_training_state(MODEL_DIR)
+    snapshot_version = df_train.attrs.get("snapshot_version")
+    done = {
+        label for label in target_labels
+        if label in state and state[label].get("snapshot_version") == snapshot_version
+        and os.path.isdir(os.path.join(MODEL_DIR, f'predictor_{label}'))
+        and label not in (retrain_labels or ())
+    }
+    pending = [label for label in target_labels if label not in done]
+    for label in sorted(done):
+        print(f"   ⏭️  {label} daha önce eğitilmiş (F1: {state[label]['best_f1_score']:.4f}), atlanıyor")
+    for label in sorted(set(pending) & set(state)):
+        if state[label].get("snapshot_version") != snapshot_version:
+            print(f"   🔁 {label} farklı snapshot ile eğitilmiş ({state[label].get('snapshot_version')} → "
+                  f"{snapshot_version}), yeniden eğitilecek")
 
-    print("\n4. 🤖 AutoGluon Modeli Eğitiliyor (Çoklu Etiket Sınıflandırma)...")
-    print("   ✅ Paralel işlemciler azaltıldı (num_cpus=0.5).")
-    
-    # 5. Model Değerlendirme için sonuçları tutacak dictionary
-    results = {}
-    
-    for i, label in enumerate(target_labels):
-        print(f"\n--- Eğitiliyor: {label} ({i+1}/{len(target_labels)}) ---")
-        
-        predictor = TabularPredictor(
-            label=label, 
-            path=os.path.join(MODEL_DIR, f'predictor_{label}'),
-            eval_metric='f1_macro' 
-        ).fit(
-            train_data=df_train_set[['overview'] + target_labels], 
-            time_limit=3600, # Süreyi 1 saate çıkarıldı
-            presets='best_quality', 
-
-            dynamic_stacking=False, # DyStack'i kapatır
-            num_stack_levels=0,      # Sadece temel (L1) modelleri eğitir, Ray'i kullanan Stacking'i minimize eder.
-            # RAY/ÇOKLU İŞLEMCİ sorununu çözen parametreler:
-            ag_args_fit={'num_cpus': 1}, # Ray'i devre dışı bırakır, kararlılığı artırır 
-            ag_args_ensemble={'num_folds': 4, 'num_cpus': 1}, # Fold sayısını düşürerek hafıza sorununu azaltır
-            # Aşırı öğrenmeyi azaltmak için early stopping sıkılaştırılabilir:
-            hyperparameters='default', # Hyperparametre tuning'i varsayılan hale getirir.
-        )
-        
-        # 5. Model Değerlendirme (Gerçek Genelleme Yeteneği)
-        
-        # Test seti üzerinde tahmin yap
-        y_true = df_test_set[label]
-        y_pred = predictor.predict(df_test_set)
-        
-        # F1 ve Doğruluk (Accuracy) Hesapla
-        acc = accuracy_score(y_true, y_pred)
-        f1 = f1_score(y_true, y_pred)
-        
-        results[label] = {
-            "best_f1_score": f1,
-            "accuracy_score": acc,
-            "best_model": predictor.info()['best_model']
-        }
-        
-        print(f"✅ {label} Sonuç (Test Seti Üzerinde):")
-        print(f"   En iyi model: {results[label]['best_model']}")
-        print(f"   Test Acc: {acc:.4f} | Test F1: {f1:.4f}")
-        
+    concurrency, num_cpus = plan_label_concurrency(
+        len(pending), cpu_budget, cpus_per_label, memory_budget_gb, memory_per_label_gb
+    )
+    print("\n4. 🤖 AutoGluon Modelleri Eğitiliyor (Çoklu Etiket Sınıflandırma)...")
+    if infer_limit_ms:
+        print(f"   ⏱️  Tahmin gecikmesi bütçesi: {infer_limit_ms} ms/satır (infer_limit)")
+    print(f"   ⚙️  Bütçe: {cpu_budget} CPU, {memory_budget_gb:.1f} GB → "
+          f"{concurrency} eşzamanlı etiket × {num_cpus} CPU ({len(pending)} etiket bekliyor)")
+
+    start = time.perf_counter()
+    if pending:
+        # AutoGluon fork sonrası güvenli değil; süreçler spawn ile başlatılır
+        with ProcessPoolExecutor(max_workers=concurrency, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {
+                pool.submit(fit_label, label, df_train_set, df_test_set, target_labels,
+                            MODEL_DIR, num_cpus, time_limit, infer_limit_ms,
+                            (hyperparameters or {}).get(label)): label
+                for label in pending
+            }
+            for future in as_completed(futures):
+                label = futures[future]
+                try:
+                    state[label] = future.result()
+                    state[label]["snapshot_version"] = snapshot_version
+                except Exception as e:
+                    print(f"❌ {label} eğitilemedi: {e}")
+                    continue
+                _write_json(os.path.join(MODEL_DIR, TRAINING_STATE_FILE), state)
+                res = state[label]
+                print(f"✅ {label} ({len(state)}/{len(target_labels)}): {res['best_model']} | "
+                      f"Test Acc: {res['accuracy_score']:.4f} | Test F1: {res['best_f1_score']:.4f} | "
+                      f"{res['wall_seconds']:.0f} sn")
+    wall_seconds = time.perf_counter() - start
+
+    results = {label: state[label] for label in target_labels if label in state}
+    trained = [label for label in pending if label in results]
+    sequential_seconds = sum(results[label]['wall_seconds'] for label in trained)
+    summary = {
+        "finished_at": datetime.utcnow().isoformat(),
+        "cpu_budget": cpu_budget,
+        "memory_budget_gb": round(memory_budget_gb, 1),
+        "concurrency": concurrency,
+        "cpus_per_label": num_cpus,
+        "infer_limit_ms": infer_limit_ms or None,
+        "trained_labels": trained,
+        "skipped_labels": sorted(done),
+        "wall_seconds": round(wall_seconds, 2),
+        "sum_label_seconds": round(sequential_seconds, 2),
+        "macro_f1": round(float(np.mean([r['best_f1_score'] for r in results.values()])), 4) if results else None,
+        "labels": results,
+    }
+    _write_json(os.path.join(MODEL_DIR, TRAINING_SUMMARY_FILE), summary)
     
     print("\n\n--- 📊 Tüm Modellerin Özeti (Test Performansı) ---")
     for label, res in results.items():
-        print(f"🏷️ {label}: Acc: {res['accuracy_score']:.4f}, F1: {res['best_f1_score']:.4f}")
+        print(f"🏷️ {label}: Acc: {res['accuracy_score']:.4f}, F1: {res['best_f1_score']:.4f}, "
+              f"Süre: {res['wall_seconds']:.0f} sn")
+    if trained:
+        print(f"⏱️ Toplam duvar saati: {wall_seconds:.0f} sn (etiket süreleri toplamı: {sequential_seconds:.0f} sn)")
+    print(f"📝 Özet: {os.path.join(MODEL_DIR, TRAINING_SUMMARY_FILE)}")
         
-    print("\n🎉 Tüm Çoklu Etiket Sınıflandırma Modelleri Eğitildi ve Kaydedildi.")
+    missing = [label for label in target_labels if label not in results]
+    if missing:
+        print(f"⚠️ Eğitilemeyen etiketler: {missing} (tekrar çalıştırınca sadece bunlar eğitilir)")
+    else:
+        print("\n🎉 Tüm Çoklu Etiket Sınıflandırma Modelleri Eğitildi ve Kaydedildi.")
+    return summary
+
+
+MODEL_COMPARISON_FILE = "model_comparison.json"
+
+
+def split_train_test(df_train: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Tüm eğitim modlarının aynı test setini kullanması için sabit ayrım."""
+    return train_test_split(df_train, test_size=0.20, random_state=42, shuffle=True)
+
+
+def _rss_mb() -> float:
+    """Sürecin o anki RSS'i (MB, Linux /proc); okunamazsa 0."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def _dir_size_mb(path: str) -> float:
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 1024 ** 2
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / 1024 ** 2
+
+
+def measure_layout(load_fn, predict_fn, texts: List[str], y_true: np.ndarray, repeats: int = 100) -> Dict:
+    """
+    Bir model düzeni için yükleme süresi, bellek artışı, tek satır gecikmesi
+    (p50/p99), batch verimi ve macro-F1 ölçer.
+
+    Args:
+        load_fn: Modeli yükleyip döndüren fonksiyon
+        predict_fn: (model, texts) -> (n, n_etiket) olasılık matrisi
+    """
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    model = load_fn()
+    load_seconds = time.perf_counter() - start
+    memory_mb = _rss_mb() - rss_before
+
+    predict_fn(model, texts[:1])  # ilk çağrı maliyetini ölçümden çıkar
+    latencies = []
+    for text in texts[:repeats]:
+        start = time.perf_counter()
+        predict_fn(model, [text])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    probs = predict_fn(model, texts)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "load_seconds": round(load_seconds, 3),
+        "memory_mb": round(memory_mb, 1),
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "latency_p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "batch_rows_per_second": round(len(texts) / max(batch_seconds, 1e-9), 1),
+        "macro_f1": round(float(f1_score(y_true, probs >= 0.5, average='macro', zero_division=0)), 4),
+    }
+
+
+def train_multi_output_model(df_train: pd.DataFrame, target_labels: List[str], compare: bool = True,
+                             retrain_labels: Optional[List[str]] = None) -> Dict:
+    """
+    Sekiz ikili predictor yerine tüm etiketler için tek bir model eğitir:
+    ortak TF-IDF özellikleri üzerinde one-vs-rest lojistik regresyon.
+    Tek artifact olarak multi_output_model.joblib'e kaydedilir; RecommenderService
+    bu dosya varsa (MODEL_LAYOUT=auto) onu yükler.
+
+    retrain_labels verilirse (artımlı mod) mevcut artifact'ın TF-IDF sözlüğü
+    korunur ve sadece bu etiketlerin sınıflandırıcıları önceki katsayılardan
+    (warm start) yeniden eğitilir.
+    """
+    print("\n3. 🔍 Veri, Eğitim ve Test Setlerine Ayrılıyor...")
+    df_train_set, df_test_set = split_train_test(df_train)
+    print(f"   Eğitim Seti Boyutu: {len(df_train_set)} film")
+    print(f"   Test Seti Boyutu: {len(df_test_set)} film")
+
+    artifact_path = os.path.join(MODEL_DIR, MULTI_OUTPUT_MODEL_FILE)
+    snapshot_version = df_train.attrs.get("snapshot_version")
+    y_train = df_train_set[target_labels].to_numpy()
+    start = time.perf_counter()
+
+    if retrain_labels is not None:
+        artifact = joblib.load(artifact_path)
+        model = artifact["model"]
+        label_versions = dict(artifact.get("label_versions", {}))
+        print(f"\n4. 🔁 Artımlı eğitim (warm start): {retrain_labels or 'yok'}")
+        if retrain_labels:
+            features = model.named_steps["tfidf"].transform(df_train_set['overview'].tolist())
+            ovr = model.named_steps["clf"]
+            for label in retrain_labels:
+                column = target_labels.index(label)
+                estimator = ovr.estimators_[column]
+                if not isinstance(estimator, LogisticRegression):
+                    # Önceki eğitimde tek sınıf vardı (sabit tahminci); sıfırdan kur
+                    estimator = clone(ovr.estimator)
+                    ovr.estimators_[column] = estimator
+                estimator.set_params(warm_start=True)
+                estimator.fit(features, y_train[:, column])
+                label_versions[label] = snapshot_version
+    else:
+        print("\n4. 🤖 Çoklu Çıkışlı Model Eğitiliyor (TF-IDF + one-vs-rest)...")
+        model = Pipeline([
+            ("tfidf", TfidfVectorizer(ngram_range=(1, 2), min_df=2, max_features=100000,
+                                      sublinear_tf=True, dtype=np.float32)),
+            ("clf", OneVsRestClassifier(
+                # lbfgs: artımlı modda warm start'ı destekler (liblinear desteklemez)
+                LogisticRegression(max_iter=1000, class_weight='balanced'),
+                n_jobs=-1,
+            )),
+        ])
+        model.fit(df_train_set['overview'].tolist(), y_train)
+        label_versions = {label: snapshot_version for label in target_labels}
+    fit_seconds = time.perf_counter() - start
+
+    y_true = df_test_set[target_labels].to_numpy()
+    y_pred = model.predict(df_test_set['overview'].tolist())
+    per_label_f1 = f1_score(y_true, y_pred, average=None, zero_division=0)
+    for label, f1 in zip(target_labels, per_label_f1):
+        print(f"🏷️ {label}: F1: {f1:.4f}")
+    print(f"✅ Macro-F1: {per_label_f1.mean():.4f} (eğitim {fit_seconds:.1f} sn)")
+
+    artifact = {
+        "model": model,
+        "labels": list(target_labels),
+        "label_versions": label_versions,
+        "trained_at": datetime.utcnow().isoformat(),
+        "fit_seconds": round(fit_seconds, 2),
+        "macro_f1": round(float(per_label_f1.mean()), 4),
+    }
+    if retrain_labels is not None:
+        # Tam eğitim süresi referansı artımlı çalıştırmalarda korunur
+        artifact["full_fit_seconds"] = joblib.load(artifact_path).get("full_fit_seconds")
+    else:
+        artifact["full_fit_seconds"] = round(fit_seconds, 2)
+    joblib.dump(artifact, artifact_path)
+    print(f"💾 Model kaydedildi: {artifact_path}")
+
+    if compare:
+        compare_model_layouts(df_test_set, target_labels)
+    return artifact
+
+
+def compare_model_layouts(df_test_set: pd.DataFrame, target_labels: List[str]) -> Dict:
+    """
+    Etiket başına predictor'lar ile çoklu çıkışlı modeli aynı test setinde
+    yan yana ölçer ve model_comparison.json'a yazar.
+    """
+    print("\n5. ⚖️ Model düzenleri karşılaştırılıyor...")
+    texts = df_test_set['overview'].tolist()
+    y_true = df_test_set[target_labels].to_numpy()
+    report: Dict[str, Dict] = {}
+
+    artifact_path = os.path.join(MODEL_DIR, MULTI_OUTPUT_MODEL_FILE)
+    if os.path.exists(artifact_path):
+        report["multi_output"] = measure_layout(
+            lambda: joblib.load(artifact_path)["model"],
+            lambda model, batch: model.predict_proba(batch),
+            texts, y_true,
+        )
+        report["multi_output"]["artifact_mb"] = round(_dir_size_mb(artifact_path), 1)
+
+    predictor_dirs = [os.path.join(MODEL_DIR, f'predictor_{label}') for label in target_labels]
+    if ML_LIBRARIES_AVAILABLE and all(os.path.isdir(path) for path in predictor_dirs):
+        def predict_per_label(predictors, batch):
+            frame = pd.DataFrame({'overview': batch, **{label: 0 for label in target_labels}})
+            return np.column_stack([
+                predictors[label].predict_proba(frame).iloc[:, 1].to_numpy() for label in target_labels
+            ])
+
+        report["per_label"] = measure_layout(
+            lambda: {label: TabularPredictor.load(path) for label, path in zip(target_labels, predictor_dirs)},
+            predict_per_label,
+            texts, y_true,
+        )
+        report["per_label"]["artifact_mb"] = round(sum(_dir_size_mb(path) for path in predictor_dirs), 1)
+    else:
+        print("   ℹ️ Etiket başına predictor'lar bulunamadı (veya AutoGluon yok); sadece çoklu çıkışlı model ölçüldü.")
+
+    columns = ["load_seconds", "memory_mb", "artifact_mb", "latency_p50_ms", "latency_p99_ms",
+               "batch_rows_per_second", "macro_f1"]
+    print(f"   {'':14}" + "".join(f"{c:>22}" for c in columns))
+    for layout, metrics in report.items():
+        print(f"   {layout:14}" + "".join(f"{metrics.get(c, ''):>22}" for c in columns))
+
+    _write_json(os.path.join(MODEL_DIR, MODEL_COMPARISON_FILE), {
+        "measured_at": datetime.utcnow().isoformat(),
+        "test_rows": len(texts),
+        "layouts": report,
+    })
+    return report
+
+
+EXPORT_REPORT_FILE = "export_report.json"
+
+
+def _latency_profile(predictor, frame: pd.DataFrame, rows: int = 200) -> Dict:
+    """Tek satırlık predict_proba çağrılarının p50/p99 gecikmesi (ms)."""
+    predictor.predict_proba(frame.iloc[:1])  # ilk çağrı maliyetini ölçümden çıkar
+    latencies = []
+    for i in range(min(rows, len(frame))):
+        start = time.perf_counter()
+        predictor.predict_proba(frame.iloc[i:i + 1])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "latency_p99_ms": round(float(np.percentile(latencies, 99)), 3),
+    }
+
+
+def _profile_predictor(path: str, frame: pd.DataFrame) -> Dict:
+    start = time.perf_counter()
+    predictor = TabularPredictor.load(path)
+    predictor.persist(models='best')  # servisteki gibi (PERSIST_MODELS)
+    load_seconds = time.perf_counter() - start
+    return {
+        "artifact_mb": round(_dir_size_mb(path), 1),
+        "load_seconds": round(load_seconds, 3),
+        "best_model": predictor.model_best,
+        **_latency_profile(predictor, frame),
+    }
+
+
+def export_for_deployment(target_labels: List[str], sample_texts: List[str], export_dir: str) -> Dict:
+    """
+    Eğitilmiş predictor'lardan dağıtıma uygun, küçük bir kopya üretir:
+
+        1. predictor klonlanır (orijinal dokunulmadan kalır)
+        2. refit_full: bagging fold'ları yerine tüm veriyle tek model
+        3. refit edilen model en iyi model yapılır, geri kalanlar delete_models ile silinir
+        4. save_space ile gereksiz artifact'lar temizlenir
+
+    Öncesi/sonrası boyut, yükleme süresi (persist dahil) ve satır başına p50/p99
+    gecikme export_report.json'a yazılır. export_dir, EMOTION_MODEL_DIR olarak
+    doğrudan servis edilebilecek tam bir model klasörüdür (binarizer dahil).
+    """
+    os.makedirs(export_dir, exist_ok=True)
+    frame = pd.DataFrame({'overview': sample_texts, **{label: 0 for label in target_labels}})
+    report: Dict[str, Dict] = {}
+
+    for label in target_labels:
+        source = os.path.join(MODEL_DIR, f'predictor_{label}')
+        target = os.path.join(export_dir, f'predictor_{label}')
+        if not os.path.isdir(source):
+            print(f"   ⚠ {label} için predictor bulunamadı: {source}")
+            continue
+        print(f"\n--- Dağıtım kopyası: {label} ---")
+        before = _profile_predictor(source, frame)
+
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        predictor = TabularPredictor.load(source).clone(path=target, return_clone=True)
+        refit_map = predictor.refit_full(model='best')
+        predictor.set_model_best(refit_map.get(predictor.model_best, predictor.model_best), save_trained=True)
+        predictor.delete_models(models_to_keep='best', dry_run=False)
+        predictor.save_space()
+
+        after = _profile_predictor(target, frame)
+        report[label] = {"before": before, "after": after}
+        print(f"   📦 {before['artifact_mb']} MB → {after['artifact_mb']} MB | "
+              f"yükleme {before['load_seconds']} → {after['load_seconds']} sn | "
+              f"p50 {before['latency_p50_ms']} → {after['latency_p50_ms']} ms | "
+              f"p99 {before['latency_p99_ms']} → {after['latency_p99_ms']} ms")
+
+    binarizer = os.path.join(MODEL_DIR, "multi_label_binarizer.pkl")
+    if os.path.exists(binarizer):
+        shutil.copy2(binarizer, os.path.join(export_dir, "multi_label_binarizer.pkl"))
+
+    if report:
+        totals = {
+            stage: {
+                "artifact_mb": round(sum(r[stage]["artifact_mb"] for r in report.values()), 1),
+                "load_seconds": round(sum(r[stage]["load_seconds"] for r in report.values()), 3),
+                # Servis her film için tüm etiketleri sırayla çağırır
+                "latency_p50_ms": round(sum(r[stage]["latency_p50_ms"] for r in report.values()), 3),
+                "latency_p99_ms": round(sum(r[stage]["latency_p99_ms"] for r in report.values()), 3),
+            }
+            for stage in ("before", "after")
+        }
+        print(f"\n📊 Toplam: {totals['before']} → {totals['after']}")
+        _write_json(os.path.join(export_dir, EXPORT_REPORT_FILE), {
+            "exported_at": datetime.utcnow().isoformat(),
+            "sample_rows": len(sample_texts),
+            "totals": totals,
+            "labels": report,
+        })
+        print(f"💾 Dağıtım modeli: {export_dir} (EMOTION_MODEL_DIR={export_dir} ile servis edilebilir)")
+    return report
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _library_versions() -> Dict[str, Optional[str]]:
+    from importlib import metadata
+    versions = {"python": platform.python_version()}
+    for package in ("autogluon.tabular", "scikit-learn", "numpy", "pandas"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def package_model_bundle(model_dir: str, sample_texts: List[str]) -> Dict:
+    """
+    model_dir'deki modelleri tek dosyalık pakete dönüştürür:
+
+        model_bundle.pkl   binarizer + belleğe alınmış (persist) tüm predictor'lar
+                           veya çoklu çıkışlı model, tek pickle
+        model_bundle.json  etiketler, eşikler, özellik şeması, kaynak dosyaların
+                           ve paketin sha256'sı, kütüphane versiyonları
+
+    Servis bu klasörü iki dosya açıp tek unpickle ile yükler. Paket yazıldıktan
+    sonra yeniden yüklenip sample_texts üzerindeki olasılıklar orijinal
+    düzenle karşılaştırılır; uyuşmazsa paket silinir.
+    """
+    print(f"\n📦 Model paketi hazırlanıyor: {model_dir}")
+    source = ModelBundle(model_dir).load(settings.MODEL_LAYOUT, use_package=False)
+    if not source.is_ready():
+        raise RuntimeError(f"Paketlenecek model yüklenemedi: {model_dir}")
+
+    if source.layout == LAYOUT_MULTI_OUTPUT:
+        payload = {"model": source.multi_output_model}
+        source_files = [MULTI_OUTPUT_MODEL_FILE]
+        decision_thresholds = {label: 0.5 for label in source.target_labels}
+    else:
+        for predictor in source.predictors.values():
+            # Paket diskteki model klasörlerine ihtiyaç duymamalı: modeller bellekte pickle'lanır
+            predictor.persist(models='best')
+        payload = {"mlb": source.mlb, "predictors": source.predictors}
+        source_files = ["multi_label_binarizer.pkl"] + [
+            os.path.relpath(os.path.join(root, name), model_dir)
+            for label in source.target_labels
+            for root, _, names in os.walk(os.path.join(model_dir, f'predictor_{label}'))
+            for name in names
+        ]
+        decision_thresholds = {
+            label: float(getattr(predictor, 'decision_threshold', 0.5) or 0.5)
+            for label, predictor in source.predictors.items()
+        }
+
+    payload_bytes = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    bundle_path = os.path.join(model_dir, BUNDLE_FILE)
+    with open(f"{bundle_path}.tmp", "wb") as f:
+        f.write(payload_bytes)
+    manifest = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "created_at": datetime.utcnow().isoformat(),
+        "layout": source.layout,
+        "labels": list(source.target_labels),
+        "thresholds": {
+            # Servis varsayılan olarak resolve_thresholds (otomatik) kullanır
+            "mode": "auto",
+            "custom_default": 0.3,
+            "decision_thresholds": decision_thresholds,
+        },
+        "feature_schema": {
+            "inputs": [{"name": "overview", "dtype": "text"}],
+            "label_columns": list(source.target_labels),
+        },
+        "sha256": hashlib.sha256(payload_bytes).hexdigest(),
+        "size_bytes": len(payload_bytes),
+        "source_files": {path: _sha256_file(os.path.join(model_dir, path)) for path in source_files},
+        "libraries": _library_versions(),
+    }
+    del payload_bytes
+    os.replace(f"{bundle_path}.tmp", bundle_path)
+    _write_json(os.path.join(model_dir, BUNDLE_MANIFEST_FILE), manifest)
+
+    # Doğrulama: paket tek başına aynı olasılıkları üretmeli
+    packaged = ModelBundle(model_dir).load(settings.MODEL_LAYOUT)
+    expected = source.predict_proba_batch(sample_texts)
+    actual = packaged.predict_proba_batch(sample_texts) if packaged.is_ready() else None
+    if actual is None or actual.shape != expected.shape or not np.allclose(actual, expected, atol=1e-6):
+        os.remove(bundle_path)
+        os.remove(os.path.join(model_dir, BUNDLE_MANIFEST_FILE))
+        raise RuntimeError("Paketten yüklenen model orijinal modelle aynı olasılıkları üretmiyor; paket silindi")
+
+    print(f"✅ Paket: {bundle_path} ({manifest['size_bytes'] / 1024 / 1024:.1f} MB, "
+          f"{len(source_files)} kaynak dosya → 2 dosya) | yükleme {source.load_seconds:.2f} → "
+          f"{packaged.load_seconds:.2f} sn")
+    return manifest
+
+
+INCREMENTAL_REPORT_FILE = "incremental_report.json"
+
+
+def label_drift(previous: pd.DataFrame, current: pd.DataFrame, labels: List[str]) -> Dict[str, Dict]:
+    """
+    İki snapshot arasında etiket başına değişimi ölçer: etiketi eklenen/silinen
+    filmler ve yeni eklenip bu etiketi alan filmler "changed" sayılır;
+    oran önceki pozitif sayısına göredir.
+    """
+    merged = previous[['movie_id'] + labels].merge(
+        current[['movie_id'] + labels], on='movie_id', how='outer', suffixes=('_old', '_new')
+    ).fillna(0)
+    drift = {}
+    for label in labels:
+        old = merged[f'{label}_old'].astype(int)
+        new = merged[f'{label}_new'].astype(int)
+        changed = int((old != new).sum())
+        positives = int(old.sum())
+        drift[label] = {
+            "changed": changed,
+            "previous_positives": positives,
+            "ratio": round(changed / max(1, positives), 4),
+        }
+    return drift
+
+
+def _snapshot_frame(version: Optional[str], cache: Dict[str, pd.DataFrame]) -> Optional[pd.DataFrame]:
+    if not version:
+        return None
+    if version not in cache:
+        entry = next((e for e in load_snapshot_manifest()["snapshots"] if e["version"] == version), None)
+        if entry is None or not os.path.exists(os.path.join(_snapshot_dir(), entry["path"])):
+            return None
+        cache[version] = load_training_snapshot(entry)
+    return cache[version]
+
+
+def retrain_changed_labels(df_train: pd.DataFrame, target_labels: List[str], mode: str = 'per-label',
+                           drift_threshold: Optional[float] = None, **train_kwargs) -> Optional[Dict]:
+    """
+    Sadece son eğitimden beri verisi belirgin değişen etiketleri yeniden eğitir.
+
+    Her etiketin eğitildiği snapshot (training_state.json veya multi-output
+    artifact'ı) ile güncel snapshot karşılaştırılır; değişim oranı
+    drift_threshold'u aşan etiketler yeniden eğitilir. per-label modda
+    önceki en iyi modelin hiperparametreleri, multi-output modda önceki
+    katsayılar (warm start) kullanılır. Atlanan etiketlerin son eğitim
+    süresi kazanılan süre olarak raporlanır.
+    """
+    drift_threshold = settings.RETRAIN_DRIFT_THRESHOLD if drift_threshold is None else drift_threshold
+    current_version = df_train.attrs.get("snapshot_version")
+    if current_version is None:
+        print("⚠️ Güncel veri bir snapshot'tan gelmiyor (pyarrow yok); tam eğitim yapılıyor.")
+
+    artifact_path = os.path.join(MODEL_DIR, MULTI_OUTPUT_MODEL_FILE)
+    if mode == 'multi-output':
+        artifact = joblib.load(artifact_path) if os.path.exists(artifact_path) else None
+        if artifact is None or artifact.get("labels") != list(target_labels):
+            print("ℹ️ Önceki çoklu çıkışlı model yok veya etiketler farklı; tam eğitim yapılıyor.")
+            return train_multi_output_model(df_train, target_labels, compare=False)
+        trained_versions = artifact.get("label_versions", {})
+        previous_seconds = {label: (artifact.get("full_fit_seconds") or 0) / len(target_labels)
+                            for label in target_labels}
+    else:
+        state = load_training_state(MODEL_DIR)
+        trained_versions = {label: state[label].get("snapshot_version") for label in state}
+        previous_seconds = {label: state[label].get("wall_seconds", 0) for label in state}
+
+    print(f"\n🔎 Etiket başına veri değişimi (eşik: {drift_threshold:.0%})")
+    cache: Dict[str, pd.DataFrame] = {}
+    drift: Dict[str, Dict] = {}
+    retrain: List[str] = []
+    for label in target_labels:
+        previous = _snapshot_frame(trained_versions.get(label), cache) if current_version else None
+        if previous is None:
+            drift[label] = {"changed": None, "previous_positives": None, "ratio": None}
+            retrain.append(label)
+            print(f"   {label:12} önceki eğitim snapshot'ı yok → yeniden eğitilecek")
+            continue
+        drift[label] = label_drift(previous, df_train, [label])[label]
+        if drift[label]["ratio"] >= drift_threshold:
+            retrain.append(label)
+        print(f"   {label:12} {drift[label]['changed']:>6} değişen film ({drift[label]['ratio']:.1%}) → "
+              f"{'yeniden eğitilecek' if label in retrain else 'atlandı'}")
+
+    skipped = [label for label in target_labels if label not in retrain]
+    start = time.perf_counter()
+    if not retrain:
+        print("✅ Eşiği aşan etiket yok; modeller güncel.")
+    elif mode == 'multi-output':
+        train_multi_output_model(df_train, target_labels, compare=False, retrain_labels=retrain)
+    else:
+        state = load_training_state(MODEL_DIR)
+        train_autogluon_model(
+            df_train, target_labels, retrain_labels=retrain,
+            hyperparameters={label: state.get(label, {}).get("hyperparameters") for label in retrain},
+            **train_kwargs,
+        )
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "finished_at": datetime.utcnow().isoformat(),
+        "mode": mode,
+        "snapshot_version": current_version,
+        "drift_threshold": drift_threshold,
+        "drift": drift,
+        "retrained_labels": retrain,
+        "skipped_labels": skipped,
+        "wall_seconds": round(elapsed, 2),
+        # Atlanan etiketlerin son eğitim süreleri (tam eğitime göre kazanılan süre tahmini)
+        "estimated_seconds_saved": round(sum(previous_seconds.get(label, 0) for label in skipped), 2),
+    }
+    _write_json(os.path.join(MODEL_DIR, INCREMENTAL_REPORT_FILE), report)
+    print(f"\n⏱️ Artımlı eğitim: {len(retrain)} etiket yeniden eğitildi, {len(skipped)} atlandı; "
+          f"{elapsed:.0f} sn sürdü, tahmini {report['estimated_seconds_saved']:.0f} sn kazanıldı")
+    return report
 
 
 if __name__ == "__main__":
-    if not ML_LIBRARIES_AVAILABLE:
+    import argparse
+    parser = argparse.ArgumentParser(description="Duygu etiketleri için AutoGluon modellerini eğit")
+    parser.add_argument('--cpu-budget', type=int, default=None, help='Toplam CPU (varsayılan: TRAIN_CPU_BUDGET / tüm çekirdekler)')
+    parser.add_argument('--cpus-per-label', type=int, default=None, help='Etiket başına CPU (TRAIN_CPUS_PER_LABEL)')
+    parser.add_argument('--memory-budget-gb', type=float, default=None, help='Toplam bellek bütçesi (GB)')
+    parser.add_argument('--memory-per-label-gb', type=float, default=None, help='Etiket başına tahmini bellek (GB)')
+    parser.add_argument('--time-limit', type=int, default=None, help='Etiket başına süre limiti (sn)')
+    parser.add_argument('--force', action='store_true', help='Checkpoint\'i yok say, tüm etiketleri yeniden eğit')
+    parser.add_argument('--mode', choices=['per-label', 'multi-output'], default='per-label',
+                        help='per-label: duygu başına TabularPredictor, multi-output: tek ortak model')
+    parser.add_argument('--no-compare', action='store_true',
+                        help='multi-output sonrası düzen karşılaştırmasını (gecikme/bellek/F1) atla')
+    parser.add_argument('--infer-limit-ms', type=float, default=None,
+                        help='Satır başına tahmin süresi bütçesi (ms, AutoGluon infer_limit; TRAIN_INFER_LIMIT_MS)')
+    parser.add_argument('--export', action='store_true',
+                        help='Eğitimden sonra refit_full + en iyi model dışındakileri silerek dağıtım kopyası üret')
+    parser.add_argument('--export-only', action='store_true',
+                        help='Eğitim yapmadan mevcut predictor\'lardan dağıtım kopyası üret')
+    parser.add_argument('--export-dir', default=os.path.join(MODEL_DIR, 'deploy'), help='Dağıtım kopyası klasörü')
+    parser.add_argument('--refresh-snapshot', action='store_true',
+                        help='Etiketler değişmemiş olsa da veritabanından yeni Parquet snapshot al')
+    parser.add_argument('--snapshot', default=None, metavar='VERSION',
+                        help='Belirli bir snapshot versiyonuyla eğit (snapshots/manifest.json)')
+    parser.add_argument('--package', action='store_true',
+                        help='Modeli (veya --export çıktısını) tek dosyalık pakete (model_bundle.pkl + manifest) dönüştür')
+    parser.add_argument('--publish', action='store_true',
+                        help='Eğitilen (veya --export edilen) modeli versions/ altına yeni versiyon olarak yayınla ve etkinleştir')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Sadece son eğitimden beri verisi değişen etiketleri yeniden eğit')
+    parser.add_argument('--drift-threshold', type=float, default=None,
+                        help='Yeniden eğitim için etiket başına değişim oranı eşiği (RETRAIN_DRIFT_THRESHOLD)')
+    args = parser.parse_args()
+
+    if (args.mode == 'per-label' or args.export_only) and not ML_LIBRARIES_AVAILABLE:
         print("\nModel eğitimi başlatılamıyor. Lütfen gerekli kütüphaneleri kurun.")
     else:
-        df_train = prepare_data_for_autogluon()
+        df_train = prepare_data_for_autogluon(refresh_snapshot=args.refresh_snapshot, snapshot_version=args.snapshot)
         
         if df_train is not None and len(df_train) > 0:
             target_labels = settings.EMOTION_CATEGORIES
-            train_autogluon_model(df_train, target_labels)
\ No newline at end of file
+            if args.incremental:
+                retrain_changed_labels(
+                    df_train, target_labels, mode=args.mode, drift_threshold=args.drift_threshold,
+                    cpu_budget=args.cpu_budget,
+                    cpus_per_label=args.cpus_per_label,
+                    memory_budget_gb=args.memory_budget_gb,
+                    memory_per_label_gb=args.memory_per_label_gb,
+                    time_limit=args.time_limit,
+                    infer_limit_ms=args.infer_limit_ms,
+                )
+            elif not args.export_only:
+                if args.mode == 'multi-output':
+                    train_multi_output_model(df_train, target_labels, compare=not args.no_compare)
+                else:
+                    train_autogluon_model(
+                        df_train, target_labels,
+                        cpu_budget=args.cpu_budget,
+                        cpus_per_label=args.cpus_per_label,
+                        memory_budget_gb=args.memory_budget_gb,
+                        memory_per_label_gb=args.memory_per_label_gb,
+                        time_limit=args.time_limit,
+                        force=args.force,
+                        infer_limit_ms=args.infer_limit_ms,
+                    )
+            if args.mode == 'per-label' and (args.export or args.export_only):
+                sample = df_train['overview'].sample(n=min(200, len(df_train)), random_state=42).tolist()
+                export_for_deployment(target_labels, sample, args.export_dir)
+            source_dir = args.export_dir if (args.export or args.export_only) else MODEL_DIR
+            if args.package:
+                sample = df_train['overview'].sample(n=min(200, len(df_train)), random_state=0).tolist()
+                package_model_bundle(source_dir, sample)
+            if args.publish:
+                version = publish_model_version(source_dir)
+                print(f"🚀 Model versiyonu yayınlandı: {version} (çalışan API'ler CURRENT'ı izleyip yeniden yükler)")
@@ -0,0 +1,591 @@
+"""
+Öneri hattı bileşenleri için çevrimdışı benchmark script'i.
+
+Veritabanı veya eğitilmiş model gerektirmez; sentetik veri üzerinde
+(gerekirse bellek içi SQLite ile) ölçüm yapar. Her bileşen ayrı bir alt komuttur.
+"""
+
+import os
+import sys
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+# Proje kök dizinini Python path'ine ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+project_root = os.path.dirname(backend_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+def _time_ms(fn: Callable[[], object], repeat: int) -> List[float]:
+    """Fonksiyonu repeat kez çalıştırıp her çalıştırmanın süresini ms olarak döndürür."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label: str, timings: List[float]) -> None:
+    arr = np.array(timings)
+    print(f"   {label:28} p50: {np.percentile(arr, 50):8.2f} ms | "
+          f"p99: {np.percentile(arr, 99):8.2f} ms | min: {arr.min():8.2f} ms")
+
+
+def benchmark_mmr(pool_size: int, k_values: List[int], lambda_: float, repeat: int, seed: int) -> None:
+    """MMR yeniden sıralamayı sentetik aday havuzu üzerinde ölçer."""
+    from backend.services.ranking import build_features, mmr_rerank
+
+    rng = np.random.default_rng(seed)
+    n_emotions, n_genres = 8, 19
+
+    # Sentetik havuz: Dirichlet duygu olasılıkları + seyrek multi-hot türler
+    emotions = rng.dirichlet(np.ones(n_emotions), size=pool_size).astype(np.float32)
+    genres = (rng.random((pool_size, n_genres)) < 0.15).astype(np.float32)
+    relevance = rng.random(pool_size).astype(np.float32)
+
+    print(f"🎯 MMR benchmark: havuz={pool_size}, λ={lambda_}, tekrar={repeat}")
+    _report("özellik matrisi", _time_ms(lambda: build_features(emotions, genres), repeat))
+
+    features = build_features(emotions, genres)
+    for k in k_values:
+        _report(f"mmr_rerank k={k}", _time_ms(lambda: mmr_rerank(relevance, features, k, lambda_), repeat))
+
+    # Çeşitlilik karşılaştırması: saf alaka sıralaması vs MMR (seçilenler arası ortalama benzerlik)
+    k = k_values[0]
+    top_k = np.argsort(-relevance)[:k]
+    mmr_k = np.array(mmr_rerank(relevance, features, k, lambda_))
+    for label, idx in (("saf alaka", top_k), ("MMR", mmr_k)):
+        sims = features[idx] @ features[idx].T
+        off_diag = sims[~np.eye(len(idx), dtype=bool)]
+        print(f"   {label:10} k={k}: ortalama ikili benzerlik {off_diag.mean():.3f}, "
+              f"ortalama alaka {relevance[idx].mean():.3f}")
+
+
+def benchmark_knn(catalog_size: int, k: int, repeat: int, seed: int) -> None:
+    """Benzer filmler k-NN indeksinin sorgu gecikmesini sentetik katalog üzerinde ölçer."""
+    from backend.config import settings
+    from backend.services.similarity_index import EmotionSimilarityIndex
+
+    rng = np.random.default_rng(seed)
+    labels = settings.EMOTION_CATEGORIES
+    genre_names = ["Action", "Drama", "Comedy", "Romance", "Family", "Thriller", "War", "Sci-Fi"]
+
+    index = EmotionSimilarityIndex(labels)
+    start = time.perf_counter()
+    probs = rng.dirichlet(np.ones(len(labels)), size=catalog_size)
+    for movie_id in range(catalog_size):
+        genre = ", ".join(rng.choice(genre_names, size=2, replace=False))
+        index.upsert(movie_id, dict(zip(labels, probs[movie_id])), genre)
+    print(f"🧭 k-NN benchmark: katalog={catalog_size}, k={k}, tekrar={repeat}")
+    print(f"   indeks kurulumu: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    query_ids = rng.integers(0, catalog_size, size=repeat)
+    _report("sorgu (filtresiz)", _time_ms(_iter_call(index.query, query_ids, k=k), repeat))
+    _report("sorgu (ortak tür)", _time_ms(_iter_call(index.query, query_ids, k=k, same_genre=True), repeat))
+
+
+def benchmark_lsh(catalog_size: int, dim: int, k: int, n_queries: int, seed: int) -> None:
+    """Overview LSH aramasının recall@k ve gecikmesini tam aramaya göre ölçer."""
+    from backend.services.text_index import TextEmbeddingIndex
+
+    rng = np.random.default_rng(seed)
+    # Kümelenmiş sentetik vektörler (gerçek LSA uzayına benzer yapı)
+    centers = rng.standard_normal((max(1, catalog_size // 50), dim)).astype(np.float32)
+    assignments = rng.integers(0, len(centers), size=catalog_size)
+    vectors = centers[assignments] + 0.6 * rng.standard_normal((catalog_size, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    start = time.perf_counter()
+    index = TextEmbeddingIndex(vectors, np.arange(catalog_size, dtype=np.int64))
+    print(f"🔎 LSH benchmark: katalog={catalog_size}, boyut={dim}, k={k}, sorgu={n_queries}")
+    print(f"   indeks kurulumu: {(time.perf_counter() - start) * 1000:.1f} ms")
+    report = index.evaluate_recall(n_queries=n_queries, k=k, seed=seed)
+    print(f"   recall@{k}: {report['recall_at_k']:.3f} | yaklaşık: {report['approx_ms']:.2f} ms | "
+          f"tam: {report['exact_ms']:.2f} ms")
+
+
+def benchmark_cf(catalog_sizes: List[int], n_users: int, per_user: int, repeat: int, seed: int) -> None:
+    """Item-item CF kullanıcı skorlamasının katalog büyüklüğünden bağımsız kaldığını ölçer."""
+    from backend.services.collaborative import ItemCooccurrenceIndex
+
+    rng = np.random.default_rng(seed)
+    print(f"🤝 CF benchmark: kullanıcı={n_users}, kullanıcı başına film={per_user}, tekrar={repeat}")
+    for catalog_size in catalog_sizes:
+        # Zipf benzeri popülerlik: az sayıda film çok izlenir
+        weights = 1.0 / np.arange(1, catalog_size + 1)
+        weights /= weights.sum()
+        pairs = [
+            (user_id, int(movie_id))
+            for user_id in range(n_users)
+            for movie_id in rng.choice(catalog_size, size=per_user, replace=False, p=weights)
+        ]
+        index = ItemCooccurrenceIndex()
+        start = time.perf_counter()
+        index.build_from_pairs(pairs)
+        print(f"   katalog={catalog_size}: kurulum {(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"nnz={index._base.nnz}")
+        user_ids = rng.integers(0, n_users, size=repeat)
+        _report("score_for_user (soğuk)", _time_ms(_iter_call(index.score_for_user, user_ids), repeat))
+        _report("score_for_user (sıcak)", _time_ms(_iter_call(index.score_for_user, user_ids), repeat))
+        new_movies = rng.integers(0, catalog_size, size=repeat)
+        _report("add_interaction", _time_ms(
+            _iter_call(lambda movie_id: index.add_interaction(0, movie_id), new_movies), repeat
+        ))
+
+
+def benchmark_seen(history_sizes: List[int], n_candidates: int, repeat: int, seed: int) -> None:
+    """Sıralı uint32 "görüldü" filtresini Python set'iyle bellek ve maske süresi açısından karşılaştırır."""
+    import sys as _sys
+
+    from backend.services.seen_filter import contains
+
+    rng = np.random.default_rng(seed)
+    print(f"👁️ Görüldü filtresi benchmark: aday={n_candidates}, tekrar={repeat}")
+    for size in history_sizes:
+        ids = rng.choice(1_000_000, size=size, replace=False)
+        seen = np.unique(ids.astype(np.uint32))
+        as_set = set(ids.tolist())
+        set_bytes = _sys.getsizeof(as_set) + sum(_sys.getsizeof(i) for i in as_set)
+        candidates = rng.integers(0, 1_000_000, size=n_candidates)
+        print(f"   geçmiş={size}: uint32 dizi {seen.nbytes / 1024:.1f} KB | set {set_bytes / 1024:.1f} KB")
+        _report("maske (searchsorted)", _time_ms(lambda: contains(seen, candidates), repeat))
+        candidate_list = candidates.tolist()
+        _report("maske (set)", _time_ms(lambda: [c in as_set for c in candidate_list], repeat))
+
+
+def benchmark_trending(n_movies: int, n_interactions: int, repeat: int, seed: int) -> None:
+    """
+    Trend listelerinin yenileme maliyetini ve okuma gecikmesini bellek içi
+    SQLite üzerinde sentetik geçmişle ölçer.
+    """
+    from datetime import datetime, timedelta
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from backend.config import settings
+    from backend.db.models import Base, Emotion, Movie, User, UserHistory
+    from backend.services.trending import OVERALL_LIST, get_trending, refresh_trending
+
+    rng = np.random.default_rng(seed)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    labels = settings.EMOTION_CATEGORIES
+    db.bulk_insert_mappings(Movie, [
+        {"movie_id": i, "title": f"M{i}", "overview": "-", "vote_average": float(rng.random() * 10),
+         "popularity": float(rng.random() * 100), "genre": "Drama"}
+        for i in range(1, n_movies + 1)
+    ])
+    db.bulk_insert_mappings(Emotion, [
+        {"movie_id": i, "emotion_label": label}
+        for i in range(1, n_movies + 1)
+        for label in rng.choice(labels, size=2, replace=False)
+    ])
+    n_users = max(1, n_interactions // 20)
+    db.bulk_insert_mappings(User, [
+        {"user_id": u, "username": f"u{u}", "email": f"u{u}@x", "password_hash": "-"} for u in range(1, n_users + 1)
+    ])
+    weights = 1.0 / np.arange(1, n_movies + 1)
+    now = datetime.utcnow()
+    db.bulk_insert_mappings(UserHistory, [
+        {"user_id": int(u), "movie_id": int(m), "interaction": str(k),
+         "watch_date": now - timedelta(days=float(d))}
+        for u, m, k, d in zip(
+            rng.integers(1, n_users + 1, size=n_interactions),
+            rng.choice(np.arange(1, n_movies + 1), size=n_interactions, p=weights / weights.sum()),
+            rng.choice(["liked", "viewed", "clicked"], size=n_interactions),
+            rng.random(n_interactions) * 45,
+        )
+    ])
+    db.commit()
+
+    print(f"📈 Trend benchmark: film={n_movies}, etkileşim={n_interactions}, "
+          f"pencereler={settings.TRENDING_WINDOWS}, tekrar={repeat}")
+    _report("refresh_trending", _time_ms(lambda: refresh_trending(db), max(1, repeat // 20)))
+    window = settings.TRENDING_WINDOWS[len(settings.TRENDING_WINDOWS) // 2]
+    _report(f"okuma ({OVERALL_LIST}, {window}g, 20)", _time_ms(lambda: get_trending(db, window, OVERALL_LIST, 20), repeat))
+    _report(f"okuma ({labels[0]}, {window}g, 20)", _time_ms(lambda: get_trending(db, window, labels[0], 20), repeat))
+    db.close()
+
+
+_MODEL_LOAD_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+from backend.services.recommender_service import ModelBundle
+start = time.perf_counter()
+bundle = ModelBundle(sys.argv[2]).load(use_package=sys.argv[3] == "package")
+print(json.dumps({"seconds": time.perf_counter() - start, "ready": bundle.is_ready()}))
+"""
+
+
+def _count_model_files(model_dir: str, packaged: bool) -> int:
+    """Yükleme sırasında okunan model dosyası sayısı (yaklaşık)."""
+    from backend.services.recommender_service import (
+        BINARIZER_FILE, BUNDLE_FILE, BUNDLE_MANIFEST_FILE, MULTI_OUTPUT_MODEL_FILE,
+    )
+    if packaged:
+        return sum(os.path.exists(os.path.join(model_dir, name)) for name in (BUNDLE_FILE, BUNDLE_MANIFEST_FILE))
+    count = sum(os.path.exists(os.path.join(model_dir, name)) for name in (BINARIZER_FILE, MULTI_OUTPUT_MODEL_FILE))
+    for name in os.listdir(model_dir):
+        if name.startswith("predictor_"):
+            count += sum(len(files) for _, _, files in os.walk(os.path.join(model_dir, name)))
+    return count
+
+
+def benchmark_model_load(model_dir: str, repeat: int) -> None:
+    """
+    Duygu modelinin soğuk yükleme süresini ayrı süreçlerde ölçer: mevcut düzen
+    (binarizer + predictor_* klasörleri) ile tek dosyalık paket (model_bundle.pkl).
+    Eğitilmiş (ve paketlenmiş) bir model klasörü gerektirir.
+    """
+    import json
+    import subprocess
+    from backend.services.recommender_service import BUNDLE_FILE
+
+    modes = ["legacy"] + (["package"] if os.path.exists(os.path.join(model_dir, BUNDLE_FILE)) else [])
+    print(f"📦 Model yükleme benchmark: {model_dir}, süreç başına tek yükleme, tekrar={repeat}")
+    for mode in modes:
+        timings = []
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, "-c", _MODEL_LOAD_SCRIPT, project_root, model_dir, mode],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip().splitlines()[-1]
+            result = json.loads(output)
+            if not result["ready"]:
+                print(f"   ❌ {mode}: model yüklenemedi")
+                break
+            timings.append(result["seconds"] * 1000)
+        if timings:
+            _report(f"{mode} ({_count_model_files(model_dir, mode == 'package')} dosya)", timings)
+    if len(modes) == 1:
+        print("ℹ️ Paket yok; önce: python backend/ml/automl_train.py --export-only --package")
+
+
+def benchmark_by_emotions(n_movies: int, requests: int, concurrency: int, latency_ms: float,
+                          row_latency_ms: float, seed: int) -> None:
+    """
+    POST /recommendation/by-emotions uçtan uca yük testi: geçici SQLite
+    veritabanı, sentetik filmler ve sahte tahmin motoru (MODEL_LAYOUT=fake)
+    ile; eğitilmiş model veya PostgreSQL gerektirmez.
+    """
+    import shutil
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    work_dir = tempfile.mkdtemp(prefix="by_emotions_bench_")
+    # Uygulama modülleri ayarları import anında okur
+    os.environ.update(
+        DATABASE_URL=f"sqlite:///{os.path.join(work_dir, 'bench.db')}",
+        DB_PASSWORD=os.environ.get("DB_PASSWORD", "bench"),
+        MODEL_LAYOUT="fake",
+        FAKE_MODEL_LATENCY_MS=str(latency_ms),
+        FAKE_MODEL_ROW_LATENCY_MS=str(row_latency_ms),
+        CF_INDEX_PATH=os.path.join(work_dir, "cf", "cooc.npz"),
+        TEXT_INDEX_DIR=os.path.join(work_dir, "text_index"),
+        ALS_MODEL_DIR=os.path.join(work_dir, "als"),
+        EMOTION_MODEL_DIR=os.path.join(work_dir, "model"),
+        MODEL_WATCH_SECONDS="0",
+        TRENDING_REFRESH_SECONDS="0",
+    )
+    from fastapi.testclient import TestClient
+    from backend.app import app
+    from backend.config import settings
+    from backend.db.connection import SessionLocal, init_db
+    from backend.db.models import Emotion, Movie
+
+    rng = np.random.default_rng(seed)
+    labels = settings.EMOTION_CATEGORIES
+    genres = ["Action", "Drama", "Comedy", "Romance", "Family", "Thriller", "Horror", "Animation"]
+    vocabulary = [f"kelime{i}" for i in range(2000)]
+    init_db()
+    db = SessionLocal()
+    db.bulk_insert_mappings(Movie, [
+        {
+            "title": f"Film {i}",
+            "overview": " ".join(rng.choice(vocabulary, size=30)),
+            "vote_average": float(rng.random() * 10),
+            "popularity": float(rng.random() * 100),
+            "genre": ", ".join(rng.choice(genres, size=2, replace=False)),
+        }
+        for i in range(n_movies)
+    ])
+    # Filmlerin yarısı etiketli (gerisi istek anında tahmin edilir)
+    db.bulk_insert_mappings(Emotion, [
+        {"movie_id": movie_id, "emotion_label": label}
+        for movie_id in range(1, n_movies // 2 + 1)
+        for label in rng.choice(labels, size=2, replace=False)
+    ])
+    db.commit()
+    db.close()
+
+    payloads = [
+        {"selected_emotions": list(rng.choice(labels, size=int(rng.integers(1, 3)), replace=False)),
+         "max_recommendations": 20}
+        for _ in range(requests)
+    ]
+    print(f"🎬 /by-emotions yük testi: film={n_movies}, istek={requests}, eşzamanlılık={concurrency}, "
+          f"sahte motor {latency_ms} ms + {row_latency_ms} ms/satır")
+    try:
+        with TestClient(app) as client:
+            def call(payload) -> float:
+                start = time.perf_counter()
+                response = client.post("/recommendation/by-emotions", json=payload)
+                response.raise_for_status()
+                return (time.perf_counter() - start) * 1000
+
+            call(payloads[0])  # ısınma
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                timings = list(pool.map(call, payloads))
+            elapsed = time.perf_counter() - start
+        _report("POST /by-emotions", timings)
+        print(f"   throughput: {requests / elapsed:.1f} istek/sn")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _process_rss_mb(pid: Optional[int] = None) -> float:
+    """Sürecin RSS'i (MB, Linux /proc); okunamazsa 0."""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def _inference_worker(duration: float, batch_size: int, seed: int):
+    """Tek bir API worker'ını taklit eder: servisi kurar, süre boyunca toplu tahmin yapar."""
+    from backend.services.recommender_service import get_recommender_service
+
+    service = get_recommender_service()
+    if not service.is_ready():
+        return 0, _process_rss_mb(), 0.0
+    rng = np.random.default_rng(seed)
+    vocabulary = [f"kelime{i}" for i in range(2000)]
+    texts = [" ".join(rng.choice(vocabulary, size=40)) for _ in range(batch_size * 8)]
+    rows = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        offset = (rows // batch_size) % 8 * batch_size
+        service.predict_proba_batch(texts[offset:offset + batch_size])
+        rows += batch_size
+    return rows, _process_rss_mb(), time.perf_counter() - start
+
+
+def benchmark_inference_server(worker_counts: List[int], model_dir: str, duration: float, batch_size: int) -> None:
+    """
+    N API worker'ının (ayrı süreçler) bellek ve tahmin verimini iki düzende ölçer:
+    her worker kendi model kopyasıyla (local) ve tek çıkarım sunucusu üzerinden (remote).
+    """
+    import multiprocessing
+    import subprocess
+    import tempfile
+
+    socket_path = os.path.join(tempfile.mkdtemp(prefix="inference_bench_"), "inference.sock")
+    os.environ.update(EMOTION_MODEL_DIR=model_dir, MODEL_WATCH_SECONDS="0")
+    context = multiprocessing.get_context("spawn")
+    print(f"🧠 Çıkarım sunucusu benchmark: {model_dir}, {duration:.0f} sn, batch={batch_size}")
+    print(f"   {'düzen':8} {'worker':>6} {'worker RSS':>11} {'sunucu RSS':>11} {'toplam RSS':>11} {'satır/sn':>10}")
+
+    for mode in ("local", "remote"):
+        server = None
+        server_rss = 0.0
+        os.environ["INFERENCE_SERVER_SOCKET"] = socket_path if mode == "remote" else ""
+        if mode == "remote":
+            server = subprocess.Popen(
+                [sys.executable, "-m", "backend.services.inference_server", "--socket", socket_path],
+                cwd=project_root, env={**os.environ, "INFERENCE_SERVER_SOCKET": ""},
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            deadline = time.time() + 300
+            while not os.path.exists(socket_path):
+                if server.poll() is not None or time.time() > deadline:
+                    print("   ❌ Çıkarım sunucusu başlatılamadı")
+                    return
+                time.sleep(0.1)
+        try:
+            for workers in worker_counts:
+                with context.Pool(workers) as pool:
+                    results = pool.starmap(_inference_worker, [(duration, batch_size, seed) for seed in range(workers)])
+                if server is not None:
+                    server_rss = _process_rss_mb(server.pid)
+                rows = sum(r[0] for r in results)
+                if rows == 0:
+                    print(f"   ❌ {mode}: model yüklenemedi")
+                    break
+                worker_rss = sum(r[1] for r in results)
+                elapsed = max(r[2] for r in results)
+                print(f"   {mode:8} {workers:>6} {worker_rss:>9.0f}MB {server_rss:>9.0f}MB "
+                      f"{worker_rss + server_rss:>9.0f}MB {rows / elapsed:>10.0f}")
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+    os.environ.pop("INFERENCE_SERVER_SOCKET", None)
+
+
+def _preload_worker(duration: float, batch_size: int, seed: int):
+    """_inference_worker + çalışma sonundaki bellek özeti (RSS/PSS/USS)."""
+    from backend.services.model_preload import read_memory_rollup
+
+    rows, _, elapsed = _inference_worker(duration, batch_size, seed)
+    return rows, read_memory_rollup(), elapsed
+
+
+def benchmark_preload(workers: int, model_dir: str, duration: float, batch_size: int) -> None:
+    """
+    N worker'ın tahmin yükü altındaki belleğini üç düzende ölçer: her worker
+    kendi kopyasını yükler (spawn), modeller master'da yüklenip fork edilir
+    (fork) ve fork öncesi gc.freeze() de çağrılır (fork+freeze; gunicorn.conf.py).
+    Toplam PSS, paylaşılan sayfaları süreçlere bölerek gerçek bellek kullanımını verir.
+    """
+    import gc
+    import multiprocessing
+
+    os.environ.update(EMOTION_MODEL_DIR=model_dir, MODEL_WATCH_SECONDS="0", INFERENCE_SERVER_SOCKET="")
+    from backend.config import settings
+    # fork düzenlerinde modeller bu süreçte yüklenir (ayarlar zaten import edilmiş olabilir)
+    settings.EMOTION_MODEL_DIR = model_dir
+    settings.MODEL_WATCH_SECONDS = 0
+    settings.INFERENCE_SERVER_SOCKET = ""
+    from backend.services.model_preload import preload_models, read_memory_rollup
+
+    print(f"🧊 Fork öncesi yükleme benchmark: {model_dir}, {workers} worker, {duration:.0f} sn, batch={batch_size}")
+    print(f"   {'düzen':12} {'worker RSS':>11} {'worker PSS':>11} {'worker USS':>11} {'toplam PSS':>11} {'satır/sn':>10}")
+
+    for mode in ("spawn", "fork", "fork+freeze"):
+        if mode == "fork":
+            if not preload_models(freeze=False):
+                print("   ❌ Model yüklenemedi")
+                return
+        elif mode == "fork+freeze":
+            gc.collect()
+            gc.freeze()
+        context = multiprocessing.get_context("spawn" if mode == "spawn" else "fork")
+        with context.Pool(workers) as pool:
+            results = pool.starmap(_preload_worker, [(duration, batch_size, seed) for seed in range(workers)])
+            master = read_memory_rollup() if mode != "spawn" else {}
+        rows = sum(r[0] for r in results)
+        if rows == 0 or not results[0][1]:
+            print(f"   ❌ {mode}: model yüklenemedi veya smaps_rollup okunamadı")
+            return
+        memory = [r[1] for r in results]
+        elapsed = max(r[2] for r in results)
+        total_pss = sum(m["pss"] for m in memory) + master.get("pss", 0.0)
+        print(f"   {mode:12} {np.mean([m['rss'] for m in memory]):>9.0f}MB {np.mean([m['pss'] for m in memory]):>9.0f}MB "
+              f"{np.mean([m['uss'] for m in memory]):>9.0f}MB {total_pss:>9.0f}MB {rows / elapsed:>10.0f}")
+    gc.unfreeze()
+
+
+def _iter_call(fn: Callable, args_iterable, **kwargs) -> Callable[[], object]:
+    """Her çağrıda args_iterable'dan sıradaki argümanla fn'i çağıran kapanış döndürür."""
+    iterator = iter(args_iterable)
+    return lambda: fn(int(next(iterator)), **kwargs)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Öneri hattı bileşenleri için çevrimdışı benchmark")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    mmr_parser = subparsers.add_parser("mmr", help="MMR yeniden sıralama")
+    mmr_parser.add_argument('--pool', type=int, default=10000, help='Aday havuzu büyüklüğü (varsayılan: 10000)')
+    mmr_parser.add_argument('--k', type=int, nargs='+', default=[10, 30, 100], help='Seçilecek film sayıları')
+    mmr_parser.add_argument('--lambda', dest='lambda_', type=float, default=0.7, help='MMR λ değeri')
+    mmr_parser.add_argument('--repeat', type=int, default=20, help='Tekrar sayısı')
+    mmr_parser.add_argument('--seed', type=int, default=42, help='Rastgele tohum')
+
+    knn_parser = subparsers.add_parser("knn", help="Benzer filmler k-NN indeksi")
+    knn_parser.add_argument('--catalog', type=int, default=50000, help='Katalog büyüklüğü (varsayılan: 50000)')
+    knn_parser.add_argument('--k', type=int, default=10, help='Komşu sayısı')
+    knn_parser.add_argument('--repeat', type=int, default=200, help='Tekrar sayısı')
+    knn_parser.add_argument('--seed', type=int, default=42, help='Rastgele tohum')
+
+    lsh_parser = subparsers.add_parser("lsh", help="Overview LSH yaklaşık en yakın komşu araması")
+    lsh_parser.add_argument('--catalog', type=int, default=100000, help='Katalog büyüklüğü (varsayılan: 100000)')
+    lsh_parser.add_argument('--dim', type=int, default=128, help='Vektör boyutu')
+    lsh_parser.add_argument('--k', type=int, default=10, help='Komşu sayısı')
+    lsh_parser.add_argument('--queries', type=int, default=200, help='Sorgu sayısı')
+    lsh_parser.add_argument('--seed', type=int, default=42, help='Rastgele tohum')
+
+    cf_parser = subparsers.add_parser("cf", help="Item-item işbirlikçi filtreleme")
+    cf_parser.add_argument('--catalog', type=int, nargs='+', default=[10000, 100000], help='Katalog büyüklükleri')
+    cf_parser.add_argument('--users', type=int, default=5000, help='Kullanıcı sayısı')
+    cf_parser.add_argument('--per-user', type=int, default=30, help='Kullanıcı başına etkileşim')
+    cf_parser.add_argument('--repeat', type=int, default=200, help='Tekrar sayısı')
+    cf_parser.add_argument('--seed', type=int, default=42, help='Rastgele tohum')
+
+    seen_parser = subparsers.add_parser("seen", help="Kullanıcı başına görüldü filtresi")
+    seen_parser.add_argument('--history', type=int, nargs='+', default=[100, 10000, 50000], help='Geçmiş büyüklükleri')
+    seen_parser.add_argument('--candidates', type=int, default=1000, help='Aday film sayısı')
+    seen_parser.add_argument('--repeat', type=int, default=200, help='Tekrar sayısı')
+    seen_parser.add_argument('--seed', type=int, default=42, help='Rastgele tohum')
+
+    trending_parser = subparsers.add_parser("trending", help="Trend listeleri (bellek içi SQLite)")
+    trending_parser.add_argument('--movies', type=int, default=10000, help='Film sayısı')
+    trending_parser.add_argument('--interactions', type=int, default=200000, help='Geçmiş kaydı sayısı')
+    trending_parser.add_argument('--repeat', type=int, default=200, help='Tekrar sayısı')
+    trending_parser.add_argument('--seed', type=int, default=42, help='Rastgele tohum')
+
+    by_emotions_parser = subparsers.add_parser("by-emotions", help="/by-emotions uçtan uca (sahte model, SQLite)")
+    by_emotions_parser.add_argument('--movies', type=int, default=5000, help='Film sayısı')
+    by_emotions_parser.add_argument('--requests', type=int, default=200, help='İstek sayısı')
+    by_emotions_parser.add_argument('--concurrency', type=int, default=4, help='Eşzamanlı istek sayısı')
+    by_emotions_parser.add_argument('--latency-ms', type=float, default=5.0, help='Sahte motor çağrı başına gecikme')
+    by_emotions_parser.add_argument('--row-latency-ms', type=float, default=0.05, help='Sahte motor satır başına gecikme')
+    by_emotions_parser.add_argument('--seed', type=int, default=42, help='Rastgele tohum')
+
+    server_parser = subparsers.add_parser("inference-server",
+                                          help="N API worker: kendi model kopyası vs tek çıkarım sunucusu")
+    server_parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8], help='Worker sayıları')
+    server_parser.add_argument('--model-dir', default=None, help='Model klasörü (varsayılan: EMOTION_MODEL_DIR)')
+    server_parser.add_argument('--duration', type=float, default=10.0, help='Worker başına ölçüm süresi (sn)')
+    server_parser.add_argument('--batch', type=int, default=32, help='İstek başına satır')
+
+    preload_parser = subparsers.add_parser("preload",
+                                           help="N worker belleği: kendi kopyası vs fork öncesi yükleme (+gc.freeze)")
+    preload_parser.add_argument('--workers', type=int, default=4, help='Worker sayısı')
+    preload_parser.add_argument('--model-dir', default=None, help='Model klasörü (varsayılan: EMOTION_MODEL_DIR)')
+    preload_parser.add_argument('--duration', type=float, default=10.0, help='Worker başına ölçüm süresi (sn)')
+    preload_parser.add_argument('--batch', type=int, default=32, help='İstek başına satır')
+
+    load_parser = subparsers.add_parser("model-load", help="Duygu modeli soğuk yükleme: klasör düzeni vs tek paket")
+    load_parser.add_argument('--model-dir', default=None, help='Model klasörü (varsayılan: EMOTION_MODEL_DIR)')
+    load_parser.add_argument('--repeat', type=int, default=5, help='Tekrar sayısı (her biri yeni süreç)')
+
+    args = parser.parse_args()
+
+    if args.command == "mmr":
+        benchmark_mmr(args.pool, args.k, args.lambda_, args.repeat, args.seed)
+    elif args.command == "knn":
+        benchmark_knn(args.catalog, args.k, args.repeat, args.seed)
+    elif args.command == "lsh":
+        benchmark_lsh(args.catalog, args.dim, args.k, args.queries, args.seed)
+    elif args.command == "cf":
+        benchmark_cf(args.catalog, args.users, args.per_user, args.repeat, args.seed)
+    elif args.command == "seen":
+        benchmark_seen(args.history, args.candidates, args.repeat, args.seed)
+    elif args.command == "trending":
+        benchmark_trending(args.movies, args.interactions, args.repeat, args.seed)
+    elif args.command == "by-emotions":
+        benchmark_by_emotions(args.movies, args.requests, args.concurrency, args.latency_ms,
+                              args.row_latency_ms, args.seed)
+    elif args.command == "inference-server":
+        from backend.config import settings
+        benchmark_inference_server(args.workers, os.path.abspath(args.model_dir or settings.EMOTION_MODEL_DIR),
+                                   args.duration, args.batch)
+    elif args.command == "preload":
+        from backend.config import settings
+        benchmark_preload(args.workers, os.path.abspath(args.model_dir or settings.EMOTION_MODEL_DIR),
+                          args.duration, args.batch)
+    elif args.command == "model-load":
+        from backend.config import settings
+        benchmark_model_load(os.path.abspath(args.model_dir or settings.EMOTION_MODEL_DIR), args.repeat)
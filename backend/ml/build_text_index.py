@@ -0,0 +1,135 @@
+"""
+Film özetlerini (overview) çevrimdışı olarak yoğun vektörlere kodlayan script.
+
+TF-IDF + TruncatedSVD (LSA) tamamen yerel eğitilir (ağ erişimi gerekmez).
+Vektörler float32 memmap olarak yazılır; API tarafında
+backend/services/text_index.py tarafından LSH ile aranır.
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+# Proje kök dizinini Python path'ine ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+project_root = os.path.dirname(backend_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.config import settings
+from backend.db.connection import get_db_session
+from backend.db.models import Movie
+from backend.services.text_index import LSA_FILE, META_FILE, MOVIE_IDS_FILE, VECTORS_FILE
+
+
+def build_text_index(output_dir: str, n_components: int = 128, max_features: int = 50000,
+                     chunk_size: int = 5000, evaluate: bool = True):
+    """
+    Veritabanındaki tüm overview'ları LSA ile kodlar ve indeksi output_dir'e yazar.
+
+    Args:
+        output_dir: İndeks klasörü
+        n_components: LSA boyutu
+        max_features: TF-IDF sözlük büyüklüğü
+        chunk_size: Kodlama/yazma parça büyüklüğü
+        evaluate: True ise LSH recall@10 değerini tam aramaya göre ölçer
+    """
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    import joblib
+
+    print("📥 Overview'lar veritabanından okunuyor...")
+    session = get_db_session()
+    try:
+        rows = (
+            session.query(Movie.movie_id, Movie.overview)
+            .filter(Movie.overview.isnot(None), Movie.overview != "", Movie.overview != " ")
+            .order_by(Movie.movie_id)
+            .yield_per(chunk_size)
+        )
+        movie_ids, overviews = [], []
+        for movie_id, overview in rows:
+            movie_ids.append(movie_id)
+            overviews.append(overview)
+    finally:
+        session.close()
+
+    n = len(overviews)
+    if n == 0:
+        print("❌ Kodlanacak film bulunamadı.")
+        return
+    print(f"✅ {n} film okundu.")
+
+    start = time.perf_counter()
+    vectorizer = TfidfVectorizer(
+        max_features=max_features,
+        ngram_range=(1, 2),
+        sublinear_tf=True,
+        min_df=2,
+        stop_words="english",
+        dtype=np.float32,
+    )
+    try:
+        tfidf = vectorizer.fit_transform(overviews)
+    except ValueError as e:
+        # min_df=2 ve stop word'ler sonrası hiç terim kalmazsa TfidfVectorizer hata verir
+        print(f"❌ TF-IDF sözlüğü oluşturulamadı ({n} film): {e}")
+        return
+    # TruncatedSVD en az 1, en fazla min(terim, film) - 1 bileşen kabul eder
+    n_components = min(n_components, tfidf.shape[1] - 1, n - 1)
+    if n_components < 1:
+        print(f"❌ LSA için katalog çok küçük: {n} film, {tfidf.shape[1]} terim "
+              f"(en az 2 film ve 2 terim gerekli)")
+        return
+    svd = TruncatedSVD(n_components=n_components, random_state=42)
+    svd.fit(tfidf)
+    print(f"🧠 LSA eğitildi: {tfidf.shape[1]} terim → {n_components} boyut "
+          f"(açıklanan varyans: {svd.explained_variance_ratio_.sum():.2%}, {time.perf_counter() - start:.1f} sn)")
+
+    os.makedirs(output_dir, exist_ok=True)
+    vectors = np.memmap(os.path.join(output_dir, VECTORS_FILE), dtype=np.float32, mode="w+",
+                        shape=(n, n_components))
+    for begin in range(0, n, chunk_size):
+        block = svd.transform(tfidf[begin:begin + chunk_size]).astype(np.float32)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors[begin:begin + chunk_size] = block / norms
+    vectors.flush()
+    del vectors
+
+    np.save(os.path.join(output_dir, MOVIE_IDS_FILE), np.asarray(movie_ids, dtype=np.int64))
+    joblib.dump({"vectorizer": vectorizer, "svd": svd}, os.path.join(output_dir, LSA_FILE))
+    with open(os.path.join(output_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "n": n,
+            "dim": n_components,
+            "max_features": max_features,
+            "lsh_seed": 42,
+            "built_at": datetime.utcnow().isoformat(),
+        }, f, indent=2)
+    print(f"💾 İndeks yazıldı: {output_dir} ({n * n_components * 4 / 1024 / 1024:.1f} MB vektör)")
+
+    if evaluate:
+        from backend.services.text_index import TextEmbeddingIndex
+
+        report = TextEmbeddingIndex.load(output_dir).evaluate_recall(k=10)
+        print(f"📏 LSH recall@10: {report['recall_at_k']:.3f} | "
+              f"yaklaşık: {report['approx_ms']:.2f} ms | tam: {report['exact_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Film özetleri için LSA vektör indeksini oluştur")
+    parser.add_argument('--output', default=settings.TEXT_INDEX_DIR, help='İndeks klasörü')
+    parser.add_argument('--components', type=int, default=128, help='LSA boyutu (varsayılan: 128)')
+    parser.add_argument('--max-features', type=int, default=50000, help='TF-IDF sözlük büyüklüğü')
+    parser.add_argument('--no-eval', action='store_true', help='Recall ölçümünü atla')
+    args = parser.parse_args()
+
+    build_text_index(args.output, n_components=args.components, max_features=args.max_features,
+                     evaluate=not args.no_eval)
@@ -1,9 +1,21 @@
-"""Hugging Face'den movies dataset'ini indirir ve veritabanına ekler"""
+"""
+Film dataset'ini (Hugging Face veya yerel CSV/Parquet) veritabanına ekler.
+
+Desteklenen kaynak düzenleri:
+    hf   : Hugging Face "Pablinho/movies-dataset" kolonları (Title, Release_Date, ...)
+    imdb : Repodaki imdb_top_1000.csv kolonları (Series_Title, Released_Year, ...)
+
+Tüm dönüşümler sütun bazında (vektörel) yapılır; tekrar kontrolü
+movies(title, release_date) üzerindeki unique index ile veritabanına bırakılır
+(``INSERT ... ON CONFLICT DO NOTHING``, büyük batch'ler halinde; PostgreSQL'de
+istenirse COPY ile).
+"""
 
 import sys
 import os
+import io
+import time
 import pandas as pd
-from datetime import datetime, date
 from typing import Optional
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -13,174 +25,243 @@ try:
     DATASETS_AVAILABLE = True
 except ImportError:
     DATASETS_AVAILABLE = False
-    print("⚠️  'datasets' kütüphanesi yüklü değil. Yüklemek için: pip install datasets")
 
-from backend.db.connection import get_db_session
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from backend.db.connection import engine, get_db_session
 from backend.db.models import Movie
 
+MOVIE_COLUMNS = [
+    'title', 'release_date', 'overview', 'popularity', 'vote_count',
+    'vote_average', 'original_language', 'genre', 'poster_url',
+]
+
+# Kaynak kolonu → veritabanı kolonu
+SOURCE_LAYOUTS = {
+    'hf': {
+        'Title': 'title',
+        'Release_Date': 'release_date',
+        'Overview': 'overview',
+        'Popularity': 'popularity',
+        'Vote_Count': 'vote_count',
+        'Vote_Average': 'vote_average',
+        'Original_Language': 'original_language',
+        'Genre': 'genre',
+        'Poster_Url': 'poster_url',
+    },
+    'imdb': {
+        'Series_Title': 'title',
+        'Released_Year': 'release_date',
+        'Overview': 'overview',
+        'No_of_Votes': 'vote_count',
+        'IMDB_Rating': 'vote_average',
+        'Genre': 'genre',
+        'Poster_Link': 'poster_url',
+    },
+}
+
 
 def download_dataset() -> pd.DataFrame:
     """Hugging Face'den dataset'i indirir"""
     if not DATASETS_AVAILABLE:
         raise ImportError("'datasets' kütüphanesi gerekli. pip install datasets")
-    
+
     print("📥 Hugging Face'den dataset indiriliyor...")
     dataset = load_dataset("Pablinho/movies-dataset")
-    
+
     # DataFrame'e çevir
     df = dataset['train'].to_pandas()
-    
+
     print(f"✅ {len(df)} film indirildi")
     print(f"📊 Kolonlar: {df.columns.tolist()}")
-    
+
     return df
 
 
-def parse_release_date(date_str) -> Optional[date]:
+def read_local_dataset(path: str) -> pd.DataFrame:
+    """Yerel CSV veya Parquet dosyasını okur (ağ erişimi gerekmez)."""
+    print(f"📂 Yerel dosya okunuyor: {path}")
+    if path.lower().endswith(('.parquet', '.pq')):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    print(f"✅ {len(df)} satır okundu")
+    print(f"📊 Kolonlar: {df.columns.tolist()}")
+    return df
+
+
+def detect_layout(df: pd.DataFrame) -> str:
+    """Kolon isimlerinden kaynak düzenini (hf / imdb) belirler."""
+    for name, mapping in SOURCE_LAYOUTS.items():
+        if 'Overview' in df.columns and next(iter(mapping)) in df.columns:
+            return name
+    raise ValueError(f"Tanınmayan dataset kolonları: {df.columns.tolist()}")
+
+
+def parse_release_dates(values: pd.Series) -> pd.Series:
     """
-    Release date string'ini date objesine dönüştürür.
-    Modelde Date tipinde olduğu için date objesi döndürmeliyiz.
+    Release date değerlerini sütun bazında date objelerine dönüştürür.
+
+    Sırasıyla YYYY-MM-DD, YYYY-MM (ayın ilk günü) ve sadece yıl (1900-2100,
+    yılın ilk günü) denenir; geçersiz değerler None olur.
     """
-    if pd.isna(date_str) or date_str == '' or str(date_str).strip() == '':
-        return None
-    
-    date_str = str(date_str).strip()
-    
-    # Geçersiz formatları filtrele (çok kısa, sayısal değerler, özel karakterler)
-    if len(date_str) < 4:
-        return None
-    
-    # Sadece sayı içeren ve mantıksız değerleri filtrele (örn: "61.328", " - Magic Tricks")
-    if not any(c.isdigit() for c in date_str[:4]):
-        return None
-    
-    # YYYY-MM-DD formatını dene
-    try:
-        return datetime.strptime(date_str, '%Y-%m-%d').date()
-    except ValueError:
-        pass
-    
-    # YYYY-MM formatını dene (ayın ilk günü olarak)
-    try:
-        return datetime.strptime(date_str, '%Y-%m').date()
-    except ValueError:
-        pass
-    
-    # Sadece yıl (YYYY) formatını dene
-    if date_str.isdigit() and len(date_str) == 4:
-        try:
-            year = int(date_str)
-            if 1900 <= year <= 2100:  # Mantıklı yıl aralığı
-                return date(year, 1, 1)  # Yılın ilk günü
-        except (ValueError, OverflowError):
-            pass
-    
-    # Geçersiz format
-    return None
-
-
-def clean_and_transform_data(df: pd.DataFrame) -> pd.DataFrame:
-    """Dataset'i veritabanı formatına dönüştürür (tam eşleşme)"""
+    text = values.astype('string').str.strip()
+    parsed = pd.to_datetime(text, format='%Y-%m-%d', errors='coerce')
+    parsed = parsed.fillna(pd.to_datetime(text, format='%Y-%m', errors='coerce'))
+
+    is_year = text.str.fullmatch(r'\d{4}').fillna(False).astype(bool)
+    years = pd.to_numeric(text.where(is_year), errors='coerce')
+    years = years.where(years.between(1900, 2100))
+    parsed = parsed.fillna(pd.to_datetime(years, format='%Y', errors='coerce'))
+
+    return parsed.dt.date.astype(object).where(parsed.notna(), None)
+
+
+def clean_and_transform_data(df: pd.DataFrame, layout: Optional[str] = None) -> pd.DataFrame:
+    """Dataset'i veritabanı formatına dönüştürür (tüm işlemler vektörel)"""
     print("\n🔄 Veri temizleniyor ve dönüştürülüyor...")
-    
-    # Dataset kolonları → Veritabanı kolonları (tam eşleşme)
-    df_clean = pd.DataFrame()
-    
-    # Direkt mapping (kolon isimleri küçük harf, underscore)
-    df_clean['title'] = df['Title'].fillna('Unknown')
-    
-    # Release_Date'i date objesine dönüştür (model Date tipinde)
-    df_clean['release_date'] = df['Release_Date'].apply(parse_release_date)
-    
-    df_clean['overview'] = df['Overview'].fillna('')
-    df_clean['popularity'] = pd.to_numeric(df['Popularity'], errors='coerce')
-    df_clean['vote_count'] = pd.to_numeric(df['Vote_Count'], errors='coerce')
-    df_clean['vote_average'] = pd.to_numeric(df['Vote_Average'], errors='coerce')
-    df_clean['original_language'] = df['Original_Language'].fillna('en')
-    df_clean['genre'] = df['Genre'].fillna('')
-    df_clean['poster_url'] = df['Poster_Url'].fillna('')
-    
-    # Overview boş olanları filtrele
-    df_clean = df_clean[df_clean['overview'].str.strip() != '']
-    
-    # Title boş olanları filtrele
-    df_clean = df_clean[df_clean['title'].str.strip() != '']
-    
+
+    layout = layout or detect_layout(df)
+    mapping = SOURCE_LAYOUTS[layout]
+    print(f"🧭 Kaynak düzeni: {layout}")
+
+    df_clean = df[[c for c in mapping if c in df.columns]].rename(columns=mapping)
+    for column in MOVIE_COLUMNS:
+        if column not in df_clean.columns:
+            df_clean[column] = None
+
+    df_clean['title'] = df_clean['title'].fillna('Unknown').astype(str).str.strip()
+    df_clean['release_date'] = parse_release_dates(df_clean['release_date'])
+    df_clean['overview'] = df_clean['overview'].fillna('').astype(str)
+    for column in ('popularity', 'vote_average'):
+        df_clean[column] = pd.to_numeric(df_clean[column], errors='coerce')
+    df_clean['vote_count'] = pd.to_numeric(
+        df_clean['vote_count'].astype('string').str.replace(',', '', regex=False), errors='coerce'
+    ).round().astype('Int64')
+    df_clean['original_language'] = df_clean['original_language'].fillna('en')
+    for column in ('genre', 'poster_url'):
+        stripped = df_clean[column].astype('string').str.strip()
+        df_clean[column] = stripped.where(stripped != '')
+
+    # Overview / title boş olanları filtrele
+    df_clean = df_clean[(df_clean['overview'].str.strip() != '') & (df_clean['title'] != '')]
+
+    # Aynı dosya içindeki tekrarlar (NULL tarihler dahil) burada elenir
+    before = len(df_clean)
+    df_clean = df_clean.drop_duplicates(subset=['title', 'release_date'])
+    if before != len(df_clean):
+        print(f"⚠️  Dosya içinde {before - len(df_clean)} tekrar eden film elendi")
+
     # Geçersiz release_date sayısını göster
     invalid_dates = df_clean['release_date'].isna().sum()
     if invalid_dates > 0:
         print(f"⚠️  {invalid_dates} film için geçersiz release_date (None olarak ayarlandı)")
-    
+
     print(f"✅ {len(df_clean)} film temizlendi (overview/title boş olanlar filtrelendi)")
-    print(f"📊 Kolonlar: {df_clean.columns.tolist()}")
-    
-    return df_clean
 
+    return df_clean[MOVIE_COLUMNS]
+
+
+def ensure_unique_index() -> None:
+    """movies(title, release_date) unique index'ini (yoksa) oluşturur."""
+    for index in Movie.__table__.indexes:
+        if index.name == 'uq_movies_title_release_date':
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except SQLAlchemyError as e:
+                print(f"⚠️  Unique index oluşturulamadı (mevcut tekrar eden kayıtlar olabilir): {e}")
+
+
+def _insert_statement(dialect_name: str):
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(Movie).on_conflict_do_nothing()
 
-def import_to_database(df: pd.DataFrame, clear_existing: bool = False):
-    """Veritabanına filmleri ekler"""
+
+def _copy_postgres(session, df: pd.DataFrame) -> None:
+    """PostgreSQL: COPY ile geçici tabloya yükler, oradan ON CONFLICT DO NOTHING ile aktarır."""
+    columns = ', '.join(MOVIE_COLUMNS)
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.execute(
+            "CREATE TEMP TABLE movies_import (LIKE movies INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        cursor.copy_expert(f"COPY movies_import ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.execute(
+            f"INSERT INTO movies ({columns}, created_at) "
+            f"SELECT {columns}, now() FROM movies_import ON CONFLICT DO NOTHING"
+        )
+    finally:
+        cursor.close()
+
+
+def import_to_database(df: pd.DataFrame, clear_existing: bool = False, batch_size: int = 10000,
+                       use_copy: bool = False):
+    """
+    Veritabanına filmleri ekler.
+
+    Satırlar batch_size'lık gruplar halinde tek bir executemany
+    ``INSERT ... ON CONFLICT DO NOTHING`` ile yazılır; aynı (title, release_date)
+    zaten varsa veritabanı satırı atlar. use_copy=True ise (sadece PostgreSQL)
+    tüm veri COPY ile aktarılır.
+    """
+    ensure_unique_index()
     session = get_db_session()
-    
+
     try:
         if clear_existing:
             print("\n🗑️  Mevcut filmler siliniyor...")
             deleted = session.query(Movie).delete()
             session.commit()
             print(f"✅ {deleted} film silindi")
-        
-        print(f"\n💾 {len(df)} film veritabanına ekleniyor...")
-        
-        added_count = 0
-        skipped_count = 0
-        
-        for idx, row in df.iterrows():
-            try:
-                # Aynı başlık ve release_date varsa atla (duplicate kontrolü)
-                existing = session.query(Movie).filter(
-                    Movie.title == row['title'],
-                    Movie.release_date == row['release_date']
-                ).first()
-                
-                if existing:
-                    skipped_count += 1
-                    continue
-                
-                # Movie objesi oluştur (dataset kolonları ile tam eşleşme)
-                # release_date zaten date objesi veya None (parse_release_date'den geliyor)
-                movie = Movie(
-                    title=row['title'],
-                    release_date=row['release_date'],  # Zaten date objesi veya None
-                    overview=row['overview'],
-                    popularity=float(row['popularity']) if pd.notna(row['popularity']) else None,
-                    vote_count=int(row['vote_count']) if pd.notna(row['vote_count']) else None,
-                    vote_average=float(row['vote_average']) if pd.notna(row['vote_average']) else None,
-                    original_language=row['original_language'] if pd.notna(row['original_language']) else 'en',
-                    genre=row['genre'] if pd.notna(row['genre']) and str(row['genre']).strip() != '' else None,
-                    poster_url=row['poster_url'] if pd.notna(row['poster_url']) and str(row['poster_url']).strip() != '' else None,
-                )
-                
-                session.add(movie)
-                added_count += 1
-                
-                if (added_count + skipped_count) % 500 == 0:
-                    print(f"  İşleniyor: {added_count + skipped_count}/{len(df)}")
-                    session.commit()  # Her 500'de bir commit
-                    
-            except Exception as e:
-                print(f"⚠️  Hata (satır {idx}): {e}")
-                session.rollback()
-                skipped_count += 1
-                continue
-        
+
+        total_rows = len(df)
+        print(f"\n💾 {total_rows} film veritabanına ekleniyor...")
+        start = time.perf_counter()
+        before_count = session.query(Movie).count()
+
+        # Unique index NULL tarihleri birbirinden farklı sayar; bunlar başlık üzerinden elenir
+        undated = df['release_date'].isna()
+        if undated.any():
+            existing_titles = {
+                title for (title,) in session.query(Movie.title).filter(Movie.release_date.is_(None))
+            }
+            df = df[~(undated & df['title'].isin(existing_titles))]
+
+        dialect_name = session.bind.dialect.name
+        if use_copy and dialect_name == 'postgresql':
+            _copy_postgres(session, df)
+        else:
+            if use_copy:
+                print(f"ℹ️  COPY sadece PostgreSQL'de desteklenir ({dialect_name}); batch INSERT kullanılıyor")
+            stmt = _insert_statement(dialect_name)
+            if stmt is None:
+                stmt = insert(Movie).prefix_with('IGNORE')
+            # NaN/NA → None (executemany parametreleri)
+            records = df.astype(object).where(df.notna(), None).to_dict('records')
+            for offset in range(0, len(records), batch_size):
+                session.execute(stmt, records[offset:offset + batch_size])
+                print(f"  İşleniyor: {min(offset + batch_size, len(records))}/{len(records)}")
+
         session.commit()
-        
-        print(f"\n✅ {added_count} yeni film eklendi")
-        print(f"⏭️  {skipped_count} film atlandı (duplicate veya hata)")
-        
+        elapsed = time.perf_counter() - start
+
         # İstatistikler
         total_movies = session.query(Movie).count()
+        added_count = total_movies - before_count
+        print(f"\n✅ {added_count} yeni film eklendi ({elapsed:.2f} sn, {total_rows / max(elapsed, 1e-9):.0f} satır/sn)")
+        print(f"⏭️  {total_rows - added_count} film atlandı (duplicate)")
         print(f"\n📊 Toplam film sayısı: {total_movies}")
-        
+
     except Exception as e:
         session.rollback()
         print(f"❌ Hata: {e}")
@@ -189,21 +270,22 @@ def import_to_database(df: pd.DataFrame, clear_existing: bool = False):
         session.close()
 
 
-def main(clear_existing: bool = False):
+def main(clear_existing: bool = False, source: str = 'hf', layout: Optional[str] = None,
+         batch_size: int = 10000, use_copy: bool = False):
     """Ana fonksiyon"""
     print("="*60)
     print("🎬 Movies Dataset Import")
     print("="*60)
-    
-    # 1. Dataset'i indir
-    df = download_dataset()
-    
+
+    # 1. Dataset'i indir veya yerel dosyadan oku
+    df = download_dataset() if source == 'hf' else read_local_dataset(source)
+
     # 2. Veriyi temizle ve dönüştür
-    df_clean = clean_and_transform_data(df)
-    
+    df_clean = clean_and_transform_data(df, layout)
+
     # 3. Veritabanına ekle
-    import_to_database(df_clean, clear_existing=clear_existing)
-    
+    import_to_database(df_clean, clear_existing=clear_existing, batch_size=batch_size, use_copy=use_copy)
+
     print("\n" + "="*60)
     print("✅ İşlem tamamlandı!")
     print("="*60)
@@ -211,9 +293,15 @@ def main(clear_existing: bool = False):
 
 if __name__ == "__main__":
     import argparse
-    parser = argparse.ArgumentParser(description="Hugging Face movies dataset'ini indir ve veritabanına ekle")
+    parser = argparse.ArgumentParser(description="Movies dataset'ini (Hugging Face veya yerel dosya) veritabanına ekle")
     parser.add_argument('--clear', action='store_true', help='Mevcut filmleri sil')
+    parser.add_argument('--source', default='hf',
+                        help="'hf' (Hugging Face) veya yerel CSV/Parquet yolu (örn. imdb_top_1000.csv)")
+    parser.add_argument('--layout', choices=sorted(SOURCE_LAYOUTS), default=None,
+                        help='Kolon düzeni (varsayılan: kolonlardan otomatik)')
+    parser.add_argument('--batch-size', type=int, default=10000, help='INSERT batch boyutu')
+    parser.add_argument('--copy', action='store_true', help='PostgreSQL COPY ile yükle')
     args = parser.parse_args()
-    
-    main(clear_existing=args.clear)
 
+    main(clear_existing=args.clear, source=args.source, layout=args.layout,
+         batch_size=args.batch_size, use_copy=args.copy)
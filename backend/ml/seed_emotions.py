@@ -1,11 +1,32 @@
 """
 Film verilerine AutoGluon modeli kullanarak ÇOKLU duygu etiketleri atayan script.
 Eğitilmiş AutoGluon modelini kullanarak film özetlerinden duygu tahmini yapar.
+
+Akış (streaming):
+    1. Etiketi olmayan filmler tek bir anti-join sorgusuyla, movie_id sırasına
+       göre sayfa sayfa okunur (film başına sorgu yok).
+    2. Her sayfa toplu (batch) tahmin edilir; --workers > 1 ise sayfa alt
+       parçalara bölünüp süreç havuzuna dağıtılır.
+    3. Etiketler tek bir executemany INSERT ile yazılır ve sayfa commit edilir.
+    4. Her commit'ten sonra son movie_id checkpoint dosyasına yazılır; yarıda
+       kalan bir çalıştırma aynı komutla kaldığı yerden devam eder.
+    5. Tamamlanan çalıştırma checkpoint'i silmez, "completed" olarak işaretler:
+       son movie_id sonraki çalıştırmaların filigranıdır. Böylece hiç etiket
+       çıkmayan (emotions satırı olmayan) filmler her çalıştırmada yeniden
+       tahmin edilmez; sadece filigrandan sonra eklenen filmler işlenir
+       (--clear veya --restart filigranı sıfırlar).
 """
 
 import sys
 import os
-from typing import List, Optional
+import json
+import time
+import multiprocessing
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import exists, insert
 
 # Proje kök dizinini Python path'ine ekle
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,145 +38,282 @@ if project_root not in sys.path:
 from backend.db.connection import get_db_session
 from backend.db.models import Movie, Emotion
 from backend.config import settings
-from backend.services.recommender_service import get_recommender_service
+from backend.services.recommender_service import get_recommender_service, resolve_thresholds
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(current_dir, "model", "seed_emotions.checkpoint.json")
+
+
+# =====================================================
+# Checkpoint
+# =====================================================
+
+def load_checkpoint(path: str) -> Optional[Dict]:
+    """Yarıda kalmış bir çalıştırmanın checkpoint'ini okur (yoksa None)."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, state: Dict) -> None:
+    """Checkpoint'i atomik olarak yazar (yarım yazılmış dosya kalmaz)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# =====================================================
+# Tahmin (ana süreçte veya worker süreçlerinde)
+# =====================================================
+
+_worker_recommender = None
+
+
+def _init_worker() -> None:
+    """Her worker süreci modelleri bir kez yükler."""
+    global _worker_recommender
+    _worker_recommender = get_recommender_service()
+
+
+def label_batch(
+    recommender,
+    batch: List[Tuple[int, str]],
+    auto_threshold: bool,
+    threshold: float,
+) -> List[Tuple[int, List[str]]]:
+    """
+    (movie_id, overview) listesini toplu tahmin edip (movie_id, [duygular]) döndürür.
+    """
+    if not batch:
+        return []
+    # Yüklenemeyen predictor'ların sütunları hep 0: otomatik eşiği bozmasınlar
+    loaded = set(recommender.loaded_labels)
+    labels = [label for label in recommender.target_labels if label in loaded]
+    columns = [j for j, label in enumerate(recommender.target_labels) if label in loaded]
+    probs = recommender.predict_proba_batch([overview for _, overview in batch])[:, columns]
+    thresholds = resolve_thresholds(probs, auto_threshold, None if auto_threshold else threshold)
+    selected = probs >= thresholds[:, None]
+    return [
+        (movie_id, [labels[j] for j in np.flatnonzero(selected[i])])
+        for i, (movie_id, _) in enumerate(batch)
+    ]
+
+
+def _label_batch_in_worker(args) -> List[Tuple[int, List[str]]]:
+    batch, auto_threshold, threshold = args
+    return label_batch(_worker_recommender, batch, auto_threshold, threshold)
+
 
+# =====================================================
+# Veritabanı
+# =====================================================
 
-def seed_emotions(clear_existing: bool = False, threshold: float = 0.3, auto_threshold: bool = True):
+def fetch_unlabeled_page(session, after_movie_id: int, page_size: int) -> List[Tuple[int, str]]:
+    """
+    Overview'u olan ve hiç duygu etiketi bulunmayan filmlerden movie_id > after_movie_id
+    olan ilk sayfayı döndürür (NOT EXISTS anti-join + keyset sayfalama).
+    """
+    rows = (
+        session.query(Movie.movie_id, Movie.overview)
+        .filter(
+            Movie.movie_id > after_movie_id,
+            Movie.overview.isnot(None),
+            Movie.overview != "",
+            Movie.overview != " ",
+            ~exists().where(Emotion.movie_id == Movie.movie_id),
+        )
+        .order_by(Movie.movie_id)
+        .limit(page_size)
+        .yield_per(page_size)
+    )
+    return [(movie_id, overview) for movie_id, overview in rows]
+
+
+def insert_labels(session, labeled: List[Tuple[int, List[str]]]) -> int:
+    """Etiketleri tek bir executemany INSERT ile yazar; eklenen satır sayısını döndürür."""
+    rows = [
+        {"movie_id": movie_id, "emotion_label": emotion}
+        for movie_id, emotions in labeled
+        for emotion in emotions
+    ]
+    if rows:
+        session.execute(insert(Emotion), rows)
+    return len(rows)
+
+
+# =====================================================
+# Ana Akış
+# =====================================================
+
+def seed_emotions(
+    clear_existing: bool = False,
+    threshold: float = 0.3,
+    auto_threshold: bool = True,
+    batch_size: int = 256,
+    workers: int = 1,
+    checkpoint_path: str = DEFAULT_CHECKPOINT_PATH,
+):
     """
     Eğitilmiş AutoGluon modelini kullanarak veritabanındaki filmlere duygu etiketleri atar.
-    
+
     Args:
         clear_existing: True ise mevcut duygu kayıtlarını siler
         threshold: Duygu kabul eşiği (0-1 arası). auto_threshold=True ise kullanılmaz.
         auto_threshold: True ise otomatik threshold belirler, False ise threshold parametresini kullanır
+        batch_size: Bir sayfada okunup tek seferde tahmin edilen film sayısı (worker başına)
+        workers: Tahmin için süreç sayısı (1: ana süreçte)
+        checkpoint_path: Devam bilgisinin yazılacağı dosya
     """
     print("🚀 AutoGluon Model Servisi Başlatılıyor...")
-    
+
     # AutoGluon model servisini yükle
     recommender = get_recommender_service()
-    
+
     if not recommender.is_ready():
         print("❌ Model servisi hazır değil!")
         print("📝 Lütfen önce modeli eğitin: python backend/ml/automl_train.py")
         return
-    
+
     print(f"✅ Model servisi hazır. {len(recommender.target_labels)} duygu kategorisi yüklendi.")
     print(f"📋 Duygu kategorileri: {', '.join(recommender.target_labels)}")
-    
+
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint and checkpoint.get("completed"):
+        # Önceki çalıştırma tamamlanmış: yeni ayarlarla, sadece filigrandan sonraki filmler
+        watermark = 0 if clear_existing else checkpoint["last_movie_id"]
+        checkpoint = None
+    else:
+        watermark = 0
+    if checkpoint:
+        # Yarıda kalan çalıştırma aynı ayarlarla sürdürülür (--clear tekrar uygulanmaz)
+        auto_threshold = checkpoint["auto_threshold"]
+        threshold = checkpoint["threshold"]
+        print(f"♻️ Checkpoint bulundu: movie_id > {checkpoint['last_movie_id']} filmlerden devam ediliyor "
+              f"({checkpoint['processed']} film daha önce işlendi).")
+
     session = get_db_session()
-    
+    pool = None
+
     try:
         print("\n🎬 Duygu Etiketleme Başlatılıyor...")
-        
-        if clear_existing:
+
+        if clear_existing and not checkpoint:
             deleted = session.query(Emotion).delete()
             session.commit()
             print(f"🗑️ {deleted} mevcut duygu kaydı silindi.")
-        
-        # Overview'u olan filmleri al
-        movies = session.query(Movie).filter(
-            Movie.overview.isnot(None),
-            Movie.overview != "",
-            Movie.overview != " "
-        ).all()
-        
-        print(f"📽️ Toplam {len(movies)} film bulundu (overview'u olan).")
-        
-        # Sadece boş olan filmleri etiketlemek için filtreleme
-        if not clear_existing:
-             movies_to_process = [
-                m for m in movies 
-                if not session.query(Emotion).filter(Emotion.movie_id == m.movie_id).first()
-            ]
-             print(f"🔄 Etiketlenecek {len(movies_to_process)} yeni film var.")
-        else:
-            movies_to_process = movies
-            print(f"🔄 Tüm {len(movies_to_process)} film yeniden etiketlenecek.")
-        
-        if not movies_to_process:
-            print("✅ Etiketlenecek yeni film yok.")
-            return
-        
+
+        if not checkpoint:
+            if watermark:
+                print(f"♻️ Önceki çalıştırmalar movie_id <= {watermark} filmleri işlemiş; "
+                      f"sadece yeni filmler etiketlenecek (--restart ile hepsi).")
+            checkpoint = {
+                "last_movie_id": watermark,
+                "processed": 0,
+                "auto_threshold": auto_threshold,
+                "threshold": threshold,
+                "started_at": datetime.utcnow().isoformat(),
+            }
+
         # İstatistik takibi
         created_count = 0
         updated_count = 0
         skipped_count = 0
+        processed_count = 0
         emotion_counts = {e: 0 for e in settings.EMOTION_CATEGORIES}
 
-        print(f"\n📊 Threshold: {'Otomatik' if auto_threshold else f'{threshold:.2f}'}")
+        workers = max(1, workers)
+        page_size = batch_size * workers
+        if workers > 1:
+            # Her worker modelleri kendi belleğine bir kez yükler
+            pool = multiprocessing.get_context().Pool(workers, initializer=_init_worker)
+
+        print(f"\n📊 Threshold: {'Otomatik' if auto_threshold else f'{threshold:.2f}'} | "
+              f"Batch: {batch_size} | Worker: {workers}")
         print("=" * 60)
-        
-        for i, movie in enumerate(movies_to_process):
-            try:
-                # AutoGluon modeli ile duygu tahmini yap
-                predicted_emotions, emotion_probs, used_threshold = recommender.predict_emotions_with_proba(
-                    movie.overview,
-                    auto_threshold=auto_threshold,
-                    custom_threshold=threshold if not auto_threshold else None
-                )
-                
-                # Mevcut etiketleri kontrol et
-                existing_emotions = session.query(Emotion).filter(
-                    Emotion.movie_id == movie.movie_id
-                ).all()
-                existing_emotion_labels = {e.emotion_label for e in existing_emotions}
-                
-                # Yeni etiketleri ekle
-                added_any = False
-                for emotion in predicted_emotions:
-                    if emotion not in existing_emotion_labels:
-                new_emotion = Emotion(
-                    movie_id=movie.movie_id,
-                            emotion_label=emotion
-                )
-                session.add(new_emotion)
-                        emotion_counts[emotion] += 1
-                created_count += 1
-                        added_any = True
-                
-                if added_any:
+
+        start = time.perf_counter()
+        page = fetch_unlabeled_page(session, checkpoint["last_movie_id"], page_size)
+        while page:
+            if pool is not None:
+                chunks = [(page[i:i + batch_size], auto_threshold, threshold)
+                          for i in range(0, len(page), batch_size)]
+                pending = pool.map_async(_label_batch_in_worker, chunks)
+                # Worker'lar tahmin yaparken bir sonraki sayfa okunur
+                next_page = fetch_unlabeled_page(session, page[-1][0], page_size)
+                labeled = [item for chunk in pending.get() for item in chunk]
+            else:
+                labeled = label_batch(recommender, page, auto_threshold, threshold)
+                next_page = None
+
+            created_count += insert_labels(session, labeled)
+            session.commit()
+
+            for _, emotions in labeled:
+                if emotions:
                     updated_count += 1
                 else:
                     skipped_count += 1
-                
-                # İlerleme göster
-                if (i + 1) % 100 == 0:
-                    print(f"  ⏳ İşlendi: {i + 1}/{len(movies_to_process)} | "
-                          f"Etiketlenen: {updated_count} | "
-                          f"Atlanan: {skipped_count}")
-                    session.commit()  # Her 100'de bir commit
-                    
-            except Exception as e:
-                print(f"  ⚠️ Film {movie.movie_id} için hata: {e}")
-                skipped_count += 1
-                continue
-        
-        # Son commit
-        session.commit()
-        
+                for emotion in emotions:
+                    emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
+            processed_count += len(page)
+
+            checkpoint["last_movie_id"] = page[-1][0]
+            checkpoint["processed"] += len(page)
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            elapsed = time.perf_counter() - start
+            print(f"  ⏳ İşlendi: {processed_count} | "
+                  f"Etiketlenen: {updated_count} | "
+                  f"Atlanan: {skipped_count} | "
+                  f"{processed_count / max(elapsed, 1e-9):.1f} film/sn")
+
+            page = next_page if next_page is not None else fetch_unlabeled_page(
+                session, checkpoint["last_movie_id"], page_size)
+
+        elapsed = time.perf_counter() - start
+
+        # Çalıştırma tamamlandı; son movie_id sonraki çalıştırmaların filigranı olarak kalır
+        checkpoint["completed"] = True
+        checkpoint["completed_at"] = datetime.utcnow().isoformat()
+        save_checkpoint(checkpoint_path, checkpoint)
+
+        if processed_count == 0:
+            print("✅ Etiketlenecek yeni film yok.")
+            return
+
         print("\n" + "=" * 60)
         print(f"✅ İşlem tamamlandı!")
-        print(f"   📝 Toplam işlenen film: {len(movies_to_process)}")
+        print(f"   📝 Toplam işlenen film: {processed_count}")
         print(f"   ✨ Yeni etiketlenen film: {updated_count}")
         print(f"   🏷️  Toplam oluşturulan etiket: {created_count}")
-        print(f"   ⏭️  Atlanan film: {skipped_count}")
-        
+        print(f"   ⏭️  Etiket çıkmayan film: {skipped_count}")
+        print(f"   ⏱️  Süre: {elapsed:.2f} sn ({processed_count / max(elapsed, 1e-9):.1f} film/sn)")
+
         print("\n📊 Duygu Dağılımı:")
         for emotion, count in sorted(emotion_counts.items(), key=lambda x: -x[1]):
             if count > 0:
                 print(f"   {emotion:12} : {count:4} film")
-        
+
         # Toplam istatistik
         total_emotions = session.query(Emotion).count()
         print(f"\n📈 Veritabanındaki toplam duygu kaydı: {total_emotions}")
-            
+
+    except KeyboardInterrupt:
+        session.rollback()
+        print(f"\n⏸️ Durduruldu. Aynı komutla devam edebilirsiniz (checkpoint: {checkpoint_path}).")
     except Exception as e:
         session.rollback()
         print(f"\n❌ Hata oluştu: {e}")
+        print(f"ℹ️ Aynı komutla son checkpoint'ten devam edilebilir: {checkpoint_path}")
         import traceback
         traceback.print_exc()
         raise
     finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
         session.close()
 
 
@@ -168,23 +326,29 @@ if __name__ == "__main__":
 Örnek kullanımlar:
   # Mevcut etiketleri sil ve yeniden etiketle (otomatik threshold)
   python backend/ml/seed_emotions.py --clear
-  
-  # Sadece yeni filmleri etiketle (otomatik threshold)
+
+  # Sadece yeni filmleri etiketle (önceki çalıştırmanın filigranından sonrası, otomatik threshold)
   python backend/ml/seed_emotions.py
-  
+
   # Manuel threshold ile etiketle
   python backend/ml/seed_emotions.py --clear --threshold 0.4 --no-auto-threshold
+
+  # 4 süreçle, 512'lik batch'lerle etiketle (yarıda kalırsa aynı komutla devam eder)
+  python backend/ml/seed_emotions.py --workers 4 --batch-size 512
+
+  # Checkpoint'i/filigranı yok sayıp etiketsiz tüm filmleri baştan işle
+  python backend/ml/seed_emotions.py --restart
         """
     )
     parser.add_argument(
-        '--clear', 
-        action='store_true', 
+        '--clear',
+        action='store_true',
         help='Mevcut duygu kayıtlarını sil ve tüm filmleri yeniden etiketle'
     )
     parser.add_argument(
-        '--threshold', 
-        type=float, 
-        default=0.3, 
+        '--threshold',
+        type=float,
+        default=0.3,
         help='Duygu kabul eşiği (0-1 arası, varsayılan: 0.3). --no-auto-threshold ile kullanılır.'
     )
     parser.add_argument(
@@ -192,10 +356,38 @@ if __name__ == "__main__":
         action='store_true',
         help='Otomatik threshold kullanma, --threshold parametresini kullan'
     )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=256,
+        help='Tek seferde tahmin edilen film sayısı (worker başına, varsayılan: 256)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Tahmin süreç sayısı; her süreç modelleri ayrı yükler (varsayılan: 1)'
+    )
+    parser.add_argument(
+        '--checkpoint',
+        default=DEFAULT_CHECKPOINT_PATH,
+        help='Checkpoint dosyası'
+    )
+    parser.add_argument(
+        '--restart',
+        action='store_true',
+        help='Mevcut checkpoint\'i (filigranı) silip etiketsiz tüm filmleri baştan işle'
+    )
     args = parser.parse_args()
-    
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
     seed_emotions(
-        clear_existing=args.clear, 
+        clear_existing=args.clear,
         threshold=args.threshold,
-        auto_threshold=not args.no_auto_threshold
-    )
\ No newline at end of file
+        auto_threshold=not args.no_auto_threshold,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+    )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from backend.core.auth import create_access_token, get_current_user, get_password_hash, verify_password
@@ -11,6 +11,7 @@ from backend.schemas.auth import (
     RegisterRequest,
     RegisterResponse,
 )
+from backend.services.recommendation_cache import prefetch_recommendations
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -43,7 +44,11 @@ def register_user(body: RegisterRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=LoginResponse)
-def login_user(body: LoginRequest, db: Session = Depends(get_db)):
+def login_user(
+    body: LoginRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
     user = db.query(User).filter(User.email == body.email).first()
     if not user or not verify_password(body.password, user.password_hash):
         raise HTTPException(
@@ -52,6 +57,11 @@ def login_user(body: LoginRequest, db: Session = Depends(get_db)):
         )
 
     token = create_access_token({"sub": str(user.user_id)})
+
+    # Kayıtlı ruh hali için önerileri yanıt döndükten sonra hesapla (ilk /by-emotions sıcak olur)
+    if user.mood:
+        background_tasks.add_task(prefetch_recommendations, user.user_id, user.mood)
+
     return LoginResponse(success=True, token=token, user_id=user.user_id)
 
 
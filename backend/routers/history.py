@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
+import logging
 
 from backend.core.auth import get_current_user
 from backend.db.connection import get_db
@@ -13,8 +15,80 @@ from backend.schemas.history import (
     HistoryByInteractionResponse,
     MovieInfo  # ✅ EKLENDİ
 )
+from backend.services.collaborative import apply_history_events, record_history_event
+from backend.services.interaction_stats import record_interaction
+from backend.services.matrix_factorization import invalidate_user_vector
+from backend.services.recommendation_cache import get_recommendation_cache
+from backend.services.seen_filter import get_seen_filter
+from backend.utils.helpers import measure
 
 router = APIRouter(prefix="/history", tags=["History"])
+logger = logging.getLogger(__name__)
+
+# Geçmiş listesi için kolon projeksiyonu (UserHistory + Movie ORM nesneleri hydrate edilmez)
+_HISTORY_COLUMNS = (
+    UserHistory.history_id,
+    UserHistory.movie_id,
+    UserHistory.interaction,
+    UserHistory.watch_date,
+    Movie.title,
+    Movie.overview,
+    Movie.release_date,
+    Movie.vote_average,
+    Movie.popularity,
+    Movie.genre,
+    Movie.poster_url,
+)
+
+
+def _fetch_history_page(
+    db: Session,
+    filters: List,
+    limit: int,
+    offset: int,
+) -> Tuple[int, List[HistoryItemResponse]]:
+    """
+    Verilen filtrelerle geçmiş kayıtlarını film bilgileri ile birlikte sayfalı olarak getirir.
+
+    Returns:
+        Tuple: (toplam_kayıt_sayısı, HistoryItemResponse listesi)
+    """
+    with measure("history: sayfa sorgusu", logger):
+        rows = (
+            db.query(*_HISTORY_COLUMNS)
+            .join(Movie, UserHistory.movie_id == Movie.movie_id)
+            .filter(*filters)
+            .order_by(UserHistory.watch_date.desc())
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+
+    # Response formatına dönüştür
+    history_items = [
+        HistoryItemResponse(
+            history_id=row.history_id,
+            movie_id=row.movie_id,
+            interaction=row.interaction,
+            watch_date=row.watch_date,
+            movie=MovieInfo(
+                movie_id=row.movie_id,
+                title=row.title,
+                overview=row.overview,
+                release_date=row.release_date,
+                vote_average=row.vote_average,
+                popularity=row.popularity,
+                genre=row.genre,
+                poster_url=row.poster_url,
+            ),
+        )
+        for row in rows
+    ]
+
+    # Toplam sayı (entity yüklemeden COUNT)
+    total = db.query(func.count(UserHistory.history_id)).filter(*filters).scalar() or 0
+
+    return total, history_items
 
 
 @router.post("", response_model=dict)
@@ -37,7 +111,7 @@ def create_history_item(
             detail="Sadece kendi geçmişinizi güncelleyebilirsiniz",
         )
 
-    movie = db.query(Movie).filter(Movie.movie_id == body.movie_id).first()
+    movie = db.query(Movie.movie_id).filter(Movie.movie_id == body.movie_id).first()
     if not movie:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Film bulunamadı")
 
@@ -52,7 +126,13 @@ def create_history_item(
         # 🌟 TOGGLE MANTIĞI: 'liked' ve 'viewed' için mevcut kayıt varsa sil (geri çek)
         if body.interaction in ["liked", "viewed"]:
             db.delete(existing)
+            record_interaction(db, body.movie_id, body.interaction, -1)
+            record_history_event(db, user_id_to_use, body.movie_id)
             db.commit()
+            apply_history_events(db)
+            get_seen_filter().invalidate(user_id_to_use)
+            get_recommendation_cache().invalidate(user_id_to_use)
+            invalidate_user_vector(user_id_to_use)
             if body.interaction == "liked":
                 return {
                     "success": True, 
@@ -72,6 +152,7 @@ def create_history_item(
         else:
             # Diğer interaction'lar için sadece watch_date güncelle
             existing.watch_date = datetime.utcnow()
+            record_interaction(db, body.movie_id, body.interaction, 0)
             db.commit()
             return {
                 "success": True, 
@@ -88,7 +169,13 @@ def create_history_item(
         interaction=body.interaction,
     )
     db.add(history)
+    record_interaction(db, body.movie_id, body.interaction, +1)
+    record_history_event(db, user_id_to_use, body.movie_id)
     db.commit()
+    apply_history_events(db)
+    get_seen_filter().add(user_id_to_use, body.movie_id, body.interaction)
+    get_recommendation_cache().invalidate(user_id_to_use)
+    invalidate_user_vector(user_id_to_use)
     return {
         "success": True, 
         "message": f"Geçmiş kaydı oluşturuldu ({body.interaction})",
@@ -108,44 +195,8 @@ def get_my_history(
     """
     Giriş yapan kullanıcının tüm geçmişini getirir (film bilgileri ile birlikte).
     """
-    # History kayıtlarını film bilgileri ile birlikte çek
-    items = (
-        db.query(UserHistory, Movie)
-        .join(Movie, UserHistory.movie_id == Movie.movie_id)
-        .filter(UserHistory.user_id == current_user.user_id)
-        .order_by(UserHistory.watch_date.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
-    
-    # Response formatına dönüştür
-    history_items = []
-    for history, movie in items:
-        # ✅ Movie objesini MovieInfo'ya manuel olarak dönüştür
-        movie_info = MovieInfo(
-            movie_id=movie.movie_id,
-            title=movie.title,
-            overview=movie.overview,
-            release_date=movie.release_date if movie.release_date else None,  # ✅ DÜZELTME: .date() kaldırıldı
-            vote_average=movie.vote_average,
-            popularity=movie.popularity,
-            genre=movie.genre,
-            poster_url=movie.poster_url
-        )
-        
-        history_items.append(HistoryItemResponse(
-            history_id=history.history_id,
-            movie_id=history.movie_id,
-            interaction=history.interaction,
-            watch_date=history.watch_date,
-            movie=movie_info
-        ))
-    
-    # Toplam sayı
-    total = db.query(UserHistory).filter(
-        UserHistory.user_id == current_user.user_id
-    ).count()
+    # Film bilgileri ile birlikte geçmişi çek (kolon projeksiyonu, ORM hydration yok)
+    total, history_items = _fetch_history_page(db, [UserHistory.user_id == current_user.user_id], limit, offset)
     
     return HistoryListResponse(
         total=total,
@@ -175,49 +226,14 @@ def get_my_history_by_interaction(
             detail=f"Geçersiz interaction tipi. Geçerli tipler: {', '.join(valid_interactions)}"
         )
     
-    # History kayıtlarını film bilgileri ile birlikte çek
-    items = (
-        db.query(UserHistory, Movie)
-        .join(Movie, UserHistory.movie_id == Movie.movie_id)
-        .filter(
-            UserHistory.user_id == current_user.user_id,
-            UserHistory.interaction == interaction
-        )
-        .order_by(UserHistory.watch_date.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
+    # Film bilgileri ile birlikte geçmişi çek (kolon projeksiyonu, ORM hydration yok)
+    total, history_items = _fetch_history_page(
+        db,
+        [UserHistory.user_id == current_user.user_id, UserHistory.interaction == interaction],
+        limit,
+        offset,
     )
     
-    # Response formatına dönüştür
-    history_items = []
-    for history, movie in items:
-        # ✅ Movie objesini MovieInfo'ya manuel olarak dönüştür
-        movie_info = MovieInfo(
-            movie_id=movie.movie_id,
-            title=movie.title,
-            overview=movie.overview,
-            release_date=movie.release_date if movie.release_date else None,  # ✅ DÜZELTME: .date() kaldırıldı
-            vote_average=movie.vote_average,
-            popularity=movie.popularity,
-            genre=movie.genre,
-            poster_url=movie.poster_url
-        )
-        
-        history_items.append(HistoryItemResponse(
-            history_id=history.history_id,
-            movie_id=history.movie_id,
-            interaction=history.interaction,
-            watch_date=history.watch_date,
-            movie=movie_info
-        ))
-    
-    # Toplam sayı
-    total = db.query(UserHistory).filter(
-        UserHistory.user_id == current_user.user_id,
-        UserHistory.interaction == interaction
-    ).count()
-    
     return HistoryByInteractionResponse(
         interaction=interaction,
         total=total,
@@ -244,44 +260,8 @@ def get_user_history(
             detail="Sadece kendi geçmişinizi görüntüleyebilirsiniz",
         )
 
-    # History kayıtlarını film bilgileri ile birlikte çek
-    items = (
-        db.query(UserHistory, Movie)
-        .join(Movie, UserHistory.movie_id == Movie.movie_id)
-        .filter(UserHistory.user_id == user_id)
-        .order_by(UserHistory.watch_date.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
-    
-    # Response formatına dönüştür
-    history_items = []
-    for history, movie in items:
-        # ✅ Movie objesini MovieInfo'ya manuel olarak dönüştür
-        movie_info = MovieInfo(
-            movie_id=movie.movie_id,
-            title=movie.title,
-            overview=movie.overview,
-            release_date=movie.release_date if movie.release_date else None,  # ✅ DÜZELTME: .date() kaldırıldı
-            vote_average=movie.vote_average,
-            popularity=movie.popularity,
-            genre=movie.genre,
-            poster_url=movie.poster_url
-        )
-        
-        history_items.append(HistoryItemResponse(
-            history_id=history.history_id,
-            movie_id=history.movie_id,
-            interaction=history.interaction,
-            watch_date=history.watch_date,
-            movie=movie_info
-        ))
-    
-    # Toplam sayı
-    total = db.query(UserHistory).filter(
-        UserHistory.user_id == user_id
-    ).count()
+    # Film bilgileri ile birlikte geçmişi çek (kolon projeksiyonu, ORM hydration yok)
+    total, history_items = _fetch_history_page(db, [UserHistory.user_id == user_id], limit, offset)
     
     return HistoryListResponse(
         total=total,
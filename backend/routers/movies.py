@@ -1,14 +1,31 @@
+import logging
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from backend.core.auth import get_current_user
 from backend.db.connection import get_db
 from backend.db.models import Movie, User
-from backend.schemas.movies import MovieCreate, MovieListResponse, MovieResponse, MovieUpdate
+from backend.schemas.movies import (
+    MovieCreate,
+    MovieInteractionStatsResponse,
+    MovieListResponse,
+    MovieResponse,
+    MovieUpdate,
+    SimilarMovieItem,
+    SimilarMoviesResponse,
+)
+from backend.services.interaction_stats import get_interaction_stats
+from backend.services.similarity_index import get_similarity_index, rebuild_similarity_index
+from backend.utils.helpers import measure
 
 router = APIRouter(prefix="/movies", tags=["Movies"])
+logger = logging.getLogger(__name__)
+
+# Liste endpoint'i için kolon projeksiyonu (MovieResponse alanlarının tamamı)
+_LIST_COLUMNS = tuple(Movie.__table__.columns)
 
 
 @router.get("", response_model=MovieListResponse)
@@ -19,22 +36,24 @@ def list_movies(
     page: int = Query(default=1, ge=1),
     db: Session = Depends(get_db),
 ):
-    query = db.query(Movie)
+    # Tam Movie ORM nesnesi yerine sadece tablo kolonları (ilişkiler/identity map yok)
+    query = db.query(*_LIST_COLUMNS)
     if genre:
         query = query.filter(Movie.genre.ilike(f"%{genre}%"))
     if year:
         # release_date'den yıl çıkar veya direkt yıl ile karşılaştır
         query = query.filter(Movie.release_date.like(f"{year}%"))
 
-    total = query.count()
-    items = (
-        query.order_by(Movie.vote_average.desc().nullslast())
-        .offset((page - 1) * limit)
-        .limit(limit)
-        .all()
-    )
+    total = query.with_entities(func.count(Movie.movie_id)).scalar() or 0
+    with measure("movies: liste sorgusu", logger):
+        items = (
+            query.order_by(Movie.vote_average.desc().nullslast())
+            .offset((page - 1) * limit)
+            .limit(limit)
+            .all()
+        )
 
-    return MovieListResponse(total=total, page=page, limit=limit, items=items)
+    return MovieListResponse(total=total, page=page, limit=limit, items=[row._asdict() for row in items])
 
 
 @router.get("/{movie_id}", response_model=MovieResponse)
@@ -45,6 +64,64 @@ def get_movie(movie_id: int, db: Session = Depends(get_db)):
     return movie
 
 
+@router.get("/{movie_id}/stats", response_model=MovieInteractionStatsResponse)
+def get_movie_stats(movie_id: int, db: Session = Depends(get_db)):
+    """Filmin beğeni/izleme/tıklama sayaçları (movie_interaction_stats, O(1) okuma)."""
+    stats = get_interaction_stats(db, [movie_id]).get(movie_id)
+    if stats is None:
+        if not db.query(Movie.movie_id).filter(Movie.movie_id == movie_id).first():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Film bulunamadı")
+        return MovieInteractionStatsResponse(movie_id=movie_id)
+    return MovieInteractionStatsResponse(
+        movie_id=movie_id,
+        likes=stats.likes,
+        views=stats.views,
+        clicks=stats.clicks,
+        last_interaction=stats.last_interaction,
+    )
+
+
+@router.get("/{movie_id}/similar", response_model=SimilarMoviesResponse)
+def get_similar_movies(
+    movie_id: int,
+    limit: int = Query(default=10, ge=1, le=50),
+    same_genre: bool = Query(default=False, description="Sadece en az bir ortak türü olan filmler"),
+    genre: Optional[str] = Query(default=None, description="Virgülle ayrılmış tür filtresi"),
+    db: Session = Depends(get_db),
+):
+    """
+    Duygu vektörleri en yakın filmleri döndürür (önceden kurulmuş k-NN indeksi,
+    istek başına model tahmini yok).
+    """
+    index = get_similarity_index()
+    if not index.is_built:
+        index = rebuild_similarity_index(db)
+
+    if index.vector(movie_id) is None:
+        exists = db.query(Movie.movie_id).filter(Movie.movie_id == movie_id).first()
+        if not exists:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Film bulunamadı")
+        # Film var ama henüz duygu etiketi yok
+        return SimilarMoviesResponse(movie_id=movie_id, total=0, items=[])
+
+    genres = [g.strip() for g in genre.split(",") if g.strip()] if genre else None
+    with measure("movies: benzer film sorgusu", logger):
+        neighbours = index.query(movie_id, k=limit, genres=genres, same_genre=same_genre)
+
+    # Sadece top-k için film bilgileri (tek sorgu)
+    rows = db.query(
+        Movie.movie_id, Movie.title, Movie.genre, Movie.poster_url, Movie.vote_average, Movie.release_date
+    ).filter(Movie.movie_id.in_([mid for mid, _ in neighbours])).all() if neighbours else []
+    rows_by_id = {row.movie_id: row for row in rows}
+
+    items = [
+        SimilarMovieItem(**rows_by_id[mid]._asdict(), similarity=round(score, 4))
+        for mid, score in neighbours
+        if mid in rows_by_id
+    ]
+    return SimilarMoviesResponse(movie_id=movie_id, total=len(items), items=items)
+
+
 @router.post("", response_model=dict)
 def create_movie(
     movie_in: MovieCreate,
@@ -74,6 +151,7 @@ def update_movie(
         setattr(movie, field, value)
 
     db.commit()
+    get_similarity_index().update_genre(movie_id, movie.genre)
     return {"success": True}
 
 
@@ -88,6 +166,7 @@ def delete_movie(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Film bulunamadı")
     db.delete(movie)
     db.commit()
+    get_similarity_index().remove(movie_id)
     return {"success": True}
 
 """
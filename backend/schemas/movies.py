@@ -38,3 +38,27 @@ class MovieListResponse(BaseModel):
     page: int
     limit: int
     items: List[MovieResponse]
+
+
+class SimilarMovieItem(BaseModel):
+    movie_id: int
+    title: str
+    similarity: float
+    genre: Optional[str] = None
+    poster_url: Optional[str] = None
+    vote_average: Optional[float] = None
+    release_date: Optional[date] = None
+
+
+class SimilarMoviesResponse(BaseModel):
+    movie_id: int
+    total: int
+    items: List[SimilarMovieItem]
+
+
+class MovieInteractionStatsResponse(BaseModel):
+    movie_id: int
+    likes: int = 0
+    views: int = 0
+    clicks: int = 0
+    last_interaction: Optional[datetime] = None
@@ -2,6 +2,7 @@
 Recommendation için Pydantic şemaları
 """
 
+from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional, Dict, Any
 
@@ -93,6 +94,12 @@ class RecommendationRequest(BaseModel):
         le=1.0,
         description="Duygu kabul eşiği"
     )
+    diversity_lambda: Optional[float] = Field(
+        default=None,
+        ge=0.0,
+        le=1.0,
+        description="MMR alaka/çeşitlilik dengesi (1.0: sadece alaka, 0.0: sadece çeşitlilik). Boşsa MMR_LAMBDA kullanılır."
+    )
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -100,7 +107,8 @@ class RecommendationRequest(BaseModel):
                 "selected_emotions": ["mutlu", "romantik"],
                 "max_recommendations": 10,
                 "min_similarity_threshold": 0.3,
-                "emotion_threshold": 0.3
+                "emotion_threshold": 0.3,
+                "diversity_lambda": 0.7
             }
         }
     )
@@ -177,4 +185,69 @@ class RecommendationResponse(BaseModel):
                 "model_type": "autogluon_multi_label"
             }
         }
-    )
\ No newline at end of file
+    )
+
+
+class TextSearchRequest(BaseModel):
+    text: Optional[str] = Field(
+        default=None,
+        min_length=3,
+        description="Serbest metin (ruh hali açıklaması veya özet)"
+    )
+    movie_id: Optional[int] = Field(
+        default=None,
+        description="Bu filmin özetine benzer filmler ('buna benzer' sorgusu)"
+    )
+    max_results: int = Field(default=10, ge=1, le=100, description="Maksimum sonuç sayısı")
+    exact: bool = Field(default=False, description="LSH yerine tam arama (karşılaştırma için)")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "text": "a heartwarming story about friendship and second chances",
+                "max_results": 10
+            }
+        }
+    )
+
+class TextSearchItem(BaseModel):
+    movie_id: int
+    title: str
+    overview: str
+    similarity: float
+    poster_url: Optional[str] = None
+    release_year: Optional[int] = None
+    rating: Optional[float] = None
+    genres: Optional[List[str]] = None
+
+class TextSearchResponse(BaseModel):
+    query: Optional[str] = None
+    movie_id: Optional[int] = None
+    total_results: int
+    results: List[TextSearchItem]
+    search_mode: str
+    elapsed_ms: float
+    status: str
+
+
+class TrendingItem(BaseModel):
+    rank: int
+    movie_id: int
+    title: str
+    likes: int
+    views: int
+    clicks: int
+    score: float
+    poster_url: Optional[str] = None
+    release_year: Optional[int] = None
+    rating: Optional[float] = None
+    genres: Optional[List[str]] = None
+
+class TrendingResponse(BaseModel):
+    list_key: str
+    window_days: int
+    total_results: int
+    results: List[TrendingItem]
+    refreshed_at: Optional[datetime] = None
+    elapsed_ms: float
+    status: str
@@ -0,0 +1,541 @@
+"""
+user_history üzerinden item-item işbirlikçi filtreleme (co-occurrence).
+
+İki film, aynı kullanıcının geçmişinde (viewed / liked / clicked) birlikte
+bulunuyorsa birlikte görülme sayıları (co-occurrence) artar. Benzerlik,
+kosinüs normalizasyonudur: ``c_ij / sqrt(n_i * n_j)``.
+
+- Taban matris scipy.sparse CSR olarak tutulur; her POST /history sonrası
+  gelen artımlar satır bazlı bir delta sözlüğünde birikir ve eşik aşılınca
+  CSR'a katlanır (compaction).
+- Her film için en benzer CF_NEIGHBORS film önbelleğe alınır; bir kullanıcı
+  için skor hesabı (profil büyüklüğü × komşu sayısı) kadar iş yapar,
+  katalog büyüklüğünden bağımsızdır. Bir filmin sayısı değişince onunla
+  birlikte görülen filmlerin listeleri düşürülür.
+
+Worker'lar arası ortak kaynak user_history_events günlüğüdür: POST /history
+kaydı ile aynı transaction'da (kullanıcı, film) çiftinin güncel kayıt
+sayısını yazar (record_history_event). Her worker günlüğü kendi su
+seviyesinden (son uygulanan event_id) itibaren okuyup matrise uygular
+(catch_up): POST /history'den hemen sonra ve CF_SYNC_SECONDS aralıkla.
+Olaylar sayıyı "ayarladığı" için tekrar uygulanmaları zararsızdır; bu
+yüzden son CF_EVENT_LOOKBACK olay her okumada yeniden uygulanır (daha küçük
+id ile geç commit edilen olaylar kaçmaz).
+
+Matris su seviyesiyle birlikte CF_INDEX_PATH'e yazılır; açılışta dosya
+yüklenip günlüğün kalanı uygulanır. Tam X^T X kurulumu sadece dosya yoksa
+veya günlüğün gereken kısmı silinmişse yapılır; kurulum yeni bir nesnede
+yapılır, kurulum sürerken gelen olaylar referans değişmeden önce ve sonra
+günlükten uygulanır. Film silindiğinde (cascade) günlüğe olay yazılmaz;
+silinen filmler önerilerde zaten yer almaz.
+scipy sadece matris kurulurken import edilir (API import süresi).
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.db.models import UserHistory, UserHistoryEvent
+
+logger = logging.getLogger(__name__)
+
+
+class ItemCooccurrenceIndex:
+    """
+    Artımlı güncellenen seyrek item-item co-occurrence matrisi.
+
+    Kullanıcı-film ilişkisi ikilidir: aynı filme birden fazla etkileşim
+    (ör. viewed + liked) tek sayılır; son etkileşim silinince ilişki kalkar.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        # save()/load() için varsayılan dosya
+        self.path = path
+        self._lock = threading.Lock()
+        # Günlük okumaları sırayla uygulanmalı (eski bir okuma yeni sayıların üzerine yazmasın)
+        self._catch_up_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        from scipy import sparse
+
+        self._rows: Dict[int, int] = {}            # movie_id -> satır
+        self._movie_ids: List[int] = []            # satır -> movie_id
+        self._base = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._delta: Dict[int, Dict[int, float]] = {}
+        self._delta_size = 0
+        self._item_counts = np.zeros(0, dtype=np.float32)
+        # user_id -> {movie_id: etkileşim kaydı sayısı} (ekleme sırası korunur)
+        self._user_items: Dict[int, Dict[int, int]] = {}
+        self._neighbors: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        # Uygulanan son user_history_events.event_id ve diske yazılan su seviyesi
+        self.event_id = 0
+        self.saved_event_id = 0
+        self.is_built = False
+
+    # ----- Yardımcılar -----
+
+    def _row_for(self, movie_id: int) -> int:
+        row = self._rows.get(movie_id)
+        if row is None:
+            row = self._rows[movie_id] = len(self._movie_ids)
+            self._movie_ids.append(movie_id)
+            if row >= len(self._item_counts):
+                grown = np.zeros(max(1024, 2 * len(self._item_counts)), dtype=np.float32)
+                grown[:len(self._item_counts)] = self._item_counts
+                self._item_counts = grown
+        return row
+
+    def _row_counts(self, row: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Bir satırın (taban CSR + delta) co-occurrence sayılarını döndürür."""
+        if row < self._base.shape[0]:
+            start, end = self._base.indptr[row], self._base.indptr[row + 1]
+            cols = self._base.indices[start:end]
+            vals = self._base.data[start:end]
+        else:
+            cols = np.empty(0, dtype=np.int32)
+            vals = np.empty(0, dtype=np.float32)
+        delta = self._delta.get(row)
+        if delta:
+            merged = dict(zip(cols.tolist(), vals.tolist()))
+            for col, value in delta.items():
+                merged[col] = merged.get(col, 0.0) + value
+            cols = np.fromiter(merged.keys(), dtype=np.int32, count=len(merged))
+            vals = np.fromiter(merged.values(), dtype=np.float32, count=len(merged))
+        keep = vals > 0
+        return cols[keep], vals[keep]
+
+    def _add_pair(self, a: int, b: int, value: float) -> None:
+        for i, j in ((a, b), (b, a)):
+            row = self._delta.setdefault(i, {})
+            if j not in row:
+                self._delta_size += 1
+            row[j] = row.get(j, 0.0) + value
+
+    def _invalidate_neighbors(self, row: int) -> None:
+        """
+        Filmin ve birlikte görüldüğü tüm filmlerin komşu listelerini düşürür:
+        filmin n_i sayısı değişince onu içeren her listedeki kosinüs değişir.
+        """
+        cols, _ = self._row_counts(row)
+        for col in cols.tolist():
+            self._neighbors.pop(self._movie_ids[col], None)
+        self._neighbors.pop(self._movie_ids[row], None)
+
+    def _compact(self) -> None:
+        """Delta sözlüğünü taban CSR matrise katlar."""
+        from scipy import sparse
+
+        n = len(self._movie_ids)
+        base = self._base
+        if base.shape != (n, n):
+            base = base.copy()
+            base.resize((n, n))
+        if self._delta:
+            rows, cols, vals = [], [], []
+            for i, row in self._delta.items():
+                rows.extend([i] * len(row))
+                cols.extend(row.keys())
+                vals.extend(row.values())
+            delta = sparse.csr_matrix(
+                (np.asarray(vals, dtype=np.float32), (np.asarray(rows), np.asarray(cols))),
+                shape=(n, n),
+            )
+            base = base + delta
+            base.data[base.data < 0] = 0
+            base.eliminate_zeros()
+        self._base = base.tocsr()
+        self._delta = {}
+        self._delta_size = 0
+        # Komşu listelerindeki n_j normalizasyonu da tazelensin
+        self._neighbors = {}
+
+    # ----- Kurulum -----
+
+    def build(self, db: Session) -> None:
+        """
+        Matrisi user_history tablosundan sıfırdan kurar (X^T X). Su seviyesi
+        geçmişten önce okunur: arada commit edilen olaylar catch_up'ta tekrar
+        uygulanır (sayı ayarladıkları için çift sayılmaz).
+        """
+        start = time.perf_counter()
+        event_id = db.query(func.max(UserHistoryEvent.event_id)).scalar() or 0
+        rows = (
+            db.query(UserHistory.user_id, UserHistory.movie_id)
+            .order_by(UserHistory.watch_date, UserHistory.history_id)
+            .all()
+        )
+        self.build_from_pairs(rows, event_id=event_id)
+        logger.info(
+            f"🤝 Co-occurrence matrisi kuruldu: {len(self._movie_ids)} film, {len(self._user_items)} kullanıcı, "
+            f"{self._base.nnz} komşuluk ({(time.perf_counter() - start) * 1000:.1f} ms)"
+        )
+
+    def build_from_pairs(self, pairs, event_id: int = 0) -> None:
+        """(user_id, movie_id) çiftlerinden (zaman sırasıyla) matrisi kurar."""
+        from scipy import sparse
+
+        with self._lock:
+            self._reset()
+            user_rows: Dict[int, int] = {}
+            for user_id, movie_id in pairs:
+                items = self._user_items.setdefault(user_id, {})
+                items[movie_id] = items.get(movie_id, 0) + 1
+                user_rows.setdefault(user_id, len(user_rows))
+                self._row_for(movie_id)
+
+            n_items = len(self._movie_ids)
+            pairs_u, pairs_i = [], []
+            for user_id, items in self._user_items.items():
+                u = user_rows[user_id]
+                for movie_id in items:
+                    pairs_u.append(u)
+                    pairs_i.append(self._rows[movie_id])
+            interactions = sparse.csr_matrix(
+                (np.ones(len(pairs_u), dtype=np.float32), (pairs_u, pairs_i)),
+                shape=(len(user_rows), n_items),
+            )
+            cooc = (interactions.T @ interactions).tocsr()
+            self._item_counts[:n_items] = cooc.diagonal()
+            cooc.setdiag(0)
+            cooc.eliminate_zeros()
+            self._base = cooc
+            self.event_id = event_id
+            self.is_built = True
+
+    # ----- Artımlı güncelleme (POST /history) -----
+
+    def add_interaction(self, user_id: int, movie_id: int) -> None:
+        """Yeni bir geçmiş kaydını işler; film kullanıcı için yeniyse co-occurrence artar."""
+        with self._lock:
+            count = self._user_items.get(user_id, {}).get(movie_id, 0)
+            self._set_count_locked(user_id, movie_id, count + 1)
+
+    def remove_interaction(self, user_id: int, movie_id: int) -> None:
+        """Silinen geçmiş kaydını işler (beğeni/izleme geri çekme)."""
+        with self._lock:
+            count = self._user_items.get(user_id, {}).get(movie_id, 0)
+            if count:
+                self._set_count_locked(user_id, movie_id, count - 1)
+
+    def _set_count_locked(self, user_id: int, movie_id: int, count: int) -> None:
+        """
+        Kullanıcının filme ait kayıt sayısını ayarlar; ilişki sadece sayı 0'dan
+        çıkınca/0'a inince değişir (aynı sayıyla tekrar çağrılması etkisizdir).
+        """
+        items = self._user_items.setdefault(user_id, {})
+        current = items.get(movie_id, 0)
+        if count > 0 and current > 0:
+            items[movie_id] = count
+            return
+        if count > 0:
+            row = self._row_for(movie_id)
+            for other_id in items:
+                self._add_pair(row, self._rows[other_id], 1.0)
+            items[movie_id] = count
+            self._item_counts[row] += 1
+            self._invalidate_neighbors(row)
+            self._maybe_compact()
+        elif current > 0:
+            del items[movie_id]
+            row = self._rows[movie_id]
+            # Çiftler silinmeden önce: kullanıcının diğer filmleri de hâlâ komşu sayılır
+            self._invalidate_neighbors(row)
+            for other_id in items:
+                self._add_pair(row, self._rows[other_id], -1.0)
+            self._item_counts[row] = max(0.0, self._item_counts[row] - 1)
+            self._maybe_compact()
+
+    def catch_up(self, db: Session) -> Optional[int]:
+        """
+        user_history_events günlüğünde su seviyesinden sonraki olayları uygular
+        (son CF_EVENT_LOOKBACK olay da yeniden uygulanır).
+
+        Returns:
+            Optional[int]: Yeni uygulanan olay sayısı; matris kurulmamışsa veya
+            gereken olaylar günlükten silinmişse None (tam kurulum gerekir)
+        """
+        if not self.is_built:
+            return None
+        with self._catch_up_lock:
+            watermark = self.event_id
+            oldest = db.query(func.min(UserHistoryEvent.event_id)).scalar()
+            if oldest is None:
+                return 0
+            if oldest > watermark + 1 and watermark > 0:
+                return None
+            events = (
+                db.query(UserHistoryEvent.event_id, UserHistoryEvent.user_id,
+                         UserHistoryEvent.movie_id, UserHistoryEvent.history_count)
+                .filter(UserHistoryEvent.event_id > watermark - settings.CF_EVENT_LOOKBACK)
+                .order_by(UserHistoryEvent.event_id)
+                .all()
+            )
+            applied = 0
+            with self._lock:
+                for event_id, user_id, movie_id, history_count in events:
+                    self._set_count_locked(user_id, movie_id, history_count)
+                    if event_id > watermark:
+                        applied += 1
+                        self.event_id = max(self.event_id, event_id)
+            return applied
+
+    def _maybe_compact(self) -> None:
+        # Yerel artımlar diske yazılmaz (bkz. modül açıklaması); sadece CSR'a katlanır
+        if self._delta_size >= settings.CF_COMPACT_THRESHOLD:
+            self._compact()
+
+    # ----- Sorgu -----
+
+    def neighbors(self, movie_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Filmin en benzer CF_NEIGHBORS komşusunu (movie_id dizisi, kosinüs) döndürür."""
+        cached = self._neighbors.get(movie_id)
+        if cached is not None:
+            return cached
+        with self._lock:
+            row = self._rows.get(movie_id)
+            if row is None:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            cols, counts = self._row_counts(row)
+            if cols.size:
+                norms = np.sqrt(self._item_counts[row] * self._item_counts[cols])
+                sims = np.divide(counts, norms, out=np.zeros_like(counts), where=norms > 0)
+                k = min(settings.CF_NEIGHBORS, cols.size)
+                top = np.argpartition(-sims, k - 1)[:k]
+                top = top[np.argsort(-sims[top], kind="stable")]
+                ids = np.asarray(self._movie_ids, dtype=np.int64)[cols[top]]
+                result = (ids, sims[top].astype(np.float32))
+            else:
+                result = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+            self._neighbors[movie_id] = result
+        return result
+
+    def score_for_user(self, user_id: int) -> Dict[int, float]:
+        """
+        Kullanıcının son CF_MAX_PROFILE_ITEMS filminin komşularından kişisel skor üretir.
+
+        Returns:
+            Dict[int, float]: movie_id -> [0, 1] aralığına ölçeklenmiş skor
+            (kullanıcının kendi filmleri hariç)
+        """
+        items = self._user_items.get(user_id)
+        if not items:
+            return {}
+        profile = list(items)[-settings.CF_MAX_PROFILE_ITEMS:]
+        scores: Dict[int, float] = {}
+        for movie_id in profile:
+            ids, sims = self.neighbors(movie_id)
+            for neighbor_id, sim in zip(ids.tolist(), sims.tolist()):
+                scores[neighbor_id] = scores.get(neighbor_id, 0.0) + sim
+        for movie_id in items:
+            scores.pop(movie_id, None)
+        if not scores:
+            return {}
+        top = max(scores.values())
+        return {movie_id: score / top for movie_id, score in scores.items()}
+
+    # ----- Diske yazma / okuma -----
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            self._save_locked(path)
+
+    def _save_locked(self, path: str) -> None:
+        self._compact()
+        users, movies, counts = [], [], []
+        for user_id, items in self._user_items.items():
+            users.extend([user_id] * len(items))
+            movies.extend(items.keys())
+            counts.extend(items.values())
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # Worker'lar aynı anda yazabilir: her yazım kendi geçici dosyasına, sonra atomik rename
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                self._write_npz(f, users, movies, counts)
+            os.chmod(tmp_path, 0o644)  # mkstemp 0600 açar
+            os.replace(tmp_path, path)
+            self.saved_event_id = self.event_id
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _write_npz(self, f, users: List[int], movies: List[int], counts: List[int]) -> None:
+        np.savez(
+            f,
+            data=self._base.data,
+            indices=self._base.indices,
+            indptr=self._base.indptr,
+            movie_ids=np.asarray(self._movie_ids, dtype=np.int64),
+            item_counts=self._item_counts[:len(self._movie_ids)],
+            pair_users=np.asarray(users, dtype=np.int64),
+            pair_movies=np.asarray(movies, dtype=np.int64),
+            pair_counts=np.asarray(counts, dtype=np.int32),
+            event_id=np.asarray(self.event_id, dtype=np.int64),
+        )
+
+    def load(self, path: str) -> bool:
+        """Diskteki matrisi yükler; dosya yoksa (veya su seviyesi içermeyen eski biçimse) False döner."""
+        if not os.path.exists(path):
+            return False
+        from scipy import sparse
+
+        with np.load(path) as data, self._lock:
+            if "event_id" not in data.files:
+                return False
+            self._reset()
+            movie_ids = data["movie_ids"].tolist()
+            n = len(movie_ids)
+            self._movie_ids = movie_ids
+            self._rows = {movie_id: row for row, movie_id in enumerate(movie_ids)}
+            self._base = sparse.csr_matrix((data["data"], data["indices"], data["indptr"]), shape=(n, n))
+            self._item_counts = np.zeros(max(1024, n), dtype=np.float32)
+            self._item_counts[:n] = data["item_counts"]
+            for user_id, movie_id, count in zip(
+                data["pair_users"].tolist(), data["pair_movies"].tolist(), data["pair_counts"].tolist()
+            ):
+                self._user_items.setdefault(user_id, {})[movie_id] = count
+            self.event_id = self.saved_event_id = int(data["event_id"])
+            self.is_built = True
+        return True
+
+
+_index: Optional[ItemCooccurrenceIndex] = None
+_sync_thread: Optional[threading.Thread] = None
+_rebuild_lock = threading.Lock()
+
+
+def get_cooccurrence_index() -> ItemCooccurrenceIndex:
+    """Süreç genelinde tek ItemCooccurrenceIndex örneğini döndürür."""
+    global _index
+    if _index is None:
+        _index = ItemCooccurrenceIndex(settings.CF_INDEX_PATH)
+    return _index
+
+
+def record_history_event(db: Session, user_id: int, movie_id: int) -> None:
+    """
+    user_history'ye eklenen/silinen kayıttan sonra (aynı transaction'da, commit
+    çağıranın sorumluluğundadır) çiftin güncel kayıt sayısını günlüğe yazar.
+    """
+    db.flush()
+    count = db.query(func.count(UserHistory.history_id)).filter(
+        UserHistory.user_id == user_id, UserHistory.movie_id == movie_id
+    ).scalar() or 0
+    db.add(UserHistoryEvent(user_id=user_id, movie_id=movie_id, history_count=count))
+
+
+def apply_history_events(db: Session) -> None:
+    """POST /history commit'inden sonra: günlükteki yeni olayları (diğer worker'larınkiler dahil) uygular."""
+    try:
+        get_cooccurrence_index().catch_up(db)
+    except Exception as e:
+        # Kayıt zaten yazıldı; olay bir sonraki senkronizasyonda uygulanır
+        logger.warning(f"⚠️ Co-occurrence günlüğü uygulanamadı: {e}")
+
+
+def rebuild_cooccurrence_index(session_factory) -> ItemCooccurrenceIndex:
+    """
+    Matrisi user_history'den yeni bir nesneye kurar, kurulum sırasında gelen
+    olayları günlükten uygular, diske yazar ve süreç genelindeki referansı
+    değiştirir. Okuyanlar kurulum boyunca eski nesneyi kullanmaya devam eder.
+    """
+    global _index
+    with _rebuild_lock:
+        index = ItemCooccurrenceIndex(settings.CF_INDEX_PATH)
+        db = session_factory()
+        try:
+            index.build(db)
+            index.catch_up(db)
+            if index.path:
+                index.save(index.path)
+            _index = index
+            # Kaydetme ile referans değişimi arasında gelen olaylar
+            index.catch_up(db)
+        finally:
+            db.close()
+    return index
+
+
+def sync_cooccurrence_index(session_factory) -> Optional[int]:
+    """
+    Günlüğü uygular, su seviyesi ilerlediyse matrisi diske yazar ve eski
+    olayları siler; gereken olaylar silinmişse matrisi yeniden kurar.
+
+    Returns:
+        Optional[int]: Uygulanan yeni olay sayısı (yeniden kurulduysa None)
+    """
+    index = get_cooccurrence_index()
+    db = session_factory()
+    try:
+        applied = index.catch_up(db)
+        if applied is None:
+            logger.info("🤝 Co-occurrence günlüğü su seviyesinin gerisinde; matris yeniden kuruluyor")
+        else:
+            if index.path and index.event_id > index.saved_event_id:
+                index.save(index.path)
+            _prune_events(db, index.saved_event_id)
+            return applied
+    finally:
+        db.close()
+    rebuild_cooccurrence_index(session_factory)
+    return None
+
+
+def _prune_events(db: Session, saved_event_id: int) -> None:
+    """Diske yazılmış ve CF_EVENT_RETENTION_SECONDS'tan eski olayları siler."""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.CF_EVENT_RETENTION_SECONDS)
+    deleted = db.query(UserHistoryEvent).filter(
+        UserHistoryEvent.event_id <= saved_event_id - settings.CF_EVENT_LOOKBACK,
+        UserHistoryEvent.created_at < cutoff,
+    ).delete(synchronize_session=False)
+    db.commit()
+    if deleted:
+        logger.info(f"🤝 Co-occurrence günlüğünden {deleted} eski olay silindi")
+
+
+def start_cooccurrence_index(session_factory) -> None:
+    """
+    Uygulama açılışında matrisi diskten yükleyip günlüğün kalanını uygular;
+    dosya yoksa veya günlüğün gereken kısmı silinmişse veritabanından kurup
+    diske yazar. CF_SYNC_SECONDS > 0 ise günlüğü periyodik olarak uygulayıp
+    diske yazan daemon thread'i başlatır.
+    """
+    global _sync_thread
+    index = get_cooccurrence_index()
+    try:
+        if index.path and index.load(index.path):
+            applied = sync_cooccurrence_index(session_factory)
+            if applied is not None:
+                logger.info(f"🤝 Co-occurrence matrisi diskten yüklendi: {index.path} "
+                            f"(günlükten {applied} olay uygulandı)")
+        else:
+            rebuild_cooccurrence_index(session_factory)
+    except Exception as e:
+        logger.error(f"❌ Co-occurrence matrisi hazırlanamadı: {e}")
+
+    interval = settings.CF_SYNC_SECONDS
+    if interval <= 0 or _sync_thread is not None:
+        return
+
+    def _sync_loop():
+        while True:
+            time.sleep(interval)
+            try:
+                sync_cooccurrence_index(session_factory)
+            except Exception as e:
+                logger.warning(f"⚠️ Co-occurrence matrisi senkronize edilemedi: {e}")
+
+    _sync_thread = threading.Thread(target=_sync_loop, name="cooccurrence-sync", daemon=True)
+    _sync_thread.start()
@@ -0,0 +1,314 @@
+"""
+Film kataloğunun duygu dağılımı (/recommendation/emotion-distribution).
+
+Kaynaklar:
+    database  emotions tablosu (seed_emotions.py çıktısı) üzerinde tek GROUP BY;
+              model çalıştırılmaz
+    model     overview'u olan ilk `limit` film içinden istatistiksel olarak
+              boyutlandırılmış rastgele örneklem, toplu tahmin ve duygu başına
+              Wilson güven aralığı
+
+Örneklem büyüklüğü oran tahmini için Cochran formülü ve sonlu popülasyon
+düzeltmesiyle bulunur: n0 = z²·p(1-p)/e² (p = 0.5, en kötü durum),
+n = n0 / (1 + (n0 - 1) / N). %95 güven ve ±%5 hata payı için en fazla 385 film.
+
+Tahmin edilecek satır sayısı EMOTION_DISTRIBUTION_SYNC_ROWS'u aşarsa (örn.
+exact=True ile büyük limit) hesap arka plan işi olarak çalışır. İş durumu ve
+sonuç emotion_distribution_jobs tablosunda tutulur, böylece tekrar eden istek
+hangi worker'a gelirse gelsin aynı işi görür ve ikinci bir iş başlatmaz.
+Biten sonuçlar EMOTION_DISTRIBUTION_CACHE_SECONDS boyunca dönülür; çalışan
+iş süresi dolmaz, sadece EMOTION_DISTRIBUTION_STALE_SECONDS boyunca heartbeat
+gelmezse (worker öldü) yeniden başlatılır.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.db.models import Emotion, EmotionDistributionJob, Movie
+from backend.services.recommender_service import RecommenderService, resolve_thresholds
+
+logger = logging.getLogger(__name__)
+
+SOURCE_AUTO = "auto"
+SOURCE_DATABASE = "database"
+SOURCE_MODEL = "model"
+SOURCES = (SOURCE_AUTO, SOURCE_DATABASE, SOURCE_MODEL)
+
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+_MAX_SQL_PARAMS = 1000  # PostgreSQL için güvenli IN listesi boyutu
+
+
+def _z_score(confidence: float) -> float:
+    from statistics import NormalDist
+
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def required_sample_size(population: int, confidence: float = 0.95, margin: float = 0.05) -> int:
+    """Bir oranı verilen güven ve hata payıyla tahmin etmek için gereken film sayısı."""
+    if population <= 0:
+        return 0
+    n0 = _z_score(confidence) ** 2 * 0.25 / margin ** 2
+    return min(population, math.ceil(n0 / (1 + (n0 - 1) / population)))
+
+
+def wilson_interval(successes: np.ndarray, n: int, confidence: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Oranlar için Wilson skor aralığı (alt, üst; 0-1)."""
+    z = _z_score(confidence)
+    p = successes / n
+    denominator = 1 + z ** 2 / n
+    center = (p + z ** 2 / (2 * n)) / denominator
+    half_width = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return np.clip(center - half_width, 0, 1), np.clip(center + half_width, 0, 1)
+
+
+def _summarize(emotion_counts: Dict[str, int], n_movies: int) -> Dict:
+    """Duygu sayılarından yanıtın ortak alanları (yüzdeler tahmin toplamına göre)."""
+    total_predictions = sum(emotion_counts.values())
+    emotion_percentages = {
+        emotion: round(count / total_predictions * 100, 2) if total_predictions else 0
+        for emotion, count in emotion_counts.items()
+    }
+    most_common_emotion = max(emotion_counts.items(), key=lambda x: x[1])[0] if total_predictions else None
+    return {
+        "total_movies_analyzed": n_movies,
+        "total_predictions": total_predictions,
+        "emotion_counts": emotion_counts,
+        "emotion_percentages": emotion_percentages,
+        "most_common_emotion": most_common_emotion,
+        "status": "success",
+    }
+
+
+def distribution_from_database(db: Session) -> Optional[Dict]:
+    """emotions tablosundaki etiketlerden dağılım; tablo boşsa None."""
+    labeled_movies = db.query(func.count(func.distinct(Emotion.movie_id))).scalar() or 0
+    if not labeled_movies:
+        return None
+    rows = db.query(Emotion.emotion_label, func.count(func.distinct(Emotion.movie_id)))\
+        .filter(Emotion.emotion_label.in_(settings.EMOTION_CATEGORIES))\
+        .group_by(Emotion.emotion_label).all()
+    emotion_counts = {emotion: 0 for emotion in settings.EMOTION_CATEGORIES}
+    emotion_counts.update({label: count for label, count in rows})
+    return {**_summarize(emotion_counts, labeled_movies), "source": SOURCE_DATABASE, "sampled": False}
+
+
+def _population_ids(db: Session, limit: int) -> np.ndarray:
+    """Overview'u olan ilk `limit` filmin ID'leri (movie_id sırasıyla)."""
+    rows = db.query(Movie.movie_id).filter(
+        Movie.overview.isnot(None),
+        Movie.overview != "",
+        Movie.overview != " "
+    ).order_by(Movie.movie_id).limit(limit).all()
+    return np.fromiter((row.movie_id for row in rows), dtype=np.int64, count=len(rows))
+
+
+def population_size(db: Session, limit: int) -> int:
+    count = db.query(func.count(Movie.movie_id)).filter(
+        Movie.overview.isnot(None),
+        Movie.overview != "",
+        Movie.overview != " "
+    ).scalar() or 0
+    return min(count, limit)
+
+
+def distribution_from_model(db: Session, recommender: RecommenderService, limit: int,
+                            confidence: float = 0.95, margin: float = 0.05, exact: bool = False,
+                            seed: Optional[int] = None, progress: Optional[Callable[[int], None]] = None) -> Dict:
+    """
+    İlk `limit` filmden (exact=False ise) rastgele örneklem çekip toplu tahminle
+    dağılımı hesaplar. Duygu seçimi /predict-emotions ile aynı otomatik eşiği kullanır.
+    progress verilirse her film grubundan sonra o ana kadar tahmin edilen film sayısıyla çağrılır.
+    """
+    population = _population_ids(db, limit)
+    n_population = len(population)
+    n_sample = n_population if exact else required_sample_size(n_population, confidence, margin)
+    sampled = n_sample < n_population
+    movie_ids = np.random.default_rng(seed).choice(population, n_sample, replace=False) if sampled else population
+
+    emotion_counts = {emotion: 0 for emotion in settings.EMOTION_CATEGORIES}
+    result = {"source": SOURCE_MODEL, "population_size": n_population, "sample_size": n_sample, "sampled": sampled}
+    if n_sample == 0:
+        return {**_summarize(emotion_counts, 0), **result}
+
+    labels = list(recommender.target_labels)
+    loaded = set(recommender.loaded_labels)
+    columns = [column for column, label in enumerate(labels) if label in loaded]
+    label_counts = np.zeros(len(columns), dtype=np.int64)
+    batch_size = settings.EMOTION_DISTRIBUTION_BATCH_SIZE
+    for start in range(0, n_sample, _MAX_SQL_PARAMS):
+        chunk = movie_ids[start:start + _MAX_SQL_PARAMS].tolist()
+        overviews = [row.overview for row in db.query(Movie.overview).filter(Movie.movie_id.in_(chunk))]
+        for batch_start in range(0, len(overviews), batch_size):
+            probs = recommender.predict_proba_batch(overviews[batch_start:batch_start + batch_size])[:, columns]
+            thresholds = resolve_thresholds(probs.astype(np.float64))
+            label_counts += (probs >= thresholds[:, None]).sum(axis=0)
+        if progress is not None:
+            progress(start + len(chunk))
+
+    for column, count in zip(columns, label_counts):
+        if labels[column] in emotion_counts:
+            emotion_counts[labels[column]] = int(count)
+    result["movie_percentages"] = {
+        emotion: round(count / n_sample * 100, 2) for emotion, count in emotion_counts.items()
+    }
+    if sampled:
+        counts = np.array(list(emotion_counts.values()), dtype=np.float64)
+        low, high = wilson_interval(counts, n_sample, confidence)
+        result.update(
+            confidence=confidence,
+            margin_of_error=margin,
+            confidence_intervals={
+                emotion: [round(float(lo) * 100, 2), round(float(hi) * 100, 2)]
+                for emotion, lo, hi in zip(emotion_counts, low, high)
+            },
+        )
+    return {**_summarize(emotion_counts, n_sample), **result}
+
+
+def _job_key(key: Tuple) -> str:
+    return "|".join(str(part) for part in key)
+
+
+def _cached_status(db: Session, job_key: str) -> Optional[Dict]:
+    """
+    İşin sonucunu veya durumunu tablodan okur. Süresi dolmuş sonuçlar ve
+    heartbeat'i kesilmiş çalışan işler silinir (None döner); hata bir kez
+    bildirilir, sonraki istek yeniden dener.
+    """
+    job = db.get(EmotionDistributionJob, job_key)
+    if job is None:
+        return None
+    now = datetime.utcnow()
+    expired = (
+        (job.state == JOB_DONE and job.finished_at < now - timedelta(seconds=settings.EMOTION_DISTRIBUTION_CACHE_SECONDS))
+        or (job.state == JOB_RUNNING
+            and job.updated_at < now - timedelta(seconds=settings.EMOTION_DISTRIBUTION_STALE_SECONDS))
+    )
+    status = None if expired else _job_status(job)
+    if expired or job.state == JOB_FAILED:
+        db.delete(job)
+        db.commit()
+    return status
+
+
+def _job_status(job: EmotionDistributionJob) -> Dict:
+    if job.state == JOB_DONE:
+        return json.loads(job.result)
+    status = {"status": job.state, "source": SOURCE_MODEL, "rows": job.rows,
+              "started_at": job.started_at.isoformat()}
+    if job.error:
+        status["error"] = job.error
+    return status
+
+
+def _store_result(db: Session, job_key: str, result: Dict) -> None:
+    now = datetime.utcnow()
+    job = db.get(EmotionDistributionJob, job_key)
+    if job is None:
+        job = EmotionDistributionJob(job_key=job_key, started_at=now)
+        db.add(job)
+    job.state, job.result, job.error = JOB_DONE, json.dumps(result), None
+    job.updated_at = job.finished_at = now
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # Aynı sonucu başka bir worker yazdı
+
+
+def _claim_job(db: Session, job_key: str, rows: int) -> Optional[EmotionDistributionJob]:
+    """
+    İşi "running" olarak kaydeder. Aynı anda başka bir worker kaydettiyse
+    None döner (o worker'ın işi kullanılır).
+    """
+    now = datetime.utcnow()
+    job = EmotionDistributionJob(job_key=job_key, state=JOB_RUNNING, rows=rows, started_at=now, updated_at=now)
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    return job
+
+
+def compute_emotion_distribution(db: Session, session_factory, recommender: RecommenderService, limit: int,
+                                 source: str = SOURCE_AUTO, confidence: float = 0.95, margin: float = 0.05,
+                                 exact: bool = False) -> Optional[Dict]:
+    """
+    Dağılımı döndürür: auto önce emotions tablosunu dener, boşsa modele
+    düşer. Büyük model hesapları arka planda başlatılır; o durumda dönen
+    sözlüğün status alanı "running" (veya "failed") olur ve aynı istek
+    (herhangi bir worker'da) tekrarlandığında sonuç döner. Model gerekiyor
+    ama hazır değilse None.
+    """
+    if source in (SOURCE_AUTO, SOURCE_DATABASE):
+        result = distribution_from_database(db)
+        if result is not None:
+            return result
+        if source == SOURCE_DATABASE:
+            return {**_summarize({emotion: 0 for emotion in settings.EMOTION_CATEGORIES}, 0),
+                    "source": SOURCE_DATABASE, "sampled": False,
+                    "message": "emotions tablosunda etiket bulunamadı"}
+
+    if not recommender.is_ready():
+        return None
+    job_key = _job_key((recommender.model_version, recommender.layout, limit, confidence, margin, exact))
+    status = _cached_status(db, job_key)
+    if status is not None:
+        return status
+
+    rows = population_size(db, limit)
+    if not exact:
+        rows = required_sample_size(rows, confidence, margin)
+    if rows <= settings.EMOTION_DISTRIBUTION_SYNC_ROWS:
+        result = distribution_from_model(db, recommender, limit, confidence, margin, exact)
+        _store_result(db, job_key, result)
+        return result
+
+    job = _claim_job(db, job_key, rows)
+    if job is None:
+        job = db.get(EmotionDistributionJob, job_key)
+        return _job_status(job) if job is not None else {"status": JOB_RUNNING, "source": SOURCE_MODEL, "rows": rows}
+    started_at = job.started_at
+
+    def _run():
+        job_db = session_factory()
+        start = time.perf_counter()
+
+        def _heartbeat(_done_rows: int) -> None:
+            job_db.query(EmotionDistributionJob).filter(EmotionDistributionJob.job_key == job_key)\
+                .update({"updated_at": datetime.utcnow()}, synchronize_session=False)
+            job_db.commit()
+
+        try:
+            result = distribution_from_model(job_db, recommender, limit, confidence, margin, exact,
+                                             progress=_heartbeat)
+            _store_result(job_db, job_key, {**result, "computed_at": datetime.utcnow().isoformat()})
+            logger.info(f"📊 Duygu dağılımı hesaplandı: {rows} film, {time.perf_counter() - start:.1f} sn")
+        except Exception as e:
+            logger.error(f"❌ Duygu dağılımı hesaplanamadı: {e}", exc_info=True)
+            job_db.rollback()
+            job_db.query(EmotionDistributionJob).filter(EmotionDistributionJob.job_key == job_key)\
+                .update({"state": JOB_FAILED, "error": str(e), "updated_at": datetime.utcnow()},
+                        synchronize_session=False)
+            job_db.commit()
+        finally:
+            job_db.close()
+
+    threading.Thread(target=_run, name="emotion-distribution", daemon=True).start()
+    return {"status": JOB_RUNNING, "source": SOURCE_MODEL, "rows": rows, "started_at": started_at.isoformat()}
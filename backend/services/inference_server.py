@@ -0,0 +1,177 @@
+"""
+Yerel çıkarım sunucusu: duygu modellerini tek süreçte bir kez yükler ve
+API süreçlerine Unix soket üzerinden hizmet verir.
+
+Her uvicorn/gunicorn worker'ı kendi model kopyasını yüklemek yerine
+INFERENCE_SERVER_SOCKET ayarlıysa RemoteBackend ile bu sunucuya gider
+(services/predictor_backends.py). Farklı bağlantılardan gelen istekler
+INFERENCE_MAX_WAIT_MS boyunca (en fazla INFERENCE_MAX_BATCH_ROWS satır)
+biriktirilip tek predict_proba_batch çağrısıyla tahmin edilir.
+
+    python -m backend.services.inference_server --socket /tmp/film_oneri_inference.sock
+    INFERENCE_SERVER_SOCKET=/tmp/film_oneri_inference.sock uvicorn backend.app:app --workers 8
+
+Sunucu kendi içinde RecommenderService kullanır; CURRENT izleme ile yeni
+model versiyonlarını kesintisiz yükler.
+"""
+
+import json
+import logging
+import os
+import queue
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from backend.config import settings
+from backend.services.predictor_backends import recv_frame, send_frame
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = "/tmp/film_oneri_inference.sock"
+
+
+class MicroBatcher:
+    """
+    Eşzamanlı istekleri toplayıp tek tahmin çağrısında birleştirir: ilk istek
+    geldikten sonra max_wait_ms kadar (veya max_batch_rows dolana kadar)
+    bekler, sonuç matrisini isteklere satır aralıklarıyla dağıtır.
+    """
+
+    def __init__(self, predict_fn, max_batch_rows: int, max_wait_ms: float):
+        self.predict_fn = predict_fn
+        self.max_batch_rows = max_batch_rows
+        self.max_wait_ms = max_wait_ms
+        self.batches = 0
+        self.rows = 0
+        self._pending: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        threading.Thread(target=self._run, name="inference-batcher", daemon=True).start()
+
+    def submit(self, texts: List[str]) -> Future:
+        future: Future = Future()
+        self._pending.put((texts, future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._pending.get()]
+            rows = len(batch[0][0])
+            deadline = time.perf_counter() + self.max_wait_ms / 1000
+            while rows < self.max_batch_rows:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                probs = self.predict_fn(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += len(texts)
+            offset = 0
+            for item_texts, future in batch:
+                future.set_result(probs[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+
+class _InferenceHandler(socketserver.BaseRequestHandler):
+    """Bir API bağlantısı: bağlantı kapanana kadar istek/yanıt döngüsü."""
+
+    def handle(self) -> None:
+        server: "InferenceServer" = self.server
+        while True:
+            try:
+                request = json.loads(recv_frame(self.request))
+            except (ConnectionError, OSError, ValueError):
+                return
+            try:
+                if request.get("op") == "predict":
+                    probs = server.batcher.submit(request["texts"]).result()
+                    probs = np.ascontiguousarray(probs, dtype=np.float32)
+                    send_frame(self.request, json.dumps({
+                        "rows": probs.shape[0], "cols": probs.shape[1], "version": server.service.model_version,
+                    }).encode())
+                    send_frame(self.request, probs.tobytes())
+                elif request.get("op") == "info":
+                    send_frame(self.request, json.dumps(server.info()).encode())
+                else:
+                    send_frame(self.request, json.dumps({"error": f"Bilinmeyen işlem: {request.get('op')}"}).encode())
+            except OSError:
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ Çıkarım isteği başarısız: {e}")
+                send_frame(self.request, json.dumps({"error": str(e)}).encode())
+
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, service, max_batch_rows: int, max_wait_ms: float):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # Önceki çalıştırmadan kalan soket
+        super().__init__(socket_path, _InferenceHandler)
+        self.socket_path = socket_path
+        self.service = service
+        self.batcher = MicroBatcher(service.predict_proba_batch, max_batch_rows, max_wait_ms)
+
+    def info(self) -> dict:
+        return {
+            "ready": self.service.is_ready(),
+            "layout": self.service.layout,
+            "version": self.service.model_version,
+            "target_labels": list(self.service.target_labels),
+            "loaded_labels": list(self.service.loaded_labels),
+            "pid": os.getpid(),
+            "batches": self.batcher.batches,
+            "batched_rows": self.batcher.rows,
+        }
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def serve(socket_path: Optional[str] = None) -> None:
+    """Modelleri yükler ve soketi dinlemeye başlar (Ctrl+C ile durur)."""
+    from backend.services.recommender_service import get_recommender_service, start_model_watch
+
+    socket_path = socket_path or settings.INFERENCE_SERVER_SOCKET or DEFAULT_SOCKET_PATH
+    # Sunucu modelleri kendisi yükler; kendi kendine bağlanmaya çalışmamalı
+    settings.INFERENCE_SERVER_SOCKET = ""
+    service = get_recommender_service()
+    if not service.is_ready():
+        logger.warning("⚠️ Model hazır değil; sunucu yine de başlıyor (info.ready=false)")
+    start_model_watch()
+
+    server = InferenceServer(socket_path, service, settings.INFERENCE_MAX_BATCH_ROWS, settings.INFERENCE_MAX_WAIT_MS)
+    logger.info(f"🧠 Çıkarım sunucusu hazır: {socket_path} ({service.layout}, {len(service.loaded_labels)} etiket)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Duygu modelleri için yerel çıkarım sunucusu (Unix soket)")
+    parser.add_argument('--socket', default=None, help='Soket yolu (varsayılan: INFERENCE_SERVER_SOCKET)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    serve(args.socket)
@@ -0,0 +1,179 @@
+"""
+movie_interaction_stats sayaçlarının bakımı.
+
+Sayaçlar create_history_item içinde, geçmiş kaydıyla aynı transaction'da
+tek bir ``INSERT ... ON CONFLICT DO UPDATE`` (artırma) veya ``UPDATE``
+(azaltma) ifadesiyle güncellenir; eşzamanlı istekler birbirinin artışını
+ezmez. Okuma, birincil anahtar üzerinden O(1)'dir.
+
+/by-emotions skorlamasındaki popülerlik terimi (popularity_scores) bu
+sayaçlardan gelir. Trend listeleri ise kayan pencerelerde (son 1/7/30 gün)
+sayım gerektirdiği için user_history üzerinde GROUP BY yapmaya devam eder;
+sayaçlar tüm zamanların toplamıdır ve pencereye bölünemez.
+
+Açılışta sayaçlar yalnızca tablo boşken doldurulur; user_history'ye sayaçları
+atlayan yollarla (elle SQL, toplu silme) yazıldıysa
+sayaçlar kayabilir ve kendiliğinden onarılmaz. Yeniden saymak için:
+
+    python -m backend.services.interaction_stats
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.db.models import MovieInteractionStats, UserHistory
+
+logger = logging.getLogger(__name__)
+
+# interaction -> sayaç kolonu
+COUNTER_COLUMNS = {"liked": "likes", "viewed": "views", "clicked": "clicks"}
+
+_MAX_SQL_PARAMS = 1000  # PostgreSQL için güvenli IN listesi boyutu
+
+
+def _upsert_statement(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(MovieInteractionStats)
+
+
+def record_interaction(db: Session, movie_id: int, interaction: Optional[str], delta: int) -> None:
+    """
+    Filmin sayaçlarını delta kadar değiştirir (commit çağıranın sorumluluğundadır).
+
+    Args:
+        movie_id: Film
+        interaction: liked / viewed / clicked (diğerleri sadece last_interaction günceller)
+        delta: +1 yeni kayıt, -1 silinen kayıt (toggle), 0 sadece zaman damgası
+    """
+    column_name = COUNTER_COLUMNS.get(interaction or "")
+    now = datetime.utcnow()
+    table = MovieInteractionStats.__table__
+    update = {"last_interaction": now}
+
+    if delta > 0:
+        if column_name:
+            update[column_name] = table.c[column_name] + delta
+        values = {"movie_id": movie_id, "likes": 0, "views": 0, "clicks": 0, "last_interaction": now}
+        if column_name:
+            values[column_name] = delta
+        stmt = _upsert_statement(db.bind.dialect.name)
+        if stmt is not None:
+            db.execute(stmt.values(**values).on_conflict_do_update(index_elements=["movie_id"], set_=update))
+            return
+        # ON CONFLICT desteklemeyen veritabanları: önce atomik UPDATE, satır yoksa INSERT
+        result = db.execute(table.update().where(table.c.movie_id == movie_id).values(**update))
+        if result.rowcount == 0:
+            db.execute(table.insert().values(**values))
+        return
+
+    if column_name and delta < 0:
+        # Sayaç sıfırın altına düşmez
+        column = table.c[column_name]
+        update[column_name] = case((column + delta < 0, 0), else_=column + delta)
+    db.execute(table.update().where(table.c.movie_id == movie_id).values(**update))
+
+
+def get_interaction_stats(db: Session, movie_ids: Iterable[int]) -> Dict[int, MovieInteractionStats]:
+    """Verilen filmlerin sayaçlarını birincil anahtar üzerinden tek sorguda döndürür."""
+    ids = list(movie_ids)
+    if not ids:
+        return {}
+    rows = db.query(MovieInteractionStats).filter(MovieInteractionStats.movie_id.in_(ids)).all()
+    return {row.movie_id: row for row in rows}
+
+
+def popularity_scores(db: Session, movie_ids: Sequence[int]) -> np.ndarray:
+    """
+    Adayların sayaçlardan popülerlik skoru: ALS_INTERACTION_WEIGHTS ağırlıklı
+    etkileşim toplamının log1p'si, adaylar içindeki en yükseğe bölünerek [0, 1].
+    Sayaç satırı olmayan filmler 0 alır. movie_ids sırasıyla döner.
+    """
+    scores = np.zeros(len(movie_ids), dtype=np.float32)
+    if not movie_ids:
+        return scores
+    weights = settings.ALS_INTERACTION_WEIGHTS
+    weighted = (
+        MovieInteractionStats.likes * weights.get("liked", 0)
+        + MovieInteractionStats.views * weights.get("viewed", 0)
+        + MovieInteractionStats.clicks * weights.get("clicked", 0)
+    )
+    position = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+    ids = list(position)
+    for start in range(0, len(ids), _MAX_SQL_PARAMS):
+        rows = db.query(MovieInteractionStats.movie_id, weighted)\
+            .filter(MovieInteractionStats.movie_id.in_(ids[start:start + _MAX_SQL_PARAMS])).all()
+        for movie_id, value in rows:
+            scores[position[movie_id]] = value or 0.0
+    scores = np.log1p(np.maximum(scores, 0))
+    top = scores.max()
+    return scores / top if top > 0 else scores
+
+
+def rebuild_interaction_stats(db: Session) -> int:
+    """
+    Sayaçları user_history'den sıfırdan hesaplar (ilk kurulum veya tutarsızlık
+    sonrası tek seferlik). Yazılan film sayısını döndürür.
+    """
+    def count_of(interaction: str):
+        return func.sum(case((UserHistory.interaction == interaction, 1), else_=0))
+
+    rows = (
+        db.query(
+            UserHistory.movie_id,
+            count_of("liked"),
+            count_of("viewed"),
+            count_of("clicked"),
+            func.max(UserHistory.watch_date),
+        )
+        .group_by(UserHistory.movie_id)
+        .all()
+    )
+    db.query(MovieInteractionStats).delete(synchronize_session=False)
+    db.bulk_insert_mappings(MovieInteractionStats, [
+        {"movie_id": movie_id, "likes": likes or 0, "views": views or 0, "clicks": clicks or 0,
+         "last_interaction": last}
+        for movie_id, likes, views, clicks, last in rows
+    ])
+    db.commit()
+    logger.info(f"📊 Etkileşim sayaçları user_history'den yeniden hesaplandı: {len(rows)} film")
+    return len(rows)
+
+
+def ensure_interaction_stats(session_factory) -> None:
+    """
+    Sayaç tablosu boşken geçmiş kaydı varsa bir kez doldurur (uygulama açılışında).
+    Dolu tabloyu kontrol etmez; kaymış sayaçlar için modül komutuyla yeniden sayılır.
+    """
+    db = session_factory()
+    try:
+        has_stats = db.query(MovieInteractionStats.movie_id).first() is not None
+        has_history = db.query(UserHistory.history_id).first() is not None
+        if not has_stats and has_history:
+            rebuild_interaction_stats(db)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Etkileşim sayaçları hazırlanamadı: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    from backend.db.connection import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        print(rebuild_interaction_stats(session))
+    finally:
+        session.close()
@@ -0,0 +1,223 @@
+"""
+user_history üzerinde örtük geri bildirimli (implicit) ALS matris ayrıştırma modeli.
+
+Model çevrimdışı eğitilir (bkz. ml/als_train.py). Kullanıcı ve film faktörleri
+diskte float32 memmap olarak tutulur; istek sırasında bir kullanıcının tüm
+adaylarını skorlamak tek bir matris-vektör çarpımıdır. Eğitimden sonra
+kaydolan kullanıcılar için faktör, geçmişinden "fold-in" ile (tek bir f×f
+doğrusal sistem) hesaplanır ve ALS_FOLD_IN_CACHE_SECONDS boyunca önbellekte
+tutulur. Yeniden eğitilen model (meta.json'un değişme zamanı) bir sonraki
+istekte yüklenir; als_train dosyaları yerinde değil rename ile yazdığı için
+eski modeli kullanan istekler eski memmap'leri okumaya devam eder.
+
+Dizin yapısı (ALS_MODEL_DIR):
+    user_factors.f32   (n_users, f) float32
+    item_factors.f32   (n_items, f) float32
+    user_ids.npy       (n_users,) int64
+    movie_ids.npy      (n_items,) int64
+    meta.json          {"factors": ..., "regularization": ..., "alpha": ..., ...}
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.db.models import UserHistory
+
+logger = logging.getLogger(__name__)
+
+USER_FACTORS_FILE = "user_factors.f32"
+ITEM_FACTORS_FILE = "item_factors.f32"
+USER_IDS_FILE = "user_ids.npy"
+MOVIE_IDS_FILE = "movie_ids.npy"
+META_FILE = "meta.json"
+
+
+def interaction_weight(interaction: Optional[str]) -> float:
+    """Etkileşim tipinin güven ağırlığı (liked > viewed > clicked)."""
+    return settings.ALS_INTERACTION_WEIGHTS.get(interaction or "", 0.0)
+
+
+def solve_factor(
+    factors: np.ndarray,
+    gram: np.ndarray,
+    rows: np.ndarray,
+    confidence: np.ndarray,
+    regularization: float,
+) -> np.ndarray:
+    """
+    Implicit ALS'de tek bir satırın (kullanıcı veya film) faktörünü çözer.
+
+    (YᵀY + Yᵢᵀ(Cᵢ − I)Yᵢ + λI) x = Yᵢᵀ Cᵢ pᵢ   (pᵢ = 1 gözlenen satırlarda)
+
+    Args:
+        factors: Karşı tarafın faktör matrisi (Y)
+        gram: YᵀY (tüm satırlar için bir kez hesaplanır)
+        rows: Gözlenen etkileşimlerin Y içindeki satırları
+        confidence: Bu etkileşimlerin güveni (1 + α·ağırlık)
+        regularization: λ
+    """
+    n_factors = factors.shape[1]
+    if rows.size == 0:
+        return np.zeros(n_factors, dtype=np.float32)
+    observed = np.asarray(factors[rows], dtype=np.float64)
+    a = gram + (observed.T * (confidence - 1.0)) @ observed
+    a[np.diag_indices(n_factors)] += regularization
+    b = observed.T @ confidence
+    return np.linalg.solve(a, b).astype(np.float32)
+
+
+class ALSModel:
+    """Memmap faktör matrisleri üzerinde skorlama ve yeni kullanıcılar için fold-in."""
+
+    def __init__(
+        self,
+        user_factors: np.ndarray,
+        item_factors: np.ndarray,
+        user_ids: np.ndarray,
+        movie_ids: np.ndarray,
+        meta: Dict,
+    ):
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self.meta = meta
+        self._user_rows = {int(uid): i for i, uid in enumerate(user_ids)}
+        self._item_rows = {int(mid): i for i, mid in enumerate(movie_ids)}
+        self.regularization = float(meta.get("regularization", settings.ALS_REGULARIZATION))
+        self.alpha = float(meta.get("alpha", settings.ALS_ALPHA))
+        # Fold-in için YᵀY bir kez hesaplanır (f×f)
+        items = np.asarray(item_factors, dtype=np.float64)
+        self._gram = items.T @ items
+        # user_id -> (fold-in faktörü veya None, son geçerlilik)
+        self._folded: "OrderedDict[int, Tuple[Optional[np.ndarray], float]]" = OrderedDict()
+        self._folded_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, model_dir: str) -> "ALSModel":
+        with open(os.path.join(model_dir, META_FILE), encoding="utf-8") as f:
+            meta: Dict = json.load(f)
+        n_users, n_items, n_factors = int(meta["n_users"]), int(meta["n_items"]), int(meta["factors"])
+        user_factors = np.memmap(os.path.join(model_dir, USER_FACTORS_FILE), dtype=np.float32, mode="r",
+                                 shape=(n_users, n_factors))
+        item_factors = np.memmap(os.path.join(model_dir, ITEM_FACTORS_FILE), dtype=np.float32, mode="r",
+                                 shape=(n_items, n_factors))
+        user_ids = np.load(os.path.join(model_dir, USER_IDS_FILE))
+        movie_ids = np.load(os.path.join(model_dir, MOVIE_IDS_FILE))
+        return cls(user_factors, item_factors, user_ids, movie_ids, meta)
+
+    def fold_in(self, interactions: Iterable[Tuple[int, str]]) -> Optional[np.ndarray]:
+        """
+        Eğitimde görülmemiş bir kullanıcının faktörünü geçmişinden hesaplar.
+
+        Args:
+            interactions: (movie_id, interaction) çiftleri
+
+        Returns:
+            Optional[np.ndarray]: Kullanıcı faktörü; modelde bilinen ve ağırlığı
+            sıfırdan büyük film yoksa None
+        """
+        weights: Dict[int, float] = {}
+        for movie_id, interaction in interactions:
+            row = self._item_rows.get(movie_id)
+            if row is not None:
+                weights[row] = weights.get(row, 0.0) + interaction_weight(interaction)
+        # Eğitimdeki güven matrisi sıfır ağırlıkları (ör. disliked) düşürür (eliminate_zeros)
+        weights = {row: weight for row, weight in weights.items() if weight > 0}
+        if not weights:
+            return None
+        rows = np.fromiter(weights.keys(), dtype=np.int64, count=len(weights))
+        confidence = 1.0 + self.alpha * np.fromiter(weights.values(), dtype=np.float64, count=len(weights))
+        return solve_factor(self.item_factors, self._gram, rows, confidence, self.regularization)
+
+    def user_vector(self, db: Session, user_id: int) -> Optional[np.ndarray]:
+        """
+        Eğitilmiş kullanıcı faktörü; kullanıcı modelde yoksa geçmişinden fold-in
+        (sonuç ALS_FOLD_IN_CACHE_SECONDS boyunca önbellekten döner).
+        """
+        row = self._user_rows.get(user_id)
+        if row is not None:
+            return np.asarray(self.user_factors[row])
+        now = time.monotonic()
+        with self._folded_lock:
+            cached = self._folded.get(user_id)
+            if cached is not None and cached[1] > now:
+                self._folded.move_to_end(user_id)
+                return cached[0]
+        history = db.query(UserHistory.movie_id, UserHistory.interaction).filter(
+            UserHistory.user_id == user_id
+        ).all()
+        vector = self.fold_in(history)
+        if settings.ALS_FOLD_IN_CACHE_SECONDS > 0:
+            with self._folded_lock:
+                self._folded[user_id] = (vector, now + settings.ALS_FOLD_IN_CACHE_SECONDS)
+                self._folded.move_to_end(user_id)
+                while len(self._folded) > settings.ALS_FOLD_IN_CACHE_USERS:
+                    self._folded.popitem(last=False)
+        return vector
+
+    def invalidate(self, user_id: int) -> None:
+        """Kullanıcının önbellekteki fold-in faktörünü düşürür (geçmişi değişti)."""
+        with self._folded_lock:
+            self._folded.pop(user_id, None)
+
+    def score(self, user_vector: np.ndarray, movie_ids: Sequence[int]) -> np.ndarray:
+        """Aday filmleri tek matris-vektör çarpımıyla skorlar (modelde olmayan filmler 0)."""
+        rows = np.fromiter((self._item_rows.get(mid, -1) for mid in movie_ids), dtype=np.int64, count=len(movie_ids))
+        known = rows >= 0
+        scores = np.zeros(len(movie_ids), dtype=np.float32)
+        if known.any():
+            scores[known] = np.asarray(self.item_factors[rows[known]]) @ user_vector
+        return scores
+
+
+_model: Optional[ALSModel] = None
+_model_mtime: Optional[int] = -1  # -1: henüz bakılmadı; None: model yok
+_model_lock = threading.Lock()
+
+
+def _meta_mtime(model_dir: str) -> Optional[int]:
+    try:
+        return os.stat(os.path.join(model_dir, META_FILE)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_als_model() -> Optional[ALSModel]:
+    """
+    ALS modelini döndürür; model henüz eğitilmemişse None (python backend/ml/als_train.py).
+    meta.json değiştiyse (yeniden eğitim) model yeniden yüklenir.
+    """
+    global _model, _model_mtime
+    model_dir = settings.ALS_MODEL_DIR
+    mtime = _meta_mtime(model_dir)
+    if mtime == _model_mtime:
+        return _model
+    with _model_lock:
+        if mtime == _model_mtime:
+            return _model
+        model = None
+        if mtime is not None:
+            try:
+                model = ALSModel.load(model_dir)
+                logger.info(f"🧮 ALS modeli yüklendi: {model_dir} ({model.meta.get('n_users')} kullanıcı, "
+                            f"{model.meta.get('n_items')} film, {model.meta.get('factors')} faktör)")
+            except Exception as e:
+                logger.error(f"❌ ALS modeli yüklenemedi: {e}")
+        else:
+            logger.info(f"ℹ️ ALS modeli bulunamadı: {model_dir}")
+        _model, _model_mtime = model, mtime
+    return _model
+
+
+def invalidate_user_vector(user_id: int) -> None:
+    """POST /history sonrası kullanıcının fold-in önbelleğini düşürür (model yüklü değilse no-op)."""
+    if _model is not None:
+        _model.invalidate(user_id)
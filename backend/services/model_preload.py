@@ -0,0 +1,150 @@
+"""
+Çok worker'lı sunucularda modelleri fork öncesi bir kez yükleme
+(gunicorn preload_app; bkz. backend/gunicorn.conf.py).
+
+Master süreç modelleri yükler, sentetik bir tahminle tembel başlatmaları
+(import'lar, ilk çağrı önbellekleri) fork öncesine çeker, ardından
+gc.freeze() ile tüm nesneleri kalıcı nesile taşır: worker'lardaki çöp
+toplayıcı bu nesnelerin başlıklarına yazmadığı için sayfalar copy-on-write
+ile paylaşılmaya devam eder. Yüklemeden sonra predictor'lar değiştirilmez;
+MODEL_PRELOAD açıkken worker'larda CURRENT izleme (hot reload) çalışmaz,
+yeni versiyon için master yeniden başlatılır.
+
+Worker açılışında check_worker_sharing() /proc/self/smaps_rollup'tan
+worker'ın özel belleğini (USS) okur ve model belleğinin paylaşılıp
+paylaşılmadığını kontrol eder.
+"""
+
+import gc
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Master'da preload_models() doldurur; fork ile worker'lara aynen geçer
+PRELOAD_STATS: Dict = {}
+
+_SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def read_memory_rollup(pid: Optional[int] = None) -> Dict[str, float]:
+    """
+    Sürecin bellek özeti (MB, Linux /proc/<pid>/smaps_rollup):
+    rss, pss, shared (başka süreçlerle paylaşılan), uss (sadece bu sürece ait).
+    Okunamazsa boş sözlük.
+    """
+    values = {}
+    try:
+        with open(f"/proc/{pid or 'self'}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in _SMAPS_FIELDS:
+                    values[key] = int(rest.split()[0]) / 1024
+    except (OSError, ValueError, IndexError):
+        return {}
+    if len(values) != len(_SMAPS_FIELDS):
+        return {}
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "shared": values["Shared_Clean"] + values["Shared_Dirty"],
+        "uss": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def preload_models(freeze: bool = True) -> Dict:
+    """
+    Modelleri bu süreçte (gunicorn master) yükler, bir sentetik toplu tahmin
+    yapar ve gc.freeze() çağırır (freeze=False sadece karşılaştırma içindir).
+    Model belleği (yükleme öncesi/sonrası RSS farkı) PRELOAD_STATS'a yazılır.
+    """
+    from backend.services.recommender_service import get_recommender_service
+
+    if settings.INFERENCE_SERVER_SOCKET:
+        # Soket bağlantıları fork'la paylaşılamaz; worker'lar kendi havuzlarını kurar
+        logger.info("ℹ️ INFERENCE_SERVER_SOCKET ayarlı, modeller çıkarım sunucusunda; preload atlandı")
+        return PRELOAD_STATS
+    if not settings.PERSIST_MODELS:
+        logger.warning("⚠️ PERSIST_MODELS kapalı: predictor'lar tahmin anında diskten yükleneceği "
+                       "için worker'larda paylaşılmayan bellek oluşur")
+
+    start = time.perf_counter()
+    before = read_memory_rollup()
+    service = get_recommender_service()
+    if not service.is_ready():
+        logger.warning("⚠️ Modeller yüklenemedi; worker'lar model olmadan başlayacak")
+        return PRELOAD_STATS
+    # İlk çağrının tembel başlatmaları (import, önbellek) fork öncesi yapılsın
+    service.warm_up()
+    gc.collect()
+    if freeze:
+        gc.freeze()
+    after = read_memory_rollup()
+
+    PRELOAD_STATS.update({
+        "pid": os.getpid(),
+        "layout": service.layout,
+        "version": service.model_version,
+        "model_mb": round(after.get("rss", 0.0) - before.get("rss", 0.0), 1),
+        "master_rss_mb": round(after.get("rss", 0.0), 1),
+        "frozen_objects": gc.get_freeze_count(),
+        "seconds": round(time.perf_counter() - start, 2),
+    })
+    logger.info(f"🧊 Modeller fork öncesi yüklendi{' ve donduruldu' if freeze else ''}: {service.layout}, "
+                f"~{PRELOAD_STATS['model_mb']:.0f} MB, {PRELOAD_STATS['frozen_objects']} nesne, "
+                f"{PRELOAD_STATS['seconds']:.1f} sn")
+    return PRELOAD_STATS
+
+
+def model_memory_report() -> Dict:
+    """
+    Bu sürecin bellek özeti ve (preload yapıldıysa) model belleğinin
+    paylaşılan kısmının tahmini. Tahmin muhafazakârdır: worker'ın tüm özel
+    belleği (USS) modele aitmiş gibi sayılır.
+    """
+    memory = read_memory_rollup()
+    report = {"pid": os.getpid(), "memory_mb": {key: round(value, 1) for key, value in memory.items()}}
+    if not PRELOAD_STATS:
+        report["preloaded"] = False
+        return report
+    model_mb = PRELOAD_STATS["model_mb"]
+    report.update(preloaded=True, forked=os.getpid() != PRELOAD_STATS["pid"], model_mb=model_mb)
+    if memory and model_mb > 0:
+        report["model_shared_ratio"] = round(max(0.0, 1.0 - memory["uss"] / model_mb), 3)
+    return report
+
+
+def check_worker_sharing() -> Dict:
+    """
+    Worker açılışında (gunicorn post_worker_init) model belleğinin master
+    ile paylaşıldığını doğrular; paylaşım PRELOAD_MIN_SHARED_RATIO'nun
+    altındaysa uyarı loglar.
+    """
+    from backend.services.recommender_service import RecommenderService
+
+    report = model_memory_report()
+    if not report.get("preloaded"):
+        logger.warning(f"⚠️ Worker {report['pid']}: modeller fork öncesi yüklenmemiş, "
+                       f"her worker kendi kopyasını yükleyecek")
+        return report
+    bundle = RecommenderService._bundle
+    if bundle is None or not bundle.is_ready():
+        logger.warning(f"⚠️ Worker {report['pid']}: master'dan devralınan model hazır değil")
+        return report
+
+    ratio = report.get("model_shared_ratio")
+    memory = report["memory_mb"]
+    if ratio is None:
+        logger.info(f"🧊 Worker {report['pid']}: model belleği ölçülemedi "
+                    f"(model ~{report['model_mb']:.0f} MB, RSS {memory.get('rss', 0):.0f} MB)")
+    elif ratio < settings.PRELOAD_MIN_SHARED_RATIO:
+        logger.warning(f"⚠️ Worker {report['pid']}: model belleğinin sadece %{ratio * 100:.0f}'i paylaşılıyor "
+                       f"(USS {memory['uss']:.0f} MB, model ~{report['model_mb']:.0f} MB)")
+    else:
+        logger.info(f"🧊 Worker {report['pid']}: model belleği paylaşılıyor (%{ratio * 100:.0f}; "
+                    f"RSS {memory['rss']:.0f} MB, PSS {memory['pss']:.0f} MB, USS {memory['uss']:.0f} MB)")
+    return report
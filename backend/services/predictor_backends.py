@@ -0,0 +1,276 @@
+"""
+Duygu olasılığı hesaplayan tahmin motorları (backend'ler).
+
+RecommenderService modele doğrudan değil, ortak bir arayüze gider:
+
+    backend.predict_proba_batch(texts) -> (len(texts), len(target_labels)) float32
+
+    per_label     etiket başına AutoGluon TabularPredictor
+    multi_output  tek scikit-learn modeli (TF-IDF + one-vs-rest)
+    fake          model dosyası gerektirmeyen, metnin hash'inden deterministik
+                  olasılık üreten ve ayarlanabilir gecikme ekleyen sahte motor
+                  (MODEL_LAYOUT=fake; uçtan uca yük testi ve profilleme için)
+    remote        modelleri tek kopya tutan yerel çıkarım sunucusu
+                  (services/inference_server.py) ile Unix soket üzerinden konuşur
+
+Soket protokolü: her mesaj 4 baytlık (big-endian) uzunluk + gövde. İstek
+gövdesi JSON ({"op": "predict", "texts": [...]} veya {"op": "info"}); yanıt
+JSON başlık, predict için ardından ham float32 (satır öncelikli) matris.
+predict başlığı sunucunun model versiyonunu da taşır; istemci versiyon
+değişince (sunucuda hot reload) info'yu yeniden çeker.
+"""
+
+import hashlib
+import json
+import logging
+import queue
+import socket
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LAYOUT_PER_LABEL = "per_label"
+LAYOUT_MULTI_OUTPUT = "multi_output"
+LAYOUT_FAKE = "fake"
+LAYOUT_REMOTE = "remote"
+
+_FRAME_HEADER = struct.Struct(">I")
+
+
+def send_frame(conn: socket.socket, payload: bytes) -> None:
+    conn.sendall(_FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(conn: socket.socket, size: int) -> bytearray:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = conn.recv_into(view[received:], size - received)
+        if count == 0:
+            raise ConnectionError("Bağlantı kapandı")
+        received += count
+    # bytearray: np.frombuffer ile kopyasız ve yazılabilir dizi
+    return buffer
+
+
+def recv_frame(conn: socket.socket) -> bytearray:
+    (size,) = _FRAME_HEADER.unpack(_recv_exact(conn, _FRAME_HEADER.size))
+    return _recv_exact(conn, size)
+
+
+class PredictorBackend:
+    """Tahmin motoru arayüzü."""
+
+    name = "base"
+
+    def __init__(self, target_labels: List[str]):
+        self.target_labels = list(target_labels)
+
+    def close(self) -> None:
+        """Motorun tuttuğu kaynakları (bağlantılar) bırakır; yerel motorlarda bir şey yapmaz."""
+
+    @property
+    def loaded_labels(self) -> List[str]:
+        """Olasılığı hesaplanabilen etiketler."""
+        return list(self.target_labels)
+
+    def is_ready(self) -> bool:
+        return True
+
+    def predict_proba_batch(self, texts: List[str]) -> np.ndarray:
+        """(len(texts), len(target_labels)) float32 olasılık matrisi."""
+        raise NotImplementedError
+
+
+class AutoGluonBackend(PredictorBackend):
+    """Etiket başına bir TabularPredictor; eksik predictor'ların sütunu 0 kalır."""
+
+    name = LAYOUT_PER_LABEL
+
+    def __init__(self, target_labels: List[str], predictors: Dict[str, "TabularPredictor"]):
+        super().__init__(target_labels)
+        self.predictors = predictors
+
+    @property
+    def loaded_labels(self) -> List[str]:
+        return [label for label in self.target_labels if label in self.predictors]
+
+    def predict_proba_batch(self, texts: List[str]) -> np.ndarray:
+        probs = np.zeros((len(texts), len(self.target_labels)), dtype=np.float32)
+        if not texts:
+            return probs
+
+        import pandas as pd
+
+        data_dict = {'overview': list(texts)}
+        for label in self.target_labels:
+            data_dict[label] = 0
+        input_df = pd.DataFrame(data_dict)
+
+        for column, label in enumerate(self.target_labels):
+            predictor = self.predictors.get(label)
+            if predictor is None:
+                continue
+            try:
+                # P(1) olasılığını al (duygunun var olma olasılığı)
+                proba_df = predictor.predict_proba(input_df)
+                if not proba_df.empty and len(proba_df.columns) >= 2:
+                    probs[:, column] = proba_df.iloc[:, 1].to_numpy(dtype=np.float32)
+            except Exception as e:
+                logger.warning(f"⚠️ {label} olasılık hatası: {e}")
+        return probs
+
+
+class MultiOutputBackend(PredictorBackend):
+    """Tüm etiketler için tek scikit-learn modeli (predict_proba → (n, n_etiket))."""
+
+    name = LAYOUT_MULTI_OUTPUT
+
+    def __init__(self, target_labels: List[str], model):
+        super().__init__(target_labels)
+        self.model = model
+
+    def predict_proba_batch(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, len(self.target_labels)), dtype=np.float32)
+        return np.asarray(self.model.predict_proba(list(texts)), dtype=np.float32)
+
+
+class FakeBackend(PredictorBackend):
+    """
+    Model gerektirmeyen deterministik motor: aynı metin her zaman aynı
+    olasılıkları alır (blake2b hash'i). Her çağrıya latency_ms, her satıra
+    row_latency_ms kadar bekleme eklenerek gerçek modelin maliyeti taklit edilir.
+    """
+
+    name = LAYOUT_FAKE
+
+    def __init__(self, target_labels: List[str], latency_ms: float = 0.0, row_latency_ms: float = 0.0):
+        super().__init__(target_labels)
+        self.latency_ms = latency_ms
+        self.row_latency_ms = row_latency_ms
+
+    def predict_proba_batch(self, texts: List[str]) -> np.ndarray:
+        delay_ms = self.latency_ms + self.row_latency_ms * len(texts)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+        n_labels = len(self.target_labels)
+        digests = b"".join(
+            hashlib.blake2b((text or "").encode("utf-8"), digest_size=n_labels).digest() for text in texts
+        )
+        return (np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), n_labels) / 255.0).astype(np.float32)
+
+
+class RemoteBackend(PredictorBackend):
+    """
+    Çıkarım sunucusuna Unix soket üzerinden giden motor. Bağlantılar havuzda
+    tutulur (en fazla pool_size eşzamanlı istek); kopan bağlantı bir kez yeniden
+    kurulur. Satırlar sunucu tarafında diğer API süreçlerinin istekleriyle
+    birlikte toplu tahmine girer.
+
+    Sunucu bilgisi (hazır olma, versiyon, etiketler) info_ttl saniyede bir ve
+    predict yanıtındaki versiyon değiştiğinde yeniden çekilir: sunucu
+    bağlanıldığında henüz hazır değilse veya modeli yeniden yüklediyse istemci
+    bunu görür. Sunucuya ulaşılamazsa hazır değil sayılır.
+    """
+
+    name = LAYOUT_REMOTE
+
+    def __init__(self, socket_path: str, pool_size: int = 4, timeout: float = 30.0, info_ttl: float = 5.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.info_ttl = info_ttl
+        self._idle: "queue.LifoQueue[socket.socket]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._info = self._call({"op": "info"})[0]
+        self._info_at = time.monotonic()
+        super().__init__(self._info["target_labels"])
+
+    @property
+    def info(self) -> Dict:
+        """Sunucu bilgisi; info_ttl geçtiyse veya versiyon değiştiyse yeniden çekilir."""
+        if time.monotonic() - self._info_at > self.info_ttl:
+            self.refresh_info()
+        return self._info
+
+    def refresh_info(self) -> Dict:
+        self._info_at = time.monotonic()
+        try:
+            info = self._call({"op": "info"})[0]
+        except (OSError, RuntimeError, ValueError) as e:
+            logger.warning(f"⚠️ Çıkarım sunucusu bilgisi alınamadı ({self.socket_path}): {e}")
+            self._info = {**self._info, "ready": False}
+            return self._info
+        if info.get("version") != self._info.get("version"):
+            logger.info(f"🔌 Çıkarım sunucusu model versiyonu: {self._info.get('version')} → {info.get('version')}")
+        self._info = info
+        self.target_labels = list(info["target_labels"])
+        return info
+
+    def _connect(self) -> socket.socket:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.settimeout(self.timeout)
+        conn.connect(self.socket_path)
+        return conn
+
+    def _call(self, request: Dict) -> Tuple[Dict, Optional[bytearray]]:
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+            for attempt in range(2):
+                try:
+                    if conn is None:
+                        conn = self._connect()
+                    send_frame(conn, json.dumps(request).encode("utf-8"))
+                    header = json.loads(recv_frame(conn))
+                    # Matris sadece başarılı predict yanıtında gelir
+                    payload = recv_frame(conn) if request["op"] == "predict" and "error" not in header else None
+                    self._idle.put(conn)
+                    break
+                except OSError:
+                    # Sunucu yeniden başlamış olabilir: bağlantıyı bir kez tazele
+                    if conn is not None:
+                        conn.close()
+                    conn = None
+                    if attempt:
+                        raise
+                except Exception:
+                    # Bozuk çerçeve / JSON (ValueError) vb.: akışın neresinde kalındığı belirsiz,
+                    # bağlantı havuza geri konmaz
+                    if conn is not None:
+                        conn.close()
+                    raise
+        if "error" in header:
+            raise RuntimeError(f"Çıkarım sunucusu hatası: {header['error']}")
+        return header, payload
+
+    @property
+    def loaded_labels(self) -> List[str]:
+        return list(self.info["loaded_labels"])
+
+    def is_ready(self) -> bool:
+        return bool(self.info.get("ready"))
+
+    def predict_proba_batch(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, len(self.target_labels)), dtype=np.float32)
+        header, payload = self._call({"op": "predict", "texts": list(texts)})
+        if "version" in header and header["version"] != self._info.get("version"):
+            self._info_at = 0.0  # Sunucu modeli değişti: sonraki erişimde info yenilensin
+        return np.frombuffer(payload, dtype=np.float32).reshape(header["rows"], header["cols"])
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
@@ -0,0 +1,107 @@
+"""
+Öneri listesini yeniden sıralama (re-ranking) yardımcıları.
+
+Maximal Marginal Relevance (MMR): her adımda, alaka skoru yüksek ama
+önceden seçilmiş filmlere benzemeyen filmi seçer:
+
+    MMR(i) = λ · rel(i) − (1 − λ) · max_{j ∈ S} sim(i, j)
+
+Benzerlik, duygu olasılık vektörü + tür (genre) multi-hot vektörünün
+kosinüs benzerliğidir. Seçilen her film için tüm havuza karşı tek bir
+matris-vektör çarpımı yapılır ve "en yakın seçilmiş" benzerliği artımlı
+olarak güncellenir; toplam maliyet O(k · n · d).
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+def split_genres(genre: Optional[str]) -> List[str]:
+    """'Action, Drama' biçimindeki genre string'ini listeye çevirir."""
+    if not genre:
+        return []
+    return [g.strip() for g in genre.split(",") if g.strip()]
+
+
+def emotion_matrix(emotion_probs: Sequence[Dict[str, float]], labels: Sequence[str]) -> np.ndarray:
+    """{duygu: olasılık} sözlüklerinden (n, len(labels)) float32 matris oluşturur."""
+    matrix = np.zeros((len(emotion_probs), len(labels)), dtype=np.float32)
+    label_index = {label: j for j, label in enumerate(labels)}
+    for i, probs in enumerate(emotion_probs):
+        for label, prob in probs.items():
+            j = label_index.get(label)
+            if j is not None:
+                matrix[i, j] = prob
+    return matrix
+
+
+def genre_matrix(genres: Iterable[Optional[str]], vocabulary: Optional[List[str]] = None) -> np.ndarray:
+    """Genre string'lerinden (n, |vocabulary|) multi-hot float32 matris oluşturur."""
+    genre_lists = [split_genres(g) for g in genres]
+    if vocabulary is None:
+        vocabulary = sorted({g for gl in genre_lists for g in gl})
+    genre_index = {g: j for j, g in enumerate(vocabulary)}
+    matrix = np.zeros((len(genre_lists), len(vocabulary)), dtype=np.float32)
+    for i, gl in enumerate(genre_lists):
+        for g in gl:
+            j = genre_index.get(g)
+            if j is not None:
+                matrix[i, j] = 1.0
+    return matrix
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def build_features(emotions: np.ndarray, genres: np.ndarray, genre_weight: float = 0.5) -> np.ndarray:
+    """
+    Duygu ve tür bloklarını ayrı ayrı normalize edip birleştirir;
+    satırlar birim uzunlukta döner (nokta çarpımı = kosinüs benzerliği).
+    """
+    blocks = [_normalize_rows(emotions.astype(np.float32, copy=False))]
+    if genres.size and genre_weight > 0:
+        blocks.append(_normalize_rows(genres.astype(np.float32, copy=False)) * genre_weight)
+    return _normalize_rows(np.hstack(blocks))
+
+
+def mmr_rerank(relevance: np.ndarray, features: np.ndarray, k: int, lambda_: float = 0.7) -> List[int]:
+    """
+    MMR ile havuzdan k adet indeks seçer (seçim sırasıyla döner).
+
+    Args:
+        relevance: (n,) alaka skorları
+        features: (n, d) satırları birim uzunlukta özellik matrisi
+        k: Seçilecek eleman sayısı
+        lambda_: 1.0 saf alaka sıralaması, 0.0 saf çeşitlilik
+
+    Returns:
+        List[int]: Seçilen indeksler
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    # Seçilmiş kümeye en yüksek benzerlik (başta küme boş)
+    max_sim = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected: List[int] = []
+
+    for step in range(k):
+        if step == 0:
+            scores = relevance.copy()
+        else:
+            scores = lambda_ * relevance - (1.0 - lambda_) * max_sim
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        # Artımlı güncelleme: sadece yeni seçilen filme olan benzerlik hesaplanır
+        np.maximum(max_sim, features @ features[best], out=max_sim)
+
+    return selected
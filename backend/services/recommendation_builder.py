@@ -0,0 +1,539 @@
+"""
+Duygu seçimine göre öneri listesi hesaplama.
+
+POST /recommendation/by-emotions ve login sırasındaki ön-hesaplama
+(recommendation_cache.prefetch_recommendations) aynı çekirdeği kullanır;
+bu yüzden router'da değil servis katmanında durur.
+"""
+
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Optional
+
+import numpy as np
+from sqlalchemy import desc, func, or_
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.db.models import Emotion, Movie
+from backend.schemas.recommendation import (
+    MovieEmotionScore,
+    RecommendationRequest,
+    RecommendationResponse,
+    RecommendationResponseItem,
+)
+from backend.services.collaborative import get_cooccurrence_index
+from backend.services.interaction_stats import popularity_scores
+from backend.services.matrix_factorization import get_als_model
+from backend.services.ranking import build_features, emotion_matrix, genre_matrix, mmr_rerank
+from backend.services.recommender_service import RecommenderService
+from backend.services.seen_filter import contains as contains_seen, get_seen_filter, not_seen_clause
+from backend.utils.helpers import measure
+
+logger = logging.getLogger(__name__)
+
+# Sıcak yol projeksiyonları: tam Movie ORM nesnesi yerine sadece gereken kolonlar.
+# Skorlama aşamasında overview gibi geniş kolonlar taşınmaz; aday filmler için
+# overview sadece model tahmini için gereklidir; yanıt kolonları top-k için ayrıca çekilir.
+_SCORING_COLUMNS = (Movie.movie_id, Movie.vote_average, Movie.genre)
+_CANDIDATE_COLUMNS = _SCORING_COLUMNS + (Movie.overview,)
+DETAIL_COLUMNS = (
+    Movie.movie_id,
+    Movie.title,
+    Movie.overview,
+    Movie.poster_url,
+    Movie.release_date,
+    Movie.vote_average,
+    Movie.genre,
+)
+
+
+def build_recommendations(
+    request: RecommendationRequest,
+    db: Session,
+    recommender: RecommenderService,
+    user_id: Optional[int],
+) -> RecommendationResponse:
+    """
+    Seçilen duygulara göre öneri listesini hesaplar (/by-emotions ve login ön-hesaplamasının ortak çekirdeği).
+    
+    ÇEŞİTLİLİK STRATEJİSİ:
+    1. Kullanıcının daha önce izlediği/beğendiği filmleri hariç tutar (user_id varsa)
+    2. Karma aday havuzu: Popüler + Rastgele + Yeni filmler karışımı
+    3. Paralel işleme ile hızlı analiz (9000+ film için optimize)
+    4. Kullanıcının geçmişinden item-item işbirlikçi filtreleme ve ALS skoru eklenir (user_id varsa)
+    5. Final top-k, MMR (Maximal Marginal Relevance) ile çeşitlendirilir (diversity_lambda)
+    """
+    start_time = time.time()
+    
+    # ===== 1. KULLANICI GEÇMİŞİNİ AL (HARİÇ TUTMAK İÇİN) =====
+    # Sıralı uint32 dizi (LRU önbellekte, POST /history ile güncel); etiketli filmler bellekte maskelenir,
+    # LIMIT'li aday sorgularında ise aynı koşul SQL'de NOT EXISTS olarak uygulanır
+    seen_filter = get_seen_filter()
+    seen_movie_ids = seen_filter.get(db, user_id) if user_id else np.empty(0, dtype=np.uint32)
+    if seen_movie_ids.size:
+        logger.info(f"Kullanıcı geçmişi: {seen_movie_ids.size} film hariç tutulacak.")
+    
+    # ===== 2. VERİTABANINDAN ETİKETLENMİŞ FİLMLERİ ÇEK =====
+    logger.info(f"Seçilen duygular: {request.selected_emotions}")
+    
+    emotion_filters = [Emotion.emotion_label == emotion 
+                      for emotion in request.selected_emotions]
+    
+    # Sadece skorlama için gereken dar kolonlar (overview/poster vb. sadece final top-k için yüklenir)
+    query = db.query(*_SCORING_COLUMNS, Emotion.emotion_label)\
+        .join(Emotion, Movie.movie_id == Emotion.movie_id)\
+        .filter(or_(*emotion_filters))\
+        .order_by(Movie.movie_id)
+
+    with measure("by-emotions: etiketli filmler", logger):
+        results = query.all()
+
+    # Kullanıcı geçmişini hariç tut
+    if seen_movie_ids.size and results:
+        seen_mask = contains_seen(seen_movie_ids, np.fromiter((row.movie_id for row in results), dtype=np.int64))
+        results = [row for row, seen in zip(results, seen_mask) if not seen]
+
+    movie_emotions_map = {}
+    movies_map = {}
+
+    for row in results:
+        movie_id = row.movie_id
+        movies_map[movie_id] = row
+
+        if movie_id not in movie_emotions_map:
+            movie_emotions_map[movie_id] = set()
+        if row.emotion_label:
+            movie_emotions_map[movie_id].add(row.emotion_label)
+    
+    movies_from_db = list(movies_map.values())
+    logger.info(f"Veritabanından {len(movies_from_db)} film bulundu (kullanıcı geçmişi hariç).")
+    
+    # ===== 3. VERİTABANI FİLMLERİNİ SKORLA =====
+    scored_movies = []
+    for movie in movies_from_db:
+        movie_id = movie.movie_id
+        movie_emotion_set = movie_emotions_map.get(movie_id, set())
+        
+        # OLASILIK AĞIRLIKLI SIMILARITY (veritabanı filmleri için)
+        intersection = len(movie_emotion_set.intersection(set(request.selected_emotions)))
+        union = len(movie_emotion_set.union(set(request.selected_emotions)))
+        jaccard_similarity = intersection / union if union > 0 else 0
+        
+        # Veritabanı filmleri için: Eşleşen duygu sayısı / Seçilen duygu sayısı
+        # (Tüm eşleşen duygular %100 güvenilir olduğu için)
+        prob_weighted = intersection / len(request.selected_emotions) if request.selected_emotions else 0
+        
+        # İkisini birleştir (olasılık ağırlıklı daha önemli)
+        similarity = (prob_weighted * 0.7) + (jaccard_similarity * 0.3)
+        
+        emotion_scores = []
+        for emotion in movie_emotion_set:
+            if emotion in request.selected_emotions:
+                emotion_scores.append(
+                    MovieEmotionScore(
+                        emotion=emotion,
+                        score=1.0,
+                        percentage="100%"
+                    )
+                )
+        
+        scored_movies.append({
+            "movie": movie,
+            "similarity_score": similarity,
+            "predicted_emotions": list(movie_emotion_set),
+            "emotion_scores": emotion_scores,
+            "matched_emotions": list(movie_emotion_set.intersection(set(request.selected_emotions))),
+            "source": "database",
+            "confidence": 0.9,
+            # Veritabanı etiketleri kesin kabul edilir (MMR özellik vektörü için)
+            "emotion_probs": {emotion: 1.0 for emotion in movie_emotion_set}
+        })
+    
+    # ===== 4. KARMA STRATEJİ: POPÜLER + RASTGELE + YENİ =====
+    scored_movie_ids = {m["movie"].movie_id for m in scored_movies}
+    # Kullanıcı geçmişi ID listesi olarak SQL'e gönderilmez; aday sorgularına NOT EXISTS eklenir
+    seen_clause = not_seen_clause(user_id) if user_id else None
+    
+    # SQL parametre limiti sorununu önlemek için: Eğer çok fazla ID varsa, sadece son 1000'ini kullan
+    # (Zaten veritabanından gelen filmler zaten skorlandı, sadece yeni filmler için filtreleme yapıyoruz)
+    MAX_SQL_PARAMS = 1000  # PostgreSQL için güvenli limit
+    excluded_ids_list = list(scored_movie_ids)
+    if len(excluded_ids_list) > MAX_SQL_PARAMS:
+        # Son 1000 ID'yi kullan (en yeni eklenenler)
+        excluded_ids_list = excluded_ids_list[-MAX_SQL_PARAMS:]
+        logger.warning(f"Çok fazla hariç tutulacak film var ({len(scored_movie_ids)}). Son {MAX_SQL_PARAMS} tanesi kullanılıyor.")
+    
+    # Toplam kaç film var? (entity yüklemeden, doğrudan COUNT)
+    base_query = db.query(func.count(Movie.movie_id)).filter(
+        Movie.overview.isnot(None),
+        Movie.overview != "",
+        Movie.overview != " "
+    )
+    if excluded_ids_list:
+        base_query = base_query.filter(~Movie.movie_id.in_(excluded_ids_list))
+    if seen_clause is not None:
+        base_query = base_query.filter(seen_clause)
+    total_movies_count = base_query.scalar() or 0
+    
+    logger.info(f"Toplam {total_movies_count} aday film mevcut (skorlanan {len(scored_movie_ids)} ve kullanıcı geçmişi hariç).")
+    
+    # ===== GENRE FİLTRELEME: Seçilen duygulara göre uygun genre'ları bul =====
+    preferred_genres = set()
+    for emotion in request.selected_emotions:
+        if emotion in settings.EMOTION_GENRE_MAP:
+            preferred_genres.update(settings.EMOTION_GENRE_MAP[emotion])
+    
+    logger.info(f"Seçilen duygular için uygun genre'lar: {preferred_genres}")
+    
+    # Genre filtreleme helper fonksiyonu
+    def add_genre_filter(query):
+        """Genre filtreleme ekler (opsiyonel - eğer genre varsa)"""
+        if preferred_genres:
+            # Genre string'inde bu genre'lardan herhangi biri var mı?
+            genre_filters = [Movie.genre.ilike(f"%{genre}%") for genre in preferred_genres]
+            return query.filter(or_(*genre_filters))
+        return query
+    
+    # ===== STRATEJİ 1: POPÜLER FİLMLER (%30) - Genre'e uygun + Rastgele karıştırılmış =====
+    popular_count = int(request.max_recommendations * 0.3)
+    popular_query = db.query(*_CANDIDATE_COLUMNS).filter(
+        Movie.overview.isnot(None),
+        Movie.overview != "",
+        Movie.overview != " "
+    )
+    if excluded_ids_list:
+        popular_query = popular_query.filter(~Movie.movie_id.in_(excluded_ids_list))
+    if seen_clause is not None:
+        popular_query = popular_query.filter(seen_clause)
+    
+    # Önce genre'e uygun filmleri al (öncelikli)
+    popular_with_genre = add_genre_filter(popular_query)
+    popular_movies = popular_with_genre.order_by(
+        desc(Movie.vote_average),
+        desc(Movie.popularity)
+    ).limit(popular_count * 5).all()
+    
+    # Eğer yeterli film yoksa, genre'e uygun olmayanları da ekle
+    if len(popular_movies) < popular_count * 3:
+        popular_without_genre = popular_query.filter(
+            ~or_(*[Movie.genre.ilike(f"%{genre}%") for genre in preferred_genres]) if preferred_genres else True
+        ).order_by(
+            desc(Movie.vote_average),
+            desc(Movie.popularity)
+        ).limit((popular_count * 3) - len(popular_movies)).all()
+        popular_movies.extend(popular_without_genre)
+    
+    # Rastgele karıştır
+    random.shuffle(popular_movies)
+    popular_movies = popular_movies[:popular_count * 3]  # İlk 3 katını al
+    
+    # ===== STRATEJİ 2: RASTGELE FİLMLER (%50) - Genre'e uygun + Tamamen rastgele =====
+    random_count = int(request.max_recommendations * 0.5)
+    random_query = db.query(*_CANDIDATE_COLUMNS).filter(
+        Movie.overview.isnot(None),
+        Movie.overview != "",
+        Movie.overview != " "
+    )
+    if excluded_ids_list:
+        random_query = random_query.filter(~Movie.movie_id.in_(excluded_ids_list))
+    if seen_clause is not None:
+        random_query = random_query.filter(seen_clause)
+    
+    # Önce genre'e uygun filmleri al (öncelikli)
+    random_with_genre = add_genre_filter(random_query)
+    try:
+        random_movies = random_with_genre.order_by(func.random()).limit(random_count * 3).all()
+    except:
+        random_offset = random.randint(0, max(0, total_movies_count - random_count * 3))
+        random_movies = random_with_genre.order_by(Movie.movie_id).offset(random_offset).limit(random_count * 3).all()
+    
+    # Eğer yeterli film yoksa, genre'e uygun olmayanları da ekle
+    if len(random_movies) < random_count * 3:
+        random_without_genre = random_query.filter(
+            ~or_(*[Movie.genre.ilike(f"%{genre}%") for genre in preferred_genres]) if preferred_genres else True
+        )
+        try:
+            additional = random_without_genre.order_by(func.random()).limit((random_count * 3) - len(random_movies)).all()
+        except:
+            random_offset = random.randint(0, max(0, total_movies_count - random_count * 3))
+            additional = random_without_genre.order_by(Movie.movie_id).offset(random_offset).limit((random_count * 3) - len(random_movies)).all()
+        random_movies.extend(additional)
+    
+    # ===== STRATEJİ 3: YENİ FİLMLER (%20) - Genre'e uygun + Rastgele karıştırılmış =====
+    new_count = int(request.max_recommendations * 0.2)
+    new_query = db.query(*_CANDIDATE_COLUMNS).filter(
+        Movie.overview.isnot(None),
+        Movie.overview != "",
+        Movie.overview != " "
+    )
+    if excluded_ids_list:
+        new_query = new_query.filter(~Movie.movie_id.in_(excluded_ids_list))
+    if seen_clause is not None:
+        new_query = new_query.filter(seen_clause)
+    
+    # Önce genre'e uygun filmleri al (öncelikli)
+    new_with_genre = add_genre_filter(new_query)
+    new_movies = new_with_genre.order_by(desc(Movie.release_date)).limit(new_count * 5).all()
+    
+    # Eğer yeterli film yoksa, genre'e uygun olmayanları da ekle
+    if len(new_movies) < new_count * 3:
+        new_without_genre = new_query.filter(
+            ~or_(*[Movie.genre.ilike(f"%{genre}%") for genre in preferred_genres]) if preferred_genres else True
+        ).order_by(desc(Movie.release_date)).limit((new_count * 3) - len(new_movies)).all()
+        new_movies.extend(new_without_genre)
+    
+    # Rastgele karıştır
+    random.shuffle(new_movies)
+    new_movies = new_movies[:new_count * 3]  # İlk 3 katını al
+    
+    # Tüm aday filmleri birleştir (tekrarları kaldır)
+    all_candidate_movies = {}
+    for movie in popular_movies + random_movies + new_movies:
+        if movie.movie_id not in all_candidate_movies:
+            all_candidate_movies[movie.movie_id] = movie
+    
+    candidate_movies = list(all_candidate_movies.values())
+    # Aday filmleri de rastgele karıştır (ek çeşitlilik için)
+    random.shuffle(candidate_movies)
+    
+    logger.info(f"Karma strateji: {len(popular_movies)} popüler, {len(random_movies)} rastgele, {len(new_movies)} yeni = Toplam {len(candidate_movies)} aday film (rastgele karıştırıldı).")
+    
+    # ===== 5. PARALEL İŞLEME =====
+    def process_movie(movie) -> Optional[Dict[str, Any]]:
+        """Tek bir aday film satırı (_CANDIDATE_COLUMNS) için tahmin yapar."""
+        try:
+            predicted_emotions, emotion_probs, _ = recommender.predict_emotions_with_proba(
+                movie.overview,
+                auto_threshold=False,
+                custom_threshold=request.emotion_threshold
+            )
+            
+            predicted_set = set(predicted_emotions)
+            requested_set = set(request.selected_emotions)
+            
+            # ===== OLASILIK AĞIRLIKLI SIMILARITY HESAPLAMA =====
+            if predicted_set and requested_set:
+                # 1. Jaccard Similarity (hangi duygular eşleşti)
+                intersection = len(predicted_set.intersection(requested_set))
+                union = len(predicted_set.union(requested_set))
+                jaccard_similarity = intersection / union if union > 0 else 0
+                
+                # 2. OLASILIK AĞIRLIKLI SIMILARITY (eşleşen duyguların olasılıklarının ortalaması)
+                matched_probs = [emotion_probs.get(e, 0) for e in request.selected_emotions 
+                               if e in predicted_set]
+                prob_weighted_similarity = sum(matched_probs) / len(request.selected_emotions) if matched_probs else 0
+                
+                # 3. İKİSİNİ BİRLEŞTİR (olasılık daha önemli - %70, Jaccard %30)
+                similarity = (prob_weighted_similarity * 0.7) + (jaccard_similarity * 0.3)
+            else:
+                similarity = 0
+            
+            if similarity >= request.min_similarity_threshold:
+                # Eşleşen duyguların ortalama olasılığı (confidence için)
+                matched_probs = [emotion_probs.get(e, 0) for e in predicted_emotions 
+                               if e in request.selected_emotions]
+                avg_confidence = sum(matched_probs) / len(matched_probs) if matched_probs else 0
+                
+                emotion_scores = []
+                for emotion, prob in emotion_probs.items():
+                    if emotion in predicted_emotions and prob > 0:
+                        emotion_scores.append(
+                            MovieEmotionScore(
+                                emotion=emotion,
+                                score=round(prob, 3),
+                                percentage=f"{prob*100:.1f}%"
+                            )
+                        )
+                emotion_scores.sort(key=lambda x: x.score, reverse=True)
+                
+                return {
+                    "movie": movie,
+                    "similarity_score": similarity,
+                    "predicted_emotions": predicted_emotions,
+                    "emotion_scores": emotion_scores,
+                    "matched_emotions": list(predicted_set.intersection(requested_set)),
+                    "source": "model",
+                    "confidence": round(avg_confidence, 3),
+                    "emotion_probs": emotion_probs
+                }
+            return None
+            
+        except Exception as e:
+            logger.warning(f"Film {movie.movie_id} için tahmin yapılamadı: {str(e)}")
+            return None
+    
+    # Paralel işleme
+    processed_count = 0
+    found_count = 0
+    
+    # Eğer aday film yoksa, paralel işlemeyi atla
+    if not candidate_movies:
+        logger.info("Aday film bulunamadı, paralel işleme atlanıyor.")
+    else:
+        max_workers = max(1, min(6, len(candidate_movies)))  # En az 1 olmalı
+        target_count = request.max_recommendations * 3
+        
+        logger.info(f"Paralel işleme: {max_workers} thread, {len(candidate_movies)} film...")
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_movie = {
+                executor.submit(process_movie, movie): movie 
+                for movie in candidate_movies
+            }
+            
+            for future in as_completed(future_to_movie):
+                processed_count += 1
+                result = future.result()
+                
+                if result is not None:
+                    scored_movies.append(result)
+                    found_count += 1
+                
+                if processed_count % 50 == 0:
+                    logger.info(
+                        f"İlerleme: {processed_count}/{len(candidate_movies)} film analiz edildi, "
+                        f"{found_count} uygun film bulundu."
+                    )
+                
+                if len(scored_movies) >= target_count:
+                    logger.info(f"Yeterli film bulundu ({len(scored_movies)}), analiz durduruluyor.")
+                    break
+    
+    elapsed_time = time.time() - start_time
+    logger.info(
+        f"Analiz tamamlandı: {processed_count} film işlendi, "
+        f"{found_count} uygun film bulundu, toplam {len(scored_movies)} film skorlandı. "
+        f"Süre: {elapsed_time:.2f} saniye."
+    )
+    
+    # ===== 6. SKORLAMA VE SIRALAMA =====
+    # Kişisel sinyal: kullanıcının geçmişindeki filmlerin item-item komşuları (O(profil × k))
+    cf_scores = get_cooccurrence_index().score_for_user(user_id) if user_id else {}
+    if cf_scores:
+        logger.info(f"İşbirlikçi filtreleme: {len(cf_scores)} komşu film skorlandı.")
+
+    # ALS faktör skoru: tüm adaylar için tek matris-vektör çarpımı, [0, 1]'e ölçeklenir
+    mf_scores = np.zeros(len(scored_movies), dtype=np.float32)
+    als_model = get_als_model() if user_id and scored_movies else None
+    if als_model is not None:
+        user_vector = als_model.user_vector(db, user_id)
+        if user_vector is not None:
+            raw = als_model.score(user_vector, [rec["movie"].movie_id for rec in scored_movies])
+            spread = raw.max() - raw.min()
+            if spread > 0:
+                mf_scores = (raw - raw.min()) / spread
+
+    # Popülerlik: movie_interaction_stats sayaçlarından (birincil anahtar okuması, GROUP BY yok)
+    popularity = np.zeros(len(scored_movies), dtype=np.float32)
+    if settings.POPULARITY_WEIGHT and scored_movies:
+        with measure("by-emotions: popülerlik sayaçları", logger):
+            popularity = popularity_scores(db, [rec["movie"].movie_id for rec in scored_movies])
+
+    for position, rec in enumerate(scored_movies):
+        movie = rec["movie"]
+        base_score = rec["similarity_score"]  # Artık olasılık ağırlıklı similarity
+        
+        rating_bonus = 0
+        if movie.vote_average:
+            rating_bonus = (movie.vote_average - 5.0) / 20.0
+        
+        # OLASILIK DEĞERLERİNE DAHA FAZLA AĞIRLIK VER
+        # Confidence (ortalama olasılık) daha önemli
+        confidence_bonus = rec.get("confidence", 0) * 0.3  # 0.1'den 0.3'e çıkarıldı (3 kat artırıldı)
+        
+        # GENRE BONUSU: Film'in genre'u seçilen duygulara uygun mu?
+        genre_bonus = 0
+        if preferred_genres and movie.genre:
+            movie_genres = [g.strip() for g in movie.genre.split(",")] if movie.genre else []
+            # Film'in genre'u ile uygun genre'lar arasında eşleşme var mı?
+            matching_genres = [g for g in movie_genres if any(pref_genre.lower() in g.lower() or g.lower() in pref_genre.lower() for pref_genre in preferred_genres)]
+            if matching_genres:
+                # Eşleşen genre sayısına göre bonus (max 0.15)
+                genre_bonus = min(0.15, len(matching_genres) * 0.05)
+        
+        # Veritabanından gelenler için küçük bonus
+        database_bonus = 0.02 if rec.get("source") == "database" else 0
+
+        # Benzer kullanıcıların birlikte izlediği/beğendiği filmler için kişisel bonus
+        cf_bonus = settings.CF_WEIGHT * cf_scores.get(movie.movie_id, 0.0)
+        mf_bonus = settings.MF_WEIGHT * float(mf_scores[position])
+        # Çok beğenilen/izlenen filmler için küçük bonus
+        popularity_bonus = settings.POPULARITY_WEIGHT * float(popularity[position])
+        
+        rec["final_score"] = (
+            base_score + rating_bonus + confidence_bonus + genre_bonus + database_bonus + cf_bonus + mf_bonus
+            + popularity_bonus
+        )
+    
+    # ===== ÇEŞİTLİLİK: MMR İLE YENİDEN SIRALAMA =====
+    # Rastgele karıştırma yerine: alaka skoru yüksek ama birbirine benzemeyen
+    # (duygu + tür vektörleri) filmler seçilir. Sadece gösterilecek top-k hesaplanır.
+    diversity_lambda = (
+        request.diversity_lambda if request.diversity_lambda is not None else settings.MMR_LAMBDA
+    )
+    if scored_movies:
+        with measure("by-emotions: MMR yeniden sıralama", logger):
+            relevance = np.array([rec["final_score"] for rec in scored_movies], dtype=np.float32)
+            features = build_features(
+                emotion_matrix([rec.get("emotion_probs", {}) for rec in scored_movies], settings.EMOTION_CATEGORIES),
+                genre_matrix([rec["movie"].genre for rec in scored_movies]),
+                genre_weight=settings.MMR_GENRE_WEIGHT,
+            )
+            selected = mmr_rerank(relevance, features, request.max_recommendations, diversity_lambda)
+        scored_movies = [scored_movies[i] for i in selected]
+    
+    # ===== 7. YANITI FORMATLA =====
+    # Geniş kolonlar (overview, poster_url, title...) sadece final top-k için tek sorguda yüklenir
+    top_recs = scored_movies[:request.max_recommendations]
+    with measure("by-emotions: top-k detayları", logger):
+        detail_rows = db.query(*DETAIL_COLUMNS).filter(
+            Movie.movie_id.in_([rec["movie"].movie_id for rec in top_recs])
+        ).all() if top_recs else []
+    details_map = {row.movie_id: row for row in detail_rows}
+
+    recommendations = []
+    for rec in top_recs:
+        movie = details_map.get(rec["movie"].movie_id)
+        if movie is None:
+            continue
+        
+        release_year = None
+        if movie.release_date:
+            release_year = movie.release_date.year
+        
+        genres_list = []
+        if movie.genre:
+            genres_list = [g.strip() for g in movie.genre.split(",")]
+        
+        recommendations.append(
+            RecommendationResponseItem(
+                movie_id=movie.movie_id,
+                title=movie.title,
+                overview=movie.overview[:200] + "..." if len(movie.overview) > 200 else movie.overview,
+                similarity_score=round(rec["similarity_score"], 3),
+                predicted_emotions=rec["predicted_emotions"],
+                emotion_scores=rec["emotion_scores"],
+                matched_emotions=rec["matched_emotions"],
+                poster_url=movie.poster_url,
+                release_year=release_year,
+                rating=movie.vote_average,
+                genres=genres_list if genres_list else None,
+                confidence=round(rec.get("confidence", 0), 3)
+            )
+        )
+    
+    total_time = time.time() - start_time
+    logger.info(f"Toplam {len(recommendations)} öneri döndürülüyor. Süre: {total_time:.2f} saniye.")
+    
+    return RecommendationResponse(
+        selected_emotions=request.selected_emotions,
+        total_recommendations=len(recommendations),
+        recommendations=recommendations,
+        threshold_used=request.emotion_threshold,
+        min_similarity_threshold=request.min_similarity_threshold,
+        status="success",
+        model_type="autogluon_multi_label"
+    )
@@ -0,0 +1,128 @@
+"""
+Kullanıcı başına kısa ömürlü (TTL) öneri önbelleği.
+
+Login sırasında kullanıcının kayıtlı ruh hali (User.mood) için hesaplanan
+öneriler ve /by-emotions yanıtları burada tutulur; aynı istek tekrarlandığında
+(MoodSelection → RecommendedMovies) hesaplama yapılmadan döner. Kullanıcının
+geçmişi değiştiğinde (POST /history) kaydı düşürülür.
+
+Önbellek worker başınadır; POST /history başka bir worker'a gittiyse bu
+worker'ın kaydı haberdar olmaz. Bu yüzden her kayıt hesaplandığı andaki
+geçmiş sürümüyle (kullanıcının user_history kayıt sayısı ve son history_id)
+saklanır ve okurken sürüm veritabanıyla karşılaştırılır.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.db.models import UserHistory
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple
+HistoryVersion = Tuple[int, int]
+
+
+def recommendation_cache_key(request) -> CacheKey:
+    """RecommendationRequest'i sıradan bağımsız, hashlenebilir bir anahtara çevirir."""
+    return (
+        tuple(sorted(set(request.selected_emotions))),
+        request.max_recommendations,
+        request.min_similarity_threshold,
+        request.emotion_threshold,
+        request.diversity_lambda,
+    )
+
+
+def history_version(db: Session, user_id: int) -> HistoryVersion:
+    """Kullanıcının geçmiş sürümü: (user_history kayıt sayısı, en büyük history_id)."""
+    count, max_id = db.query(func.count(UserHistory.history_id), func.max(UserHistory.history_id))\
+        .filter(UserHistory.user_id == user_id).one()
+    return count or 0, max_id or 0
+
+
+class RecommendationCache:
+    """user_id → (istek anahtarı, geçmiş sürümü, yanıt, son geçerlilik) eşlemesi tutan sınırlı LRU."""
+
+    def __init__(self, ttl_seconds: float, capacity: int):
+        self.ttl_seconds = ttl_seconds
+        self.capacity = capacity
+        self._entries: "OrderedDict[int, Tuple[CacheKey, HistoryVersion, Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, key: CacheKey, version: HistoryVersion) -> Optional[Any]:
+        """Kayıt yoksa, süresi dolduysa, istek farklıysa veya geçmiş değiştiyse None."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            cached_key, cached_version, value, expires_at = entry
+            if expires_at < time.monotonic() or cached_version != version:
+                del self._entries[user_id]
+                return None
+            if cached_key != key:
+                return None
+            self._entries.move_to_end(user_id)
+            return value
+
+    def put(self, user_id: int, key: CacheKey, version: HistoryVersion, value: Any) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (key, version, value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+_cache: Optional[RecommendationCache] = None
+
+
+def get_recommendation_cache() -> RecommendationCache:
+    """Süreç genelinde tek RecommendationCache örneğini döndürür."""
+    global _cache
+    if _cache is None:
+        _cache = RecommendationCache(settings.RECOMMENDATION_CACHE_TTL_SECONDS, settings.RECOMMENDATION_CACHE_MAX_USERS)
+    return _cache
+
+
+def prefetch_recommendations(user_id: int, mood: str) -> None:
+    """
+    Kullanıcının kayıtlı ruh hali için önerileri arka planda hesaplayıp önbelleğe yazar
+    (login sonrası BackgroundTasks ile çağrılır; kendi veritabanı oturumunu açar).
+
+    Öneri servisi burada, görev çalışırken alınır: login isteği model yüklemez.
+    """
+    from backend.db.connection import SessionLocal
+    from backend.schemas.recommendation import RecommendationRequest
+    from backend.services.recommendation_builder import build_recommendations
+    from backend.services.recommender_service import get_recommender_service
+    from backend.utils.helpers import measure
+
+    if mood not in settings.EMOTION_CATEGORIES:
+        return
+    recommender = get_recommender_service()
+    if not recommender.is_ready():
+        return
+    request = RecommendationRequest(selected_emotions=[mood])
+    db = SessionLocal()
+    try:
+        version = history_version(db, user_id)
+        with measure(f"login ön-hesaplama (kullanıcı {user_id}, {mood})", logger):
+            response = build_recommendations(request, db, recommender, user_id)
+        get_recommendation_cache().put(user_id, recommendation_cache_key(request), version, response)
+    except Exception as e:
+        logger.warning(f"⚠️ Login ön-hesaplaması başarısız (kullanıcı {user_id}): {e}")
+    finally:
+        db.close()
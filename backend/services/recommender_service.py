@@ -1,37 +1,409 @@
+import gc
+import hashlib
+import importlib.util
+import json
+import logging
 import os
+import pickle
+import shutil
 import sys
-import joblib
-import pandas as pd
+import threading
+import time
+from datetime import datetime
+
 import numpy as np
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 
-# AutoGluon import'ları
-try:
-    from autogluon.tabular import TabularPredictor
-    ML_LIBRARIES_AVAILABLE = True
-except ImportError:
-    ML_LIBRARIES_AVAILABLE = False
-    print("⚠️ UYARI: AutoGluon kütüphanesi kurulu değil. Tahmin servisi devre dışı.")
+from backend.config import settings
+from backend.services.predictor_backends import (
+    LAYOUT_FAKE, LAYOUT_MULTI_OUTPUT, LAYOUT_PER_LABEL, LAYOUT_REMOTE,
+    AutoGluonBackend, FakeBackend, MultiOutputBackend, PredictorBackend, RemoteBackend,
+)
+
+logger = logging.getLogger(__name__)
+
+
+
+def _autogluon_installed() -> bool:
+    try:
+        return importlib.util.find_spec("autogluon.tabular") is not None
+    except ModuleNotFoundError:
+        return False
+
+
+# AutoGluon (ve joblib/pandas) sadece modeller yüklenirken import edilir; API'nin
+# ve CLI'ların açılışı ML kütüphanelerinin import süresini ödemez.
+ML_LIBRARIES_AVAILABLE = _autogluon_installed()
+
+
+# Model klasörü (varsayılan backend/ml/model; EMOTION_MODEL_DIR ile değiştirilebilir)
+MODEL_DIR = os.path.abspath(settings.EMOTION_MODEL_DIR)
+BINARIZER_FILE = "multi_label_binarizer.pkl"
+BINARIZER_PATH = os.path.join(MODEL_DIR, BINARIZER_FILE)
+# Tek artifact'lı çoklu çıkışlı model (automl_train.py --mode multi-output)
+MULTI_OUTPUT_MODEL_FILE = "multi_output_model.joblib"
+MULTI_OUTPUT_MODEL_PATH = os.path.join(MODEL_DIR, MULTI_OUTPUT_MODEL_FILE)
+
+# Tek dosyalık paket (automl_train.py --package): tüm predictor'lar + binarizer tek
+# pickle'da, etiketler/eşikler/özellik şeması ve sha256 yanındaki manifest'te
+BUNDLE_FILE = "model_bundle.pkl"
+BUNDLE_MANIFEST_FILE = "model_bundle.json"
+BUNDLE_FORMAT_VERSION = 1
+
+# Versiyonlu düzen: versions/<versiyon>/ altında model klasörleri, CURRENT aktif versiyonu gösterir.
+# CURRENT yoksa modeller doğrudan MODEL_DIR'den yüklenir (eski düzen).
+MODEL_VERSIONS_DIR = os.path.join(MODEL_DIR, "versions")
+CURRENT_VERSION_PATH = os.path.join(MODEL_DIR, "CURRENT")
+
+
+
+
+def resolve_thresholds(probs: np.ndarray, auto_threshold: bool = True,
+                       custom_threshold: Optional[float] = None) -> np.ndarray:
+    """
+    Her satır (film) için duygu kabul eşiğini belirler.
+
+    Otomatik modda: en yüksek olasılık > 0.7 ise 0.5, > 0.4 ise max(0.3, ortalama·0.8),
+    aksi halde 0.2; sonuç [0.2, 0.6] aralığına kırpılır.
+
+    Args:
+        probs: (n_film, n_duygu) olasılık matrisi
+        auto_threshold: True ise otomatik threshold, False ise custom_threshold
+        custom_threshold: Manuel threshold değeri (varsayılan 0.3)
+
+    Returns:
+        np.ndarray: (n_film,) threshold dizisi
+    """
+    n_rows = probs.shape[0]
+    if not auto_threshold:
+        return np.full(n_rows, custom_threshold if custom_threshold is not None else 0.3)
+    if probs.shape[1] == 0:
+        return np.full(n_rows, 0.3)
+    max_prob = probs.max(axis=1)
+    avg_prob = probs.mean(axis=1)
+    threshold = np.where(max_prob > 0.7, 0.5,
+                         np.where(max_prob > 0.4, np.maximum(0.3, avg_prob * 0.8), 0.2))
+    return np.clip(threshold, 0.2, 0.6)
+
+
+_SYNTHETIC_WORDS = (
+    "a", "young", "detective", "family", "war", "love", "journey", "city", "secret", "friends",
+    "lost", "village", "music", "dream", "night", "escape", "future", "memory", "hero", "storm",
+)
+
+
+def synthetic_overviews(count: int, words_per_text: int = 40) -> List[str]:
+    """Isınma için deterministik sentetik film özetleri (model ve tokenizer yollarını tetikler)."""
+    n_words = len(_SYNTHETIC_WORDS)
+    return [
+        " ".join(_SYNTHETIC_WORDS[(i * 7 + j) % n_words] for j in range(words_per_text))
+        for i in range(count)
+    ]
+
+
+class ModelBundle:
+    """
+    Bir model versiyonunun belleğe yüklenmiş, değişmez hali (düzen, etiketler,
+    predictor'lar ve bunları saran tahmin motoru). RecommenderService tahmin anında bundle referansını bir kez
+    alır; yeniden yüklemede yeni bundle hazırlanıp tek atamayla devreye girer,
+    eski bundle son istek onu bıraktığında serbest kalır.
+    """
+
+    def __init__(self, model_dir: str, version: Optional[str] = None):
+        self.model_dir = model_dir
+        self.version = version
+        self.layout: Optional[str] = None
+        self.target_labels: List[str] = []
+        self.predictors: Dict[str, "TabularPredictor"] = {}
+        self.mlb = None
+        self.multi_output_model = None
+        self.manifest: Optional[Dict] = None
+        self.backend: Optional[PredictorBackend] = None
+        self.is_loaded = False
+        self.load_seconds = 0.0
+
+    def load(self, layout: str = "auto", use_package: bool = True) -> "ModelBundle":
+        """
+        Modelleri ve binarizer'ı belleğe yükler (layout: auto / per_label / multi_output / fake).
+        Klasörde model_bundle.pkl varsa (use_package=True) tek dosyadan yüklenir.
+        """
+        start = time.perf_counter()
+        if settings.INFERENCE_SERVER_SOCKET:
+            self._load_remote()
+        elif layout == LAYOUT_FAKE:
+            self._load_fake()
+        elif use_package and os.path.exists(os.path.join(self.model_dir, BUNDLE_FILE)):
+            self._load_package(layout)
+        else:
+            multi_output_path = os.path.join(self.model_dir, MULTI_OUTPUT_MODEL_FILE)
+            if layout == "auto":
+                layout = LAYOUT_MULTI_OUTPUT if os.path.exists(multi_output_path) else LAYOUT_PER_LABEL
+            if layout == LAYOUT_MULTI_OUTPUT:
+                self._load_multi_output(multi_output_path)
+            elif ML_LIBRARIES_AVAILABLE:
+                self._load_per_label()
+            else:
+                logger.warning("⚠️ AutoGluon kütüphanesi kurulu değil. Tahmin servisi devre dışı.")
+        if self.is_loaded and self.backend is None:
+            self.backend = self._make_backend()
+        self.load_seconds = time.perf_counter() - start
+        return self
+
+    def _load_per_label(self) -> None:
+        """Etiket başına bir TabularPredictor (predictor_<duygu> klasörleri)."""
+        import joblib
+        from autogluon.tabular import TabularPredictor
+
+        print(f"🚀 RecommenderService başlatılıyor: Modeller belleğe yükleniyor ({self.model_dir})...")
+        self.layout = LAYOUT_PER_LABEL
+
+        try:
+            # 1. MultiLabelBinarizer'ı Yükle
+            self.mlb = joblib.load(os.path.join(self.model_dir, BINARIZER_FILE))
+            self.target_labels = list(self.mlb.classes_)
+            print(f"✅ MultiLabelBinarizer yüklendi. Etiketler: {self.target_labels}")
+
+            # 2. Tüm modelleri yükle
+            loaded_count = 0
+            for emotion in self.target_labels:
+                predictor_path = os.path.join(self.model_dir, f'predictor_{emotion}')
+                if os.path.exists(predictor_path):
+                    predictor = TabularPredictor.load(predictor_path)
+                    if settings.PERSIST_MODELS:
+                        # Modelleri belleğe sabitle (her tahminde diskten yüklenmez)
+                        predictor.persist(models='best')
+                    self.predictors[emotion] = predictor
+                    print(f"   ✅ {emotion} yüklendi")
+                    loaded_count += 1
+                else:
+                    print(f"   ⚠ {emotion} için dosya bulunamadı: {predictor_path}")
+
+            if loaded_count == len(self.target_labels):
+                self.is_loaded = True
+                print(f"🎉 {len(self.target_labels)} adet model başarıyla yüklendi.")
+            else:
+                print(f"⚠ Eksik modeller var: {loaded_count}/{len(self.target_labels)}")
+                self.is_loaded = True
+
+        except FileNotFoundError as e:
+            print(f"❌ HATA: Model dosyaları bulunamadı. Lütfen eğitimden emin olun. Eksik dosya: {e}")
+            self.is_loaded = False
+        except Exception as e:
+            print(f"❌ Kritik Hata: Modeller yüklenemedi: {e}")
+            import traceback
+            traceback.print_exc()
+            self.is_loaded = False
+
+    def _load_multi_output(self, path: str) -> None:
+        """Tüm etiketler için tek artifact (ortak TF-IDF + one-vs-rest; automl_train.py --mode multi-output)."""
+        import joblib
+
+        print(f"🚀 RecommenderService başlatılıyor: çoklu çıkışlı model yükleniyor ({path})...")
+        self.layout = LAYOUT_MULTI_OUTPUT
+        try:
+            artifact = joblib.load(path)
+            self.multi_output_model = artifact["model"]
+            self.target_labels = list(artifact["labels"])
+            self.is_loaded = True
+            print(f"🎉 Çoklu çıkışlı model yüklendi. Etiketler: {self.target_labels}")
+        except FileNotFoundError as e:
+            print(f"❌ HATA: Model dosyaları bulunamadı. Lütfen eğitimden emin olun. Eksik dosya: {e}")
+            self.is_loaded = False
+        except Exception as e:
+            print(f"❌ Kritik Hata: Modeller yüklenemedi: {e}")
+            self.is_loaded = False
+
+    def _load_fake(self) -> None:
+        """Model dosyası gerektirmeyen sahte motor (FAKE_MODEL_LATENCY_MS / FAKE_MODEL_ROW_LATENCY_MS)."""
+        print(f"🧪 RecommenderService başlatılıyor: sahte tahmin motoru "
+              f"({settings.FAKE_MODEL_LATENCY_MS} ms + {settings.FAKE_MODEL_ROW_LATENCY_MS} ms/satır)")
+        self.layout = LAYOUT_FAKE
+        self.target_labels = list(settings.EMOTION_CATEGORIES)
+        self.is_loaded = True
+
+    def _load_remote(self) -> None:
+        """Modeller çıkarım sunucusunda (services/inference_server.py); burada sadece bağlantı havuzu."""
+        socket_path = settings.INFERENCE_SERVER_SOCKET
+        self.layout = LAYOUT_REMOTE
+        try:
+            self.backend = RemoteBackend(socket_path, settings.INFERENCE_POOL_SIZE, settings.INFERENCE_TIMEOUT_SECONDS,
+                                         settings.INFERENCE_INFO_TTL_SECONDS)
+            self.target_labels = list(self.backend.target_labels)
+            self.version = self.backend.info.get("version")
+            self.is_loaded = True
+            logger.info(f"🔌 Çıkarım sunucusuna bağlanıldı: {socket_path} ({self.backend.info.get('layout')})")
+        except OSError as e:
+            logger.warning(f"⚠️ Çıkarım sunucusuna bağlanılamadı ({socket_path}): {e}")
+            self.is_loaded = False
+
+    def _make_backend(self) -> PredictorBackend:
+        if self.layout == LAYOUT_FAKE:
+            return FakeBackend(self.target_labels, settings.FAKE_MODEL_LATENCY_MS, settings.FAKE_MODEL_ROW_LATENCY_MS)
+        if self.layout == LAYOUT_MULTI_OUTPUT:
+            return MultiOutputBackend(self.target_labels, self.multi_output_model)
+        return AutoGluonBackend(self.target_labels, self.predictors)
+
+    def _load_package(self, layout: str) -> None:
+        """
+        Paketlenmiş modeli yükler: manifest + tek payload okuması, sha256
+        doğrulaması ve tek unpickle (predictor başına klasör taraması yok).
+        """
+        print(f"🚀 RecommenderService başlatılıyor: model paketi yükleniyor ({self.model_dir})...")
+        try:
+            manifest = read_bundle_manifest(self.model_dir)
+            if layout not in ("auto", manifest["layout"]):
+                raise ValueError(f"Paket düzeni {manifest['layout']}, MODEL_LAYOUT={layout}")
+            with open(os.path.join(self.model_dir, BUNDLE_FILE), "rb") as f:
+                payload = f.read()
+            if settings.BUNDLE_VERIFY_CHECKSUM and hashlib.sha256(payload).hexdigest() != manifest["sha256"]:
+                raise ValueError(f"{BUNDLE_FILE} sağlama toplamı manifest ile uyuşmuyor")
+            data = pickle.loads(payload)
+            del payload
+
+            self.manifest = manifest
+            self.layout = manifest["layout"]
+            self.target_labels = list(manifest["labels"])
+            self.mlb = data.get("mlb")
+            self.predictors = data.get("predictors", {})
+            self.multi_output_model = data.get("model")
+            self.is_loaded = True
+            print(f"🎉 Model paketi yüklendi ({self.layout}). Etiketler: {self.target_labels}")
+        except FileNotFoundError as e:
+            print(f"❌ HATA: Model dosyaları bulunamadı. Lütfen eğitimden emin olun. Eksik dosya: {e}")
+            self.is_loaded = False
+        except Exception as e:
+            print(f"❌ Kritik Hata: Model paketi yüklenemedi: {e}")
+            self.is_loaded = False
+
+    @property
+    def loaded_labels(self) -> List[str]:
+        """Olasılığı hesaplanabilen etiketler."""
+        return self.backend.loaded_labels if self.backend is not None else []
+
+    def is_ready(self) -> bool:
+        if self.layout == LAYOUT_REMOTE and self.backend is not None:
+            self._sync_remote_info()
+        return self.is_loaded and self.backend is not None and self.backend.is_ready()
+
+    def _sync_remote_info(self) -> None:
+        """Uzak düzende versiyon ve etiketler sunucudan gelir (sunucu hot reload yapabilir)."""
+        info = self.backend.info
+        self.version = info.get("version")
+        self.target_labels = list(self.backend.target_labels)
+
+    def close(self) -> None:
+        """Devreden çıkan bundle'ın motor kaynaklarını (uzak bağlantılar) bırakır."""
+        if self.backend is not None:
+            self.backend.close()
+
+    def predict_proba_batch(self, overview_texts: List[str]) -> np.ndarray:
+        """(len(overview_texts), len(target_labels)) float32 olasılık matrisi; yüklenemeyen sütunlar 0."""
+        return self.backend.predict_proba_batch(overview_texts)
+
+    def warm_up(self, batch_size: Optional[int] = None) -> float:
+        """
+        Tek satırlık ve toplu sentetik tahminlerle her predictor'ın ilk çağrı
+        maliyetini (tembel model yükleme, pandas, özellik dönüşümleri) öder.
+
+        Returns:
+            float: Isınma süresi (sn)
+        """
+        start = time.perf_counter()
+        texts = synthetic_overviews(batch_size or settings.WARMUP_BATCH_SIZE)
+        self.predict_proba_batch(texts[:1])
+        self.predict_proba_batch(texts)
+        return time.perf_counter() - start
+
 
+def read_bundle_manifest(model_dir: str) -> Dict:
+    """model_bundle.json'u okur (etiketler, eşikler, özellik şeması, sha256; unpickle gerektirmez)."""
+    with open(os.path.join(model_dir, BUNDLE_MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Desteklenmeyen paket formatı: {manifest.get('format_version')}")
+    return manifest
 
-# Projenin kök dizininden model klasörüne ulaşmak için yol ayarı
-MODEL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ml', 'model'))
-BINARIZER_PATH = os.path.join(MODEL_DIR, "multi_label_binarizer.pkl")
 
-print(f"📁 MODEL_DIR: {MODEL_DIR}")
-print(f"📄 BINARIZER_PATH: {BINARIZER_PATH}")
+def resolve_model_dir(version: Optional[str] = None) -> Tuple[Optional[str], str]:
+    """
+    Yüklenecek model klasörünü döndürür: verilen versiyon, yoksa CURRENT
+    dosyasındaki versiyon, o da yoksa eski düz düzen (MODEL_DIR).
+
+    Returns:
+        Tuple: (versiyon veya None, klasör yolu)
+    """
+    if version is None and os.path.exists(CURRENT_VERSION_PATH):
+        with open(CURRENT_VERSION_PATH, encoding="utf-8") as f:
+            version = f.read().strip() or None
+    if version is None:
+        return None, MODEL_DIR
+    return version, os.path.join(MODEL_VERSIONS_DIR, version)
+
+
+def list_model_versions() -> List[str]:
+    """versions/ altındaki model versiyonları (eskiden yeniye)."""
+    if not os.path.isdir(MODEL_VERSIONS_DIR):
+        return []
+    return sorted(
+        name for name in os.listdir(MODEL_VERSIONS_DIR)
+        if os.path.isdir(os.path.join(MODEL_VERSIONS_DIR, name)) and not name.endswith(".tmp")
+    )
+
+
+def publish_model_version(source_dir: str, version: Optional[str] = None, activate: bool = True) -> str:
+    """
+    source_dir'deki model artifact'larını (binarizer, predictor_* klasörleri,
+    multi_output_model.joblib, model_bundle.*) versions/<versiyon>/ altına kopyalar ve
+    activate=True ise CURRENT dosyasını atomik olarak yeni versiyona çevirir.
+    Çalışan API süreçleri değişikliği dosya izleyicisiyle veya admin
+    endpoint'iyle fark edip modeli yeniden yükler.
+    """
+    version = version or datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    target_dir = os.path.join(MODEL_VERSIONS_DIR, version)
+    if os.path.exists(target_dir):
+        raise FileExistsError(f"Model versiyonu zaten var: {version}")
+
+    tmp_dir = f"{target_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    copied = 0
+    for name in sorted(os.listdir(source_dir)):
+        source = os.path.join(source_dir, name)
+        if name.startswith("predictor_") and os.path.isdir(source):
+            shutil.copytree(source, os.path.join(tmp_dir, name))
+            copied += 1
+        elif name in (BINARIZER_FILE, MULTI_OUTPUT_MODEL_FILE, BUNDLE_FILE, BUNDLE_MANIFEST_FILE):
+            shutil.copy2(source, os.path.join(tmp_dir, name))
+            copied += 1
+    if copied == 0:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise FileNotFoundError(f"Yayınlanacak model artifact'ı bulunamadı: {source_dir}")
+    # Yarım kopya hiçbir zaman versiyon olarak görünmez
+    os.rename(tmp_dir, target_dir)
+
+    if activate:
+        tmp_path = f"{CURRENT_VERSION_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp_path, CURRENT_VERSION_PATH)
+    return version
 
 
 class RecommenderService:
     """
     Eğitilmiş AutoGluon Çoklu Etiket Sınıflandırma modellerini yöneten 
     ve tahmin yapan servis katmanı.
+
+    Modeller bir ModelBundle içinde tutulur; reload() yeni versiyonu eski
+    bundle hizmet vermeye devam ederken yükler ve tek atamayla değiştirir.
     """
     
     # Singleton pattern için class değişkenleri
     _instance: Optional['RecommenderService'] = None
-    _is_loaded: bool = False
+    _bundle: Optional[ModelBundle] = None
+    _reload_lock = threading.Lock()
+    reload_status: Dict = {"state": "idle"}
     
     def __new__(cls):
         """Singleton örneği oluşturur."""
@@ -40,48 +412,111 @@ class RecommenderService:
         return cls._instance
 
     def __init__(self):
-        """Modelleri ve binarizer'ı belleğe yükler."""
-        if not self._is_loaded and ML_LIBRARIES_AVAILABLE:
-            print("🚀 RecommenderService başlatılıyor: Modeller belleğe yükleniyor...")
-            self.predictors: Dict[str, TabularPredictor] = {}
-            self.mlb = None
-            
-            try:
-                # 1. MultiLabelBinarizer'ı Yükle
-                self.mlb = joblib.load(BINARIZER_PATH)
-                self.target_labels = list(self.mlb.classes_)
-                print(f"✅ MultiLabelBinarizer yüklendi. Etiketler: {self.target_labels}")
-                
-                # 2. Tüm modelleri yükle
-                loaded_count = 0
-                for emotion in self.target_labels:
-                    predictor_path = os.path.join(MODEL_DIR, f'predictor_{emotion}')
-                    if os.path.exists(predictor_path):
-                        self.predictors[emotion] = TabularPredictor.load(predictor_path)
-                        print(f"   ✅ {emotion} yüklendi")
-                        loaded_count += 1
-                    else:
-                        print(f"   ⚠ {emotion} için dosya bulunamadı: {predictor_path}")
-                
-                if loaded_count == len(self.target_labels):
-                    self._is_loaded = True
-                    print(f"🎉 {len(self.target_labels)} adet model başarıyla yüklendi.")
-                else:
-                    print(f"⚠ Eksik modeller var: {loaded_count}/{len(self.target_labels)}")
-                    self._is_loaded = True
-                
-            except FileNotFoundError as e:
-                print(f"❌ HATA: Model dosyaları bulunamadı. Lütfen eğitimden emin olun. Eksik dosya: {e}")
-                self._is_loaded = False
-            except Exception as e:
-                print(f"❌ Kritik Hata: Modeller yüklenemedi: {e}")
-                import traceback
-                traceback.print_exc()
-                self._is_loaded = False
+        """Aktif model versiyonunu (CURRENT, yoksa MODEL_DIR) belleğe yükler."""
+        if self._bundle is not None and self._bundle.is_loaded:
+            return
+        version, model_dir = resolve_model_dir()
+        RecommenderService._bundle = ModelBundle(model_dir, version).load(settings.MODEL_LAYOUT)
+
+    # Mevcut bundle'a yönlendirilen özellikler (router'lar ve script'ler için)
+    @property
+    def layout(self) -> Optional[str]:
+        return self._bundle.layout
+
+    @property
+    def target_labels(self) -> List[str]:
+        return self._bundle.target_labels
+
+    @property
+    def predictors(self) -> Dict[str, "TabularPredictor"]:
+        return self._bundle.predictors
+
+    @property
+    def mlb(self):
+        return self._bundle.mlb
+
+    @property
+    def model_version(self) -> Optional[str]:
+        return self._bundle.version
+
+    @property
+    def loaded_labels(self) -> List[str]:
+        """Olasılığı hesaplanabilen etiketler."""
+        return self._bundle.loaded_labels
 
     def is_ready(self) -> bool:
         """Servisin tahmin yapmaya hazır olup olmadığını kontrol eder."""
-        return self._is_loaded and ML_LIBRARIES_AVAILABLE
+        return self._bundle.is_ready()
+
+    def reload(self, version: Optional[str] = None) -> Dict:
+        """
+        Verilen (yoksa CURRENT'taki) model versiyonunu arka planda yükler ve
+        hazırsa atomik olarak devreye alır. Yükleme sırasında eski bundle
+        istekleri karşılamaya devam eder; yeni bundle hazır değilse eskisi korunur.
+        Aynı anda tek yeniden yükleme çalışır.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return dict(self.reload_status)
+        try:
+            version, model_dir = resolve_model_dir(version)
+            previous_version = self.model_version
+            RecommenderService.reload_status = {
+                "state": "loading",
+                "version": version,
+                "started_at": datetime.utcnow().isoformat(),
+            }
+            logger.info(f"🔄 Model yeniden yükleniyor: {version or model_dir}")
+            if settings.MODEL_PRELOAD:
+                logger.warning("⚠️ MODEL_PRELOAD açık: bu worker artık master ile paylaşılmayan kendi model kopyasını tutacak")
+            bundle = ModelBundle(model_dir, version).load(settings.MODEL_LAYOUT)
+            if not bundle.is_ready():
+                RecommenderService.reload_status = {
+                    **self.reload_status, "state": "failed",
+                    "error": f"Model yüklenemedi: {model_dir}",
+                }
+                logger.warning(f"⚠️ Yeni model yüklenemedi, {previous_version or 'mevcut'} versiyon kullanılmaya devam ediyor")
+                return dict(self.reload_status)
+
+            try:
+                # Yeni versiyonun ilk istekleri tembel başlatma maliyetini ödemesin
+                bundle.warm_up()
+            except Exception as e:
+                logger.warning(f"⚠️ Yeni model ısındırılamadı: {e}")
+
+            # Tek atama: devam eden istekler eski bundle referansıyla tamamlanır,
+            # sonrakiler yeni bundle'ı görür; eski bundle son referansla birlikte serbest kalır.
+            previous_bundle = RecommenderService._bundle
+            RecommenderService._bundle = bundle
+            del bundle
+            if previous_bundle is not None:
+                previous_bundle.close()
+                del previous_bundle
+            gc.collect()
+            RecommenderService.reload_status = {
+                **self.reload_status, "state": "ready",
+                "previous_version": previous_version,
+                "load_seconds": round(self._bundle.load_seconds, 2),
+                "finished_at": datetime.utcnow().isoformat(),
+            }
+            logger.info(f"✅ Model versiyonu devreye alındı: {previous_version} → {version} "
+                        f"({self._bundle.load_seconds:.1f} sn)")
+            return dict(self.reload_status)
+        finally:
+            self._reload_lock.release()
+
+    def warm_up(self) -> float:
+        """Aktif model için sentetik ısınma tahminleri (bkz. ModelBundle.warm_up); süre (sn)."""
+        bundle = self._bundle
+        if not bundle.is_ready():
+            return 0.0
+        return bundle.warm_up()
+
+    def start_reload(self, version: Optional[str] = None) -> Dict:
+        """reload()'u daemon thread'de başlatır ve o anki durumu döndürür."""
+        if self._reload_lock.locked():
+            return dict(self.reload_status)
+        threading.Thread(target=self.reload, args=(version,), name="model-reload", daemon=True).start()
+        return {"state": "loading", "version": version}
 
     def predict_emotions_with_proba(self, overview_text: str, auto_threshold: bool = True, 
                                    custom_threshold: float = None) -> Tuple[List[str], Dict[str, float], float]:
@@ -96,66 +531,28 @@ class RecommenderService:
         Returns:
             Tuple: (duygu_listesi, {duygu: olasılık}, kullanılan_threshold)
         """
-        if not self.is_ready():
-            print("⚠ Model hazır değil")
+        bundle = self._bundle
+        if not bundle.is_ready():
+            logger.debug("⚠ Model hazır değil")
             return [], {}, 0.0
         
         try:
-            # DataFrame oluştur
-            data_dict = {'overview': overview_text}
-            for label in self.target_labels:
-                data_dict[label] = 0
-            
-            input_df = pd.DataFrame([data_dict])
+            logger.debug(f"🎯 Duygu tahmini yapılıyor: {overview_text[:50]}...")
             
-            print(f"\n🎯 Duygu tahmini yapılıyor: {overview_text[:50]}...")
-            
-            # Her duygu için olasılık tahmini
-            emotion_probs = {}
-            
-            for label in self.predictors:
-                try:
-                    # Olasılık tahmini yap
-                    proba_df = self.predictors[label].predict_proba(input_df)
-                    
-                    # P(1) olasılığını al (duygunun var olma olasılığı)
-                    if not proba_df.empty and len(proba_df.columns) >= 2:
-                        prob_positive = float(proba_df.iloc[0, 1])
-                        emotion_probs[label] = prob_positive
-                    else:
-                        emotion_probs[label] = 0.0
-                        
-                except Exception as e:
-                    print(f"   ❌ {label} olasılık hatası: {e}")
-                    emotion_probs[label] = 0.0
+            # Her duygu için olasılık tahmini (tek satırlık batch)
+            probs = bundle.predict_proba_batch([overview_text])[0]
+            loaded_labels = set(bundle.loaded_labels)
+            emotion_probs = {
+                label: float(probs[column])
+                for column, label in enumerate(bundle.target_labels)
+                if label in loaded_labels
+            }
             
             # AKILLI THRESHOLD BELİRLEME
-            if auto_threshold:
-                # Strateji 1: Ortalamanın üstündeki değerleri al
-                all_probs = list(emotion_probs.values())
-                if all_probs:
-                    avg_prob = sum(all_probs) / len(all_probs)
-                    max_prob = max(all_probs)
-                    
-                    # Dinamik threshold hesapla
-                    if max_prob > 0.7:
-                        # Güçlü tahmin varsa threshold yüksek tut
-                        threshold = 0.5
-                    elif max_prob > 0.4:
-                        # Orta güçte tahminler
-                        threshold = max(0.3, avg_prob * 0.8)
-                    else:
-                        # Zayıf tahminler - daha düşük threshold
-                        threshold = 0.2
-                    
-                    # Minimum 0.2, maksimum 0.6
-                    threshold = max(0.2, min(0.6, threshold))
-                else:
-                    threshold = 0.3
-            else:
-                threshold = custom_threshold if custom_threshold is not None else 0.3
+            probs = np.array([list(emotion_probs.values())], dtype=np.float64)
+            threshold = float(resolve_thresholds(probs, auto_threshold, custom_threshold)[0])
             
-            print(f"🎯 Otomatik threshold: {threshold:.2f}")
+            logger.debug(f"🎯 Otomatik threshold: {threshold:.2f}")
             
             # Threshold üzerindeki duyguları belirle
             predicted_emotions = []
@@ -163,25 +560,36 @@ class RecommenderService:
                 if prob >= threshold:
                     predicted_emotions.append(label)
             
-            # Olasılıkları büyükten küçüğe sırala
-            sorted_emotions = sorted(emotion_probs.items(), key=lambda x: x[1], reverse=True)
-            
-            print(f"\n📈 Duygu Olasılıkları:")
-            for emotion, prob in sorted_emotions:
-                if prob > 0:
-                    star = "⭐⭐⭐" if prob >= 0.7 else "⭐⭐" if prob >= 0.4 else "⭐"
-                    print(f"   {emotion:10} {prob:>5.1%} {star}")
-            
-            print(f"\n✅ Seçilen Duygular: {predicted_emotions}")
+            if logger.isEnabledFor(logging.DEBUG):
+                # Her aday film için çağrılır: satırlar sadece DEBUG seviyesinde üretilir
+                sorted_emotions = sorted(emotion_probs.items(), key=lambda x: x[1], reverse=True)
+                lines = [
+                    f"   {emotion:10} {prob:>5.1%} {'⭐⭐⭐' if prob >= 0.7 else '⭐⭐' if prob >= 0.4 else '⭐'}"
+                    for emotion, prob in sorted_emotions if prob > 0
+                ]
+                logger.debug("📈 Duygu Olasılıkları:\n" + "\n".join(lines))
+                logger.debug(f"✅ Seçilen Duygular: {predicted_emotions}")
             
             return predicted_emotions, emotion_probs, threshold
             
         except Exception as e:
-            print(f"❌ Tahmin hatası: {type(e).__name__}: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"❌ Tahmin hatası: {type(e).__name__}: {e}", exc_info=True)
             return [], {}, 0.3
 
+    def predict_proba_batch(self, overview_texts: List[str]) -> np.ndarray:
+        """
+        Birden çok film özeti için tüm duygu olasılıklarını tek seferde hesaplar
+        (her predictor'a satır başına değil, toplu DataFrame ile gider).
+
+        Returns:
+            np.ndarray: (len(overview_texts), len(target_labels)) float32 olasılık matrisi;
+            yüklenemeyen duygu sütunları 0
+        """
+        bundle = self._bundle
+        if not bundle.is_ready():
+            return np.zeros((len(overview_texts), len(settings.EMOTION_CATEGORIES)), dtype=np.float32)
+        return bundle.predict_proba_batch(overview_texts)
+
     def predict_emotions(self, overview_text: str) -> List[str]:
         """
         Film özetinden duygu tahmini yapar (basit versiyon).
@@ -194,4 +602,51 @@ class RecommenderService:
 # FastAPI'de bağımlılık olarak kolayca kullanmak için bir fonksiyon
 def get_recommender_service() -> RecommenderService:
     """Singleton RecommenderService örneğini döndürür."""
-    return RecommenderService()
\ No newline at end of file
+    return RecommenderService()
+
+
+_watch_thread: Optional[threading.Thread] = None
+
+
+def start_model_watch() -> None:
+    """
+    CURRENT dosyasını MODEL_WATCH_SECONDS aralıkla izleyen daemon thread'i
+    başlatır; dosya değiştiğinde (yeni versiyon yayınlandığında) servis
+    yüklenmişse modeli yeniden yükler (uygulama açılışında çağrılır).
+    """
+    global _watch_thread
+    interval = settings.MODEL_WATCH_SECONDS
+    if interval <= 0 or _watch_thread is not None:
+        return
+    if settings.MODEL_PRELOAD:
+        # Worker'da yeniden yükleme master'dan devralınan paylaşımlı kopyayı özel kopyayla değiştirir
+        logger.info("ℹ️ MODEL_PRELOAD açık: CURRENT izleme kapalı, yeni versiyon için sunucuyu yeniden başlatın")
+        return
+
+    def _mtime() -> Optional[float]:
+        try:
+            return os.stat(CURRENT_VERSION_PATH).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _watch_loop():
+        last_seen = _mtime()
+        while True:
+            time.sleep(interval)
+            current = _mtime()
+            if current == last_seen:
+                continue
+            last_seen = current
+            service = RecommenderService._instance
+            if service is None or service._bundle is None:
+                continue  # İlk istek zaten güncel versiyonu yükleyecek
+            version, _ = resolve_model_dir()
+            if version != service.model_version:
+                try:
+                    service.reload(version)
+                except Exception as e:
+                    logger.warning(f"⚠️ Model yeniden yüklenemedi: {e}")
+
+    _watch_thread = threading.Thread(target=_watch_loop, name="model-watch", daemon=True)
+    _watch_thread.start()
+
@@ -0,0 +1,140 @@
+"""
+Kullanıcı başına "daha önce izlendi/beğenildi" filtresi.
+
+Her aktif kullanıcı için izlediği/beğendiği film id'leri sıralı bir uint32
+dizisinde tutulur (film başına 4 bayt); üyelik kontrolü ``np.searchsorted``
+ile tam (false positive yok) ve aday başına O(log n)'dir. Diziler
+SEEN_CACHE_USERS kapasiteli bir LRU'da saklanır ve POST /history ile
+güncellenir; önbellekte olmayan kullanıcı için tek bir sorgu yapılır.
+
+Önbellek worker başınadır: POST /history'yi başka bir worker işlediyse bu
+worker'daki dizi eskir. Bu yüzden girdiler SEEN_CACHE_TTL_SECONDS sonra
+veritabanından yeniden yüklenir. LIMIT'li aday sorguları bu diziye
+güvenmez; onlar için ``not_seen_clause`` ile SQL'de anti-join yapılır.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.db.models import Movie, UserHistory
+
+logger = logging.getLogger(__name__)
+
+# Önerilerden hariç tutulan etkileşim tipleri
+SEEN_INTERACTIONS = ("viewed", "liked")
+
+
+def contains(seen: np.ndarray, movie_ids: np.ndarray) -> np.ndarray:
+    """movie_ids içindeki her id'nin sıralı seen dizisinde olup olmadığını döndürür."""
+    movie_ids = np.asarray(movie_ids, dtype=np.int64)
+    if seen.size == 0 or movie_ids.size == 0:
+        return np.zeros(movie_ids.shape, dtype=bool)
+    positions = np.searchsorted(seen, movie_ids)
+    positions[positions == seen.size] = 0
+    return seen[positions] == movie_ids
+
+
+def not_seen_clause(user_id: int):
+    """
+    Movie sorgularına eklenecek NOT EXISTS filtresi (kullanıcının izlediği/beğendiği
+    filmleri SQL'de eler). LIMIT'li sorgularda maske LIMIT'ten sonra uygulanacağı
+    için çok izleyen kullanıcılarda aday havuzu boşalmasın diye kullanılır.
+    """
+    return ~exists().where(
+        UserHistory.user_id == user_id,
+        UserHistory.movie_id == Movie.movie_id,
+        UserHistory.interaction.in_(SEEN_INTERACTIONS),
+    )
+
+
+class SeenFilter:
+    """Kullanıcı → sıralı uint32 film id dizisi eşlemesi tutan sınırlı LRU."""
+
+    def __init__(self, capacity: int, ttl_seconds: float = 0):
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._loaded_at: dict = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def memory_bytes(self) -> int:
+        return sum(arr.nbytes for arr in self._entries.values())
+
+    def _put(self, user_id: int, seen: np.ndarray) -> None:
+        self._entries[user_id] = seen
+        self._entries.move_to_end(user_id)
+        self._loaded_at[user_id] = time.monotonic()
+        while len(self._entries) > self.capacity:
+            evicted, _ = self._entries.popitem(last=False)
+            self._loaded_at.pop(evicted, None)
+
+    def _is_expired(self, user_id: int) -> bool:
+        if not self.ttl_seconds:
+            return False
+        return time.monotonic() - self._loaded_at.get(user_id, 0.0) > self.ttl_seconds
+
+    def get(self, db: Session, user_id: int) -> np.ndarray:
+        """Kullanıcının izlediği/beğendiği filmleri döndürür (önbellekte yoksa veya süresi dolduysa yükler)."""
+        with self._lock:
+            seen = self._entries.get(user_id)
+            if seen is not None and not self._is_expired(user_id):
+                self._entries.move_to_end(user_id)
+                return seen
+
+        rows = db.query(UserHistory.movie_id).filter(
+            UserHistory.user_id == user_id,
+            UserHistory.interaction.in_(SEEN_INTERACTIONS),
+        ).all()
+        seen = np.unique(np.fromiter((row[0] for row in rows), dtype=np.uint32, count=len(rows)))
+        with self._lock:
+            self._put(user_id, seen)
+        return seen
+
+    def mask(self, db: Session, user_id: int, movie_ids: Iterable[int]) -> np.ndarray:
+        """Aday filmlerden hangilerinin daha önce görüldüğünü boolean maske olarak döndürür."""
+        return contains(self.get(db, user_id), np.fromiter(movie_ids, dtype=np.int64))
+
+    def add(self, user_id: int, movie_id: int, interaction: Optional[str]) -> None:
+        """Yeni geçmiş kaydını önbellekteki diziye ekler (kullanıcı önbellekte değilse bir şey yapmaz)."""
+        if interaction not in SEEN_INTERACTIONS:
+            return
+        with self._lock:
+            seen = self._entries.get(user_id)
+            if seen is None:
+                return
+            position = int(np.searchsorted(seen, movie_id))
+            if position < seen.size and seen[position] == movie_id:
+                return
+            self._entries[user_id] = np.insert(seen, position, np.uint32(movie_id))
+
+    def invalidate(self, user_id: int) -> None:
+        """
+        Kullanıcının dizisini önbellekten düşürür. Bir kayıt silindiğinde (toggle)
+        film başka bir etkileşimle hâlâ görülmüş olabileceği için bir sonraki
+        istekte veritabanından yeniden yüklenir.
+        """
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._loaded_at.pop(user_id, None)
+
+
+_seen_filter: Optional[SeenFilter] = None
+
+
+def get_seen_filter() -> SeenFilter:
+    """Süreç genelinde tek SeenFilter örneğini döndürür."""
+    global _seen_filter
+    if _seen_filter is None:
+        _seen_filter = SeenFilter(settings.SEEN_CACHE_USERS, settings.SEEN_CACHE_TTL_SECONDS)
+    return _seen_filter
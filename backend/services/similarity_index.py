@@ -0,0 +1,323 @@
+"""
+Duygu olasılık vektörleri üzerinde k-NN ("benzer filmler") indeksi.
+
+Her film için 8 boyutlu duygu vektörü (emotions tablosundaki etiketlerden
+multi-hot veya model tahmininden olasılıklar) birim uzunlukta tutulur.
+Sorgu, tüm katalog üzerinde tek bir BLAS matris-vektör çarpımı + tür
+(genre) bitmask filtresidir; birkaç on bin film için milisaniyenin altında
+kalır. İndeks uygulama açılışında kurulur ve emotions tablosundaki yeni
+kayıtlar (emotion_id watermark'ı) ile artımlı olarak güncellenir. Tam
+yeniden kurulum (açılış, silinen etiketler) yeni bir nesneye yapılır ve
+modül referansı tek atamayla değiştirilir; sorgular eski nesneyi kullanırken
+dizileri sıfırlanmaz.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.db.models import Emotion, Movie
+from backend.services.ranking import split_genres
+
+logger = logging.getLogger(__name__)
+
+
+class EmotionSimilarityIndex:
+    """
+    Film duygu vektörleri için bellek içi brute-force (BLAS) k-NN indeksi.
+
+    Satırlar yerinde güncellenir; silinen filmler ``_valid`` maskesiyle
+    devre dışı bırakılır. Yazma işlemleri kilit altında yapılır, okumalar
+    kilitsizdir: artımlı güncellemede diziler kapasite büyürken yeni nesne
+    olarak atanır ve ``_size`` en son artar. ``build`` sadece henüz
+    yayınlanmamış (yeni) bir indekste çağrılır; bkz. ``rebuild_similarity_index``.
+    """
+
+    def __init__(self, labels: Sequence[str], initial_capacity: int = 1024):
+        self.labels: List[str] = list(labels)
+        self._label_index = {label: j for j, label in enumerate(self.labels)}
+        self._lock = threading.Lock()
+        self._reset(initial_capacity)
+
+    def _reset(self, capacity: int) -> None:
+        self._vectors = np.zeros((capacity, len(self.labels)), dtype=np.float32)
+        self._genre_masks = np.zeros(capacity, dtype=np.uint64)
+        self._movie_ids = np.zeros(capacity, dtype=np.int64)
+        self._valid = np.zeros(capacity, dtype=bool)
+        self._rows: Dict[int, int] = {}
+        self._size = 0
+        self._genre_bits: Dict[str, int] = {}
+        self._last_emotion_id = 0
+        self._emotion_count = 0
+        self.is_built = False
+
+    # ----- Yardımcılar -----
+
+    def __len__(self) -> int:
+        return int(self._valid[:self._size].sum())
+
+    def genre_mask(self, genres: Sequence[str], create: bool = False) -> int:
+        """Tür listesini bitmask'e çevirir (en fazla 64 farklı tür; bilinmeyen türler bit eklemez)."""
+        mask = 0
+        for genre in genres:
+            bit = self._genre_bits.get(genre)
+            if bit is None and create and len(self._genre_bits) < 64:
+                bit = self._genre_bits[genre] = len(self._genre_bits)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = len(self._movie_ids)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name in ("_vectors", "_genre_masks", "_movie_ids", "_valid"):
+            old = getattr(self, name)
+            grown = np.zeros((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            grown[:capacity] = old
+            setattr(self, name, grown)
+
+    def _vector_from_probs(self, emotion_probs: Dict[str, float]) -> np.ndarray:
+        vector = np.zeros(len(self.labels), dtype=np.float32)
+        for label, prob in emotion_probs.items():
+            j = self._label_index.get(label)
+            if j is not None:
+                vector[j] = prob
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    # ----- Yazma işlemleri -----
+
+    def upsert(self, movie_id: int, emotion_probs: Dict[str, float], genre: Optional[str] = None) -> None:
+        """Bir filmin duygu vektörünü (ve türünü) ekler veya günceller."""
+        with self._lock:
+            self._upsert_locked(movie_id, emotion_probs, genre)
+
+    def _upsert_locked(self, movie_id: int, emotion_probs: Dict[str, float], genre: Optional[str]) -> None:
+        row = self._rows.get(movie_id)
+        if row is None:
+            self._ensure_capacity(self._size + 1)
+            row = self._size
+            self._rows[movie_id] = row
+            self._movie_ids[row] = movie_id
+            self._size += 1
+        self._vectors[row] = self._vector_from_probs(emotion_probs)
+        if genre is not None:
+            self._genre_masks[row] = np.uint64(self.genre_mask(split_genres(genre), create=True))
+        self._valid[row] = True
+
+    def update_genre(self, movie_id: int, genre: Optional[str]) -> None:
+        """Film türü değiştiğinde bitmask'i günceller."""
+        with self._lock:
+            row = self._rows.get(movie_id)
+            if row is not None:
+                self._genre_masks[row] = np.uint64(self.genre_mask(split_genres(genre), create=True))
+
+    def remove(self, movie_id: int) -> None:
+        """Filmi sorgu sonuçlarından çıkarır."""
+        with self._lock:
+            row = self._rows.get(movie_id)
+            if row is not None:
+                self._valid[row] = False
+
+    # ----- Kurulum ve artımlı yenileme -----
+
+    def build(self, db: Session) -> None:
+        """
+        İndeksi emotions tablosundan sıfırdan kurar. Diziler yerinde
+        sıfırlandığı için sorgulanan bir indekste değil, yeni bir nesnede
+        çağrılmalıdır (rebuild_similarity_index).
+        """
+        start = time.perf_counter()
+        rows = (
+            db.query(Emotion.emotion_id, Emotion.movie_id, Emotion.emotion_label, Movie.genre)
+            .join(Movie, Movie.movie_id == Emotion.movie_id)
+            .all()
+        )
+        with self._lock:
+            self._reset(max(1024, len(rows)))
+            self._apply_rows(rows)
+            self._emotion_count = len(rows)
+            self.is_built = True
+        logger.info(
+            f"🧭 Benzerlik indeksi kuruldu: {len(self)} film, "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+
+    def refresh(self, db: Session) -> Optional[int]:
+        """
+        Son kurulumdan/yenilemeden sonra eklenen emotions kayıtlarını indekse işler.
+
+        Returns:
+            Optional[int]: Güncellenen film sayısı; indeks kurulmamışsa veya kayıt
+            silinmişse (ör. seed_emotions --clear) None (tam yeniden kurulum gerekir)
+        """
+        if not self.is_built:
+            return None
+
+        stats = db.query(func.count(Emotion.emotion_id), func.max(Emotion.emotion_id)).one()
+        total, max_id = stats[0] or 0, stats[1] or 0
+        new_rows = 0
+        if max_id > self._last_emotion_id:
+            new_rows = db.query(func.count(Emotion.emotion_id)).filter(
+                Emotion.emotion_id > self._last_emotion_id
+            ).scalar() or 0
+        if total < self._emotion_count + new_rows:
+            # Silme oldu: artımlı güncelleme yetersiz, yeniden kurulmalı
+            return None
+        if not new_rows:
+            return 0
+
+        # Sadece yeni etiket alan filmlerin tüm etiketlerini yeniden oku
+        changed_ids = db.query(Emotion.movie_id).filter(
+            Emotion.emotion_id > self._last_emotion_id
+        ).distinct().subquery()
+        rows = (
+            db.query(Emotion.emotion_id, Emotion.movie_id, Emotion.emotion_label, Movie.genre)
+            .join(Movie, Movie.movie_id == Emotion.movie_id)
+            .filter(Emotion.movie_id.in_(db.query(changed_ids.c.movie_id)))
+            .all()
+        )
+        with self._lock:
+            updated = self._apply_rows(rows)
+            self._emotion_count = total
+        logger.info(f"🧭 Benzerlik indeksi güncellendi: {updated} film")
+        return updated
+
+    def _apply_rows(self, rows) -> int:
+        labels_by_movie: Dict[int, Dict[str, float]] = {}
+        genre_by_movie: Dict[int, Optional[str]] = {}
+        for emotion_id, movie_id, emotion_label, genre in rows:
+            labels_by_movie.setdefault(movie_id, {})[emotion_label] = 1.0
+            genre_by_movie[movie_id] = genre
+            self._last_emotion_id = max(self._last_emotion_id, emotion_id)
+        for movie_id, probs in labels_by_movie.items():
+            self._upsert_locked(movie_id, probs, genre_by_movie[movie_id] or "")
+        return len(labels_by_movie)
+
+    # ----- Sorgu -----
+
+    def vector(self, movie_id: int) -> Optional[np.ndarray]:
+        """Filmin (normalize) duygu vektörünü döndürür; indekste yoksa None."""
+        row = self._rows.get(movie_id)
+        if row is None or not self._valid[row]:
+            return None
+        return self._vectors[row]
+
+    def query(
+        self,
+        movie_id: int,
+        k: int = 10,
+        genres: Optional[Sequence[str]] = None,
+        same_genre: bool = False,
+    ) -> List[Tuple[int, float]]:
+        """
+        Verilen filme en benzer k filmi döndürür.
+
+        Args:
+            movie_id: Sorgu filmi
+            k: Döndürülecek film sayısı
+            genres: Sonuçları bu türlerden en az birini içerenlerle sınırla
+            same_genre: True ise sorgu filmiyle en az bir ortak tür şartı
+
+        Returns:
+            List[Tuple[int, float]]: (movie_id, kosinüs benzerliği) büyükten küçüğe;
+            istenen türlerden biri indekste hiç yoksa veya same_genre ile sorgu
+            filminin türü yoksa boş liste (filtre sessizce atlanmaz)
+        """
+        row = self._rows.get(movie_id)
+        if row is None or not self._valid[row]:
+            return []
+        if genres and any(genre not in self._genre_bits for genre in genres):
+            return []
+
+        size = self._size
+        scores = self._vectors[:size] @ self._vectors[row]
+        mask = self._valid[:size].copy()
+        mask[row] = False
+
+        required = 0
+        if genres:
+            required |= self.genre_mask(genres)
+        if same_genre:
+            own_genres = int(self._genre_masks[row])
+            if not own_genres:
+                return []
+            required |= own_genres
+        if required:
+            mask &= (self._genre_masks[:size] & np.uint64(required)) != 0
+
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0:
+            return []
+        k = min(k, candidates.size)
+        candidate_scores = scores[candidates]
+        top = np.argpartition(-candidate_scores, k - 1)[:k]
+        top = top[np.argsort(-candidate_scores[top], kind="stable")]
+        return [(int(self._movie_ids[candidates[i]]), float(candidate_scores[i])) for i in top]
+
+
+_index: Optional[EmotionSimilarityIndex] = None
+_refresh_thread: Optional[threading.Thread] = None
+
+
+def get_similarity_index() -> EmotionSimilarityIndex:
+    """Süreç genelinde tek EmotionSimilarityIndex örneğini döndürür."""
+    global _index
+    if _index is None:
+        _index = EmotionSimilarityIndex(settings.EMOTION_CATEGORIES)
+    return _index
+
+
+def rebuild_similarity_index(db: Session) -> EmotionSimilarityIndex:
+    """
+    İndeksi yeni bir nesneye sıfırdan kurar ve süreç genelindeki referansı
+    değiştirir; süren sorgular eski nesneyi tutarlı şekilde kullanmaya devam eder.
+    """
+    global _index
+    index = EmotionSimilarityIndex(settings.EMOTION_CATEGORIES)
+    index.build(db)
+    _index = index
+    return index
+
+
+def start_similarity_index(session_factory) -> None:
+    """
+    İndeksi kurar ve SIMILARITY_REFRESH_SECONDS aralıkla artımlı yenileyen
+    daemon thread'i başlatır (uygulama açılışında çağrılır).
+    """
+    global _refresh_thread
+
+    db = session_factory()
+    try:
+        rebuild_similarity_index(db)
+    except Exception as e:
+        logger.error(f"❌ Benzerlik indeksi kurulamadı: {e}")
+    finally:
+        db.close()
+
+    interval = settings.SIMILARITY_REFRESH_SECONDS
+    if interval <= 0 or _refresh_thread is not None:
+        return
+
+    def _refresh_loop():
+        while True:
+            time.sleep(interval)
+            db = session_factory()
+            try:
+                if get_similarity_index().refresh(db) is None:
+                    rebuild_similarity_index(db)
+            except Exception as e:
+                logger.warning(f"⚠️ Benzerlik indeksi yenilenemedi: {e}")
+            finally:
+                db.close()
+
+    _refresh_thread = threading.Thread(target=_refresh_loop, name="similarity-index-refresh", daemon=True)
+    _refresh_thread.start()
@@ -0,0 +1,240 @@
+"""
+Film özetleri (overview) için yoğun vektör indeksi ve yaklaşık en yakın komşu araması.
+
+- Vektörler çevrimdışı üretilir (TF-IDF + TruncatedSVD / LSA, bkz. ml/build_text_index.py)
+  ve diskte float32 memmap matris olarak saklanır (RAM'e kopyalanmaz).
+- Arama, rastgele izdüşümlü LSH (random-projection / SimHash) ile aday
+  toplar; adaylar memmap üzerinden tam kosinüs benzerliğiyle yeniden sıralanır.
+
+Dizin yapısı (TEXT_INDEX_DIR):
+    vectors.f32     (n, d) float32, satırlar birim uzunlukta
+    movie_ids.npy   (n,) int64
+    lsa.joblib      {"vectorizer": TfidfVectorizer, "svd": TruncatedSVD}
+    meta.json       {"n": ..., "dim": ..., "built_at": ..., ...}
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.f32"
+MOVIE_IDS_FILE = "movie_ids.npy"
+LSA_FILE = "lsa.joblib"
+META_FILE = "meta.json"
+
+
+class RandomProjectionLSH:
+    """
+    İşaret tabanlı rastgele izdüşüm LSH (kosinüs benzerliği için).
+
+    Her tablo için ``n_bits`` adet rastgele hiper düzlem kullanılır; bir
+    vektörün kovası, hiper düzlemlere göre işaretlerinden oluşan tam sayıdır.
+    Kovalar sıralı kod dizisi + başlangıç ofsetleri (CSR benzeri) olarak
+    tutulur; arama ``np.searchsorted`` ile O(log n)'dir.
+    """
+
+    def __init__(self, dim: int, n_tables: int = 8, n_bits: int = 12, seed: int = 42):
+        if n_bits > 62:
+            raise ValueError("n_bits en fazla 62 olabilir")
+        self.dim = dim
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((n_tables, dim, n_bits)).astype(np.float32)
+        self._powers = (1 << np.arange(n_bits, dtype=np.int64))
+        self._tables: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+
+    def _codes(self, vectors: np.ndarray, table: int) -> np.ndarray:
+        bits = (vectors @ self._planes[table]) > 0
+        return bits.astype(np.int64) @ self._powers
+
+    def fit(self, vectors: np.ndarray, chunk_size: int = 65536) -> "RandomProjectionLSH":
+        """Tüm vektörleri kovalara yerleştirir (memmap için parça parça okur)."""
+        n = len(vectors)
+        self._tables = []
+        for t in range(self.n_tables):
+            codes = np.empty(n, dtype=np.int64)
+            for start in range(0, n, chunk_size):
+                codes[start:start + chunk_size] = self._codes(np.asarray(vectors[start:start + chunk_size]), t)
+            order = np.argsort(codes, kind="stable")
+            sorted_codes = codes[order]
+            unique_codes, starts = np.unique(sorted_codes, return_index=True)
+            self._tables.append((unique_codes, starts, order))
+        return self
+
+    def candidates(self, query: np.ndarray, multiprobe: int = 1) -> np.ndarray:
+        """
+        Sorgu vektörüyle aynı (ve multiprobe>0 ise 1 bit farklı) kovalardaki
+        satır indekslerini döndürür.
+        """
+        found = []
+        for t, (unique_codes, starts, order) in enumerate(self._tables):
+            code = int(self._codes(query[None, :], t)[0])
+            probes = [code]
+            if multiprobe:
+                # En belirsiz (hiper düzleme en yakın) bitleri çevirerek komşu kovaları da yokla
+                margins = np.abs(query @ self._planes[t])
+                for bit in np.argsort(margins)[:multiprobe]:
+                    probes.append(code ^ (1 << int(bit)))
+            for probe in probes:
+                pos = np.searchsorted(unique_codes, probe)
+                if pos < len(unique_codes) and unique_codes[pos] == probe:
+                    end = starts[pos + 1] if pos + 1 < len(starts) else len(order)
+                    found.append(order[starts[pos]:end])
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+
+class TextEmbeddingIndex:
+    """Overview vektörleri (memmap) + LSA kodlayıcı + LSH üzerinde arama."""
+
+    def __init__(self, vectors: np.ndarray, movie_ids: np.ndarray, vectorizer=None, svd=None, lsh_seed: int = 42):
+        self.vectors = vectors
+        self.movie_ids = movie_ids
+        self._row_by_movie = {int(mid): i for i, mid in enumerate(movie_ids)}
+        self.vectorizer = vectorizer
+        self.svd = svd
+
+        start = time.perf_counter()
+        self.lsh = RandomProjectionLSH(
+            vectors.shape[1],
+            n_tables=settings.LSH_TABLES,
+            n_bits=settings.LSH_BITS,
+            seed=lsh_seed,
+        ).fit(vectors)
+        logger.info(
+            f"🔎 Metin indeksi hazır: {len(movie_ids)} film, {vectors.shape[1]} boyut, "
+            f"LSH {settings.LSH_TABLES}x{settings.LSH_BITS} bit ({(time.perf_counter() - start) * 1000:.0f} ms)"
+        )
+
+    @classmethod
+    def load(cls, index_dir: str) -> "TextEmbeddingIndex":
+        """build_text_index.py çıktısını yükler; vektörler memmap olarak açılır."""
+        import joblib
+
+        with open(os.path.join(index_dir, META_FILE), encoding="utf-8") as f:
+            meta: Dict = json.load(f)
+        n, dim = int(meta["n"]), int(meta["dim"])
+        vectors = np.memmap(os.path.join(index_dir, VECTORS_FILE), dtype=np.float32, mode="r", shape=(n, dim))
+        movie_ids = np.load(os.path.join(index_dir, MOVIE_IDS_FILE))
+        lsa = joblib.load(os.path.join(index_dir, LSA_FILE))
+        return cls(vectors, movie_ids, lsa["vectorizer"], lsa["svd"], lsh_seed=int(meta.get("lsh_seed", 42)))
+
+    def __len__(self) -> int:
+        return len(self.movie_ids)
+
+    def encode(self, text: str) -> np.ndarray:
+        """
+        Serbest metni LSA uzayında birim vektöre çevirir; kelimelerin hiçbiri
+        sözlükte yoksa sıfır vektör döner (search bunun için boş sonuç verir).
+        """
+        if self.vectorizer is None or self.svd is None:
+            raise RuntimeError("Bu indeks için LSA kodlayıcı yüklenmedi")
+        vector = self.svd.transform(self.vectorizer.transform([text]))[0].astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def vector_for_movie(self, movie_id: int) -> Optional[np.ndarray]:
+        row = self._row_by_movie.get(movie_id)
+        return None if row is None else np.asarray(self.vectors[row])
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        exact: bool = False,
+        exclude_movie_id: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        En benzer k filmi döndürür.
+
+        Args:
+            query: Birim uzunlukta sorgu vektörü
+            k: Sonuç sayısı
+            exact: True ise LSH atlanır, tüm matris taranır (recall ölçümü için)
+            exclude_movie_id: Sonuçlardan çıkarılacak film ("buna benzer" sorguları)
+
+        Returns:
+            List[Tuple[int, float]]: (movie_id, kosinüs benzerliği); sorgu sıfır
+            vektörse (ör. sözlük dışı metin) boş liste
+        """
+        if not np.any(query):
+            return []
+        extra = 1 if exclude_movie_id is not None else 0
+        if exact:
+            rows = None
+        else:
+            rows = self.lsh.candidates(query, multiprobe=settings.LSH_MULTIPROBE)
+            if len(rows) < k + extra:
+                rows = None  # Yetersiz aday: tam taramaya düş
+
+        if rows is None:
+            scores = np.asarray(self.vectors) @ query
+            rows = np.arange(len(scores))
+        else:
+            scores = np.asarray(self.vectors[rows]) @ query
+
+        take = min(k + extra, len(scores))
+        if take == 0:
+            return []
+        top = np.argpartition(-scores, take - 1)[:take]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        results = [(int(self.movie_ids[rows[i]]), float(scores[i])) for i in top]
+        if exclude_movie_id is not None:
+            results = [r for r in results if r[0] != exclude_movie_id]
+        return results[:k]
+
+    def evaluate_recall(self, n_queries: int = 200, k: int = 10, seed: int = 0) -> Dict[str, float]:
+        """
+        Katalogdan rastgele filmleri sorgu yaparak LSH aramasının tam aramaya
+        göre recall@k değerini ve ortalama gecikmeleri ölçer.
+        """
+        rng = np.random.default_rng(seed)
+        rows = rng.choice(len(self), size=min(n_queries, len(self)), replace=False)
+        hits, approx_ms, exact_ms = 0, 0.0, 0.0
+        for row in rows:
+            query = np.asarray(self.vectors[row])
+            start = time.perf_counter()
+            approx = {mid for mid, _ in self.search(query, k)}
+            approx_ms += (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            exact = {mid for mid, _ in self.search(query, k, exact=True)}
+            exact_ms += (time.perf_counter() - start) * 1000
+            hits += len(approx & exact)
+        total = len(rows) * k
+        return {
+            "recall_at_k": hits / total if total else 0.0,
+            "approx_ms": approx_ms / max(1, len(rows)),
+            "exact_ms": exact_ms / max(1, len(rows)),
+        }
+
+
+_text_index: Optional[TextEmbeddingIndex] = None
+_text_index_lock = threading.Lock()
+
+
+def get_text_index() -> Optional[TextEmbeddingIndex]:
+    """
+    Metin indeksini ilk çağrıda yükler; indeks henüz oluşturulmamışsa None döner
+    (python backend/ml/build_text_index.py).
+    """
+    global _text_index
+    if _text_index is None:
+        with _text_index_lock:
+            if _text_index is None:
+                index_dir = settings.TEXT_INDEX_DIR
+                if not os.path.exists(os.path.join(index_dir, META_FILE)):
+                    logger.warning(f"⚠️ Metin indeksi bulunamadı: {index_dir}")
+                    return None
+                _text_index = TextEmbeddingIndex.load(index_dir)
+    return _text_index
@@ -0,0 +1,230 @@
+"""
+Trend ve duygu bazlı liderlik listeleri (materialized aggregate).
+
+user_history'deki liked/viewed/clicked sayıları kayan pencerelerde
+(TRENDING_WINDOWS gün) film başına toplanır ve her pencere için genel
+("all") + her duygu etiketi için ilk TRENDING_TOP_N film trending_movies
+tablosuna yazılır. Tablo arka plan thread'i tarafından TRENDING_REFRESH_SECONDS
+aralıkla tek transaction'da yenilenir; istekler sadece indeksli küçük bir
+tabloyu okur.
+
+Her worker aynı thread'i çalıştırdığı için yenileme tek yerde yapılır:
+PostgreSQL'de transaction'a bağlı advisory lock'u (pg_try_advisory_xact_lock)
+alamayan worker atlar, kilidi alan da tablo son aralık içinde başka bir
+worker tarafından yenilendiyse hesaplamayı atlar. Tek bir zamanlanmış görev
+tercih edilirse worker'larda TRENDING_REFRESH_SECONDS=-1 verilip
+``python -m backend.services.trending`` cron ile çalıştırılabilir. Etkileşimi az olan pencerelerde sıralama vote_average ve
+popularity ile tamamlanır (soğuk başlangıç).
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import case, func, text
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.db.models import Emotion, Movie, TrendingMovie, UserHistory
+
+logger = logging.getLogger(__name__)
+
+OVERALL_LIST = "all"
+
+# pg_try_advisory_xact_lock anahtarı (uygulama genelinde sabit, "trending" için)
+_ADVISORY_LOCK_KEY = 0x7472656E64
+
+
+def _try_refresh_lock(db: Session) -> bool:
+    """
+    Yenileme kilidini mevcut transaction için almaya çalışır (commit/rollback'te
+    bırakılır). PostgreSQL dışındaki veritabanlarında her zaman True döner.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return True
+    return bool(db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY}).scalar())
+
+
+def _is_fresh(db: Session, max_age_seconds: float) -> bool:
+    """Tablo son max_age_seconds içinde yenilendi mi?"""
+    last_refresh = db.query(func.max(TrendingMovie.refreshed_at)).scalar()
+    return last_refresh is not None and (datetime.utcnow() - last_refresh).total_seconds() < max_age_seconds
+
+
+def _window_counts(db: Session, cutoff: datetime):
+    """Pencere içindeki etkileşimleri film başına toplar (tek GROUP BY)."""
+    def count_of(interaction: str):
+        return func.sum(case((UserHistory.interaction == interaction, 1), else_=0))
+
+    return (
+        db.query(UserHistory.movie_id, count_of("liked"), count_of("viewed"), count_of("clicked"))
+        .filter(UserHistory.watch_date >= cutoff)
+        .group_by(UserHistory.movie_id)
+        .all()
+    )
+
+
+def refresh_trending(db: Session, min_age_seconds: float = 0) -> Dict[str, float]:
+    """
+    Tüm pencereler ve listeler için trending_movies tablosunu yeniden hesaplar.
+
+    Veritabanına pencere başına tek bir GROUP BY gider; film ve duygu
+    etiketleri bir kez okunur, sıralama NumPy ile yapılır.
+
+    Args:
+        db: Veritabanı oturumu
+        min_age_seconds: Tablo bundan daha yakın zamanda yenilendiyse hesaplama atlanır
+
+    Returns:
+        Dict[str, float]: {"rows": yazılan satır, "compute_ms": ..., "elapsed_ms": ...};
+            başka bir süreç yeniliyorsa veya tablo günse {"rows": 0, "skipped": True}
+    """
+    start = time.perf_counter()
+    if not _try_refresh_lock(db) or (min_age_seconds > 0 and _is_fresh(db, min_age_seconds)):
+        db.rollback()  # Kilidi (alındıysa) bırak
+        logger.debug("Trend listeleri başka bir süreçte yenileniyor veya güncel; atlandı")
+        return {"rows": 0, "skipped": True}
+    now = datetime.utcnow()
+
+    movies = db.query(Movie.movie_id, Movie.vote_average, Movie.popularity).all()
+    movie_ids = np.fromiter((m.movie_id for m in movies), dtype=np.int64, count=len(movies))
+    vote = np.fromiter((m.vote_average or 0.0 for m in movies), dtype=np.float64, count=len(movies))
+    popularity = np.fromiter((m.popularity or 0.0 for m in movies), dtype=np.float64, count=len(movies))
+    row_of = {int(mid): i for i, mid in enumerate(movie_ids)}
+
+    # Liste anahtarı -> film satırları ("all" için None: tüm filmler)
+    members: Dict[str, Optional[np.ndarray]] = {OVERALL_LIST: None}
+    by_label: Dict[str, List[int]] = {label: [] for label in settings.EMOTION_CATEGORIES}
+    for movie_id, label in db.query(Emotion.movie_id, Emotion.emotion_label).distinct():
+        if label in by_label and movie_id in row_of:
+            by_label[label].append(row_of[movie_id])
+    for label, rows in by_label.items():
+        members[label] = np.asarray(rows, dtype=np.int64)
+
+    weights = settings.ALS_INTERACTION_WEIGHTS
+    mappings: List[Dict] = []
+    for window_days in settings.TRENDING_WINDOWS:
+        counts = np.zeros((len(movies), 3), dtype=np.int64)  # likes, views, clicks
+        for movie_id, likes, views, clicks in _window_counts(db, now - timedelta(days=window_days)):
+            row = row_of.get(movie_id)
+            if row is not None:
+                counts[row] = (likes or 0, views or 0, clicks or 0)
+        score = counts @ np.array([weights.get("liked", 0), weights.get("viewed", 0), weights.get("clicked", 0)],
+                                  dtype=np.float64)
+
+        for list_key, rows in members.items():
+            if rows is None:
+                rows = np.arange(len(movies))
+            if rows.size == 0:
+                continue
+            # Skor, sonra vote_average, sonra popularity (azalan); eşitlikte movie_id
+            order = np.lexsort((movie_ids[rows], -popularity[rows], -vote[rows], -score[rows]))
+            top = rows[order[:settings.TRENDING_TOP_N]]
+            mappings.extend(
+                {
+                    "list_key": list_key,
+                    "window_days": window_days,
+                    "rank": rank,
+                    "movie_id": int(movie_ids[row]),
+                    "likes": int(counts[row, 0]),
+                    "views": int(counts[row, 1]),
+                    "clicks": int(counts[row, 2]),
+                    "score": float(score[row]),
+                    "refreshed_at": now,
+                }
+                for rank, row in enumerate(top, start=1)
+            )
+    compute_ms = (time.perf_counter() - start) * 1000
+
+    # Eski listeleri tek transaction'da değiştir (okuyucular eski anlık görüntüyü görür)
+    try:
+        db.query(TrendingMovie).delete(synchronize_session=False)
+        if mappings:
+            db.bulk_insert_mappings(TrendingMovie, mappings)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(
+        f"📈 Trend listeleri yenilendi: {len(mappings)} satır, "
+        f"hesaplama {compute_ms:.1f} ms, toplam {elapsed_ms:.1f} ms"
+    )
+    return {"rows": len(mappings), "compute_ms": compute_ms, "elapsed_ms": elapsed_ms}
+
+
+def get_trending(db: Session, window_days: int, list_key: str = OVERALL_LIST, limit: int = 20):
+    """Materialize edilmiş listeden ilk `limit` filmi film bilgileriyle döndürür."""
+    return (
+        db.query(
+            TrendingMovie.rank,
+            TrendingMovie.likes,
+            TrendingMovie.views,
+            TrendingMovie.clicks,
+            TrendingMovie.score,
+            TrendingMovie.refreshed_at,
+            Movie.movie_id,
+            Movie.title,
+            Movie.poster_url,
+            Movie.release_date,
+            Movie.vote_average,
+            Movie.genre,
+        )
+        .join(Movie, Movie.movie_id == TrendingMovie.movie_id)
+        .filter(TrendingMovie.list_key == list_key, TrendingMovie.window_days == window_days)
+        .order_by(TrendingMovie.rank)
+        .limit(limit)
+        .all()
+    )
+
+
+_refresh_thread: Optional[threading.Thread] = None
+
+
+def start_trending_refresh(session_factory) -> None:
+    """
+    Listeleri hemen bir kez hesaplar ve TRENDING_REFRESH_SECONDS aralıkla
+    yenileyen daemon thread'i başlatır (uygulama açılışında çağrılır).
+    """
+    global _refresh_thread
+    interval = settings.TRENDING_REFRESH_SECONDS
+    if interval < 0:
+        return  # Yenileme dışarıda (cron) yapılıyor
+
+    def _refresh_once():
+        db = session_factory()
+        try:
+            # Diğer worker'lardan biri bu aralıkta yenilediyse tekrar hesaplama
+            refresh_trending(db, min_age_seconds=interval / 2 if interval > 0 else 0)
+        except Exception as e:
+            logger.warning(f"⚠️ Trend listeleri yenilenemedi: {e}")
+        finally:
+            db.close()
+
+    _refresh_once()
+
+    if interval == 0 or _refresh_thread is not None:
+        return
+
+    def _refresh_loop():
+        while True:
+            time.sleep(interval)
+            _refresh_once()
+
+    _refresh_thread = threading.Thread(target=_refresh_loop, name="trending-refresh", daemon=True)
+    _refresh_thread.start()
+
+
+if __name__ == "__main__":
+    from backend.db.connection import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        print(refresh_trending(session))
+    finally:
+        session.close()
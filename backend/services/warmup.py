@@ -0,0 +1,154 @@
+"""
+Açılış ısınması: ilk isteklerin ödediği tek seferlik maliyetleri hazır olma
+(readiness) öncesine çeker.
+
+- Model: modeller yüklenir ve her predictor'dan tek satırlık + toplu sentetik
+  tahmin geçer (AutoGluon iç tembel yüklemeleri, pandas ilk çağrısı).
+- Veritabanı: SQLAlchemy mapper'ları yapılandırılır, bağlantı havuzu
+  WARMUP_DB_CONNECTIONS bağlantıyla doldurulur ve öneri sıcak yolundaki
+  sorgu şekilleri bir kez çalıştırılıp derlenmiş sorgu önbelleğine alınır.
+
+Isınma açılışta arka plan thread'inde çalışır (start_warmup); sunucu bu
+sırada bağlantı kabul eder ve /recommendation/health ısınma bitene kadar
+"warming_up" ile 503 döner (readiness probe trafiği ısınma sonrasına bırakır).
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import desc, func, text
+from sqlalchemy.orm import Session, configure_mappers
+
+from backend.config import settings
+from backend.db.models import Emotion, Movie
+
+logger = logging.getLogger(__name__)
+
+WARMUP_PENDING = "pending"
+WARMUP_RUNNING = "running"
+WARMUP_DONE = "done"
+WARMUP_SKIPPED = "skipped"
+
+warmup_status: Dict = {"state": WARMUP_PENDING}
+_warmup_thread: Optional[threading.Thread] = None
+
+
+def is_warmed_up() -> bool:
+    """Isınma bitti (veya kapalı) mı?"""
+    return warmup_status["state"] in (WARMUP_DONE, WARMUP_SKIPPED)
+
+
+def _set_status(**status) -> None:
+    warmup_status.clear()
+    warmup_status.update(status)
+
+
+def _warm_model() -> None:
+    from backend.services.recommender_service import get_recommender_service
+
+    service = get_recommender_service()
+    if not service.is_ready():
+        raise RuntimeError("Model hazır değil")
+    service.warm_up()
+
+
+def _prime_connection_pool(engine) -> int:
+    """Havuzu dolduracak kadar bağlantıyı aynı anda açar (SELECT 1) ve havuza geri bırakır."""
+    size = settings.WARMUP_DB_CONNECTIONS or getattr(engine.pool, "size", lambda: 1)()
+    connections = []
+    try:
+        for _ in range(size):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def _warm_hot_queries(db: Session) -> None:
+    """/by-emotions ve /predict-emotions yolundaki sorgu şekilleri (sonuçlar kullanılmaz)."""
+    emotion = settings.EMOTION_CATEGORIES[0]
+    db.query(Movie.movie_id, Movie.vote_average, Movie.genre, Emotion.emotion_label)\
+        .join(Emotion, Movie.movie_id == Emotion.movie_id)\
+        .filter(Emotion.emotion_label == emotion)\
+        .order_by(Movie.movie_id).limit(1).all()
+    db.query(func.count(Movie.movie_id)).filter(Movie.overview.isnot(None)).scalar()
+    db.query(Movie.movie_id, Movie.vote_average, Movie.genre, Movie.overview)\
+        .filter(Movie.overview.isnot(None))\
+        .order_by(desc(Movie.vote_average), desc(Movie.popularity)).limit(1).all()
+    db.query(Movie).limit(1).all()
+
+
+def run_warmup(session_factory) -> Dict:
+    """
+    Isınma adımlarını sırayla çalıştırır (start_warmup arka planda çağırır).
+    Başarısız adım loglanır ve atlanır; ısınma yine tamamlanmış sayılır.
+
+    Returns:
+        Dict: Durum, toplam süre ve adım başına süre (ms) / hata
+    """
+    if not settings.WARMUP_ON_STARTUP:
+        _set_status(state=WARMUP_SKIPPED)
+        return dict(warmup_status)
+
+    from backend.db.connection import engine
+
+    _set_status(state=WARMUP_RUNNING)
+    start = time.perf_counter()
+    steps: Dict[str, float] = {}
+    errors: Dict[str, str] = {}
+
+    def _step(name: str, fn: Callable[[], object]) -> None:
+        step_start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            errors[name] = str(e)
+            logger.warning(f"⚠️ Isınma adımı başarısız ({name}): {e}")
+        steps[name] = round((time.perf_counter() - step_start) * 1000, 1)
+
+    def _queries():
+        db = session_factory()
+        try:
+            _warm_hot_queries(db)
+        finally:
+            db.close()
+
+    _step("model", _warm_model)
+    _step("mappers", configure_mappers)
+    _step("connection_pool", lambda: _prime_connection_pool(engine))
+    _step("queries", _queries)
+
+    seconds = time.perf_counter() - start
+    _set_status(state=WARMUP_DONE, seconds=round(seconds, 3), steps_ms=steps)
+    if errors:
+        warmup_status["errors"] = errors
+    logger.info(f"🔥 Açılış ısınması tamamlandı: {seconds:.2f} sn "
+                f"({', '.join(f'{name} {ms:.0f} ms' for name, ms in steps.items())})")
+    return dict(warmup_status)
+
+
+def start_warmup(session_factory) -> None:
+    """
+    Isınmayı daemon thread'de başlatır (uygulama açılışında çağrılır); açılış
+    hook'u ısınmayı beklemez, hazır olma /recommendation/health ile izlenir.
+    """
+    global _warmup_thread
+    if _warmup_thread is not None:
+        return
+
+    def _run():
+        try:
+            run_warmup(session_factory)
+        except Exception as e:
+            # Adım hataları run_warmup içinde yakalanır; buraya gelen beklenmeyen hata
+            # ısınmayı sonsuza dek "running" bırakmasın
+            logger.error(f"❌ Açılış ısınması başarısız: {e}")
+            _set_status(state=WARMUP_DONE, errors={"warmup": str(e)})
+
+    _warmup_thread = threading.Thread(target=_run, name="startup-warmup", daemon=True)
+    _warmup_thread.start()
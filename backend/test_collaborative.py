@@ -0,0 +1,166 @@
+# backend/test_collaborative.py
+#
+# Item-item co-occurrence CF indeksi (artımlı güncelleme, olay günlüğü,
+# kaydetme/yükleme) testleri.
+#
+#   python -m pytest backend/test_collaborative.py
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.config import settings
+from backend.db.models import UserHistory, UserHistoryEvent
+from backend.services import collaborative
+from backend.services.collaborative import (
+    ItemCooccurrenceIndex, record_history_event, start_cooccurrence_index, sync_cooccurrence_index,
+)
+
+
+def _neighbors(index: ItemCooccurrenceIndex, movie_id: int) -> dict:
+    ids, sims = index.neighbors(movie_id)
+    return {int(i): round(float(s), 5) for i, s in zip(ids, sims)}
+
+
+def _assert_same(index: ItemCooccurrenceIndex, expected: ItemCooccurrenceIndex, movie_ids) -> None:
+    for movie_id in movie_ids:
+        assert _neighbors(index, movie_id) == _neighbors(expected, movie_id)
+
+
+def _built(db) -> ItemCooccurrenceIndex:
+    index = ItemCooccurrenceIndex()
+    index.build(db)
+    return index
+
+
+@pytest.fixture
+def write_history(db, add_history):
+    """POST /history gibi: kaydı ekler/siler ve aynı transaction'da olayı yazar."""
+    def _write(user_id: int, movie_id: int, interaction: str = "viewed", delete: bool = False) -> None:
+        if delete:
+            db.delete(db.query(UserHistory).filter_by(user_id=user_id, movie_id=movie_id,
+                                                      interaction=interaction).first())
+        else:
+            add_history(user_id, [])
+            db.add(UserHistory(user_id=user_id, movie_id=movie_id, interaction=interaction))
+        record_history_event(db, user_id, movie_id)
+        db.commit()
+    return _write
+
+
+def test_cooccurrence_add_and_remove_match_rebuild():
+    pairs = [(1, 10), (1, 20), (2, 10), (2, 30)]
+    index = ItemCooccurrenceIndex()
+    index.build_from_pairs(pairs)
+
+    index.add_interaction(3, 20)
+    index.add_interaction(3, 30)
+    expected = ItemCooccurrenceIndex()
+    expected.build_from_pairs(pairs + [(3, 20), (3, 30)])
+    _assert_same(index, expected, (10, 20, 30))
+
+    index.remove_interaction(3, 30)
+    index.remove_interaction(3, 20)
+    expected.build_from_pairs(pairs)
+    _assert_same(index, expected, (10, 20, 30))
+
+
+def test_events_reach_every_worker_and_replay_is_idempotent(db, add_movies, write_history):
+    add_movies(4)
+    write_history(1, 1)
+    write_history(1, 2)
+    worker_a, worker_b = _built(db), _built(db)
+
+    write_history(2, 1)
+    write_history(2, 3)
+    write_history(1, 2, "liked")
+    write_history(1, 2, delete=True)  # viewed geri çekildi, liked kaldı
+    assert worker_a.catch_up(db) == 4
+    assert worker_a.catch_up(db) == 0  # son olaylar yeniden uygulanır, sonuç değişmez
+    assert worker_b.catch_up(db) == 4
+    _assert_same(worker_a, _built(db), (1, 2, 3))
+    _assert_same(worker_b, _built(db), (1, 2, 3))
+
+    write_history(1, 2, "liked", delete=True)
+    assert worker_a.catch_up(db) == 1
+    assert _neighbors(worker_a, 2) == {}
+    _assert_same(worker_a, _built(db), (1, 2, 3))
+
+
+def test_rebuild_applies_events_committed_during_build(db, session_factory, add_movies, write_history, monkeypatch):
+    add_movies(3)
+    write_history(1, 1)
+    build = ItemCooccurrenceIndex.build
+
+    def build_then_write(self, build_db):
+        build(self, build_db)
+        write_history(1, 2)  # Kurulum bitti, referans henüz değişmedi
+
+    monkeypatch.setattr(ItemCooccurrenceIndex, "build", build_then_write)
+    monkeypatch.setattr(settings, "CF_INDEX_PATH", "")
+    monkeypatch.setattr(collaborative, "_index", None)
+
+    index = collaborative.rebuild_cooccurrence_index(session_factory)
+
+    assert collaborative.get_cooccurrence_index() is index
+    assert _neighbors(index, 1) == {2: 1.0}
+
+
+def test_sync_persists_log_and_restart_replays_it(tmp_path, db, session_factory, add_movies, write_history,
+                                                  monkeypatch):
+    path = str(tmp_path / "cf" / "cooccurrence.npz")
+    monkeypatch.setattr(settings, "CF_INDEX_PATH", path)
+    monkeypatch.setattr(settings, "CF_SYNC_SECONDS", 0)
+    monkeypatch.setattr(collaborative, "_index", None)
+    add_movies(3)
+    write_history(1, 1)
+    start_cooccurrence_index(session_factory)  # Dosya yok: tam kurulum ve kayıt
+    index = collaborative.get_cooccurrence_index()
+
+    write_history(1, 2)
+    assert sync_cooccurrence_index(session_factory) == 1
+    assert ItemCooccurrenceIndex().load(path) and index.saved_event_id == index.event_id
+
+    # Yeniden başlatma: dosya + dosyadan sonraki olaylar, tam kurulum yok
+    write_history(2, 1)
+    write_history(2, 3)
+    monkeypatch.setattr(collaborative, "_index", None)
+    monkeypatch.setattr(ItemCooccurrenceIndex, "build", lambda self, db: pytest.fail("tam kurulum yapıldı"))
+    start_cooccurrence_index(session_factory)
+    restarted = collaborative.get_cooccurrence_index()
+    assert restarted.event_id == db.query(UserHistoryEvent).count()
+    monkeypatch.undo()
+    _assert_same(restarted, _built(db), (1, 2, 3))
+    assert [p.name for p in (tmp_path / "cf").iterdir()] == ["cooccurrence.npz"]
+
+
+def test_pruned_log_forces_rebuild(db, session_factory, add_movies, write_history, monkeypatch):
+    monkeypatch.setattr(settings, "CF_EVENT_LOOKBACK", 0)
+    monkeypatch.setattr(settings, "CF_INDEX_PATH", "")
+    add_movies(3)
+    write_history(1, 1)
+    stale = _built(db)
+    write_history(1, 2)
+    write_history(1, 3)
+    db.query(UserHistoryEvent).update({"created_at": datetime.utcnow() - timedelta(days=2)})
+    db.commit()
+    collaborative._prune_events(db, saved_event_id=2)
+
+    assert stale.catch_up(db) is None
+    monkeypatch.setattr(collaborative, "_index", stale)
+    assert sync_cooccurrence_index(session_factory) is None
+    _assert_same(collaborative.get_cooccurrence_index(), _built(db), (1, 2, 3))
+
+
+def test_cooccurrence_save_and_load(tmp_path):
+    index = ItemCooccurrenceIndex()
+    index.build_from_pairs([(1, 1), (1, 2), (2, 1), (2, 3)], event_id=7)
+    index.add_interaction(2, 2)
+    path = tmp_path / "cooccurrence.npz"
+    index.save(str(path))
+
+    loaded = ItemCooccurrenceIndex()
+    assert loaded.load(str(path))
+    assert loaded.event_id == loaded.saved_event_id == 7
+    _assert_same(loaded, index, (1, 2, 3))
+    assert not ItemCooccurrenceIndex().load(str(tmp_path / "missing.npz"))
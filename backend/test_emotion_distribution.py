@@ -0,0 +1,147 @@
+# backend/test_emotion_distribution.py
+#
+# /emotion-distribution örneklem boyutu, güven aralığı ve arka plan işi
+# (claim / heartbeat / stale) testleri.
+#
+#   python -m pytest backend/test_emotion_distribution.py
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.config import settings
+from backend.db.models import EmotionDistributionJob
+from backend.services import emotion_distribution
+from backend.services.emotion_distribution import (
+    JOB_RUNNING,
+    SOURCE_MODEL,
+    _job_key,
+    compute_emotion_distribution,
+    required_sample_size,
+    wilson_interval,
+)
+from backend.services.predictor_backends import FakeBackend
+
+
+def test_required_sample_size():
+    assert required_sample_size(0) == 0
+    assert required_sample_size(50) <= 50
+    assert required_sample_size(1000) == 278
+    assert required_sample_size(10_000_000) == 385
+    assert required_sample_size(10_000_000, margin=0.01) > required_sample_size(10_000_000)
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(np.array([0, 50, 100]), 100, 0.95)
+
+    assert low[0] == 0 and 0 < high[0] < 0.05
+    assert low[1] == pytest.approx(0.4038, abs=1e-4)
+    assert high[1] == pytest.approx(0.5962, abs=1e-4)
+    assert 0.95 < low[2] and high[2] == 1
+
+
+class GatedRecommender:
+    """FakeBackend tahminleri; gate açılana kadar bekler ve her çağrıda işin updated_at'ini kaydeder."""
+
+    layout = "fake"
+    model_version = "v1"
+
+    def __init__(self, session_factory):
+        self.target_labels = list(settings.EMOTION_CATEGORIES)
+        self.loaded_labels = self.target_labels
+        self.backend = FakeBackend(self.target_labels)
+        self.session_factory = session_factory
+        self.gate = threading.Event()
+        self.rows = 0
+        self.heartbeats = []
+
+    def is_ready(self) -> bool:
+        return True
+
+    def predict_proba_batch(self, texts):
+        assert self.gate.wait(timeout=10)
+        db = self.session_factory()
+        try:
+            job = db.query(EmotionDistributionJob).one()
+            self.heartbeats.append(job.updated_at)
+        finally:
+            db.close()
+        self.rows += len(texts)
+        return self.backend.predict_proba_batch(texts)
+
+
+@pytest.fixture
+def recommender(session_factory, add_movies, monkeypatch):
+    add_movies(20)
+    monkeypatch.setattr(settings, "EMOTION_DISTRIBUTION_SYNC_ROWS", 5)
+    monkeypatch.setattr(settings, "EMOTION_DISTRIBUTION_BATCH_SIZE", 5)
+    # Her 5 filmde bir heartbeat
+    monkeypatch.setattr(emotion_distribution, "_MAX_SQL_PARAMS", 5)
+    recommender = GatedRecommender(session_factory)
+    yield recommender
+    recommender.gate.set()
+
+
+def _compute(db, session_factory, recommender):
+    return compute_emotion_distribution(db, session_factory, recommender, limit=20, source=SOURCE_MODEL, exact=True)
+
+
+def _wait_until_done(db, session_factory, recommender):
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        db.expire_all()
+        status = _compute(db, session_factory, recommender)
+        if status["status"] != JOB_RUNNING:
+            return status
+        time.sleep(0.02)
+    raise AssertionError("Arka plan işi bitmedi")
+
+
+def test_background_job_is_claimed_once_and_heartbeats(db, session_factory, recommender):
+    first = _compute(db, session_factory, recommender)
+    assert first["status"] == JOB_RUNNING and first["rows"] == 20
+
+    # İş sürerken gelen aynı istek (başka worker) yeni iş başlatmaz, durumu görür
+    db.expire_all()
+    assert _compute(db, session_factory, recommender)["status"] == JOB_RUNNING
+
+    recommender.gate.set()
+    result = _wait_until_done(db, session_factory, recommender)
+    assert result["status"] == "success"
+    assert result["total_movies_analyzed"] == 20
+    assert recommender.rows == 20
+    # Her film grubundan sonra heartbeat: updated_at ilerler
+    assert len(recommender.heartbeats) == 4
+    assert recommender.heartbeats == sorted(recommender.heartbeats)
+    assert recommender.heartbeats[-1] > recommender.heartbeats[0]
+
+    # Biten sonuç önbellekten döner, yeniden hesaplanmaz
+    assert _compute(db, session_factory, recommender) == result
+    assert recommender.rows == 20
+
+
+def test_stale_running_job_is_restarted(db, session_factory, recommender, monkeypatch):
+    monkeypatch.setattr(settings, "EMOTION_DISTRIBUTION_STALE_SECONDS", 60)
+    job_key = _job_key(("v1", "fake", 20, 0.95, 0.05, True))
+    long_ago = datetime.utcnow() - timedelta(hours=1)
+
+    # Uzun süredir çalışan ama heartbeat'i taze iş: beklenir
+    db.add(EmotionDistributionJob(job_key=job_key, state=JOB_RUNNING, rows=20,
+                                  started_at=long_ago, updated_at=datetime.utcnow()))
+    db.commit()
+    assert _compute(db, session_factory, recommender)["started_at"] == long_ago.isoformat()
+    assert recommender.rows == 0
+
+    # Heartbeat'i kesilmiş iş (worker öldü): silinir ve yeniden üstlenilir
+    db.query(EmotionDistributionJob).update({"updated_at": long_ago})
+    db.commit()
+    restarted = _compute(db, session_factory, recommender)
+    assert restarted["status"] == JOB_RUNNING
+    assert restarted["started_at"] != long_ago.isoformat()
+
+    recommender.gate.set()
+    assert _wait_until_done(db, session_factory, recommender)["status"] == "success"
+    assert recommender.rows == 20
@@ -0,0 +1,89 @@
+# backend/test_import_time.py
+#
+# `python -X importtime` ile backend.app'in import süresini ölçer ve bütçeyi
+# kontrol eder. Bütçe projenin kendi payı içindir: FastAPI/SQLAlchemy/pydantic
+# aynı süreçte önceden import edilir (süreleri makineye göre çok oynar ve bizim
+# kontrolümüzde değildir). ML kütüphaneleri (AutoGluon, pandas, scikit-learn,
+# joblib, scipy) sadece modeller/matrisler kurulurken import edilmeli; API ve
+# CLI açılışı bunları ödememeli.
+#
+#   python -m pytest backend/test_import_time.py
+#   python backend/test_import_time.py          (en yavaş modülleri listeler)
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Sequence, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# Framework'ler önceden yüklüyken soğuk olmayan (dosya önbelleği ısınmış) import için
+# bütçe; IMPORT_TIME_BUDGET_MS ile değiştirilebilir. Tek çekirdekli yavaş bir makinede
+# ~350 ms ölçülür.
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "500"))
+FRAMEWORK_MODULES = ("fastapi", "fastapi.routing", "sqlalchemy.orm", "pydantic")
+HEAVY_MODULES = ("autogluon.tabular", "pandas", "sklearn", "joblib", "torch", "scipy")
+
+
+def measure_import(module: str, repeat: int = 3, preload: Sequence[str] = ()) -> Tuple[float, Dict[str, float], str]:
+    """
+    module'ü ayrı süreçlerde `-X importtime` ile import eder (preload modülleri
+    önce import edilir); en hızlı çalıştırmanın toplam süresini (ms), modül başına
+    kümülatif süreleri ve stdout'u döndürür.
+    """
+    code = "".join(f"import {name}; " for name in preload) + f"import {module}"
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=PROJECT_ROOT, capture_output=True, text=True,
+        )
+        # Veritabanı ayarları (.env / DATABASE_URL) olmadan backend.app import edilemez
+        assert result.returncode == 0, f"{module} import edilemedi:\n{result.stderr[-1000:]}"
+        cumulative: Dict[str, float] = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            # "import time: <self us> | <cumulative us> | <girintili modül adı>"
+            _, cumulative_us, name = line.split("|")
+            cumulative[name.strip()] = int(cumulative_us) / 1000
+        total = cumulative.get(module, 0.0)
+        if best is None or total < best[0]:
+            best = (total, cumulative, result.stdout)
+    return best
+
+
+def test_app_import_time_budget():
+    total_ms, cumulative, _ = measure_import("backend.app", preload=FRAMEWORK_MODULES)
+    assert total_ms <= IMPORT_TIME_BUDGET_MS, (
+        f"backend.app import süresi (framework hariç) {total_ms:.0f} ms > bütçe {IMPORT_TIME_BUDGET_MS:.0f} ms"
+    )
+
+
+def test_auth_router_does_not_import_recommendation():
+    # Login yolu öneri router'ını (ve modelleri) yüklememeli
+    _, cumulative, _ = measure_import("backend.routers.auth", repeat=1)
+    assert "backend.routers.recommendation" not in cumulative
+    assert "backend.services.recommender_service" not in cumulative
+
+
+def test_app_does_not_import_ml_libraries():
+    _, cumulative, _ = measure_import("backend.app", repeat=1)
+    loaded = [name for name in HEAVY_MODULES if name in cumulative]
+    assert not loaded, f"backend.app import sırasında ML kütüphaneleri yüklendi: {loaded}"
+
+
+def test_imports_do_not_print():
+    for module in ("backend.config", "backend.services.recommender_service", "backend.app"):
+        _, _, stdout = measure_import(module, repeat=1)
+        assert stdout == "", f"{module} import sırasında stdout'a yazdı: {stdout[:200]!r}"
+
+
+if __name__ == "__main__":
+    own_ms, _, _ = measure_import("backend.app", preload=FRAMEWORK_MODULES)
+    total_ms, cumulative, _ = measure_import("backend.app")
+    print(f"backend.app: {own_ms:.0f} ms framework hariç (bütçe {IMPORT_TIME_BUDGET_MS:.0f} ms), "
+          f"{total_ms:.0f} ms toplam")
+    top_level = {name: ms for name, ms in cumulative.items() if "." not in name or name.startswith("backend.")}
+    for name, ms in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:15]:
+        print(f"   {ms:8.1f} ms  {name}")
@@ -0,0 +1,41 @@
+# backend/test_importer.py
+#
+# Film içe aktarma (ON CONFLICT DO NOTHING ile tekrar eleme) testleri.
+#
+#   python -m pytest backend/test_importer.py
+
+from datetime import date
+
+import pandas as pd
+
+from backend.db.models import Movie
+from backend.ml import download_movies_dataset as importer
+
+
+def _frame(titles, dates) -> pd.DataFrame:
+    n = len(titles)
+    return pd.DataFrame({
+        "title": titles,
+        "release_date": dates,
+        "overview": ["..."] * n,
+        "popularity": [1.0] * n,
+        "vote_count": [10] * n,
+        "vote_average": [7.0] * n,
+        "original_language": ["en"] * n,
+        "genre": ["Drama"] * n,
+        "poster_url": [None] * n,
+    })[importer.MOVIE_COLUMNS]
+
+
+def test_importer_skips_duplicate_movies(engine, session_factory, db, monkeypatch):
+    monkeypatch.setattr(importer, "engine", engine)
+    monkeypatch.setattr(importer, "get_db_session", session_factory)
+    df = _frame(["A", "A", "B", "C"], [date(2000, 1, 1), date(2001, 1, 1), date(2000, 1, 1), None])
+
+    importer.import_to_database(df, batch_size=2)
+    # İkinci çalıştırma: hepsi mevcut, tarihsiz "C" de başlıktan elenir
+    importer.import_to_database(pd.concat([df, _frame(["D"], [date(2002, 1, 1)])]), batch_size=2)
+
+    movies = sorted((m.title, m.release_date or date.min) for m in db.query(Movie))
+    assert movies == [("A", date(2000, 1, 1)), ("A", date(2001, 1, 1)), ("B", date(2000, 1, 1)),
+                      ("C", date.min), ("D", date(2002, 1, 1))]
@@ -0,0 +1,116 @@
+# backend/test_inference_server.py
+#
+# RemoteBackend ↔ inference_server Unix soket protokolü testleri (geçici
+# soket üzerinde, model yerine FakeBackend).
+#
+#   python -m pytest backend/test_inference_server.py
+
+import json
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from backend.services.inference_server import InferenceServer
+from backend.services.predictor_backends import FakeBackend, RemoteBackend, recv_frame, send_frame
+
+LABELS = ["mutlu", "huzunlu", "korku"]
+
+
+class FakeService:
+    """InferenceServer'ın RecommenderService'ten kullandığı arayüz, FakeBackend üzerinde."""
+
+    layout = "fake"
+    model_version = "v1"
+
+    def __init__(self):
+        self.backend = FakeBackend(LABELS)
+        self.target_labels = LABELS
+        self.loaded_labels = LABELS
+
+    def is_ready(self) -> bool:
+        return True
+
+    def predict_proba_batch(self, texts):
+        return self.backend.predict_proba_batch(texts)
+
+
+def _serve(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def inference_server(tmp_path):
+    server = _serve(InferenceServer(str(tmp_path / "inference.sock"), FakeService(), 64, 5))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_remote_backend_round_trip(inference_server):
+    backend = RemoteBackend(inference_server.socket_path, pool_size=2)
+    try:
+        assert backend.is_ready()
+        assert backend.target_labels == LABELS
+        assert backend.loaded_labels == LABELS
+
+        texts = ["a quiet film", "a loud film", ""]
+        expected = FakeBackend(LABELS).predict_proba_batch(texts)
+        assert np.array_equal(backend.predict_proba_batch(texts), expected)
+        assert backend.predict_proba_batch([]).shape == (0, len(LABELS))
+
+        # Eşzamanlı istekler sunucuda birleştirilse de herkes kendi satırlarını alır
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(lambda text: backend.predict_proba_batch([text]), texts * 4))
+        for text, probs in zip(texts * 4, results):
+            assert np.array_equal(probs, FakeBackend(LABELS).predict_proba_batch([text]))
+    finally:
+        backend.close()
+
+
+class _GarbageHandler(socketserver.BaseRequestHandler):
+    """info isteğine doğru, diğer isteklere JSON olmayan çerçeve döner."""
+
+    def handle(self) -> None:
+        while True:
+            try:
+                request = json.loads(recv_frame(self.request))
+            except (ConnectionError, OSError, ValueError):
+                return
+            if request.get("op") == "info":
+                send_frame(self.request, json.dumps({
+                    "ready": True, "version": "v1", "target_labels": LABELS, "loaded_labels": LABELS,
+                }).encode())
+            else:
+                send_frame(self.request, b"not json")
+
+
+class _GarbageServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def test_malformed_frame_closes_connection(tmp_path, monkeypatch):
+    server = _serve(_GarbageServer(str(tmp_path / "garbage.sock"), _GarbageHandler))
+    connections = []
+    connect = RemoteBackend._connect
+
+    def recording_connect(self):
+        connections.append(connect(self))
+        return connections[-1]
+
+    monkeypatch.setattr(RemoteBackend, "_connect", recording_connect)
+    backend = RemoteBackend(str(tmp_path / "garbage.sock"), pool_size=1)
+    try:
+        with pytest.raises(ValueError):
+            backend.predict_proba_batch(["a film"])
+        # Bozuk bağlantı kapatıldı ve havuza dönmedi; havuz slotu bırakıldı
+        assert len(connections) == 1 and connections[0].fileno() == -1
+        assert backend._idle.empty()
+        assert backend.refresh_info()["ready"]
+    finally:
+        backend.close()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,77 @@
+# backend/test_interaction_stats.py
+#
+# movie_interaction_stats sayaçları: POST /history toggle'ında azaltma,
+# sıfırda kırpma ve user_history'den yeniden sayma testleri.
+#
+#   python -m pytest backend/test_interaction_stats.py
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core.auth import get_current_user
+from backend.db.connection import get_db
+from backend.db.models import MovieInteractionStats, User
+from backend.routers import history as history_router
+from backend.services.interaction_stats import rebuild_interaction_stats, record_interaction
+
+
+def _counts(db, movie_id):
+    db.expire_all()
+    row = db.get(MovieInteractionStats, movie_id)
+    return None if row is None else (row.likes, row.views, row.clicks)
+
+
+@pytest.fixture
+def client(session_factory, db, add_history):
+    add_history(1, [])
+    user = db.get(User, 1)
+
+    def _get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(history_router.router)
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    return TestClient(app)
+
+
+def test_like_toggle_increments_and_decrements(client, db, add_movies):
+    add_movies(1)
+
+    assert client.post("/history", json={"movie_id": 1, "interaction": "liked"}).status_code == 200
+    assert client.post("/history", json={"movie_id": 1, "interaction": "viewed"}).status_code == 200
+    assert _counts(db, 1) == (1, 1, 0)
+
+    # Aynı beğeni tekrar gönderilince geri çekilir (toggle): sadece likes azalır
+    assert client.post("/history", json={"movie_id": 1, "interaction": "liked"}).json()["action"] == "deleted"
+    assert _counts(db, 1) == (0, 1, 0)
+
+
+def test_decrement_clamps_at_zero(db, add_movies):
+    add_movies(1)
+    record_interaction(db, 1, "liked", +1)
+    db.commit()
+
+    record_interaction(db, 1, "liked", -1)
+    record_interaction(db, 1, "liked", -1)
+    record_interaction(db, 1, "viewed", -1)
+    db.commit()
+    assert _counts(db, 1) == (0, 0, 0)
+
+
+def test_rebuild_repairs_drifted_counters(db, add_movies, add_history):
+    add_movies(2)
+    add_history(1, [(1, "liked"), (1, "viewed"), (2, "clicked")])
+    add_history(2, [(1, "liked")])
+    record_interaction(db, 1, "liked", +1)  # user_history ile uyumsuz sayaç
+    db.commit()
+
+    assert rebuild_interaction_stats(db) == 2
+    assert _counts(db, 1) == (2, 1, 0)
+    assert _counts(db, 2) == (0, 0, 1)
@@ -0,0 +1,111 @@
+# backend/test_matrix_factorization.py
+#
+# Implicit ALS fold-in, faktör önbelleği ve model yeniden yükleme testleri.
+#
+#   python -m pytest backend/test_matrix_factorization.py
+
+import os
+
+import numpy as np
+import pytest
+
+from backend.config import settings
+from backend.ml.als_train import _als_half_step, _synthetic_interactions, build_confidence, save_model, train_als
+from backend.services import matrix_factorization
+from backend.services.matrix_factorization import ALSModel, get_als_model
+
+FACTORS = 8
+REGULARIZATION = 0.1
+ALPHA = 10.0
+
+
+@pytest.fixture(scope="module")
+def trained():
+    interactions = _synthetic_interactions(40, 60, 8, seed=0)
+    confidence, user_ids, movie_ids = build_confidence(interactions, ALPHA)
+    user_factors, item_factors = train_als(confidence, FACTORS, REGULARIZATION, iterations=30, verbose=False)
+    meta = {"n_users": len(user_ids), "n_items": len(movie_ids), "factors": FACTORS,
+            "regularization": REGULARIZATION, "alpha": ALPHA}
+    # Eğitim film adımıyla biter; kullanıcı faktörlerini son film faktörlerine göre bir kez daha çöz
+    user_factors = _als_half_step(confidence, item_factors, REGULARIZATION)
+    model = ALSModel(user_factors, item_factors, user_ids, movie_ids, meta)
+    return model, interactions, (user_factors, item_factors, user_ids, movie_ids, meta)
+
+
+def _history(interactions, user_id):
+    return [(movie_id, interaction) for uid, movie_id, interaction in interactions if uid == user_id]
+
+
+def test_fold_in_reproduces_trained_user_factors(trained):
+    model, interactions, _ = trained
+    for user_id in (0, 7, 23):
+        folded = model.fold_in(_history(interactions, user_id))
+        expected = model.user_factors[model._user_rows[user_id]]
+        assert np.allclose(folded, expected, rtol=1e-4, atol=1e-5)
+        # Skor sıralaması da eğitimdekiyle aynı
+        movie_ids = list(model._item_rows)
+        assert np.array_equal(np.argsort(-model.score(folded, movie_ids))[:10],
+                              np.argsort(-model.score(expected, movie_ids))[:10])
+
+
+def test_fold_in_ignores_zero_weight_interactions(trained):
+    model, interactions, _ = trained
+    history = _history(interactions, 3)
+    disliked = next(mid for mid in model._item_rows if mid not in {m for m, _ in history})
+
+    assert np.array_equal(model.fold_in(history + [(disliked, "disliked")]), model.fold_in(history))
+    assert model.fold_in([(disliked, "disliked")]) is None
+    assert model.fold_in([(-1, "liked")]) is None
+
+
+def test_user_vector_caches_fold_in(trained, db, add_movies, add_history, monkeypatch):
+    model, _, _ = trained
+    add_movies(5)
+    add_history(1000, [(1, "liked"), (2, "viewed")])
+    monkeypatch.setattr(settings, "ALS_FOLD_IN_CACHE_SECONDS", 60)
+    now = [1000.0]
+    monkeypatch.setattr(matrix_factorization.time, "monotonic", lambda: now[0])
+
+    first = model.user_vector(db, 1000)
+    add_history(1000, [(3, "liked")])
+    assert np.array_equal(model.user_vector(db, 1000), first)
+    now[0] += 61
+    assert np.array_equal(model.user_vector(db, 1000), model.fold_in([(1, "liked"), (2, "viewed"), (3, "liked")]))
+
+
+def test_invalidate_drops_cached_fold_in(trained, db, add_movies, add_history, monkeypatch):
+    model, _, _ = trained
+    add_movies(5)
+    monkeypatch.setattr(settings, "ALS_FOLD_IN_CACHE_SECONDS", 60)
+    monkeypatch.setattr(matrix_factorization, "_model", model)
+
+    # Geçmişi boş kullanıcının None sonucu da önbelleğe girer (ör. login ön-hesaplaması)
+    assert model.user_vector(db, 1000) is None
+    add_history(1000, [(1, "liked")])
+    assert model.user_vector(db, 1000) is None
+    matrix_factorization.invalidate_user_vector(1000)
+    assert np.array_equal(model.user_vector(db, 1000), model.fold_in([(1, "liked")]))
+
+
+def test_get_als_model_reloads_retrained_model(trained, tmp_path, monkeypatch):
+    _, _, (user_factors, item_factors, user_ids, movie_ids, meta) = trained
+    model_dir = str(tmp_path / "als")
+    monkeypatch.setattr(settings, "ALS_MODEL_DIR", model_dir)
+    monkeypatch.setattr(matrix_factorization, "_model", None)
+    monkeypatch.setattr(matrix_factorization, "_model_mtime", -1)
+
+    assert get_als_model() is None
+    save_model(model_dir, user_factors, item_factors, user_ids, movie_ids, meta)
+    first = get_als_model()
+    assert first is not None and get_als_model() is first
+
+    save_model(model_dir, user_factors * 2, item_factors, user_ids, movie_ids, meta)
+    meta_path = os.path.join(model_dir, matrix_factorization.META_FILE)
+    stat = os.stat(meta_path)
+    os.utime(meta_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    second = get_als_model()
+    assert second is not first
+    assert np.allclose(second.user_factors, user_factors * 2)
+    # Eski model hâlâ kendi (değiştirilmemiş) dosyalarını okur
+    assert np.allclose(first.user_factors, user_factors)
+    assert not [name for name in os.listdir(model_dir) if name.endswith(".tmp")]
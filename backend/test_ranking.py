@@ -0,0 +1,32 @@
+# backend/test_ranking.py
+#
+# MMR yeniden sıralama testleri.
+#
+#   python -m pytest backend/test_ranking.py
+
+import numpy as np
+
+from backend.services.ranking import build_features, emotion_matrix, genre_matrix, mmr_rerank
+
+
+def _features(n: int, seed: int = 0) -> np.ndarray:
+    features = np.random.default_rng(seed).random((n, 8))
+    return features / np.linalg.norm(features, axis=1, keepdims=True)
+
+
+def test_mmr_with_lambda_one_is_relevance_order():
+    relevance = np.random.default_rng(0).random(50)
+
+    selected = mmr_rerank(relevance, _features(50), k=20, lambda_=1.0)
+
+    assert selected == np.argsort(-relevance, kind="stable")[:20].tolist()
+
+
+def test_mmr_skips_near_duplicates():
+    probs = [{"mutlu": 1.0}, {"mutlu": 1.0}, {"korku": 1.0}]
+    emotions = emotion_matrix(probs, ["mutlu", "korku"])
+    features = build_features(emotions, genre_matrix(["Comedy", "Comedy", "Horror"]))
+
+    assert mmr_rerank(np.array([1.0, 0.99, 0.5]), features, k=2, lambda_=0.5) == [0, 2]
+    assert mmr_rerank(np.array([1.0]), features[:1], k=5) == [0]
+    assert mmr_rerank(np.array([]), features[:0], k=5) == []
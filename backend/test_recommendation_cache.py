@@ -0,0 +1,96 @@
+# backend/test_recommendation_cache.py
+#
+# Login ön-hesaplamasının /by-emotions isteğine önbellekten dönmesi testleri.
+#
+#   python -m pytest backend/test_recommendation_cache.py
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core.auth import create_access_token
+from backend.db import connection
+from backend.db.connection import get_db
+from backend.db.models import Emotion
+from backend.routers import recommendation as recommendation_router
+from backend.services import recommendation_builder, recommendation_cache, recommender_service
+from backend.services.recommendation_cache import prefetch_recommendations
+from backend.services.recommender_service import get_recommender_service
+
+# Frontend'in (api.js getMoviesByEmotions) gönderdiği gövde
+FRONTEND_REQUEST = {
+    "selected_emotions": ["mutlu"],
+    "max_recommendations": 10,
+    "emotion_threshold": 0.3,
+    "min_similarity_threshold": 0.3,
+}
+
+
+class ReadyRecommender:
+    def is_ready(self) -> bool:
+        return True
+
+    def predict_emotions_with_proba(self, overview, auto_threshold=False, custom_threshold=None):
+        return ["mutlu"], {"mutlu": 0.8}, None
+
+
+@pytest.fixture
+def builder_calls(monkeypatch):
+    calls = []
+    build = recommendation_builder.build_recommendations
+
+    def counting_build(request, db, recommender, user_id):
+        calls.append(user_id)
+        return build(request, db, recommender, user_id)
+
+    monkeypatch.setattr(recommendation_builder, "build_recommendations", counting_build)
+    monkeypatch.setattr(recommendation_router, "build_recommendations", counting_build)
+    return calls
+
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    recommender = ReadyRecommender()
+    monkeypatch.setattr(connection, "SessionLocal", session_factory)
+    monkeypatch.setattr(recommender_service, "get_recommender_service", lambda: recommender)
+    monkeypatch.setattr(recommendation_cache, "_cache", None)
+
+    def _get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(recommendation_router.router)
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_recommender_service] = lambda: recommender
+    return TestClient(app)
+
+
+def test_prefetched_recommendations_are_served(client, builder_calls, db, add_movies, add_history):
+    add_movies(5)
+    db.add_all(Emotion(movie_id=movie_id, emotion_label="mutlu") for movie_id in (1, 2))
+    db.commit()
+    add_history(1, [(3, "viewed")])
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+
+    prefetch_recommendations(1, "mutlu")
+    assert builder_calls == [1]
+
+    response = client.post("/recommendation/by-emotions", json=FRONTEND_REQUEST, headers=headers)
+    assert response.status_code == 200
+    assert builder_calls == [1]
+    assert 3 not in [item["movie_id"] for item in response.json()["recommendations"]]
+
+    # Anonim istek önbelleği kullanmaz; token'la çelişen user_id reddedilir
+    assert client.post("/recommendation/by-emotions", json=FRONTEND_REQUEST).status_code == 200
+    assert builder_calls == [1, None]
+    forbidden = client.post("/recommendation/by-emotions?user_id=2", json=FRONTEND_REQUEST, headers=headers)
+    assert forbidden.status_code == 403
+
+    # Geçmiş değişince (başka bir worker'da da olsa) kayıt eskimiş sayılır
+    add_history(1, [(4, "liked")])
+    assert client.post("/recommendation/by-emotions", json=FRONTEND_REQUEST, headers=headers).status_code == 200
+    assert builder_calls == [1, None, 1]
@@ -0,0 +1,70 @@
+# backend/test_seed_emotions.py
+#
+# Duygu etiketleme scriptinin checkpoint/filigran testleri (AutoGluon yerine
+# overview'a göre sabit olasılık dönen sahte model).
+#
+#   python -m pytest backend/test_seed_emotions.py
+
+import numpy as np
+import pytest
+
+from backend.db.models import Emotion, Movie
+from backend.ml import seed_emotions as seed
+
+
+class FakeRecommender:
+    """Overview "calm" ise tüm olasılıklar 0.1 (etiket çıkmaz), değilse "mutlu" 0.9."""
+
+    target_labels = ["mutlu", "huzunlu"]
+    loaded_labels = ["mutlu", "huzunlu"]
+
+    def __init__(self):
+        self.predicted = []
+
+    def is_ready(self) -> bool:
+        return True
+
+    def predict_proba_batch(self, overviews):
+        self.predicted.extend(overviews)
+        return np.array([[0.1, 0.1] if text == "calm" else [0.9, 0.1] for text in overviews])
+
+
+@pytest.fixture
+def fake(session_factory, monkeypatch):
+    recommender = FakeRecommender()
+    monkeypatch.setattr(seed, "get_recommender_service", lambda: recommender)
+    monkeypatch.setattr(seed, "get_db_session", session_factory)
+    return recommender
+
+
+def _add(db, movies):
+    db.add_all(Movie(movie_id=movie_id, title=f"Film {movie_id}", overview=overview)
+               for movie_id, overview in movies)
+    db.commit()
+
+
+def test_unlabeled_movies_are_not_predicted_again(fake, db, tmp_path):
+    checkpoint = str(tmp_path / "seed.checkpoint.json")
+    _add(db, [(1, "happy"), (2, "calm"), (3, "happy")])
+
+    seed.seed_emotions(checkpoint_path=checkpoint)
+    assert sorted(m for m, in db.query(Emotion.movie_id)) == [1, 3]
+    assert seed.load_checkpoint(checkpoint)["completed"]
+
+    # 2 numaralı film etiketsiz kaldı ama filigranın altında: sadece yeni film tahmin edilir
+    _add(db, [(4, "happy")])
+    fake.predicted.clear()
+    seed.seed_emotions(checkpoint_path=checkpoint)
+    assert fake.predicted == ["happy"]
+    assert seed.load_checkpoint(checkpoint)["last_movie_id"] == 4
+
+
+def test_clear_resets_the_watermark(fake, db, tmp_path):
+    checkpoint = str(tmp_path / "seed.checkpoint.json")
+    _add(db, [(1, "happy"), (2, "calm")])
+    seed.seed_emotions(checkpoint_path=checkpoint)
+
+    fake.predicted.clear()
+    seed.seed_emotions(clear_existing=True, checkpoint_path=checkpoint)
+    assert fake.predicted == ["happy", "calm"]
+    assert [m for m, in db.query(Emotion.movie_id)] == [1]
@@ -0,0 +1,52 @@
+# backend/test_seen_filter.py
+#
+# Görülen film filtresi (NOT EXISTS sorgu filtresi ve LRU önbellek) testleri.
+#
+#   python -m pytest backend/test_seen_filter.py
+
+from backend.db.models import Movie, UserHistory
+from backend.services import seen_filter
+from backend.services.seen_filter import SeenFilter, not_seen_clause
+
+
+def test_not_seen_clause_excludes_viewed_and_liked_before_limit(db, add_movies, add_history):
+    add_movies(6)
+    add_history(1, [(1, "viewed"), (2, "liked"), (3, "disliked")])
+    add_history(2, [(4, "viewed")])
+
+    rows = db.query(Movie.movie_id).filter(not_seen_clause(1)).order_by(Movie.movie_id).limit(3).all()
+
+    assert [movie_id for (movie_id,) in rows] == [3, 4, 5]
+
+
+def test_seen_filter_add_and_invalidate(db, add_movies, add_history):
+    add_movies(5)
+    add_history(1, [(1, "viewed")])
+    cache = SeenFilter(capacity=10)
+
+    assert cache.mask(db, 1, [1, 2, 3]).tolist() == [True, False, False]
+
+    cache.add(1, 3, "liked")
+    cache.add(1, 2, "disliked")
+    assert cache.mask(db, 1, [1, 2, 3]).tolist() == [True, False, True]
+
+    # Silinen kayıt: veritabanından yeniden yüklenir
+    db.query(UserHistory).filter(UserHistory.movie_id == 1).delete()
+    db.commit()
+    cache.invalidate(1)
+    assert cache.mask(db, 1, [1, 2, 3]).tolist() == [False, False, False]
+
+
+def test_seen_filter_reloads_expired_entries(db, add_movies, add_history, monkeypatch):
+    add_movies(3)
+    add_history(1, [(1, "viewed")])
+    now = [1000.0]
+    monkeypatch.setattr(seen_filter.time, "monotonic", lambda: now[0])
+    cache = SeenFilter(capacity=10, ttl_seconds=60)
+    assert cache.get(db, 1).tolist() == [1]
+
+    # Başka bir worker'ın yazdığı kayıt
+    add_history(1, [(2, "liked")])
+    assert cache.get(db, 1).tolist() == [1]
+    now[0] += 61
+    assert cache.get(db, 1).tolist() == [1, 2]
@@ -0,0 +1,70 @@
+# backend/test_similarity_index.py
+#
+# Duygu vektörü k-NN indeksi (tür filtresi, veritabanından kurma) testleri.
+#
+#   python -m pytest backend/test_similarity_index.py
+
+from backend.db.models import Emotion
+from backend.services.similarity_index import EmotionSimilarityIndex
+
+LABELS = ["mutlu", "uzgun", "korku"]
+
+
+def _similarity_index() -> EmotionSimilarityIndex:
+    index = EmotionSimilarityIndex(LABELS)
+    index.upsert(1, {"mutlu": 0.9, "uzgun": 0.1}, "Comedy, Drama")
+    index.upsert(2, {"mutlu": 0.8, "uzgun": 0.2}, "Comedy")
+    index.upsert(3, {"mutlu": 0.7, "korku": 0.3}, "Horror")
+    index.upsert(4, {"uzgun": 0.9}, None)
+    return index
+
+
+def _ids(results):
+    return [movie_id for movie_id, _ in results]
+
+
+def test_similarity_genre_filter():
+    index = _similarity_index()
+
+    assert _ids(index.query(1, k=3)) == [2, 3, 4]
+    assert _ids(index.query(1, k=3, genres=["Horror"])) == [3]
+    assert _ids(index.query(3, k=3, same_genre=True)) == []
+    assert _ids(index.query(2, k=3, same_genre=True)) == [1]
+
+
+def test_similarity_unknown_genre_returns_nothing():
+    index = _similarity_index()
+
+    assert index.query(1, k=3, genres=["Western"]) == []
+    assert index.query(1, k=3, genres=["Horror", "Western"]) == []
+    # Türü olmayan film same_genre ile filtresiz sonuç döndürmemeli
+    assert index.query(4, k=3, same_genre=True) == []
+
+
+def test_similarity_remove():
+    index = _similarity_index()
+    index.remove(2)
+
+    assert _ids(index.query(1, k=3)) == [3, 4]
+    assert index.query(2, k=3) == []
+
+
+def test_similarity_build_and_refresh_from_database(db, add_movies):
+    add_movies(3, genres=["Comedy", "Comedy", "Horror"])
+    db.add_all(Emotion(movie_id=movie_id, emotion_label=label)
+               for movie_id, label in [(1, "mutlu"), (2, "mutlu"), (3, "korku")])
+    db.commit()
+    index = EmotionSimilarityIndex(LABELS)
+    index.build(db)
+
+    assert _ids(index.query(1, k=1)) == [2]
+    assert index.refresh(db) == 0
+
+    db.add(Emotion(movie_id=3, emotion_label="mutlu"))
+    db.commit()
+    assert index.refresh(db) == 1
+    assert _ids(index.query(1, k=2, genres=["Horror"])) == [3]
+
+    db.query(Emotion).filter(Emotion.movie_id == 3).delete()
+    db.commit()
+    assert index.refresh(db) is None
@@ -0,0 +1,83 @@
+# backend/test_text_index.py
+#
+# Overview vektör indeksi (LSH araması, sözlük dışı metin) ve indeks kurulum
+# scripti testleri.
+#
+#   python -m pytest backend/test_text_index.py
+
+import numpy as np
+import pytest
+
+from backend.config import settings
+from backend.db.models import Movie
+from backend.ml import build_text_index as builder
+from backend.services.text_index import TextEmbeddingIndex
+
+
+def _clustered_vectors(n_clusters=40, per_cluster=25, dim=32, noise=0.15, seed=0) -> np.ndarray:
+    """Birim uzunlukta, kümelenmiş sentetik vektörler (overview konularına benzer)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim))
+    vectors = np.repeat(centers, per_cluster, axis=0) + noise * rng.standard_normal((n_clusters * per_cluster, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+@pytest.fixture
+def lsh_settings(monkeypatch):
+    monkeypatch.setattr(settings, "LSH_TABLES", 8)
+    monkeypatch.setattr(settings, "LSH_BITS", 8)
+    monkeypatch.setattr(settings, "LSH_MULTIPROBE", 2)
+
+
+def test_lsh_recall_against_exact_search(lsh_settings):
+    vectors = _clustered_vectors()
+    index = TextEmbeddingIndex(vectors, np.arange(1, len(vectors) + 1, dtype=np.int64))
+
+    report = index.evaluate_recall(n_queries=100, k=10)
+
+    assert report["recall_at_k"] >= 0.9
+    # LSH aday kümesi tüm katalogdan küçük olmalı (aksi halde tam tarama ile aynı iş)
+    assert len(index.lsh.candidates(vectors[0], multiprobe=settings.LSH_MULTIPROBE)) < len(vectors)
+
+
+def test_search_returns_empty_for_zero_query(lsh_settings):
+    vectors = _clustered_vectors(n_clusters=4, per_cluster=5)
+    index = TextEmbeddingIndex(vectors, np.arange(1, len(vectors) + 1, dtype=np.int64))
+
+    zero = np.zeros(vectors.shape[1], dtype=np.float32)
+    assert index.search(zero, k=5) == []
+    assert index.search(zero, k=5, exact=True) == []
+
+
+def test_out_of_vocabulary_text_encodes_to_zero(lsh_settings):
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    corpus = ["a lonely robot falls in love", "a robot learns to love music",
+              "detectives chase a killer in the rain", "a killer hides in the city"]
+    vectorizer = TfidfVectorizer()
+    tfidf = vectorizer.fit_transform(corpus)
+    svd = TruncatedSVD(n_components=2, random_state=42).fit(tfidf)
+    vectors = svd.transform(tfidf).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = TextEmbeddingIndex(vectors, np.arange(1, 5, dtype=np.int64), vectorizer, svd)
+
+    assert not index.encode("qwerty zxcvb").any()
+    assert index.search(index.encode("qwerty zxcvb"), k=2) == []
+    assert np.isclose(np.linalg.norm(index.encode("robot love")), 1.0)
+
+
+@pytest.mark.parametrize("overviews", [
+    ["robot love story"],               # TF-IDF: min_df=2 tek filmde sağlanamaz
+    ["robot story", "robot tale"],      # tek ortak terim: LSA boyutu 0 olurdu
+])
+def test_build_text_index_rejects_tiny_catalog(overviews, db, session_factory, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(builder, "get_db_session", session_factory)
+    db.add_all(Movie(movie_id=i, title=f"Film {i}", overview=overview) for i, overview in enumerate(overviews, 1))
+    db.commit()
+
+    builder.build_text_index(str(tmp_path / "index"), evaluate=False)
+
+    assert "❌" in capsys.readouterr().out
+    assert not (tmp_path / "index").exists()
@@ -0,0 +1,66 @@
+# backend/test_warmup.py
+#
+# Arka plan açılış ısınması ve /recommendation/health readiness testleri.
+#
+#   python -m pytest backend/test_warmup.py
+
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.config import settings
+from backend.routers import recommendation as recommendation_router
+from backend.services import recommender_service, warmup
+from backend.services.recommender_service import get_recommender_service
+
+
+class SlowRecommender:
+    """warm_up, test izin verene kadar bekler (yavaş model ısınması)."""
+
+    layout = "per_label"
+    model_version = None
+    loaded_labels = ["mutlu"]
+    target_labels = ["mutlu"]
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def is_ready(self) -> bool:
+        return True
+
+    def warm_up(self) -> None:
+        assert self.release.wait(timeout=10)
+
+
+@pytest.fixture
+def recommender(monkeypatch):
+    recommender = SlowRecommender()
+    monkeypatch.setattr(recommender_service, "get_recommender_service", lambda: recommender)
+    monkeypatch.setattr(settings, "WARMUP_ON_STARTUP", True)
+    monkeypatch.setattr(warmup, "_warmup_thread", None)
+    # Router warmup_status sözlüğünü isimle import eder: yerinde sıfırlanır
+    warmup._set_status(state=warmup.WARMUP_PENDING)
+    yield recommender
+    recommender.release.set()
+    warmup._set_status(state=warmup.WARMUP_PENDING)
+
+
+def test_health_gates_readiness_while_warming_up(recommender, session_factory):
+    app = FastAPI()
+    app.include_router(recommendation_router.router)
+    app.dependency_overrides[get_recommender_service] = lambda: recommender
+    client = TestClient(app)
+
+    warmup.start_warmup(session_factory)  # beklemeden döner
+    response = client.get("/recommendation/health")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+
+    recommender.release.set()
+    warmup._warmup_thread.join(timeout=10)
+    response = client.get("/recommendation/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert response.json()["warmup"]["state"] == warmup.WARMUP_DONE
@@ -0,0 +1,64 @@
+"""
+Ortak yardımcı fonksiyonlar.
+"""
+
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def start_memory_profiling() -> None:
+    """
+    PROFILE_HOT_PATHS açıksa tracemalloc'u süreç başına bir kez başlatır
+    (uygulama açılışında). measure() izlemeyi kendisi başlatmaz/durdurmaz.
+    """
+    if settings.PROFILE_HOT_PATHS and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        logger.info("🧪 PROFILE_HOT_PATHS: tracemalloc başlatıldı (süreç geneli bellek ölçümü)")
+
+
+@contextmanager
+def measure(label: str, log: Optional[logging.Logger] = None) -> Iterator[Dict[str, float]]:
+    """
+    Bir kod bloğunun süresini (ve PROFILE_HOT_PATHS açıksa bellek tahsisini) ölçer.
+
+    Sıcak okuma yollarında (öneri, geçmiş, film listesi) ORM hydration
+    maliyetini izlemek için kullanılır. Ölçümler dönen sözlüğe de yazılır:
+    ``elapsed_ms`` ve (izleme açıksa) ``alloc_kb`` / ``traced_kb``. Sonuç her
+    çağrıda DEBUG seviyesinde loglanır.
+
+    Bellek değerleri süreç genelidir: tracemalloc tek bir sayaç tuttuğundan
+    ``alloc_kb`` blok süresince süreçteki net tahsis değişimidir ve aynı anda
+    çalışan diğer isteklerin (threadpool) tahsislerini de içerir; tek istek için
+    kesin değil, yük altında eğilim göstergesi olarak okunmalıdır.
+
+    Kullanım:
+    ```python
+    with measure("recommendation.labeled_movies", logger) as stats:
+        rows = query.all()
+    ```
+    """
+    log = log or logger
+    stats: Dict[str, float] = {}
+    trace_memory = settings.PROFILE_HOT_PATHS and tracemalloc.is_tracing()
+    before = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats["elapsed_ms"] = (time.perf_counter() - start) * 1000
+        if trace_memory:
+            current, _ = tracemalloc.get_traced_memory()
+            stats["alloc_kb"] = (current - before) / 1024
+            stats["traced_kb"] = current / 1024
+            log.debug(f"⏱️ {label}: {stats['elapsed_ms']:.1f} ms, süreç geneli net tahsis "
+                      f"{stats['alloc_kb']:+.1f} KB (izlenen {stats['traced_kb']:.1f} KB)")
+        else:
+            log.debug(f"⏱️ {label}: {stats['elapsed_ms']:.1f} ms")
@@ -12,7 +12,11 @@ const api = axios.create({
 api.interceptors.request.use(
   (config) => {
     const token = localStorage.getItem("token");
-    if (token && !config.url.includes("/recommendation")) {
+    // Öneri endpoint'leri anonimdir; by-emotions ise token'la kullanıcının
+    // (login'de ön-hesaplanmış) önbelleğinden döner
+    const isAnonymous =
+      config.url.includes("/recommendation") && !config.url.includes("/recommendation/by-emotions");
+    if (token && !isAnonymous) {
       config.headers.Authorization = `Bearer ${token}`;
     }
     return config;
@@ -157,6 +161,14 @@ export const getMovieDetails = async (movie_id) => {
   return response.data;
 };
 
+// Duygu vektörü benzer filmler – GET
+export const getSimilarMovies = async (movie_id, limit = 8) => {
+  const response = await api.get(`/movies/${movie_id}/similar`, {
+    params: { limit }
+  });
+  return response.data;
+};
+
 export const searchMovies = async (query) => {
   const response = await api.get("/movies/search", {
     params: { q: query }
@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react";
-import { useParams } from "react-router-dom";
-import api from "../api/api";
+import { useNavigate, useParams } from "react-router-dom";
+import api, { getSimilarMovies } from "../api/api";
 import { Box, Typography, CircularProgress, Container, Paper, Chip, useTheme } from "@mui/material"; // useTheme hook'u eklendi
 import AccessTimeIcon from '@mui/icons-material/AccessTime';
 import StarRateIcon from '@mui/icons-material/StarRate';
@@ -12,6 +12,8 @@ const MovieDetail = () => {
   const [movie, setMovie] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(false);
+  const [similarMovies, setSimilarMovies] = useState([]);
+  const navigate = useNavigate();
   
   // Temaya erişim için useTheme hook'u kullanılır
   const theme = useTheme();
@@ -32,6 +34,20 @@ const MovieDetail = () => {
     fetchMovieDetail();
   }, [id]);
 
+  // Benzer filmler (sunucuda önceden kurulmuş indeks, hata olursa bölüm gizlenir)
+  useEffect(() => {
+    const fetchSimilarMovies = async () => {
+      try {
+        const data = await getSimilarMovies(id);
+        setSimilarMovies(data.items || []);
+      } catch (err) {
+        console.warn("Benzer filmler alınamadı:", err);
+        setSimilarMovies([]);
+      }
+    };
+    fetchSimilarMovies();
+  }, [id]);
+
   // Yükleniyor durumu
   if (loading)
     return (
@@ -218,6 +234,33 @@ const MovieDetail = () => {
             </Box>
           </Box>
         </Box>
+
+        {/* Benzer Filmler */}
+        {similarMovies.length > 0 && (
+          <Box sx={{ marginTop: "40px" }}>
+            <Typography variant="h6" fontWeight="bold" gutterBottom sx={{ color: theme.palette.secondary.light }}>
+              Benzer Filmler
+            </Typography>
+            <Box sx={{ display: "flex", gap: 2, overflowX: "auto", paddingBottom: "10px" }}>
+              {similarMovies.map((item) => (
+                <Box
+                  key={item.movie_id}
+                  onClick={() => navigate(`/movies/${item.movie_id}`)}
+                  sx={{ width: "120px", flexShrink: 0, cursor: "pointer" }}
+                >
+                  <img
+                    src={item.poster_url || "https://via.placeholder.com/120x180?text=Poster+Yok"}
+                    alt={item.title}
+                    style={{ width: "100%", height: "180px", objectFit: "cover", borderRadius: "8px" }}
+                  />
+                  <Typography variant="body2" noWrap sx={{ color: theme.palette.text.primary, marginTop: "5px" }}>
+                    {item.title}
+                  </Typography>
+                </Box>
+              ))}
+            </Box>
+          </Box>
+        )}
       </Paper>
     </Container>
   );